@@ -0,0 +1,30 @@
+"""add_generation_status_to_courses
+
+Revision ID: 6d2f3e4a5b7c
+Revises: 5c1e2d3f4a6b
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2f3e4a5b7c'
+down_revision: Union[str, Sequence[str], None] = '5c1e2d3f4a6b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing courses were saved in one transaction, so they are all complete
+    op.add_column('courses', sa.Column('generation_status', sa.String(length=20), nullable=False, server_default='completed'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Remove generation_status column from courses table
+    op.drop_column('courses', 'generation_status')
@@ -0,0 +1,104 @@
+"""partition_chat_messages_by_month
+
+Revision ID: 7e3a4b5c6d8f
+Revises: 6d2f3e4a5b7c
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3a4b5c6d8f'
+down_revision: Union[str, Sequence[str], None] = '6d2f3e4a5b7c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created ahead of the current month; scripts/archive_chat_messages.py keeps this up
+PREMAKE_MONTHS = 3
+
+
+def _month(moment: datetime, offset: int = 0) -> datetime:
+    index = moment.year * 12 + moment.month - 1 + offset
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rebuild chat_messages as a table range partitioned by created_at month
+    op.drop_index('ix_chat_messages_id', table_name='chat_messages')
+    op.rename_table('chat_messages', 'chat_messages_unpartitioned')
+    op.execute("ALTER TABLE chat_messages_unpartitioned RENAME CONSTRAINT chat_messages_pkey TO chat_messages_unpartitioned_pkey")
+
+    # The partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE chat_messages (
+            id UUID NOT NULL,
+            course_session_id UUID REFERENCES course_chat_sessions (id),
+            guide_session_id UUID REFERENCES guide_chat_sessions (id),
+            content TEXT NOT NULL,
+            is_user BOOLEAN NOT NULL,
+            message_order INTEGER NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT chat_messages_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    # History reads and the next message_order lookup go by session
+    op.execute("""
+        CREATE INDEX ix_chat_messages_course_session_order ON chat_messages (course_session_id, message_order)
+        WHERE course_session_id IS NOT NULL
+    """)
+    op.execute("""
+        CREATE INDEX ix_chat_messages_guide_session_order ON chat_messages (guide_session_id, message_order)
+        WHERE guide_session_id IS NOT NULL
+    """)
+
+    now = datetime.now(timezone.utc)
+    oldest = op.get_bind().execute(sa.text("SELECT MIN(created_at) FROM chat_messages_unpartitioned")).scalar() or now
+    month, last = _month(oldest), _month(now, PREMAKE_MONTHS)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE chat_messages_{month.year:04d}_{month.month:02d} PARTITION OF chat_messages "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_month(month, 1).isoformat()}')"
+        )
+        month = _month(month, 1)
+    # Catches rows past the premade months until their partition is created
+    op.execute("CREATE TABLE chat_messages_default PARTITION OF chat_messages DEFAULT")
+
+    op.execute("""
+        INSERT INTO chat_messages (id, course_session_id, guide_session_id, content, is_user, message_order, created_at)
+        SELECT id, course_session_id, guide_session_id, content, is_user, message_order, COALESCE(created_at, now())
+        FROM chat_messages_unpartitioned
+    """)
+    op.drop_table('chat_messages_unpartitioned')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Move messages back into a plain chat_messages table
+    op.create_table('chat_messages_unpartitioned',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('course_session_id', sa.UUID(), nullable=True),
+    sa.Column('guide_session_id', sa.UUID(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('is_user', sa.Boolean(), nullable=False),
+    sa.Column('message_order', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['course_session_id'], ['course_chat_sessions.id'], ),
+    sa.ForeignKeyConstraint(['guide_session_id'], ['guide_chat_sessions.id'], ),
+    sa.PrimaryKeyConstraint('id', name='chat_messages_unpartitioned_pkey')
+    )
+    op.execute("""
+        INSERT INTO chat_messages_unpartitioned (id, course_session_id, guide_session_id, content, is_user, message_order, created_at)
+        SELECT id, course_session_id, guide_session_id, content, is_user, message_order, created_at
+        FROM chat_messages
+    """)
+    # Dropping the parent drops every partition
+    op.drop_table('chat_messages')
+    op.rename_table('chat_messages_unpartitioned', 'chat_messages')
+    op.execute("ALTER TABLE chat_messages RENAME CONSTRAINT chat_messages_unpartitioned_pkey TO chat_messages_pkey")
+    op.create_index(op.f('ix_chat_messages_id'), 'chat_messages', ['id'], unique=False)
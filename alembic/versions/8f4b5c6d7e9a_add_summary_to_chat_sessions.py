@@ -0,0 +1,36 @@
+"""add_summary_to_chat_sessions
+
+Revision ID: 8f4b5c6d7e9a
+Revises: 7e3a4b5c6d8f
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f4b5c6d7e9a'
+down_revision: Union[str, Sequence[str], None] = '7e3a4b5c6d8f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rolling conversation summary on both chat session tables
+    for table in ('course_chat_sessions', 'guide_chat_sessions'):
+        op.add_column(table, sa.Column('summary', sa.Text(), nullable=True))
+        op.add_column(table, sa.Column('summary_turns', sa.Integer(), nullable=False, server_default='0'))
+        op.add_column(table, sa.Column('summary_updated_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Remove the summary columns from both chat session tables
+    for table in ('course_chat_sessions', 'guide_chat_sessions'):
+        op.drop_column(table, 'summary_updated_at')
+        op.drop_column(table, 'summary_turns')
+        op.drop_column(table, 'summary')
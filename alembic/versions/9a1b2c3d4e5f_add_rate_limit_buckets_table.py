@@ -0,0 +1,35 @@
+"""add_rate_limit_buckets_table
+
+Revision ID: 9a1b2c3d4e5f
+Revises: 8f4b5c6d7e9a
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a1b2c3d4e5f'
+down_revision: Union[str, Sequence[str], None] = '8f4b5c6d7e9a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Token buckets shared by all workers when RATE_LIMIT_BACKEND=database
+    op.create_table('rate_limit_buckets',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Drop rate_limit_buckets table
+    op.drop_table('rate_limit_buckets')
@@ -0,0 +1,81 @@
+"""add_user_course_stats
+
+Revision ID: a2b3c4d5e6f7
+Revises: 9a1b2c3d4e5f
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2b3c4d5e6f7'
+down_revision: Union[str, Sequence[str], None] = '9a1b2c3d4e5f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Per-user course aggregates for HR listings, kept current by a trigger on courses
+    op.execute("""
+        CREATE TABLE user_course_stats (
+            user_id UUID PRIMARY KEY REFERENCES users (id) ON DELETE CASCADE,
+            total_courses INTEGER NOT NULL DEFAULT 0,
+            completed_courses INTEGER NOT NULL DEFAULT 0,
+            progress_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            completion_rate NUMERIC(7, 2) GENERATED ALWAYS AS (
+                CASE WHEN total_courses > 0 THEN ROUND((progress_sum / total_courses)::numeric, 2) ELSE 0 END
+            ) STORED
+        )
+    """)
+    op.execute("""
+        CREATE FUNCTION user_course_stats_add(p_user_id UUID, p_total INTEGER, p_completed INTEGER, p_progress DOUBLE PRECISION)
+        RETURNS void AS $$
+            INSERT INTO user_course_stats AS s (user_id, total_courses, completed_courses, progress_sum)
+            VALUES (p_user_id, p_total, p_completed, p_progress)
+            ON CONFLICT (user_id) DO UPDATE
+            SET total_courses = s.total_courses + EXCLUDED.total_courses,
+                completed_courses = s.completed_courses + EXCLUDED.completed_courses,
+                progress_sum = s.progress_sum + EXCLUDED.progress_sum
+        $$ LANGUAGE sql
+    """)
+    op.execute("""
+        CREATE FUNCTION user_course_stats_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM user_course_stats_add(OLD.user_id, -1, -OLD.is_completed::int, -OLD.progress);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM user_course_stats_add(NEW.user_id, 1, NEW.is_completed::int, NEW.progress);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER courses_user_course_stats
+        AFTER INSERT OR DELETE OR UPDATE OF user_id, progress, is_completed ON courses
+        FOR EACH ROW EXECUTE FUNCTION user_course_stats_apply()
+    """)
+    op.execute("""
+        INSERT INTO user_course_stats (user_id, total_courses, completed_courses, progress_sum)
+        SELECT user_id, COUNT(*), COUNT(*) FILTER (WHERE is_completed), COALESCE(SUM(progress), 0)
+        FROM courses
+        GROUP BY user_id
+    """)
+
+    # Department employee listings filter by department and page in name order
+    op.create_index('ix_users_department_id_name', 'users', ['department_id', 'name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_department_id_name', table_name='users')
+    op.execute("DROP TRIGGER courses_user_course_stats ON courses")
+    op.execute("DROP FUNCTION user_course_stats_apply()")
+    op.execute("DROP FUNCTION user_course_stats_add(UUID, INTEGER, INTEGER, DOUBLE PRECISION)")
+    op.drop_table('user_course_stats')
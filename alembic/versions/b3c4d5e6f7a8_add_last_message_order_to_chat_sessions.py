@@ -0,0 +1,43 @@
+"""add_last_message_order_to_chat_sessions
+
+Revision ID: b3c4d5e6f7a8
+Revises: a2b3c4d5e6f7
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c4d5e6f7a8'
+down_revision: Union[str, Sequence[str], None] = 'a2b3c4d5e6f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Message numbering counter on both chat session tables, so it survives archived partitions
+    for table, column in (('course_chat_sessions', 'course_session_id'), ('guide_chat_sessions', 'guide_session_id')):
+        op.add_column(table, sa.Column('last_message_order', sa.Integer(), nullable=False, server_default='0'))
+        op.execute(f"""
+            UPDATE {table} s
+            SET last_message_order = m.last_order
+            FROM (
+                SELECT {column} AS session_id, MAX(message_order) AS last_order
+                FROM chat_messages
+                WHERE {column} IS NOT NULL
+                GROUP BY {column}
+            ) m
+            WHERE s.id = m.session_id
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Remove the message numbering counter from both chat session tables
+    for table in ('course_chat_sessions', 'guide_chat_sessions'):
+        op.drop_column(table, 'last_message_order')
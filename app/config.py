@@ -20,6 +20,12 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 9000
     DEBUG: bool = True
+    FAST_STARTUP: bool = Field(default=False, description="Import routers on their first request and check the database in the background instead of blocking startup")
+    READINESS_TIMEOUT_SECONDS: float = Field(default=2.0, description="Time the readiness probe waits for the database")
+    SERVER_WORKERS: int = Field(default=0, description="Worker processes started by app.server; 0 sizes them to the CPUs available to the container")
+    SERVER_MAX_WORKERS: int = Field(default=8, description="Upper bound on automatically sized workers (each has its own database pool)")
+    SHUTDOWN_GRACE_SECONDS: float = Field(default=25.0, description="Time in-flight requests get to finish after a shutdown signal")
+    SHUTDOWN_DRAIN_DELAY_SECONDS: float = Field(default=0.0, description="Keep serving, with /ready answering 503, this long after SIGTERM before shutting down")
     
     # CORS settings
     ALLOWED_HOSTS: List[str] = ["*"]
@@ -44,9 +50,87 @@ class Settings(BaseSettings):
     # External AI API settings
     AI_API_BASE_URL: str = Field(default="https://agent.taraai.tech", description="Base URL for external AI API")
     AI_API_TIMEOUT: int = Field(default=3600, description="Timeout for AI API requests in seconds")
-    
+    AI_COURSE_STREAMING: bool = Field(default=False, description="Consume course generation as NDJSON and persist each module as it arrives")
+    AI_CHAT_TIMEOUT: int = Field(default=30, description="Timeout for AI chat and session requests in seconds")
+    CHAT_SESSION_CACHE_SIZE: int = Field(default=50000, description="Permanent chat sessions kept in memory per worker")
+    CHAT_SESSION_TOUCH_INTERVAL_SECONDS: float = Field(default=30.0, description="How often deferred chat session updated_at touches are written")
+    CHAT_MESSAGE_FLUSH_INTERVAL_SECONDS: float = Field(default=0.0, description="How often buffered chat messages are written; 0 (the default) writes each turn at once. Only buffer with a CHAT_MESSAGE_WAL_DIR that outlives the worker and a process that replays it")
+    CHAT_MESSAGE_FLUSH_BATCH: int = Field(default=500, description="Buffered chat exchanges that trigger an immediate write")
+    CHAT_MESSAGE_WAL_DIR: str = Field(default="", description="Directory for the chat message write-ahead log, replayed when a worker starts; empty keeps buffered messages in memory only")
+    CHAT_MESSAGE_WAL_FSYNC: bool = Field(default=False, description="fsync the chat message write-ahead log on every turn")
+    CHAT_PARTITION_PREMAKE_MONTHS: int = Field(default=3, description="Monthly chat_messages partitions kept created ahead of the current month")
+    CHAT_MESSAGE_RETENTION_MONTHS: int = Field(default=12, description="Months of chat messages kept in the database before partitions are archived")
+    CHAT_ARCHIVE_DIR: str = Field(default="archive/chat_messages", description="Directory archived chat message partitions are written to")
+    CHAT_SUMMARY_EVERY_TURNS: int = Field(default=20, description="Turns after which older chat turns are folded into the session summary")
+    CHAT_RECENT_TURNS: int = Field(default=4, description="Latest chat turns sent verbatim with the summary")
+    CHAT_SUMMARY_MAX_CHARS: int = Field(default=2000, description="Longest stored chat session summary")
+    CHAT_SUMMARIZER: str = Field(default="agent", description="Chat summarizer: agent, or local for the extractive stub")
+    CHAT_MEMORY_CACHE_SIZE: int = Field(default=5000, description="Conversation windows (summary and latest turns) kept in memory per worker")
+    CHAT_SESSION_POOL_SIZE: int = Field(default=1, description="Agent sessions created ahead of use per user; 0 creates them on the first message")
+    CHAT_SESSION_POOL_MAX_USERS: int = Field(default=10000, description="Users that keep pre-created agent sessions per worker")
+    CHAT_SESSION_POOL_TTL_SECONDS: float = Field(default=3600.0, description="Age after which a pre-created agent session is no longer handed out")
+    CHAT_WS_AUTH_TIMEOUT_SECONDS: float = Field(default=10.0, description="Time a chat WebSocket client has to send its auth frame")
+    CHAT_WS_MAX_CONVERSATIONS: int = Field(default=20, description="Course/guide conversations one chat WebSocket may open")
+    CHAT_WS_MAX_MESSAGE_CHARS: int = Field(default=8000, description="Longest chat message accepted over the WebSocket")
+
+    # AI agent resilience settings
+    AI_CHAT_MAX_CONCURRENCY: int = Field(default=50, description="Maximum concurrent AI chat calls per worker")
+    AI_CHAT_QUEUE_TIMEOUT: float = Field(default=2.0, description="Seconds a chat call may wait for a free slot before being rejected")
+    AI_GENERATION_MAX_CONCURRENCY: int = Field(default=4, description="Maximum concurrent AI course/guide generations per worker")
+    AI_GENERATION_QUEUE_TIMEOUT: float = Field(default=0.0, description="Seconds a generation may wait for a free slot before being rejected")
+    AI_GENERATION_MAX_PER_USER: int = Field(default=2, description="Generations one user may have running or queued per worker")
+    AI_GENERATION_QUEUE_WAIT_SECONDS: float = Field(default=300.0, description="Seconds a generation may wait in the fair queue before being rejected")
+    AI_RETRY_MAX_ATTEMPTS: int = Field(default=3, description="Attempts for idempotent AI calls, including the first one")
+    AI_RETRY_BASE_DELAY: float = Field(default=0.2, description="Base delay in seconds for jittered exponential retry backoff")
+    AI_RETRY_MAX_DELAY: float = Field(default=2.0, description="Maximum delay in seconds between retries")
+    AI_CIRCUIT_FAILURE_RATE: float = Field(default=0.5, description="Failure rate that opens the AI circuit breaker")
+    AI_CIRCUIT_MINIMUM_CALLS: int = Field(default=10, description="Calls needed in the window before the failure rate is evaluated")
+    AI_CIRCUIT_WINDOW_SECONDS: float = Field(default=60.0, description="Sliding window in seconds for the AI circuit breaker")
+    AI_CIRCUIT_OPEN_SECONDS: float = Field(default=30.0, description="Seconds the AI circuit stays open before probing again")
+
+    # AI rate limiting settings
+    RATE_LIMIT_ENABLED: bool = Field(default=True, description="Limit AI chat and generation requests per user")
+    RATE_LIMIT_BACKEND: str = Field(default="memory", description="Token bucket store: memory (per worker) or database (shared by all workers)")
+    RATE_LIMIT_CHAT_PER_MINUTE: float = Field(default=20.0, description="AI chat messages a user may send per minute")
+    RATE_LIMIT_CHAT_BURST: int = Field(default=10, description="AI chat messages a user may send at once")
+    RATE_LIMIT_GENERATION_PER_HOUR: float = Field(default=6.0, description="AI course/guide generations a user may start per hour")
+    RATE_LIMIT_GENERATION_BURST: int = Field(default=2, description="AI course/guide generations a user may start at once")
+
+    # Quiz grading settings
+    QUIZ_ANSWER_CACHE_SIZE: int = Field(default=10000, description="Modules whose quiz answer index is kept in memory for grading")
+
+    # Idempotency settings
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = Field(default=86400, description="How long stored Idempotency-Key results are replayed, in seconds")
+    IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS: int = Field(default=3660, description="Age after which an unfinished Idempotency-Key reservation may be taken over, in seconds")
+
+    # Request instrumentation settings
+    QUERY_STATS_ENABLED: bool = Field(default=True, description="Count SQL statements per request and report them in Server-Timing")
+    METRICS_ENABLED: bool = Field(default=True, description="Collect request, DB and AI agent metrics and serve them on /metrics")
+    QUERY_N_PLUS_ONE_THRESHOLD: int = Field(default=5, description="Warn when one statement runs this many times in a single request")
+
+    # Response compression settings
+    COMPRESSION_ENABLED: bool = Field(default=True, description="Compress responses with brotli (if installed) or gzip")
+    COMPRESSION_MINIMUM_SIZE: int = Field(default=1024, description="Responses smaller than this many bytes are sent uncompressed")
+    COMPRESSION_GZIP_LEVEL: int = Field(default=6, description="gzip compression level (1-9)")
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=4, description="Brotli quality (0-11)")
+
+    # Tracing settings
+    TRACING_ENABLED: bool = Field(default=False, description="Record spans for requests, repositories, SQL and outbound HTTP calls")
+    TRACING_EXPORTER: str = Field(default="console", description="Span exporter: console, file or otlp (otlp needs the OpenTelemetry SDK)")
+    TRACING_FILE_PATH: str = Field(default="traces/spans.jsonl", description="JSON-lines file used by the file exporter")
+    TRACING_SAMPLE_RATIO: float = Field(default=1.0, description="Share of new traces that are recorded")
+
+    # Profiling settings
+    PROFILING_ENABLED: bool = Field(default=False, description="Expose the /debug/profile endpoints and per-route CPU accounting")
+    PROFILING_ADMIN_TOKEN: str = Field(default="", description="Token required in X-Admin-Token for profiling; profiling is refused while empty")
+    PROFILING_SAMPLE_INTERVAL_MS: float = Field(default=5.0, description="Default sampling profiler interval in milliseconds")
+    PROFILING_MAX_REQUEST_PROFILES: int = Field(default=20, description="Single-request profiles kept per worker")
+
     # Logging settings
     LOG_LEVEL: str = Field(default="INFO", description="Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)")
+    LOG_FORMAT: str = Field(default="json", description="Log output: json (one object per line) or text")
+    LOG_DEBUG_SAMPLE_RATE: float = Field(default=1.0, description="Share of DEBUG records kept when LOG_LEVEL is DEBUG")
+    LOG_MAX_MESSAGE_LENGTH: int = Field(default=2000, description="Log messages longer than this are truncated")
     
     class Config:
         env_file = ".env"
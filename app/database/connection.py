@@ -2,6 +2,9 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.database.query_stats import install_query_stats
+from app.tracing import install_sql_tracing
+from app.metrics import REGISTRY, DB_POOL_SIZE, DB_POOL_CHECKED_OUT, DB_POOL_CHECKED_IN, DB_POOL_OVERFLOW
 
 # Create database engine
 engine = create_engine(
@@ -10,6 +13,25 @@ engine = create_engine(
     pool_pre_ping=True,   # Verify connections before use
 )
 
+# Count statements, DB time and rows per request
+if settings.QUERY_STATS_ENABLED:
+    install_query_stats(engine)
+
+# One span per SQL statement
+if settings.TRACING_ENABLED:
+    install_sql_tracing(engine)
+
+def _collect_pool_metrics():
+    """Refresh connection pool gauges at scrape time"""
+    pool = engine.pool
+    if hasattr(pool, "checkedout"):
+        DB_POOL_SIZE.set(pool.size())
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_CHECKED_IN.set(pool.checkedin())
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+REGISTRY.add_collector(_collect_pool_metrics)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
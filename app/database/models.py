@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, ARRAY, JSON
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, ARRAY, JSON, UniqueConstraint, Numeric, Computed
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -85,6 +85,7 @@ class CourseModel(Base):
     source_from = Column(ARRAY(String), nullable=True)  # Array of source URLs
     progress = Column(Float, default=0.0, nullable=False)
     is_completed = Column(Boolean, default=False, nullable=False)
+    generation_status = Column(String(20), nullable=False, server_default="completed")  # generating, completed, failed
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -170,4 +171,43 @@ class GuideModel(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    user = relationship("UserModel", back_populates="guides")
\ No newline at end of file
+    user = relationship("UserModel", back_populates="guides")
+
+class IdempotencyKeyModel(Base):
+    """Idempotency key model for replaying retried requests"""
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    idempotency_key = Column(String(255), nullable=False)
+    endpoint = Column(String(255), nullable=False)  # Logical endpoint name the key is scoped to
+    request_hash = Column(String(64), nullable=False)  # SHA-256 of the canonical request payload
+    status = Column(String(20), nullable=False, default="in_progress")  # in_progress, completed
+    resource_id = Column(UUID(as_uuid=True), nullable=True)  # Course/guide/lesson/quiz produced by the request
+    response_body = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('user_id', 'endpoint', 'idempotency_key', name='uq_idempotency_user_endpoint_key'),
+    )
+
+class RateLimitBucketModel(Base):
+    """Token bucket of one user and AI endpoint class, shared by all workers"""
+    __tablename__ = "rate_limit_buckets"
+    
+    key = Column(String(255), primary_key=True)  # <endpoint class>:<user id>
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class UserCourseStatsModel(Base):
+    """Course aggregates of one user, maintained by the courses_user_course_stats trigger"""
+    __tablename__ = "user_course_stats"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_courses = Column(Integer, nullable=False, default=0)
+    completed_courses = Column(Integer, nullable=False, default=0)
+    progress_sum = Column(Float, nullable=False, default=0.0)
+    completion_rate = Column(Numeric(7, 2), Computed(
+        "CASE WHEN total_courses > 0 THEN ROUND((progress_sum / total_courses)::numeric, 2) ELSE 0 END", persisted=True
+    ))
@@ -0,0 +1,71 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.metrics import DB_QUERY_DURATION
+
+@dataclass
+class QueryStats:
+    """Statements, database time and rows seen during one request (or test block)"""
+
+    queries: int = 0
+    db_time_ms: float = 0.0
+    rows: int = 0
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration_ms: float, rows: int) -> None:
+        self.queries += 1
+        self.db_time_ms += duration_ms
+        self.rows += max(rows, 0)
+        self.statements[" ".join(statement.split())] += 1
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least `threshold` times, the usual sign of an N+1 loop"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+_observers: List[QueryStats] = []
+
+def start_request_stats() -> QueryStats:
+    """Begin collecting stats for the current request context"""
+    stats = QueryStats()
+    _request_stats.set(stats)
+    return stats
+
+def get_request_stats() -> Optional[QueryStats]:
+    return _request_stats.get()
+
+@contextmanager
+def observe_queries() -> Iterator[QueryStats]:
+    """Collect stats for every statement on any thread while the block runs"""
+    stats = QueryStats()
+    _observers.append(stats)
+    try:
+        yield stats
+    finally:
+        _observers.remove(stats)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    duration_ms = (time.perf_counter() - start_times.pop()) * 1000 if start_times else 0.0
+    rows = cursor.rowcount if cursor.rowcount is not None else 0
+    DB_QUERY_DURATION.observe(duration_ms / 1000)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration_ms, rows)
+    for observer in _observers:
+        observer.record(statement, duration_ms, rows)
+
+def install_query_stats(engine: Engine) -> None:
+    """Attach the statement counters to an engine"""
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
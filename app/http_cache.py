@@ -0,0 +1,49 @@
+"""
+Conditional GET helpers
+
+Handlers derive a strong ETag from a cheap version query (updated_at
+timestamps) before loading the resource. When the client's If-None-Match
+still matches, they answer 304 without loading or serializing anything.
+"""
+import hashlib
+from typing import Dict, Optional
+from fastapi import Response, status
+
+# Cache-Control per route. Course and guide data are per user, so never shared caches;
+# "no-cache" lets browsers keep a copy but revalidate it with If-None-Match every time.
+CACHE_CONTROL = {
+    "course_detail": "private, no-cache",
+    "guide_list": "private, no-cache",
+    "guide_detail": "private, max-age=60, must-revalidate",
+}
+
+# Suffixes CompressionMiddleware appends to ETags of encoded representations
+ENCODING_ETAG_SUFFIXES = ("-gzip", "-br")
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the given version parts"""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+def _normalize(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ENCODING_ETAG_SUFFIXES:
+        if tag.endswith(f'{suffix}"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 prescribes for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_normalize(candidate) == etag for candidate in if_none_match.split(","))
+
+def cache_headers(etag: str, policy: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL[policy]}
+
+def not_modified(etag: str, policy: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, policy))
@@ -0,0 +1,78 @@
+"""
+Lazy router loading
+
+With FAST_STARTUP, routers are not imported when the app is created. Each
+one is registered by URL prefix and module path, and LazyRouterMiddleware
+imports and includes it when the first request under that prefix arrives,
+so a cold instance only pays for the handler/service/repository graph it
+actually serves. Documentation routes load everything first.
+"""
+import importlib
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+class LazyRouters:
+    """Routers of an app, keyed by the path prefix they serve"""
+
+    def __init__(self, app: FastAPI, routers: List[Tuple[str, str]], prefix: str = ""):
+        self.app = app
+        self.prefix = prefix
+        # Longest prefix first so "/ai/course" wins over a shorter match
+        self._pending = sorted(((prefix + path, module) for path, module in routers), key=lambda item: -len(item[0]))
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> List[str]:
+        return [module for _, module in self._pending]
+
+    def _matching(self, path: str) -> Optional[Tuple[str, str]]:
+        for router_prefix, module in self._pending:
+            if path == router_prefix or path.startswith(router_prefix + "/"):
+                return router_prefix, module
+        return None
+
+    def _include(self, router_prefix: str, module_path: str) -> None:
+        start = time.perf_counter()
+        router = importlib.import_module(module_path).router
+        self.app.include_router(router, prefix=self.prefix)
+        # Regenerate the OpenAPI schema with the new routes
+        self.app.openapi_schema = None
+        self._pending.remove((router_prefix, module_path))
+        logger.info(f"Loaded router {module_path} in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    def load_for(self, path: str) -> None:
+        """Include the router serving `path`, if it is not loaded yet"""
+        if not self._pending or self._matching(path) is None:
+            return
+        with self._lock:
+            match = self._matching(path)
+            if match is not None:
+                self._include(*match)
+
+    def load_all(self) -> None:
+        with self._lock:
+            for router_prefix, module_path in list(self._pending):
+                self._include(router_prefix, module_path)
+
+class LazyRouterMiddleware:
+    """Include a lazily registered router before its first request is routed"""
+
+    def __init__(self, app: ASGIApp, routers: LazyRouters, docs_paths: Tuple[str, ...] = ()):
+        self.app = app
+        self.routers = routers
+        self.docs_paths = docs_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket") and self.routers.pending:
+            path = scope["path"]
+            if path in self.docs_paths:
+                self.routers.load_all()
+            else:
+                self.routers.load_for(path)
+        await self.app(scope, receive, send)
@@ -0,0 +1,83 @@
+"""
+Process lifecycle state
+
+Tracks requests in flight and whether the worker is draining (shutdown has
+been requested). /ready reports 503 while draining so load balancers stop
+routing new traffic, and the shutdown hook waits for in-flight requests,
+such as streamed chat or course generation, before closing the database
+pool and the AI agent client.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List
+
+logger = logging.getLogger(__name__)
+
+class ServerLifecycle:
+    """Draining flag and in-flight request count of this worker"""
+
+    def __init__(self):
+        self.draining = False
+        self.draining_since = None
+        self.in_flight = 0
+        self._idle = None
+        self._shutdown_hooks: List[Callable[[], Awaitable[None]]] = []
+
+    def _idle_event(self) -> asyncio.Event:
+        # Created lazily so it binds to the worker's running loop
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            if self.in_flight == 0:
+                self._idle.set()
+        return self._idle
+
+    def begin_draining(self) -> None:
+        if not self.draining:
+            self.draining = True
+            self.draining_since = time.monotonic()
+            logger.info(f"Draining: {self.in_flight} request(s) in flight")
+
+    def request_started(self) -> None:
+        self.in_flight += 1
+        self._idle_event().clear()
+
+    def request_finished(self) -> None:
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle_event().set()
+
+    def grace_left(self, grace: float) -> float:
+        """Seconds of `grace`, counted from the start of draining, not yet spent"""
+        if self.draining_since is None:
+            return grace
+        return max(0.0, grace - (time.monotonic() - self.draining_since))
+
+    async def wait_for_idle(self, timeout: float) -> bool:
+        """Wait until no request is in flight; False when the timeout expired first"""
+        if self.in_flight == 0:
+            return True
+        try:
+            await asyncio.wait_for(self._idle_event().wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Shutting down with {self.in_flight} request(s) still in flight")
+            return False
+
+    def add_shutdown_hook(self, hook: Callable[[], Awaitable[None]]) -> None:
+        """Run `hook` at shutdown, after in-flight requests, before the database pool closes
+
+        Modules register their own cleanup (flush buffers, close clients), so
+        routers that were never loaded have nothing to clean up.
+        """
+        if hook not in self._shutdown_hooks:
+            self._shutdown_hooks.append(hook)
+
+    async def run_shutdown_hooks(self) -> None:
+        for hook in self._shutdown_hooks:
+            try:
+                await hook()
+            except Exception as e:
+                logger.error(f"Shutdown hook {getattr(hook, '__qualname__', hook)} failed: {e!r}")
+
+lifecycle = ServerLifecycle()
@@ -0,0 +1,179 @@
+"""
+Non-blocking structured logging
+
+Log calls only put the record on a queue; a background listener thread does
+the formatting and the write to stdout, so request handlers never block on
+log I/O. Records are emitted as JSON lines with secrets redacted, long
+messages and fields truncated, and DEBUG records sampled.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Any, Optional
+from app.config import settings
+
+REDACTED = "[REDACTED]"
+
+# Keys whose values are never written, wherever they appear (extra fields, dicts in messages)
+SECRET_KEYS = (
+    "password", "passwd", "secret", "token", "authorization", "api_key", "apikey",
+    "client_secret", "cookie", "cv"
+)
+
+_SECRET_KEY_PATTERN = "|".join(sorted(SECRET_KEYS, key=len, reverse=True))
+# 'access_token': 'abc', "password": "x", token=abc, Authorization: Bearer abc
+_SECRET_ASSIGNMENT = re.compile(
+    rf"""(?ix)
+    (['"]?[\w-]*(?:{_SECRET_KEY_PATTERN})[\w-]*['"]?\s*[:=]\s*)
+    (?:'[^']*'|"[^"]*"|bearer\s+[^\s,;}}]+|[^\s,;'"}}]+)
+    """
+)
+_BEARER = re.compile(r"(?i)\bbearer\s+[A-Za-z0-9._~+/=-]+")
+_JWT = re.compile(r"\beyJ[\w-]+\.[\w-]+\.[\w-]+")
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+def _is_secret_key(key: Any) -> bool:
+    key = str(key).lower()
+    return any(secret in key for secret in SECRET_KEYS)
+
+def redact_text(text: str) -> str:
+    """Mask secret values inside free text (formatted dicts, headers, query strings)"""
+    text = _SECRET_ASSIGNMENT.sub(lambda match: match.group(1) + f"'{REDACTED}'", text)
+    text = _BEARER.sub(f"Bearer {REDACTED}", text)
+    return _JWT.sub(REDACTED, text)
+
+def truncate(text: str, max_length: int) -> str:
+    if max_length <= 0 or len(text) <= max_length:
+        return text
+    return f"{text[:max_length]}... [truncated {len(text) - max_length} chars]"
+
+def sanitize(value: Any, max_length: int) -> Any:
+    """Redact and truncate a structured value from `extra`"""
+    if isinstance(value, dict):
+        return {key: REDACTED if _is_secret_key(key) else sanitize(item, max_length) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [sanitize(item, max_length) for item in value]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return truncate(redact_text(str(value)), max_length)
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message and extra fields"""
+
+    def __init__(self, max_message_length: int = 2000, max_field_length: int = 500):
+        super().__init__()
+        self.max_message_length = max_message_length
+        self.max_field_length = max_field_length
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": truncate(redact_text(record.getMessage()), self.max_message_length)
+        }
+        for key, value in vars(record).items():
+            if key in _RECORD_ATTRIBUTES or key.startswith("_"):
+                continue
+            entry[key] = REDACTED if _is_secret_key(key) else sanitize(value, self.max_field_length)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = redact_text(record.exc_text)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development, with the same redaction and truncation"""
+
+    def __init__(self, max_message_length: int = 2000):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+        self.max_message_length = max_message_length
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        record.message = truncate(redact_text(record.message), self.max_message_length)
+        return super().formatMessage(record)
+
+class DebugSampler(logging.Filter):
+    """Keep only a share of DEBUG records; higher levels always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that keeps exc_info for the listener-side formatter
+
+    The stock prepare() renders the record with a plain Formatter on the
+    calling thread; here only the message is merged with its args (so
+    mutable arguments are snapshotted) and the traceback text is captured.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def configure_logging(level: str = None, log_format: str = None, debug_sample_rate: float = None,
+                      max_message_length: int = None, stream=None) -> logging.handlers.QueueListener:
+    """Route the root logger through a queue to a background writer; safe to call again"""
+    global _listener
+    stop_logging()
+
+    level = (level or settings.LOG_LEVEL).upper()
+    log_format = (log_format or settings.LOG_FORMAT).lower()
+    debug_sample_rate = settings.LOG_DEBUG_SAMPLE_RATE if debug_sample_rate is None else debug_sample_rate
+    max_message_length = settings.LOG_MAX_MESSAGE_LENGTH if max_message_length is None else max_message_length
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter(max_message_length) if log_format == "json" else TextFormatter(max_message_length))
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(DebugSampler(debug_sample_rate))
+
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, _QueueHandler)]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, level, logging.INFO))
+
+    # uvicorn installs its own synchronous stream handlers; send its records through the queue too
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
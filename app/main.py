@@ -1,31 +1,56 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
+import asyncio
+import importlib
 import logging
-from internal.user.handler.user_handler import router as user_router
-from internal.oauth.handler.oauth_handler import router as oauth_router
-from internal.ai.course.handler.course_handler import router as ai_course_router
-from internal.ai.guide.handler.guide_handler import router as ai_guide_router
-from internal.guide.handler.guide_handler import router as guide_router
-from internal.course.handler.course_handler import router as course_router
-from internal.hr.company.handler.company_handler import router as hr_company_router
-from internal.hr.department.handler.department_handler import router as hr_department_router
-from internal.hr.employee.handler.employee_handler import router as hr_employee_router
-from internal.ai.chat.handler.chat_handler import router as chat_router
 from internal.auth.middleware import JWTMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.tracing import TracingMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.draining import DrainingMiddleware
+from app.lazy_routers import LazyRouters, LazyRouterMiddleware
+from app.lifecycle import lifecycle
+from app.metrics import REGISTRY
+from app.responses import FastJSONResponse
+from app.tracing import configure_tracing
+from app.logging_config import configure_logging
+from app.profiling import router as profiling_router
 from app.config import settings
-from app.database.connection import SessionLocal
+from app.database.connection import SessionLocal, engine
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL.upper()),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+# Configure logging (queued, written by a background thread)
+configure_logging()
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
+# (router prefix, handler module) of every API router, mounted under API_V1_STR
+ROUTERS = [
+    ("/users", "internal.user.handler.user_handler"),
+    ("/oauth", "internal.oauth.handler.oauth_handler"),
+    ("/ai/course", "internal.ai.course.handler.course_handler"),
+    ("/ai/guide", "internal.ai.guide.handler.guide_handler"),
+    ("/guide", "internal.guide.handler.guide_handler"),
+    ("/course", "internal.course.handler.course_handler"),
+    ("/hr/company", "internal.hr.company.handler.company_handler"),
+    ("/hr/department", "internal.hr.department.handler.department_handler"),
+    ("/hr/employee", "internal.hr.employee.handler.employee_handler"),
+    ("/ai/chat", "internal.ai.chat.handler.chat_handler"),
+]
+
+def check_database() -> None:
+    """Run SELECT 1 on a pooled connection"""
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT 1"))
+    finally:
+        db.close()
+
 def create_app() -> FastAPI:
     """Create and configure FastAPI application"""
     app = FastAPI(
@@ -34,8 +59,15 @@ def create_app() -> FastAPI:
         version=settings.VERSION,
         docs_url=settings.DOCS_URL,
         redoc_url=settings.REDOC_URL,
+        default_response_class=FastJSONResponse,
     )
 
+    # Innermost: routers are included just before the request is routed
+    if settings.FAST_STARTUP:
+        lazy_routers = LazyRouters(app, ROUTERS, prefix=settings.API_V1_STR)
+        docs_paths = tuple(path for path in (app.openapi_url, app.docs_url, app.redoc_url) if path)
+        app.add_middleware(LazyRouterMiddleware, routers=lazy_routers, docs_paths=docs_paths)
+
     # Add CORS middleware - must be added before other middleware
     app.add_middleware(
         CORSMiddleware,
@@ -55,6 +87,8 @@ def create_app() -> FastAPI:
             "Content-Language",
             "Content-Type",
             "Authorization",
+            "Idempotency-Key",
+            "If-None-Match",
             "X-Requested-With",
             "Origin",
             "Access-Control-Request-Method",
@@ -63,19 +97,43 @@ def create_app() -> FastAPI:
         expose_headers=["*"],  # Headers that the frontend can access
     )
     
+    # Inside the JWT/metrics middleware so their timings include compression
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        )
+
     app.middleware("http")(JWTMiddleware())
 
+    # Outermost so the JWT user lookup is counted too
+    if settings.QUERY_STATS_ENABLED:
+        app.middleware("http")(QueryStatsMiddleware())
+
+    if settings.METRICS_ENABLED:
+        app.middleware("http")(MetricsMiddleware())
+
+    if settings.PROFILING_ENABLED:
+        app.middleware("http")(ProfilingMiddleware())
+
+    # Outermost so the server span covers every other middleware
+    if settings.TRACING_ENABLED:
+        configure_tracing()
+        app.middleware("http")(TracingMiddleware())
+
+    # Counts every request in flight, including streamed bodies, for graceful shutdown
+    app.add_middleware(DrainingMiddleware)
+
     # Include routers
-    app.include_router(user_router, prefix=settings.API_V1_STR)
-    app.include_router(oauth_router, prefix=settings.API_V1_STR)
-    app.include_router(ai_course_router, prefix=settings.API_V1_STR)
-    app.include_router(ai_guide_router, prefix=settings.API_V1_STR)
-    app.include_router(guide_router, prefix=settings.API_V1_STR)
-    app.include_router(course_router, prefix=settings.API_V1_STR)
-    app.include_router(hr_company_router, prefix=settings.API_V1_STR)
-    app.include_router(hr_department_router, prefix=settings.API_V1_STR)
-    app.include_router(hr_employee_router, prefix=settings.API_V1_STR)
-    app.include_router(chat_router, prefix=settings.API_V1_STR)
+    if not settings.FAST_STARTUP:
+        for _, module_path in ROUTERS:
+            app.include_router(importlib.import_module(module_path).router, prefix=settings.API_V1_STR)
+
+    # Admin-only, outside the API prefix
+    if settings.PROFILING_ENABLED:
+        app.include_router(profiling_router)
 
     @app.get("/")
     async def read_root():
@@ -84,26 +142,73 @@ def create_app() -> FastAPI:
     @app.get("/health")
     async def health_check():
         return {"status": "healthy"}
+
+    @app.get("/live")
+    async def liveness_check():
+        """Liveness probe: the worker's event loop is responsive"""
+        return {"status": "alive", "draining": lifecycle.draining}
+
+    @app.get("/ready")
+    async def readiness_check():
+        """Readiness probe: not draining, and the database answers within READINESS_TIMEOUT_SECONDS"""
+        if lifecycle.draining:
+            return FastJSONResponse({"status": "draining", "in_flight": lifecycle.in_flight}, status_code=503)
+        try:
+            await asyncio.wait_for(run_in_threadpool(check_database), timeout=settings.READINESS_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Readiness check failed: {e!r}")
+            return FastJSONResponse({"status": "unavailable"}, status_code=503)
+        return {"status": "ready"}
     
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics():
+            """Prometheus scrape endpoint"""
+            return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
     @app.get("/cors-test")
     async def cors_test():
         return {"message": "CORS is working!", "timestamp": "2025-01-27"}
     
 
+    async def warm_database():
+        try:
+            await run_in_threadpool(check_database)
+            logger.info("✅ Database connection successful")
+        except Exception as e:
+            logger.error(f"❌ Database connection failed: {e}")
+
     @app.on_event("startup")
     async def startup_event():
         """Test database connection on startup"""
         logger.info("🚀 Starting Tara API application...")
+        if settings.CHAT_MESSAGE_WAL_DIR:
+            # Write chat messages that a crashed worker accepted but never stored
+            from internal.ai.chat.service.message_buffer import message_buffer
+            app.state.chat_message_recovery = asyncio.create_task(message_buffer.recover())
+        if settings.FAST_STARTUP:
+            # Serve immediately; /ready reports the database until the first connection works
+            app.state.database_warmup = asyncio.create_task(warm_database())
+            return
         try:
             # Test database connection
-            db = SessionLocal()
-            db.execute(text("SELECT 1"))
-            db.close()
+            await run_in_threadpool(check_database)
             logger.info("✅ Database connection successful")
         except Exception as e:
             logger.error(f"❌ Database connection failed: {e}")
             raise e
 
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        """Let in-flight requests finish, then close the AI client and the database pool"""
+        lifecycle.begin_draining()
+        # Under app.server uvicorn already spent part of the grace period on the same requests
+        await lifecycle.wait_for_idle(lifecycle.grace_left(settings.SHUTDOWN_DRAIN_DELAY_SECONDS + settings.SHUTDOWN_GRACE_SECONDS))
+        # Registered by the modules that were loaded, e.g. the AI agent client
+        await lifecycle.run_shutdown_hooks()
+        engine.dispose()
+        logger.info("Tara API stopped")
+
     return app
 
 # Create app instance
@@ -0,0 +1,167 @@
+import gzip
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "application/problem+json")
+# Streamed incrementally to the client; compressing would hold chunks back
+STREAMING_TYPES = ("application/x-ndjson", "text/event-stream")
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name and quality > 0:
+            accepted.add(name.lower())
+    return accepted
+
+class CompressionMiddleware:
+    """Brotli/gzip response compression above a size threshold
+
+    A plain ASGI middleware (rather than an http middleware) so streamed
+    responses pass through chunk by chunk. Single-body responses below
+    `minimum_size`, already-encoded responses, non-text content types and
+    NDJSON/SSE streams are left alone. Brotli is used when the optional
+    brotli package is installed and the client accepts it.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        accepted = _accepted_encodings(accept_encoding)
+        if HAS_BROTLI and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        encoding = self.choose_encoding(headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressionResponder(self, encoding, send, headers.get("if-none-match", "")).send)
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send, if_none_match: str = ""):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.if_none_match = if_none_match
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _compress_all(self, body: bytes) -> bytes:
+        if self.encoding == "br":
+            return brotli.compress(body, quality=self.middleware.brotli_quality)
+        return gzip.compress(body, compresslevel=self.middleware.gzip_level, mtime=0)
+
+    def _new_compressor(self):
+        if self.encoding == "br":
+            return brotli.Compressor(quality=self.middleware.brotli_quality)
+        return zlib.compressobj(self.middleware.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def _compress_chunk(self, chunk: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            data = self.compressor.process(chunk)
+            return data + (self.compressor.finish() if final else self.compressor.flush())
+        data = self.compressor.compress(chunk)
+        return data + self.compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    def _eligible(self, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        if self.start_message["status"] < 200 or self.start_message["status"] in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        if content_type.startswith(STREAMING_TYPES) or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        return more_body or len(body) >= self.middleware.minimum_size
+
+    def _mark_encoded(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = self._encoded_etag(headers)
+        if etag:
+            # A strong validator has to differ between representations
+            headers["ETag"] = etag
+
+    def _mark_not_modified(self, headers: MutableHeaders) -> None:
+        """Give a 304 the validator of the representation the client holds"""
+        headers.add_vary_header("Accept-Encoding")
+        etag = self._encoded_etag(headers)
+        held = {candidate.strip().removeprefix("W/") for candidate in self.if_none_match.split(",")}
+        if etag and etag in held:
+            headers["ETag"] = etag
+
+    def _encoded_etag(self, headers: MutableHeaders) -> Optional[str]:
+        etag = headers.get("etag")
+        if etag and etag.endswith('"') and not etag.startswith("W/"):
+            return f'{etag[:-1]}-{self.encoding}"'
+        return None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if self.compressor is not None:
+            await self._send({"type": "http.response.body", "body": self._compress_chunk(body, not more_body), "more_body": more_body})
+            return
+
+        # First body message: decide for the whole response
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if not self._eligible(headers, body, more_body):
+            if self.start_message["status"] == 304:
+                self._mark_not_modified(headers)
+            self.passthrough = True
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        self._mark_encoded(headers)
+        if not more_body:
+            compressed = self._compress_all(body)
+            headers["Content-Length"] = str(len(compressed))
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        del headers["Content-Length"]
+        self.compressor = self._new_compressor()
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": self._compress_chunk(body, False), "more_body": True})
@@ -0,0 +1,27 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.lifecycle import ServerLifecycle, lifecycle
+
+class DrainingMiddleware:
+    """Count HTTP requests in flight for graceful shutdown
+
+    A plain ASGI middleware so a streamed response (chat, course generation)
+    counts until its last chunk is sent, not just until the headers are.
+    Probe paths are not counted. WebSockets are not either: a socket can
+    stay open for hours, so chat turns on it count themselves
+    (ChatSocketSession).
+    """
+
+    def __init__(self, app: ASGIApp, state: ServerLifecycle = lifecycle, skip_paths: tuple = ("/live", "/ready", "/health")):
+        self.app = app
+        self.state = state
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        self.state.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.state.request_finished()
@@ -0,0 +1,40 @@
+import time
+from fastapi import Request
+from starlette.routing import Match
+from app.metrics import HTTP_REQUESTS, HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+
+UNMATCHED_ROUTE = "unmatched"
+
+def route_template(request: Request) -> str:
+    """Route path template for a request, e.g. /api/v1/course/{course_id}"""
+    partial = None
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            # Path matched but the method did not (405)
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+class MetricsMiddleware:
+    """Record request counts, latency and in-flight requests per route template
+
+    Labels use the route template (/api/v1/course/{course_id}) rather than the
+    raw path so the number of series stays bounded.
+    """
+
+    async def __call__(self, request: Request, call_next):
+        method = request.method
+        route = route_template(request)
+        HTTP_REQUESTS_IN_FLIGHT.inc(method=method, route=route)
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(method=method, route=route)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status_code))
@@ -0,0 +1,31 @@
+import time
+from fastapi import Request
+from app.middleware.metrics import route_template
+from app.profiling import PROFILE_ID_HEADER, PROFILE_REQUEST_HEADER, is_admin_request, request_profiles, route_cpu_stats
+
+class ProfilingMiddleware:
+    """Account CPU time per route and profile single requests on demand
+
+    A request carrying X-Profile-Request and a valid X-Admin-Token runs under
+    cProfile; the response gets an X-Profile-Id to fetch the report from
+    /debug/profile/requests/{id}.
+    """
+
+    async def __call__(self, request: Request, call_next):
+        route = route_template(request)
+        profiler = None
+        if request.headers.get(PROFILE_REQUEST_HEADER) and is_admin_request(request):
+            profiler = request_profiles.try_begin()
+
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            route_cpu_stats.record(route, time.process_time() - cpu_start, time.perf_counter() - wall_start)
+            if profiler is not None:
+                profile_id = request_profiles.finish(profiler, f"{request.method} {request.url.path}")
+
+        if profiler is not None:
+            response.headers[PROFILE_ID_HEADER] = profile_id
+        return response
@@ -0,0 +1,49 @@
+import logging
+import time
+from fastapi import Request
+from app.config import settings
+from app.database.query_stats import start_request_stats
+
+logger = logging.getLogger(__name__)
+
+class QueryStatsMiddleware:
+    """Report per-request SQL statement counts, DB time and rows
+
+    Adds a Server-Timing header (visible in browser dev tools), logs one
+    structured line per request and warns about statements repeated often
+    enough to suggest an N+1 query loop.
+    """
+
+    def __init__(self, n_plus_one_threshold: int = None):
+        self.n_plus_one_threshold = n_plus_one_threshold or settings.QUERY_N_PLUS_ONE_THRESHOLD
+
+    async def __call__(self, request: Request, call_next):
+        stats = start_request_stats()
+        start = time.perf_counter()
+
+        response = await call_next(request)
+
+        total_ms = (time.perf_counter() - start) * 1000
+        response.headers.append(
+            "Server-Timing",
+            f'db;dur={stats.db_time_ms:.1f};desc="{stats.queries} queries, {stats.rows} rows", app;dur={total_ms:.1f}'
+        )
+
+        logger.info(
+            f"request method={request.method} path={request.url.path} status={response.status_code} "
+            f"duration_ms={total_ms:.1f} db_queries={stats.queries} db_time_ms={stats.db_time_ms:.1f} db_rows={stats.rows}",
+            extra={
+                "http_method": request.method,
+                "http_path": request.url.path,
+                "http_status": response.status_code,
+                "duration_ms": round(total_ms, 1),
+                "db_queries": stats.queries,
+                "db_time_ms": round(stats.db_time_ms, 1),
+                "db_rows": stats.rows
+            }
+        )
+
+        for statement, count in stats.repeated_statements(self.n_plus_one_threshold):
+            logger.warning(f"Possible N+1 query: executed {count} times in {request.method} {request.url.path}: {statement[:200]}")
+
+        return response
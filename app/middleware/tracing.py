@@ -0,0 +1,21 @@
+from fastapi import Request
+from app.middleware.metrics import route_template
+from app.tracing import start_span, span_trace_id, SPAN_KIND_SERVER
+
+class TracingMiddleware:
+    """Root server span per request, continuing any incoming traceparent"""
+
+    async def __call__(self, request: Request, call_next):
+        route = route_template(request)
+        attributes = {
+            "http.method": request.method,
+            "http.route": route,
+            "http.target": request.url.path
+        }
+        with start_span(f"{request.method} {route}", attributes, kind=SPAN_KIND_SERVER, carrier=request.headers) as span:
+            response = await call_next(request)
+            span.set_attribute("http.status_code", response.status_code)
+            trace_id = span_trace_id(span)
+            if trace_id:
+                response.headers["X-Trace-Id"] = trace_id
+            return response
@@ -0,0 +1,245 @@
+"""
+In-process profiling (opt-in, admin only)
+
+- A sampling profiler that walks every thread's stack at a fixed interval
+  and aggregates them as folded stacks ("a;b;c 42"), the input format of
+  flamegraph.pl, speedscope and inferno.
+- Per-route CPU time, measured as process CPU time spent while each request
+  was in flight. Concurrent requests overlap, so under load the numbers are
+  best compared between routes rather than read as exact per-request cost.
+- Single-request profiles: a request sent with X-Profile-Request and the
+  admin token runs under cProfile (event loop thread) and the report is
+  kept for retrieval.
+
+Everything is per worker process; the pid is reported so multi-worker
+deployments can tell which worker answered.
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
+from app.config import settings
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+PROFILE_REQUEST_HEADER = "X-Profile-Request"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Leaf frames of threads that are parked rather than working
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("base_events.py", "_run_once"),
+}
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """Periodically samples all thread stacks into folded-stack counts"""
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 128, include_idle: bool = False):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.include_idle = include_idle
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        """Record the current stack of every thread except the sampler itself"""
+        own_id = threading.get_ident()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        collected = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            if not self.include_idle and (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(thread_names.get(thread_id, str(thread_id)))
+            collected.append(";".join(reversed(stack)))
+        with self._lock:
+            self.samples += 1
+            self._stacks.update(collected)
+
+    def folded(self) -> str:
+        """Folded stacks, one "frame;frame;frame count" line per distinct stack"""
+        with self._lock:
+            items = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+class RouteCpuStats:
+    """CPU and wall time per route template"""
+
+    def __init__(self):
+        self._routes: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, cpu_seconds: float, wall_seconds: float) -> None:
+        with self._lock:
+            entry = self._routes.setdefault(route, [0, 0.0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += cpu_seconds
+            entry[2] = max(entry[2], cpu_seconds)
+            entry[3] += wall_seconds
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            items = [(route, list(entry)) for route, entry in self._routes.items()]
+        rows = [
+            {
+                "route": route,
+                "requests": count,
+                "cpu_seconds_total": round(cpu_total, 6),
+                "cpu_ms_avg": round(cpu_total / count * 1000, 3),
+                "cpu_ms_max": round(cpu_max * 1000, 3),
+                "wall_ms_avg": round(wall_total / count * 1000, 3)
+            }
+            for route, (count, cpu_total, cpu_max, wall_total) in items
+        ]
+        return sorted(rows, key=lambda row: row["cpu_seconds_total"], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+class RequestProfiles:
+    """Most recent single-request cProfile reports, keyed by profile ID"""
+
+    def __init__(self, max_profiles: int = 20):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        # cProfile hooks the interpreter, so only one request is profiled at a time
+        self._active = threading.Lock()
+
+    def try_begin(self) -> Optional[cProfile.Profile]:
+        if not self._active.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already hooked into the interpreter
+            self._active.release()
+            return None
+        return profiler
+
+    def finish(self, profiler: cProfile.Profile, description: str) -> str:
+        profiler.disable()
+        self._active.release()
+        output = io.StringIO()
+        output.write(f"{description}\n\n")
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(60)
+
+        profile_id = uuid.uuid4().hex
+        with self._lock:
+            self._profiles[profile_id] = output.getvalue()
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[str]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._profiles)
+
+route_cpu_stats = RouteCpuStats()
+request_profiles = RequestProfiles(settings.PROFILING_MAX_REQUEST_PROFILES)
+_sampler: Optional[SamplingProfiler] = None
+
+def is_admin_request(request: Request) -> bool:
+    token = settings.PROFILING_ADMIN_TOKEN
+    provided = request.headers.get(ADMIN_TOKEN_HEADER, "")
+    return bool(token) and hmac.compare_digest(provided.encode(), token.encode())
+
+def require_admin(request: Request) -> None:
+    """Dependency rejecting requests without the profiling admin token"""
+    if not is_admin_request(request):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
+
+router = APIRouter(prefix="/debug/profile", tags=["profiling"], dependencies=[Depends(require_admin)], include_in_schema=False)
+
+@router.post("/start")
+async def start_profiler(interval_ms: float = Query(default=None, gt=0, le=1000), include_idle: bool = False):
+    """Start the sampling profiler in this worker"""
+    global _sampler
+    if _sampler is not None and _sampler.running:
+        return {"status": "already_running", "pid": os.getpid(), "samples": _sampler.samples}
+    interval = (interval_ms or settings.PROFILING_SAMPLE_INTERVAL_MS) / 1000
+    _sampler = SamplingProfiler(interval=interval, include_idle=include_idle)
+    _sampler.start()
+    return {"status": "started", "pid": os.getpid(), "interval_ms": interval * 1000}
+
+@router.post("/stop", response_class=PlainTextResponse)
+async def stop_profiler():
+    """Stop the sampling profiler and return folded stacks for a flamegraph"""
+    if _sampler is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiler has not been started")
+    _sampler.stop()
+    return PlainTextResponse(_sampler.folded(), headers={"X-Profile-Samples": str(_sampler.samples), "X-Worker-Pid": str(os.getpid())})
+
+@router.get("/folded", response_class=PlainTextResponse)
+async def get_folded_stacks():
+    """Folded stacks collected so far, without stopping the profiler"""
+    if _sampler is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiler has not been started")
+    return PlainTextResponse(_sampler.folded(), headers={"X-Profile-Samples": str(_sampler.samples), "X-Worker-Pid": str(os.getpid())})
+
+@router.get("/routes")
+async def get_route_cpu(reset: bool = False):
+    """CPU time per route template since start (or the last reset)"""
+    routes = route_cpu_stats.snapshot()
+    if reset:
+        route_cpu_stats.reset()
+    return {"pid": os.getpid(), "routes": routes}
+
+@router.get("/requests")
+async def list_request_profiles():
+    return {"pid": os.getpid(), "profiles": request_profiles.ids()}
+
+@router.get("/requests/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(profile_id: str):
+    """cProfile report of a single request profiled via X-Profile-Request"""
+    report = request_profiles.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found in this worker")
+    return PlainTextResponse(report)
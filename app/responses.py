@@ -0,0 +1,62 @@
+"""
+Fast JSON responses
+
+FastJSONResponse is the application's default response class. It renders
+with orjson when installed (falling back to the standard library) and
+understands dataclasses, pydantic models, UUIDs and datetimes itself.
+
+Handlers returning large DTOs they have built themselves can return
+``FastJSONResponse(dto)`` directly: FastAPI then skips the response_model
+round trip (dataclass -> dict copy, validation, jsonable conversion) and the
+DTO is serialized in a single pass. Keep response_model on the route for the
+OpenAPI schema.
+"""
+import dataclasses
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+def _default(value: Any) -> Any:
+    """Types neither serializer handles natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        # Shallow: nested dataclasses come back through this hook
+        return {f.name: getattr(value, f.name) for f in dataclasses.fields(value)}
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON"""
+    if isinstance(content, BaseModel):
+        # pydantic-core writes JSON directly, without an intermediate dict
+        return content.model_dump_json().encode("utf-8")
+    if HAS_ORJSON:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (or compact json) that accepts DTOs as-is"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
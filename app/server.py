@@ -0,0 +1,118 @@
+"""
+Production entrypoint
+
+    python -m app.server
+
+Serves app.main:app without the reloader (run.py is the development
+entrypoint) on HOST/PORT from the settings, so the PORT variable Cloud Run
+sets is honoured. Logging is configured by the app itself.
+
+Workers are sized to the CPUs the container may use (affinity and cgroup
+quota) unless SERVER_WORKERS is set, and uvloop/httptools are used when
+installed. On SIGTERM a worker starts draining: /ready answers 503, it keeps
+serving for SHUTDOWN_DRAIN_DELAY_SECONDS, then stops accepting connections
+and gives in-flight requests SHUTDOWN_GRACE_SECONDS to finish before the
+app's shutdown hooks flush deferred writes and close the AI client and
+the database pool. The grace period is shared: the app's own wait for
+in-flight requests only gets what uvicorn left of it, so a worker is done
+SHUTDOWN_DRAIN_DELAY_SECONDS + SHUTDOWN_GRACE_SECONDS after SIGTERM (plus
+the hooks).
+
+uvicorn's Multiprocess supervisor (0.24) does not replace a worker that
+crashes: the remaining workers carry on with less capacity, and the
+supervisor keeps running even when every worker is gone, so only a failing
+health check gets the container restarted. Anything a crashed worker kept
+in memory is lost.
+"""
+import asyncio
+import importlib.util
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Optional
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+from app.config import settings
+from app.lifecycle import lifecycle
+from app.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+def _cgroup_cpu_limit(root: Path) -> Optional[float]:
+    """CPU quota of the container in CPUs, None when unlimited"""
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    cpu_max = root / "cpu.max"
+    if cpu_max.exists():
+        quota, _, period = cpu_max.read_text().strip().partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+    # cgroup v1
+    quota_file, period_file = root / "cpu" / "cpu.cfs_quota_us", root / "cpu" / "cpu.cfs_period_us"
+    if quota_file.exists() and period_file.exists():
+        quota, period = int(quota_file.read_text()), int(period_file.read_text())
+        if quota > 0 and period > 0:
+            return quota / period
+    return None
+
+def available_cpus(cgroup_root: Path = Path("/sys/fs/cgroup")) -> int:
+    """CPUs this process may use: affinity mask capped by the cgroup quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        limit = _cgroup_cpu_limit(cgroup_root)
+    except (OSError, ValueError):
+        limit = None
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return max(1, cpus)
+
+def worker_count(cgroup_root: Path = Path("/sys/fs/cgroup")) -> int:
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+    return max(1, min(available_cpus(cgroup_root), settings.SERVER_MAX_WORKERS))
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that marks the worker as draining before it shuts down"""
+
+    def handle_exit(self, sig, frame) -> None:
+        if not lifecycle.draining:
+            lifecycle.begin_draining()
+            if settings.SHUTDOWN_DRAIN_DELAY_SECONDS > 0:
+                # Keep serving while load balancers see /ready fail; a second signal exits at once
+                asyncio.get_running_loop().call_later(settings.SHUTDOWN_DRAIN_DELAY_SECONDS, super().handle_exit, sig, frame)
+                return
+        super().handle_exit(sig, frame)
+
+def build_config(workers: int) -> uvicorn.Config:
+    return uvicorn.Config(
+        "app.main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        reload=False,
+        log_config=None,
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        timeout_graceful_shutdown=math.ceil(settings.SHUTDOWN_GRACE_SECONDS),
+    )
+
+def main() -> None:
+    # The supervisor never imports the app, so it configures logging itself
+    configure_logging()
+    config = build_config(worker_count())
+    server = DrainingServer(config)
+    logger.info(f"Starting {config.workers} worker(s) on {config.host}:{config.port} (loop={config.loop}, http={config.http})")
+    if config.workers > 1:
+        # Same as uvicorn.run, but every worker runs DrainingServer
+        Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+Request tracing
+
+Spans cover the HTTP request, JWT authentication, repository methods, SQL
+statements and outbound httpx calls (app.tracing_http), and W3C trace
+context (traceparent) is propagated to the AI agent.
+
+When the OpenTelemetry SDK is installed it does the work and spans go to an
+OTLP collector (OTEL_EXPORTER_OTLP_ENDPOINT) or the console/file exporter.
+Without it, a built-in tracer writes OpenTelemetry-shaped JSON spans to the
+console or a JSON-lines file, so traces are still available locally.
+"""
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+try:
+    from opentelemetry import trace as otel_trace
+    from opentelemetry import propagate as otel_propagate
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.trace import SpanKind
+    HAS_OPENTELEMETRY = True
+except ImportError:
+    HAS_OPENTELEMETRY = False
+
+logger = logging.getLogger(__name__)
+
+SPAN_KIND_INTERNAL = "internal"
+SPAN_KIND_SERVER = "server"
+SPAN_KIND_CLIENT = "client"
+
+MAX_STATEMENT_LENGTH = 1000
+
+class Span:
+    """Built-in span serialised in the OpenTelemetry console exporter's JSON shape"""
+
+    def __init__(self, tracer: "BuiltinTracer", name: str, trace_id: str, parent_id: Optional[str], kind: str, attributes: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status = "UNSET"
+        self.status_description: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.events.append({
+            "name": "exception",
+            "timestamp": time.time_ns(),
+            "attributes": {"exception.type": type(exc).__name__, "exception.message": str(exc)}
+        })
+        self.status = "ERROR"
+        self.status_description = f"{type(exc).__name__}: {exc}"
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "context": {"trace_id": f"0x{self.trace_id}", "span_id": f"0x{self.span_id}"},
+            "kind": f"SpanKind.{self.kind.upper()}",
+            "parent_id": f"0x{self.parent_id}" if self.parent_id else None,
+            "start_time": self.start_ns,
+            "end_time": self.end_ns,
+            "duration_ms": round(((self.end_ns or self.start_ns) - self.start_ns) / 1e6, 3),
+            "status": {"status_code": self.status, "description": self.status_description},
+            "attributes": self.attributes,
+            "events": self.events,
+            "resource": {"service.name": self.tracer.service_name}
+        }
+
+class NoopSpan:
+    """Stands in when tracing is off or the trace was not sampled"""
+
+    traceparent = None
+    trace_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+NOOP_SPAN = NoopSpan()
+
+class ConsoleSpanWriter:
+    """Writes finished spans as JSON lines to the application log"""
+
+    def export(self, span: Span) -> None:
+        logger.info(json.dumps(span.to_dict(), default=str))
+
+class FileSpanWriter:
+    """Appends finished spans as JSON lines to a file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", buffering=1)
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+class InMemorySpanWriter:
+    """Keeps finished spans in memory (tests)"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+# Set when a request arrived with an unsampled traceparent, so children stay unsampled
+_suppressed: ContextVar[bool] = ContextVar("tracing_suppressed", default=False)
+
+class BuiltinTracer:
+    """Minimal tracer used when the OpenTelemetry SDK is not installed"""
+
+    def __init__(self, writer, sample_ratio: float = 1.0, service_name: str = "tara-api"):
+        self.writer = writer
+        self.sample_ratio = sample_ratio
+        self.service_name = service_name
+
+    def export(self, span: Span) -> None:
+        try:
+            self.writer.export(span)
+        except Exception as e:
+            logger.warning(f"Failed to export span {span.name}: {str(e)}")
+
+    def _new_span(self, name: str, kind: str, attributes: Optional[Dict[str, Any]], carrier: Optional[MutableMapping[str, str]]):
+        if _suppressed.get():
+            return None
+        parent = _current_span.get()
+        if parent is not None:
+            return Span(self, name, parent.trace_id, parent.span_id, kind, attributes)
+
+        remote = _parse_traceparent(carrier.get("traceparent")) if carrier else None
+        if remote:
+            trace_id, parent_id, sampled = remote
+            if not sampled:
+                return None
+            return Span(self, name, trace_id, parent_id, kind, attributes)
+
+        if self.sample_ratio < 1.0 and random.random() >= self.sample_ratio:
+            return None
+        return Span(self, name, f"{random.getrandbits(128):032x}", None, kind, attributes)
+
+    @contextmanager
+    def start_span(self, name: str, kind: str, attributes: Optional[Dict[str, Any]], carrier: Optional[MutableMapping[str, str]]):
+        span = self._new_span(name, kind, attributes, carrier)
+        if span is None:
+            # Keep the whole subtree unsampled
+            token = _suppressed.set(True)
+            try:
+                yield NOOP_SPAN
+            finally:
+                _suppressed.reset(token)
+            return
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def start_detached_span(self, name: str, kind: str, attributes: Optional[Dict[str, Any]]):
+        if _current_span.get() is None:
+            # Statements outside a traced operation (startup checks, scripts) are not traced
+            return NOOP_SPAN
+        return self._new_span(name, kind, attributes, None) or NOOP_SPAN
+
+    def inject(self, headers: MutableMapping[str, str]) -> None:
+        span = _current_span.get()
+        if span is not None:
+            headers["traceparent"] = span.traceparent
+
+class OpenTelemetryTracer:
+    """Adapter over the OpenTelemetry SDK"""
+
+    def __init__(self, exporter_name: str, file_path: str, sample_ratio: float, service_name: str):
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": service_name}),
+            sampler=ParentBased(TraceIdRatioBased(sample_ratio))
+        )
+        provider.add_span_processor(BatchSpanProcessor(self._exporter(exporter_name, file_path)))
+        otel_trace.set_tracer_provider(provider)
+        self.provider = provider
+        self.tracer = otel_trace.get_tracer("tara-api")
+        self._KINDS = {SPAN_KIND_INTERNAL: SpanKind.INTERNAL, SPAN_KIND_SERVER: SpanKind.SERVER, SPAN_KIND_CLIENT: SpanKind.CLIENT}
+
+    def _exporter(self, exporter_name: str, file_path: str):
+        if exporter_name == "otlp" or os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT"):
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+                return OTLPSpanExporter()
+            except ImportError:
+                logger.warning("OTLP exporter not installed, falling back to the console exporter")
+        if exporter_name == "file":
+            return ConsoleSpanExporter(out=open(file_path, "a", buffering=1))
+        return ConsoleSpanExporter()
+
+    @contextmanager
+    def start_span(self, name: str, kind: str, attributes: Optional[Dict[str, Any]], carrier: Optional[MutableMapping[str, str]]):
+        context = otel_propagate.extract(carrier) if carrier else None
+        # start_as_current_span records exceptions and sets the error status itself
+        with self.tracer.start_as_current_span(name, context=context, kind=self._KINDS[kind], attributes=attributes) as span:
+            yield span
+
+    def start_detached_span(self, name: str, kind: str, attributes: Optional[Dict[str, Any]]):
+        if not otel_trace.get_current_span().get_span_context().is_valid:
+            return NOOP_SPAN
+        return self.tracer.start_span(name, kind=self._KINDS[kind], attributes=attributes)
+
+    def inject(self, headers: MutableMapping[str, str]) -> None:
+        otel_propagate.inject(headers)
+
+_tracer = None
+
+def configure_tracing(enabled: bool = None, exporter: str = None, file_path: str = None, sample_ratio: float = None, writer=None):
+    """Select the tracing backend; call once at startup (tests may pass a writer)"""
+    global _tracer
+    enabled = settings.TRACING_ENABLED if enabled is None else enabled
+    if not enabled:
+        _tracer = None
+        return None
+
+    exporter = exporter or settings.TRACING_EXPORTER
+    file_path = file_path or settings.TRACING_FILE_PATH
+    sample_ratio = settings.TRACING_SAMPLE_RATIO if sample_ratio is None else sample_ratio
+    service_name = settings.PROJECT_NAME.lower().replace(" ", "-")
+
+    if writer is None and HAS_OPENTELEMETRY:
+        _tracer = OpenTelemetryTracer(exporter, file_path, sample_ratio, service_name)
+        logger.info(f"Tracing enabled with OpenTelemetry ({exporter} exporter)")
+    else:
+        if writer is None:
+            writer = FileSpanWriter(file_path) if exporter == "file" else ConsoleSpanWriter()
+        _tracer = BuiltinTracer(writer, sample_ratio, service_name)
+        logger.info(f"Tracing enabled with the built-in tracer ({exporter} exporter)")
+    return _tracer
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+@contextmanager
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = SPAN_KIND_INTERNAL,
+               carrier: Optional[MutableMapping[str, str]] = None) -> Iterator[Any]:
+    """Run a block inside a span; `carrier` holds incoming trace headers for root spans"""
+    if _tracer is None:
+        yield NOOP_SPAN
+        return
+    with _tracer.start_span(name, kind, attributes, carrier) as span:
+        yield span
+
+def span_trace_id(span) -> Optional[str]:
+    """Hex trace ID of a span from either backend, None when not recording"""
+    if isinstance(span, Span):
+        return span.trace_id
+    if HAS_OPENTELEMETRY and hasattr(span, "get_span_context"):
+        context = span.get_span_context()
+        return f"{context.trace_id:032x}" if context.is_valid else None
+    return None
+
+def inject_trace_headers(headers: MutableMapping[str, str]) -> None:
+    """Add traceparent (and tracestate) for the current span to outgoing headers"""
+    if _tracer is not None:
+        _tracer.inject(headers)
+
+def _parse_traceparent(value: Optional[str]):
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or parts[1] == "0" * 32:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+def traced_repository(cls):
+    """Class decorator giving every public repository method its own span"""
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(attribute):
+            continue
+        setattr(cls, name, _traced_method(f"{cls.__name__}.{name}", attribute))
+    return cls
+
+def _traced_method(span_name: str, method):
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(*args, **kwargs):
+            if _tracer is None:
+                return await method(*args, **kwargs)
+            with start_span(span_name, {"code.function": method.__name__, "code.namespace": method.__module__}):
+                return await method(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if _tracer is None:
+            return method(*args, **kwargs)
+        with start_span(span_name, {"code.function": method.__name__, "code.namespace": method.__module__}):
+            return method(*args, **kwargs)
+    return wrapper
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _tracer is None:
+        return
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+    span = _tracer.start_detached_span(f"SQL {operation}", SPAN_KIND_CLIENT, {
+        "db.system": conn.dialect.name,
+        "db.operation": operation,
+        "db.statement": statement[:MAX_STATEMENT_LENGTH]
+    })
+    conn.info.setdefault("trace_spans", []).append(span)
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        span = spans.pop()
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            span.set_attribute("db.rows", cursor.rowcount)
+        span.end()
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    spans = connection.info.get("trace_spans") if connection is not None else None
+    if spans:
+        span = spans.pop()
+        span.record_exception(exception_context.original_exception)
+        span.end()
+
+def install_sql_tracing(engine: Engine) -> None:
+    """Emit a span per SQL statement"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,34 @@
+"""
+Client spans for outbound httpx calls
+
+Kept apart from app.tracing so importing the tracer does not import httpx.
+"""
+from typing import Optional
+import httpx
+from app.tracing import SPAN_KIND_CLIENT, inject_trace_headers, start_span, tracing_enabled
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """httpx transport wrapper producing a client span per outbound request"""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, inject_context: bool = True):
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.inject_context = inject_context
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not tracing_enabled():
+            return await self.transport.handle_async_request(request)
+
+        attributes = {
+            "http.method": request.method,
+            "http.url": str(request.url.copy_with(query=None)),
+            "net.peer.name": request.url.host
+        }
+        with start_span(f"HTTP {request.method} {request.url.path}", attributes, kind=SPAN_KIND_CLIENT) as span:
+            if self.inject_context:
+                inject_trace_headers(request.headers)
+            response = await self.transport.handle_async_request(request)
+            span.set_attribute("http.status_code", response.status_code)
+            return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -0,0 +1 @@
+# Shared client for the external AI agent
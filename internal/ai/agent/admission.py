@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Optional, Tuple
+from uuid import UUID
+from fastapi import Depends, HTTPException, status
+from app.config import settings
+from app.database.connection import SessionLocal
+from app.metrics import REGISTRY, AI_RATE_LIMITED, AI_GENERATION_ACTIVE, AI_GENERATION_QUEUED
+from internal.auth.middleware import get_current_user_id
+from internal.ai.agent.agent_client import AGENT_CHAT, AGENT_GENERATION
+from internal.ai.agent.rate_limit_repository import RateLimitRepository
+from internal.ai.agent.resilience import BulkheadFullError
+
+logger = logging.getLogger(__name__)
+
+# Why a request was turned away, for metrics
+LIMITED_RATE = "rate"
+LIMITED_USER_CONCURRENCY = "user_concurrency"
+LIMITED_QUEUE_TIMEOUT = "queue_timeout"
+
+class RateLimitExceededError(Exception):
+    """Raised when a user has used up their share of an AI endpoint class"""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds, never less than one"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+class TokenBucketLimiter:
+    """Token buckets kept in this worker
+
+    Each key refills at `rate` tokens per second up to `burst`. Only the
+    `max_keys` most recently used buckets are kept; a forgotten bucket
+    starts full again.
+    """
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token; returns 0 when granted, else seconds until one is available"""
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            granted = tokens >= 1
+            if granted:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return 0.0 if granted else (1 - tokens) / rate
+
+class DatabaseTokenBucketLimiter:
+    """Token buckets in the rate_limit_buckets table, shared by every worker
+
+    When the database cannot be reached the worker's own buckets decide, so
+    limiting degrades to per-worker instead of failing requests.
+    """
+
+    def __init__(self, session_factory=SessionLocal, fallback: Optional[TokenBucketLimiter] = None):
+        self.session_factory = session_factory
+        self.fallback = fallback or TokenBucketLimiter()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        db = self.session_factory()
+        try:
+            return await RateLimitRepository(db).take_token(key, rate, burst)
+        except Exception as e:
+            logger.warning(f"Shared rate limiter unavailable, limiting per worker: {str(e)}")
+            return await self.fallback.take(key, rate, burst)
+        finally:
+            db.close()
+
+class FairQueue:
+    """Concurrency cap whose free slots are handed to waiting users in turn
+
+    Waiters are grouped by user and served round-robin, so one user queueing
+    many requests delays everyone else by at most one request per turn. A
+    user may hold at most `max_per_user` running or queued requests.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_per_user: int, max_wait_seconds: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_wait_seconds = max_wait_seconds
+        self.in_flight = 0
+        self._held: Counter = Counter()
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    async def acquire(self, user_id: str) -> None:
+        if self._held[user_id] >= self.max_per_user:
+            AI_RATE_LIMITED.inc(endpoint_class=self.name, reason=LIMITED_USER_CONCURRENCY)
+            raise RateLimitExceededError(
+                f"You already have {self.max_per_user} AI {self.name} request(s) running or queued",
+                retry_after=max(1.0, self.max_wait_seconds)
+            )
+        self._held[user_id] += 1
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, deque()).append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait expired
+                return
+            self._discard(user_id, waiter)
+            AI_RATE_LIMITED.inc(endpoint_class=self.name, reason=LIMITED_QUEUE_TIMEOUT)
+            raise BulkheadFullError(
+                f"Too many AI {self.name} requests are queued, please retry shortly",
+                retry_after=max(1.0, self.max_wait_seconds)
+            )
+        except BaseException:
+            self._discard(user_id, waiter)
+            if waiter.done() and not waiter.cancelled():
+                self._hand_over()
+            raise
+
+    def release(self, user_id: str) -> None:
+        self._drop(user_id)
+        self._hand_over()
+
+    def _hand_over(self) -> None:
+        """Give a freed slot to the next user in turn, or free it"""
+        while self._waiters:
+            user_id, waiters = next(iter(self._waiters.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                # The user's other requests wait for their next turn
+                self._waiters.move_to_end(user_id)
+            else:
+                del self._waiters[user_id]
+            if not waiter.done():
+                # The slot is transferred, so in_flight stays the same
+                waiter.set_result(None)
+                return
+        self.in_flight = max(0, self.in_flight - 1)
+
+    def _discard(self, user_id: str, waiter: asyncio.Future) -> None:
+        waiters = self._waiters.get(user_id)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self._waiters[user_id]
+        self._drop(user_id)
+
+    def _drop(self, user_id: str) -> None:
+        self._held[user_id] -= 1
+        if self._held[user_id] <= 0:
+            del self._held[user_id]
+
+class AdmissionController:
+    """Per-user token buckets for each AI endpoint class and the fair generation queue"""
+
+    def __init__(self, limiter, limits: Dict[str, Tuple[float, int]], generation_queue: FairQueue, enabled: bool = True):
+        self.limiter = limiter
+        self.limits = limits
+        self.generation_queue = generation_queue
+        self.enabled = enabled
+
+    async def check(self, endpoint_class: str, user_id: UUID) -> None:
+        """Spend one of the user's tokens for `endpoint_class` or raise RateLimitExceededError"""
+        if not self.enabled or endpoint_class not in self.limits:
+            return
+        rate, burst = self.limits[endpoint_class]
+        retry_after = await self.limiter.take(f"{endpoint_class}:{user_id}", rate, burst)
+        if retry_after > 0:
+            AI_RATE_LIMITED.inc(endpoint_class=endpoint_class, reason=LIMITED_RATE)
+            raise RateLimitExceededError(f"Too many AI {endpoint_class} requests, please retry later", retry_after=retry_after)
+
+    @asynccontextmanager
+    async def generation(self, user_id: UUID) -> AsyncIterator[None]:
+        """Admit a course/guide generation: a token, then a turn in the fair queue"""
+        await self.check(AGENT_GENERATION, user_id)
+        if not self.enabled:
+            yield
+            return
+        await self.generation_queue.acquire(str(user_id))
+        try:
+            yield
+        finally:
+            self.generation_queue.release(str(user_id))
+
+    def collect_metrics(self) -> None:
+        AI_GENERATION_ACTIVE.set(self.generation_queue.in_flight)
+        AI_GENERATION_QUEUED.set(self.generation_queue.queued)
+
+def create_limiter(backend: str):
+    if backend == "memory":
+        return TokenBucketLimiter()
+    if backend == "database":
+        return DatabaseTokenBucketLimiter()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+admission = AdmissionController(
+    create_limiter(settings.RATE_LIMIT_BACKEND),
+    {
+        AGENT_CHAT: (settings.RATE_LIMIT_CHAT_PER_MINUTE / 60, settings.RATE_LIMIT_CHAT_BURST),
+        AGENT_GENERATION: (settings.RATE_LIMIT_GENERATION_PER_HOUR / 3600, settings.RATE_LIMIT_GENERATION_BURST),
+    },
+    FairQueue(
+        AGENT_GENERATION,
+        settings.AI_GENERATION_MAX_CONCURRENCY,
+        settings.AI_GENERATION_MAX_PER_USER,
+        settings.AI_GENERATION_QUEUE_WAIT_SECONDS
+    ),
+    enabled=settings.RATE_LIMIT_ENABLED
+)
+REGISTRY.add_collector(admission.collect_metrics)
+
+def rate_limit_exceeded(error: RateLimitExceededError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(error),
+        headers={"Retry-After": error.retry_after_header}
+    )
+
+def rate_limited(endpoint_class: str) -> Callable:
+    """Dependency that spends a token of the current user for `endpoint_class`, answering 429 when none is left"""
+    async def dependency(current_user_id: str = Depends(get_current_user_id)) -> None:
+        try:
+            await admission.check(endpoint_class, UUID(current_user_id))
+        except RateLimitExceededError as e:
+            raise rate_limit_exceeded(e)
+    return dependency
@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+import httpx
+from internal.ai.agent.resilience import Bulkhead, CircuitBreaker, RetryPolicy, AgentUnavailableError, CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN
+from app.config import settings
+from app.lifecycle import lifecycle
+from app.tracing_http import TracingTransport
+from app.metrics import (
+    REGISTRY, AGENT_REQUESTS, AGENT_REQUEST_DURATION, AGENT_IN_FLIGHT, AGENT_BULKHEAD_REJECTED,
+    AGENT_CIRCUIT_STATE, AGENT_CIRCUIT_TRANSITIONS
+)
+
+logger = logging.getLogger(__name__)
+
+# Endpoint classes with their own bulkhead and circuit breaker
+AGENT_CHAT = "chat"
+AGENT_GENERATION = "generation"
+
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+
+# Outcome labels for agent call metrics
+OUTCOME_SUCCESS = "success"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_HTTP_ERROR = "http_error"
+OUTCOME_TRANSPORT_ERROR = "transport_error"
+OUTCOME_REJECTED = "rejected"
+OUTCOME_ERROR = "error"
+
+def _outcome(exc: BaseException = None) -> str:
+    """Classify how an agent call ended"""
+    if exc is None:
+        return OUTCOME_SUCCESS
+    if isinstance(exc, httpx.TimeoutException):
+        return OUTCOME_TIMEOUT
+    if isinstance(exc, httpx.HTTPStatusError):
+        return OUTCOME_HTTP_ERROR
+    if isinstance(exc, httpx.TransportError):
+        return OUTCOME_TRANSPORT_ERROR
+    if isinstance(exc, AgentUnavailableError):
+        return OUTCOME_REJECTED
+    return OUTCOME_ERROR
+
+class AgentClient:
+    """Shared HTTP client for the AI agent with bulkheads, retries and circuit breakers"""
+
+    def __init__(
+        self,
+        base_url: str,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        bulkheads: Optional[Dict[str, Bulkhead]] = None,
+        breakers: Optional[Dict[str, CircuitBreaker]] = None,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.transport = transport
+        self.bulkheads = bulkheads or {
+            AGENT_CHAT: Bulkhead(AGENT_CHAT, settings.AI_CHAT_MAX_CONCURRENCY, settings.AI_CHAT_QUEUE_TIMEOUT),
+            AGENT_GENERATION: Bulkhead(AGENT_GENERATION, settings.AI_GENERATION_MAX_CONCURRENCY, settings.AI_GENERATION_QUEUE_TIMEOUT),
+        }
+        self.breakers = breakers or {
+            name: CircuitBreaker(
+                name,
+                failure_rate_threshold=settings.AI_CIRCUIT_FAILURE_RATE,
+                minimum_calls=settings.AI_CIRCUIT_MINIMUM_CALLS,
+                window_seconds=settings.AI_CIRCUIT_WINDOW_SECONDS,
+                open_seconds=settings.AI_CIRCUIT_OPEN_SECONDS
+            )
+            for name in (AGENT_CHAT, AGENT_GENERATION)
+        }
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_attempts=settings.AI_RETRY_MAX_ATTEMPTS,
+            base_delay=settings.AI_RETRY_BASE_DELAY,
+            max_delay=settings.AI_RETRY_MAX_DELAY
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, recreating it if the event loop changed"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            # Client spans per call, with traceparent propagated to the agent
+            transport = TracingTransport(self.transport)
+            self._client = httpx.AsyncClient(base_url=self.base_url, transport=transport)
+            self._client_loop = loop
+        return self._client
+
+    async def post(
+        self,
+        endpoint_class: str,
+        path: str,
+        payload: Dict[str, Any],
+        timeout: float,
+        idempotent: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+        operation: Optional[str] = None
+    ) -> httpx.Response:
+        """POST to the agent; only idempotent calls are retried"""
+        start = time.perf_counter()
+        try:
+            response = await self._post(endpoint_class, path, payload, timeout, idempotent, headers)
+        except BaseException as e:
+            self._observe(operation or path, _outcome(e), start)
+            raise
+        self._observe(operation or path, OUTCOME_SUCCESS, start)
+        return response
+
+    async def _post(
+        self,
+        endpoint_class: str,
+        path: str,
+        payload: Dict[str, Any],
+        timeout: float,
+        idempotent: bool,
+        headers: Optional[Dict[str, str]]
+    ) -> httpx.Response:
+        bulkhead = self.bulkheads[endpoint_class]
+        breaker = self.breakers[endpoint_class]
+        attempts = self.retry_policy.max_attempts if idempotent else 1
+
+        async with bulkhead:
+            for attempt in range(1, attempts + 1):
+                probe = breaker.before_call()
+                try:
+                    response = await self._get_client().post(path, json=payload, headers=headers, timeout=timeout)
+                    response.raise_for_status()
+                except (httpx.TimeoutException, httpx.TransportError) as e:
+                    breaker.record_failure(probe)
+                    if attempt >= attempts:
+                        raise
+                    logger.warning(f"AI {endpoint_class} call to {path} failed ({type(e).__name__}), retrying ({attempt}/{attempts - 1})")
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code < 500:
+                        # The agent is healthy, the request itself was rejected
+                        breaker.record_success(probe)
+                        raise
+                    breaker.record_failure(probe)
+                    if attempt >= attempts or e.response.status_code not in RETRYABLE_STATUS_CODES:
+                        raise
+                    logger.warning(f"AI {endpoint_class} call to {path} returned {e.response.status_code}, retrying ({attempt}/{attempts - 1})")
+                except BaseException:
+                    breaker.record_ignored(probe)
+                    raise
+                else:
+                    breaker.record_success(probe)
+                    return response
+
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+
+        raise AgentUnavailableError(f"AI {endpoint_class} call to {path} failed")
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        endpoint_class: str,
+        path: str,
+        payload: Dict[str, Any],
+        timeout: float,
+        headers: Optional[Dict[str, str]] = None,
+        operation: Optional[str] = None
+    ) -> AsyncIterator[httpx.Response]:
+        """Stream a POST response from the agent; streams are never retried"""
+        start = time.perf_counter()
+        try:
+            async with self._stream(endpoint_class, path, payload, timeout, headers) as response:
+                yield response
+        except BaseException as e:
+            self._observe(operation or path, _outcome(e), start)
+            raise
+        self._observe(operation or path, OUTCOME_SUCCESS, start)
+
+    @asynccontextmanager
+    async def _stream(
+        self,
+        endpoint_class: str,
+        path: str,
+        payload: Dict[str, Any],
+        timeout: float,
+        headers: Optional[Dict[str, str]]
+    ) -> AsyncIterator[httpx.Response]:
+        bulkhead = self.bulkheads[endpoint_class]
+        breaker = self.breakers[endpoint_class]
+
+        async with bulkhead:
+            probe = breaker.before_call()
+            agent_failed = False
+            try:
+                async with self._get_client().stream("POST", path, json=payload, headers=headers, timeout=timeout) as response:
+                    if response.is_error:
+                        await response.aread()
+                    agent_failed = response.status_code >= 500
+                    response.raise_for_status()
+                    yield response
+            except (httpx.TimeoutException, httpx.TransportError):
+                breaker.record_failure(probe)
+                raise
+            except httpx.HTTPStatusError:
+                if agent_failed:
+                    breaker.record_failure(probe)
+                else:
+                    breaker.record_success(probe)
+                raise
+            except BaseException:
+                breaker.record_ignored(probe)
+                raise
+            else:
+                breaker.record_success(probe)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """Current bulkhead and circuit breaker state per endpoint class"""
+        return {
+            name: {
+                "in_flight": self.bulkheads[name].in_flight,
+                "queued": self.bulkheads[name].queued,
+                "bulkhead_rejected": self.bulkheads[name].rejected,
+                "circuit": self.breakers[name].snapshot()
+            }
+            for name in self.bulkheads
+        }
+
+    def _observe(self, operation: str, outcome: str, start: float) -> None:
+        AGENT_REQUESTS.inc(operation=operation, outcome=outcome)
+        AGENT_REQUEST_DURATION.observe(time.perf_counter() - start, operation=operation, outcome=outcome)
+
+    def collect_metrics(self) -> None:
+        """Export bulkhead and circuit breaker state at scrape time"""
+        for name, bulkhead in self.bulkheads.items():
+            AGENT_IN_FLIGHT.set(bulkhead.in_flight, endpoint_class=name)
+            AGENT_BULKHEAD_REJECTED.set_total(bulkhead.rejected, endpoint_class=name)
+        for name, breaker in self.breakers.items():
+            for state in (CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN):
+                AGENT_CIRCUIT_STATE.set(1 if breaker.state == state else 0, endpoint_class=name, state=state)
+            for transition, count in breaker.transitions.items():
+                AGENT_CIRCUIT_TRANSITIONS.set_total(count, endpoint_class=name, transition=transition)
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+agent_client = AgentClient(settings.AI_API_BASE_URL)
+REGISTRY.add_collector(agent_client.collect_metrics)
+lifecycle.add_shutdown_hook(agent_client.aclose)
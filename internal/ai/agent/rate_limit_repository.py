@@ -0,0 +1,45 @@
+import logging
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from app.tracing import traced_repository
+
+logger = logging.getLogger(__name__)
+
+@traced_repository
+class RateLimitRepository:
+    """Token buckets in rate_limit_buckets using raw queries"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def take_token(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from the bucket of `key`; returns 0 when granted, else seconds until one is available
+
+        The refill and the take happen in one statement, so concurrent
+        workers never spend the same token twice.
+        """
+        params = {"key": key, "rate": rate, "burst": burst}
+        try:
+            taken = self.db.execute(text("""
+                INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at)
+                VALUES (:key, :burst - 1, now())
+                ON CONFLICT (key) DO UPDATE
+                SET tokens = LEAST(:burst, b.tokens + EXTRACT(EPOCH FROM now() - b.updated_at) * :rate) - 1,
+                    updated_at = now()
+                WHERE LEAST(:burst, b.tokens + EXTRACT(EPOCH FROM now() - b.updated_at) * :rate) >= 1
+                RETURNING tokens
+            """), params).fetchone()
+            if taken is not None:
+                self.db.commit()
+                return 0.0
+            tokens = self.db.execute(text("""
+                SELECT LEAST(:burst, tokens + EXTRACT(EPOCH FROM now() - updated_at) * :rate)
+                FROM rate_limit_buckets
+                WHERE key = :key
+            """), params).scalar()
+            self.db.commit()
+            return (1 - float(tokens or 0)) / rate
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error taking rate limit token for {key}: {str(e)}")
+            raise e
@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import deque, Counter
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+class AgentUnavailableError(Exception):
+    """Raised when a call to the AI agent is rejected without being attempted"""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds, never less than one"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+class BulkheadFullError(AgentUnavailableError):
+    """Raised when too many agent calls of one kind are already in flight"""
+    pass
+
+class CircuitOpenError(AgentUnavailableError):
+    """Raised when the circuit breaker is failing fast"""
+    pass
+
+class Bulkhead:
+    """Caps concurrent calls, letting callers queue for a bounded time"""
+
+    def __init__(self, name: str, max_concurrent: int, max_wait_seconds: float = 0.0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_wait_seconds = max_wait_seconds
+        self.in_flight = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting up to max_wait_seconds for one to free up"""
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            return
+
+        if self.max_wait_seconds <= 0:
+            self._reject()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait expired
+                return
+            self._discard(waiter)
+            self._reject()
+        except BaseException:
+            self._discard(waiter)
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the oldest waiter if there is one"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot is transferred, so in_flight stays the same
+                waiter.set_result(None)
+                return
+        self.in_flight = max(0, self.in_flight - 1)
+
+    async def __aenter__(self) -> "Bulkhead":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _reject(self) -> None:
+        self.rejected += 1
+        raise BulkheadFullError(
+            f"Too many concurrent AI {self.name} requests, please retry shortly",
+            retry_after=max(1.0, self.max_wait_seconds)
+        )
+
+class CircuitBreaker:
+    """Error-rate circuit breaker over a sliding time window
+
+    Closed: calls flow and outcomes are recorded. Once at least minimum_calls
+    outcomes in the window fail at failure_rate_threshold or more, the breaker
+    opens and rejects calls for open_seconds. It then goes half-open and lets
+    half_open_max_calls probes through: a success closes it, a failure reopens it.
+
+    before_call returns a probe token for calls admitted while half-open
+    (None otherwise), and the outcome of a call is recorded with it. Only
+    probes of the current half-open period move the breaker out of it; a
+    call admitted while closed that finishes later does not.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 10,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self.state = CIRCUIT_CLOSED
+        self.transitions: Counter = Counter()
+        self.rejected = 0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._half_open_period = 0
+
+    def before_call(self) -> Optional[int]:
+        """Admit a call or raise CircuitOpenError; returns the probe token of a half-open call"""
+        if self.state == CIRCUIT_OPEN:
+            remaining = self.open_seconds - (self.clock() - self._opened_at)
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    f"AI {self.name} service is temporarily unavailable, please retry later",
+                    retry_after=remaining
+                )
+            self._transition(CIRCUIT_HALF_OPEN)
+
+        if self.state == CIRCUIT_HALF_OPEN:
+            if self._half_open_in_flight >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    f"AI {self.name} service is recovering, please retry later",
+                    retry_after=1.0
+                )
+            self._half_open_in_flight += 1
+            return self._half_open_period
+        return None
+
+    def record_success(self, probe: Optional[int] = None) -> None:
+        if self._end_probe(probe):
+            self._transition(CIRCUIT_CLOSED)
+        elif self.state == CIRCUIT_CLOSED:
+            self._record(True)
+
+    def record_failure(self, probe: Optional[int] = None) -> None:
+        if self._end_probe(probe):
+            self._transition(CIRCUIT_OPEN)
+        elif self.state == CIRCUIT_CLOSED:
+            self._record(False)
+            if self._should_open():
+                self._transition(CIRCUIT_OPEN)
+
+    def record_ignored(self, probe: Optional[int] = None) -> None:
+        """Release an admitted call whose outcome says nothing about agent health"""
+        self._end_probe(probe)
+
+    def _end_probe(self, probe: Optional[int]) -> bool:
+        """Free the slot of a probe of the current half-open period; False for any other call"""
+        if probe is None or probe != self._half_open_period or self.state != CIRCUIT_HALF_OPEN:
+            return False
+        self._half_open_in_flight -= 1
+        return True
+
+    def failure_rate(self) -> float:
+        self._trim()
+        if not self._outcomes:
+            return 0.0
+        failures = sum(1 for _, success in self._outcomes if not success)
+        return failures / len(self._outcomes)
+
+    def _record(self, success: bool) -> None:
+        self._outcomes.append((self.clock(), success))
+        self._trim()
+
+    def _trim(self) -> None:
+        cutoff = self.clock() - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _should_open(self) -> bool:
+        return len(self._outcomes) >= self.minimum_calls and self.failure_rate() >= self.failure_rate_threshold
+
+    def _transition(self, new_state: str) -> None:
+        old_state = self.state
+        self.state = new_state
+        self.transitions[f"{old_state}->{new_state}"] += 1
+        if new_state == CIRCUIT_OPEN:
+            self._opened_at = self.clock()
+            logger.warning(f"AI {self.name} circuit opened (failure rate {self.failure_rate():.0%}), failing fast for {self.open_seconds}s")
+        elif new_state == CIRCUIT_HALF_OPEN:
+            # Probes of an earlier half-open period no longer count
+            self._half_open_period += 1
+            self._half_open_in_flight = 0
+            logger.info(f"AI {self.name} circuit half-open, probing agent")
+        else:
+            self._outcomes.clear()
+            logger.info(f"AI {self.name} circuit closed, agent recovered")
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 4),
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions)
+        }
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for idempotent calls"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0, rng: Optional[random.Random] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based)"""
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
@@ -1,10 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+import logging
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from uuid import UUID
-from app.database.connection import get_db
-from internal.ai.chat.model.chat_dto import CourseChatRequest, CourseChatResponse, GuideChatRequest, GuideChatResponse
+from app.config import settings
+from app.database.connection import get_db, SessionLocal
+from internal.ai.chat.model.chat_dto import CourseChatRequest, CourseChatResponse, GuideChatRequest, GuideChatResponse, ChatSocketFrame
 from internal.ai.chat.service.chat_service import ChatService
-from internal.auth.middleware import get_current_user_id
+from internal.ai.chat.service.chat_socket import ChatSocketSession
+from internal.auth.middleware import JWTMiddleware, get_current_user_id
+from internal.ai.agent.resilience import AgentUnavailableError
+from internal.ai.agent.admission import rate_limited
+from internal.ai.agent.agent_client import AGENT_CHAT
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ai/chat", tags=["ai-chat"])
 
@@ -12,7 +25,20 @@ def get_chat_service(db: Session = Depends(get_db)) -> ChatService:
     """Dependency to get chat service"""
     return ChatService(db)
 
-@router.post("/course/{course_id}", response_model=CourseChatResponse)
+@contextmanager
+def chat_service_scope() -> Iterator[ChatService]:
+    """Chat service on its own short-lived database session"""
+    db = SessionLocal()
+    try:
+        yield ChatService(db)
+    finally:
+        db.close()
+
+def get_chat_service_scope() -> Callable:
+    """Dependency to get the chat service factory used by WebSocket turns"""
+    return chat_service_scope
+
+@router.post("/course/{course_id}", response_model=CourseChatResponse, dependencies=[Depends(rate_limited(AGENT_CHAT))])
 async def chat_with_course(
     course_id: UUID,
     chat_request: CourseChatRequest,
@@ -23,6 +49,12 @@ async def chat_with_course(
     try:
         user_id = UUID(current_user_id)
         return await chat_service.chat_about_course(str(course_id), chat_request, user_id)
+    except AgentUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": e.retry_after_header}
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -34,7 +66,7 @@ async def chat_with_course(
             detail=f"Failed to process course chat: {str(e)}"
         )
 
-@router.post("/guide/{guide_id}", response_model=GuideChatResponse)
+@router.post("/guide/{guide_id}", response_model=GuideChatResponse, dependencies=[Depends(rate_limited(AGENT_CHAT))])
 async def chat_with_guide(
     guide_id: UUID,
     chat_request: GuideChatRequest,
@@ -45,6 +77,12 @@ async def chat_with_guide(
     try:
         user_id = UUID(current_user_id)
         return await chat_service.chat_about_guide(str(guide_id), chat_request, user_id)
+    except AgentUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": e.retry_after_header}
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -55,3 +93,65 @@ async def chat_with_guide(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process guide chat: {str(e)}"
         )
+
+async def _authenticate_socket(websocket: WebSocket) -> Optional[Tuple[UUID, Optional[float]]]:
+    """User ID and token expiry from the Authorization header or the first (auth) frame"""
+    auth_header = websocket.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
+    else:
+        # Browsers cannot set headers on WebSockets, so the token comes as the first frame
+        try:
+            raw = await asyncio.wait_for(websocket.receive_text(), timeout=settings.CHAT_WS_AUTH_TIMEOUT_SECONDS)
+            frame = ChatSocketFrame(**json.loads(raw))
+        except (asyncio.TimeoutError, ValueError, ValidationError):
+            return None
+        if frame.type != "auth" or not frame.token:
+            return None
+        token = frame.token
+
+    payload = JWTMiddleware().verify_token(token)
+    if not payload or not payload.get("user_id"):
+        return None
+    try:
+        return UUID(payload["user_id"]), payload.get("exp")
+    except ValueError:
+        return None
+
+@router.websocket("/ws")
+async def chat_socket(
+    websocket: WebSocket,
+    service_scope: Callable = Depends(get_chat_service_scope)
+):
+    """Chat about several courses and guides over one connection, with streamed answers"""
+    await websocket.accept()
+    identity = await _authenticate_socket(websocket)
+    if identity is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid or expired token")
+        return
+
+    user_id, token_expires_at = identity
+    session = ChatSocketSession(
+        user_id,
+        websocket.send_json,
+        service_scope,
+        token_expires_at=token_expires_at,
+        max_conversations=settings.CHAT_WS_MAX_CONVERSATIONS,
+        max_message_chars=settings.CHAT_WS_MAX_MESSAGE_CHARS
+    )
+    await session.send({"type": "ready", "user_id": str(user_id)})
+    session.warm_sessions()
+
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                frame = ChatSocketFrame(**json.loads(raw))
+            except (ValueError, ValidationError) as e:
+                await session.send({"type": "error", "id": None, "status": 400, "detail": f"Invalid frame: {str(e)}"})
+                continue
+            await session.handle(frame)
+    except WebSocketDisconnect:
+        logger.info(f"Chat socket closed for user {user_id} after {len(session.conversations)} conversation(s)")
+    finally:
+        await session.close()
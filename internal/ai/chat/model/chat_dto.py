@@ -3,6 +3,10 @@ from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
 
+# Conversation kinds
+CHAT_KIND_COURSE = "course"
+CHAT_KIND_GUIDE = "guide"
+
 class ChatRequest(BaseModel):
     """Request model for chat messages"""
     message: str
@@ -43,3 +47,50 @@ class ChatSessionResponse(BaseModel):
     ai_session_id: str
     created_at: datetime
     updated_at: datetime
+
+class ChatConversation(BaseModel):
+    """A resolved chat session with its precomputed agent context"""
+    kind: str
+    resource_id: UUID
+    session_id: UUID
+    ai_session_id: str
+    context: str
+    user_id: Optional[UUID] = None
+    started_at: Optional[datetime] = None
+    summary: Optional[str] = None
+    summary_turns: int = 0
+    last_message_order: int = 0
+
+    @property
+    def is_course(self) -> bool:
+        return self.kind == CHAT_KIND_COURSE
+
+class ChatExchange(BaseModel):
+    """A question and its answer waiting to be written to chat_messages"""
+    kind: str
+    session_id: UUID
+    user_message_id: UUID
+    ai_message_id: UUID
+    user_content: str
+    ai_content: str
+    created_at: datetime
+
+class ChatSessionVersion(BaseModel):
+    """Session row fields a worker caches, as left by the latest write"""
+    session_id: UUID
+    ai_session_id: str
+    summary_turns: int
+    last_message_order: int
+
+class ChatSocketFrame(BaseModel):
+    """Client frame on the chat WebSocket
+
+    type "auth" carries the token, type "message" a question for the course
+    or guide conversation named by course_id/guide_id, type "ping" a keepalive.
+    """
+    type: str
+    id: Optional[str] = None
+    token: Optional[str] = None
+    course_id: Optional[UUID] = None
+    guide_id: Optional[UUID] = None
+    message: Optional[str] = None
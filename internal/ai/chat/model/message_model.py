@@ -6,16 +6,20 @@ from app.database.connection import Base
 import uuid
 
 class ChatMessage(Base):
-    """Model for storing all chat messages"""
+    """Model for storing all chat messages
+
+    The table is range partitioned by created_at month (see the
+    7e3a4b5c6d8f migration), so created_at is part of the primary key.
+    """
     __tablename__ = "chat_messages"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     course_session_id = Column(UUID(as_uuid=True), ForeignKey("course_chat_sessions.id"), nullable=True)
     guide_session_id = Column(UUID(as_uuid=True), ForeignKey("guide_chat_sessions.id"), nullable=True)
     content = Column(Text, nullable=False)
     is_user = Column(Boolean, nullable=False)  # True for user message, False for AI response
     message_order = Column(Integer, nullable=False)  # Order within the session
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     
     # Relationships
     course_session = relationship("CourseChatSession", back_populates="messages", foreign_keys=[course_session_id])
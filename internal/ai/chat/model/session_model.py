@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Integer, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -15,6 +15,12 @@ class CourseChatSession(Base):
     ai_session_id = Column(String(255), nullable=False, unique=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Rolling summary of the first summary_turns turns; the agent session only holds later ones
+    summary = Column(Text, nullable=True)
+    summary_turns = Column(Integer, nullable=False, server_default="0", default=0)
+    summary_updated_at = Column(DateTime(timezone=True), nullable=True)
+    # Highest message_order ever given out; stays when archiving drops the messages
+    last_message_order = Column(Integer, nullable=False, server_default="0", default=0)
     
     # Unique constraint: one session per user per course
     __table_args__ = (
@@ -37,6 +43,12 @@ class GuideChatSession(Base):
     ai_session_id = Column(String(255), nullable=False, unique=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Rolling summary of the first summary_turns turns; the agent session only holds later ones
+    summary = Column(Text, nullable=True)
+    summary_turns = Column(Integer, nullable=False, server_default="0", default=0)
+    summary_updated_at = Column(DateTime(timezone=True), nullable=True)
+    # Highest message_order ever given out; stays when archiving drops the messages
+    last_message_order = Column(Integer, nullable=False, server_default="0", default=0)
     
     # Unique constraint: one session per user per guide
     __table_args__ = (
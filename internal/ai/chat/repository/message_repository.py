@@ -1,117 +1,158 @@
-from typing import List, Optional
-from uuid import UUID, uuid4
+from typing import Dict, List, Optional
+from uuid import UUID
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from internal.ai.chat.model.chat_dto import ChatExchange, ChatSessionVersion, CHAT_KIND_COURSE
 from internal.ai.chat.model.message_model import ChatMessage
+from internal.ai.chat.repository.partition_repository import month_start
 from datetime import datetime, timezone, timedelta
+from app.tracing import traced_repository
 
 # GMT+7 timezone
 GMT_PLUS_7 = timezone(timedelta(hours=7))
 
+@traced_repository
 class MessageRepository:
     """Repository for chat message operations using raw queries"""
     
     def __init__(self, db: Session):
         self.db = db
 
-    async def save_course_message(self, session_id: UUID, content: str, is_user: bool, message_order: int) -> ChatMessage:
-        """Save a message for a course session using raw query"""
-        insert_query = text("""
-            INSERT INTO chat_messages (id, course_session_id, content, is_user, message_order, created_at)
-            VALUES (:id, :course_session_id, :content, :is_user, :message_order, :created_at)
-            RETURNING id, course_session_id, guide_session_id, content, is_user, message_order, created_at
-        """)
-        
-        message_id = uuid4()
-        now = datetime.now(GMT_PLUS_7)
-        
-        result = self.db.execute(insert_query, {
-            "id": str(message_id),
-            "course_session_id": str(session_id),
-            "content": content,
-            "is_user": is_user,
-            "message_order": message_order,
-            "created_at": now
-        }).fetchone()
-        
-        self.db.commit()
-        
-        return ChatMessage(
-            id=result[0] if isinstance(result[0], UUID) else UUID(result[0]),
-            course_session_id=result[1] if isinstance(result[1], UUID) else (UUID(result[1]) if result[1] else None),
-            guide_session_id=result[2] if isinstance(result[2], UUID) else (UUID(result[2]) if result[2] else None),
-            content=result[3],
-            is_user=result[4],
-            message_order=result[5],
-            created_at=result[6]
-        )
+    async def save_exchanges(self, exchanges: List[ChatExchange]) -> Dict[UUID, ChatSessionVersion]:
+        """Save questions and answers of any sessions in one insert and one commit
 
-    async def save_guide_message(self, session_id: UUID, content: str, is_user: bool, message_order: int) -> ChatMessage:
-        """Save a message for a guide session using raw query"""
-        insert_query = text("""
-            INSERT INTO chat_messages (id, guide_session_id, content, is_user, message_order, created_at)
-            VALUES (:id, :guide_session_id, :content, :is_user, :message_order, :created_at)
-            RETURNING id, course_session_id, guide_session_id, content, is_user, message_order, created_at
-        """)
-        
-        message_id = uuid4()
-        now = datetime.now(GMT_PLUS_7)
-        
-        result = self.db.execute(insert_query, {
-            "id": str(message_id),
-            "guide_session_id": str(session_id),
-            "content": content,
-            "is_user": is_user,
-            "message_order": message_order,
-            "created_at": now
-        }).fetchone()
-        
-        self.db.commit()
-        
-        return ChatMessage(
-            id=result[0] if isinstance(result[0], UUID) else UUID(result[0]),
-            course_session_id=result[1] if isinstance(result[1], UUID) else (UUID(result[1]) if result[1] else None),
-            guide_session_id=result[2] if isinstance(result[2], UUID) else (UUID(result[2]) if result[2] else None),
-            content=result[3],
-            is_user=result[4],
-            message_order=result[5],
-            created_at=result[6]
-        )
+        Messages are numbered after each session's last_message_order, in the
+        order of `exchanges`, and the counter moves past them in the same
+        statement. The counter survives archiving, so numbering never restarts
+        for a session whose messages were all archived. Messages whose id
+        already exists are skipped without numbering, so replaying a batch
+        is harmless.
 
-    async def get_course_messages(self, session_id: UUID) -> List[ChatMessage]:
-        """Get all messages for a course session using raw query"""
-        query = text("""
-            SELECT id, course_session_id, guide_session_id, content, is_user, message_order, created_at
-            FROM chat_messages 
-            WHERE course_session_id = :session_id
-            ORDER BY message_order ASC
+        Returns the session rows as updated, keyed by session id, for the
+        sessions that got new messages; callers compare them with what they
+        cached to notice summaries and turns written by other workers.
+        """
+        if not exchanges:
+            return {}
+        rows = self._exchange_rows(exchanges)
+        insert_query = text("""
+            WITH batch AS (
+                SELECT t.*, ROW_NUMBER() OVER (
+                    PARTITION BY COALESCE(t.course_session_id, t.guide_session_id) ORDER BY t.position
+                ) AS number
+                FROM unnest(
+                    CAST(:ids AS uuid[]), CAST(:course_session_ids AS uuid[]), CAST(:guide_session_ids AS uuid[]),
+                    CAST(:contents AS text[]), CAST(:is_user AS boolean[]), CAST(:positions AS integer[]),
+                    CAST(:created_at AS timestamptz[])
+                ) AS t(id, course_session_id, guide_session_id, content, is_user, position, created_at)
+                WHERE NOT EXISTS (SELECT 1 FROM chat_messages m WHERE m.id = t.id AND m.created_at = t.created_at)
+            ),
+            added AS (
+                SELECT course_session_id, guide_session_id, COUNT(*) AS messages
+                FROM batch GROUP BY course_session_id, guide_session_id
+            ),
+            course_counters AS (
+                UPDATE course_chat_sessions s
+                SET last_message_order = s.last_message_order + a.messages
+                FROM added a
+                WHERE s.id = a.course_session_id
+                RETURNING s.id, s.last_message_order - a.messages AS floor, s.last_message_order, s.summary_turns, s.ai_session_id
+            ),
+            guide_counters AS (
+                UPDATE guide_chat_sessions s
+                SET last_message_order = s.last_message_order + a.messages
+                FROM added a
+                WHERE s.id = a.guide_session_id
+                RETURNING s.id, s.last_message_order - a.messages AS floor, s.last_message_order, s.summary_turns, s.ai_session_id
+            ),
+            inserted AS (
+                INSERT INTO chat_messages (id, course_session_id, guide_session_id, content, is_user, message_order, created_at)
+                SELECT b.id, b.course_session_id, b.guide_session_id, b.content, b.is_user,
+                       COALESCE(cc.floor, gc.floor, 0) + b.number,
+                       b.created_at
+                FROM batch b
+                LEFT JOIN course_counters cc ON cc.id = b.course_session_id
+                LEFT JOIN guide_counters gc ON gc.id = b.guide_session_id
+                ON CONFLICT DO NOTHING
+            )
+            SELECT id, ai_session_id, summary_turns, last_message_order FROM course_counters
+            UNION ALL
+            SELECT id, ai_session_id, summary_turns, last_message_order FROM guide_counters
         """)
         
-        results = self.db.execute(query, {"session_id": str(session_id)}).fetchall()
-        
-        return [
-            ChatMessage(
-                id=row[0] if isinstance(row[0], UUID) else UUID(row[0]),
-                course_session_id=row[1] if isinstance(row[1], UUID) else (UUID(row[1]) if row[1] else None),
-                guide_session_id=row[2] if isinstance(row[2], UUID) else (UUID(row[2]) if row[2] else None),
-                content=row[3],
-                is_user=row[4],
-                message_order=row[5],
-                created_at=row[6]
+        result = self.db.execute(insert_query, rows)
+        versions = [
+            ChatSessionVersion(
+                session_id=row.id,
+                ai_session_id=row.ai_session_id,
+                summary_turns=row.summary_turns,
+                last_message_order=row.last_message_order
             )
-            for row in results
+            for row in result
         ]
+        self.db.commit()
+        return {version.session_id: version for version in versions}
+
+    @staticmethod
+    def _exchange_rows(exchanges: List[ChatExchange]) -> Dict[str, list]:
+        """Column arrays for save_exchanges; position counts up per session within the batch"""
+        rows = {key: [] for key in ("ids", "course_session_ids", "guide_session_ids", "contents", "is_user", "positions", "created_at")}
+        positions: Dict[UUID, int] = {}
+        for exchange in exchanges:
+            session_id = str(exchange.session_id)
+            is_course = exchange.kind == CHAT_KIND_COURSE
+            for message_id, content, is_user in (
+                (exchange.user_message_id, exchange.user_content, True),
+                (exchange.ai_message_id, exchange.ai_content, False)
+            ):
+                positions[exchange.session_id] = positions.get(exchange.session_id, 0) + 1
+                rows["ids"].append(str(message_id))
+                rows["course_session_ids"].append(session_id if is_course else None)
+                rows["guide_session_ids"].append(None if is_course else session_id)
+                rows["contents"].append(content)
+                rows["is_user"].append(is_user)
+                rows["positions"].append(positions[exchange.session_id])
+                rows["created_at"].append(exchange.created_at)
+        return rows
+
+    async def get_session_messages(
+        self,
+        session_id: UUID,
+        is_course: bool,
+        since: datetime,
+        limit: Optional[int] = None,
+        after_order: Optional[int] = None,
+        up_to_order: Optional[int] = None
+    ) -> List[ChatMessage]:
+        """Get the latest `limit` messages of a session (all when None), oldest first
 
-    async def get_guide_messages(self, session_id: UUID) -> List[ChatMessage]:
-        """Get all messages for a guide session using raw query"""
-        query = text("""
+        `since` is the session's created_at. No message predates its session, so
+        the bound lets PostgreSQL skip every monthly partition before it.
+        `after_order`/`up_to_order` restrict the message_order range.
+        """
+        session_column = "course_session_id" if is_course else "guide_session_id"
+        query = text(f"""
             SELECT id, course_session_id, guide_session_id, content, is_user, message_order, created_at
-            FROM chat_messages 
-            WHERE guide_session_id = :session_id
+            FROM (
+                SELECT id, course_session_id, guide_session_id, content, is_user, message_order, created_at
+                FROM chat_messages
+                WHERE {session_column} = :session_id AND created_at >= :since
+                  AND (CAST(:after_order AS integer) IS NULL OR message_order > :after_order)
+                  AND (CAST(:up_to_order AS integer) IS NULL OR message_order <= :up_to_order)
+                ORDER BY message_order DESC
+                LIMIT :limit
+            ) latest
             ORDER BY message_order ASC
         """)
         
-        results = self.db.execute(query, {"session_id": str(session_id)}).fetchall()
+        results = self.db.execute(query, {
+            "session_id": str(session_id),
+            # Whole months, so clock skew between the app and the database cannot hide a message
+            "since": month_start(since),
+            "limit": limit,
+            "after_order": after_order,
+            "up_to_order": up_to_order
+        }).fetchall()
         
         return [
             ChatMessage(
@@ -125,28 +166,3 @@ class MessageRepository:
             )
             for row in results
         ]
-
-    async def get_next_message_order(self, session_id: UUID, is_course: bool = True) -> int:
-        """Get the next message order number for a session using raw query"""
-        if is_course:
-            query = text("""
-                SELECT message_order
-                FROM chat_messages 
-                WHERE course_session_id = :session_id
-                ORDER BY message_order DESC
-                LIMIT 1
-            """)
-        else:
-            query = text("""
-                SELECT message_order
-                FROM chat_messages 
-                WHERE guide_session_id = :session_id
-                ORDER BY message_order DESC
-                LIMIT 1
-            """)
-        
-        result = self.db.execute(query, {"session_id": str(session_id)}).fetchone()
-        
-        if not result:
-            return 1
-        return result[0] + 1
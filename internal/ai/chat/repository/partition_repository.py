@@ -0,0 +1,167 @@
+import csv
+import gzip
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from app.tracing import traced_repository
+
+logger = logging.getLogger(__name__)
+
+# chat_messages is range partitioned by created_at, one partition per UTC month
+PARENT_TABLE = "chat_messages"
+DEFAULT_PARTITION = "chat_messages_default"
+PARTITION_PREFIX = "chat_messages_"
+
+def month_start(moment: datetime) -> datetime:
+    """First instant of the UTC month containing `moment`"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+def partition_name(month: datetime) -> str:
+    return f"{PARTITION_PREFIX}{month.year:04d}_{month.month:02d}"
+
+def partition_ddl(month: datetime) -> str:
+    """CREATE statement for the partition of `month`; only valid while the default partition holds none of its rows"""
+    month = month_start(month)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+@dataclass
+class ChatPartition:
+    """One monthly partition of chat_messages"""
+    name: str
+    month: datetime
+    rows: int
+    total_bytes: int
+
+@traced_repository
+class ChatPartitionRepository:
+    """Maintenance of the monthly chat_messages partitions using raw queries"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def list_partitions(self) -> List[ChatPartition]:
+        """Monthly partitions attached to chat_messages, oldest first (row counts are estimates)"""
+        query = text("""
+            SELECT c.relname, c.reltuples::bigint, pg_total_relation_size(c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = :parent AND c.relname <> :default_partition
+            ORDER BY c.relname
+        """)
+        rows = self.db.execute(query, {"parent": PARENT_TABLE, "default_partition": DEFAULT_PARTITION}).fetchall()
+        partitions = []
+        for row in rows:
+            year, month = row[0][len(PARTITION_PREFIX):].split("_")
+            partitions.append(ChatPartition(
+                name=row[0],
+                month=datetime(int(year), int(month), 1, tzinfo=timezone.utc),
+                rows=max(row[1], 0),
+                total_bytes=row[2]
+            ))
+        return partitions
+
+    async def ensure_partitions(self, start: datetime, months: int) -> List[str]:
+        """Create the partitions of `months` months from `start`; returns the names created
+
+        Rows that already landed in the default partition for such a month are
+        moved into the new partition before it is attached.
+        """
+        existing = {partition.name for partition in await self.list_partitions()}
+        created = []
+        try:
+            month = month_start(start)
+            for _ in range(months):
+                name = partition_name(month)
+                if name not in existing:
+                    bounds = {"start": month, "end": add_months(month, 1)}
+                    self.db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+                    self.db.execute(text(f"""
+                        WITH moved AS (
+                            DELETE FROM {DEFAULT_PARTITION}
+                            WHERE created_at >= :start AND created_at < :end
+                            RETURNING *
+                        )
+                        INSERT INTO {name} SELECT * FROM moved
+                    """), bounds)
+                    # Indexes, the primary key and foreign keys are cloned from the parent on attach
+                    self.db.execute(text(
+                        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+                        f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+                    ))
+                    self.db.commit()
+                    created.append(name)
+                    logger.info(f"Created chat message partition {name}")
+                month = add_months(month, 1)
+            return created
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error creating chat message partitions: {str(e)}")
+            raise e
+
+    async def archive_partition(self, name: str, path: str, attached: bool = True) -> int:
+        """Detach a partition, write it to a gzip CSV file and drop it; returns the rows archived
+
+        The file has the chat_messages columns in table order, so it loads back with
+        COPY chat_messages FROM STDIN WITH (FORMAT csv, HEADER). `attached=False`
+        resumes a partition an interrupted run already detached.
+        """
+        if not _is_month_suffix(name[len(PARTITION_PREFIX):]) or not name.startswith(PARTITION_PREFIX):
+            raise ValueError(f"Not a monthly chat message partition: {name}")
+        try:
+            if attached:
+                # Reads stop seeing the month as soon as it is detached
+                self.db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+                self.db.commit()
+
+            cursor = self.db.connection().connection.cursor()
+            try:
+                with gzip.open(path, "wt", encoding="utf-8", newline="") as archive:
+                    cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", archive)
+            finally:
+                cursor.close()
+
+            with gzip.open(path, "rt", encoding="utf-8", newline="") as archive:
+                # Messages may contain newlines, so count CSV records, not lines
+                archived = sum(1 for _ in csv.reader(archive)) - 1
+            rows = self.db.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar()
+            if archived != rows:
+                raise RuntimeError(f"Archive {path} has {archived} rows, partition {name} has {rows}; the partition was kept detached")
+
+            self.db.execute(text(f"DROP TABLE {name}"))
+            self.db.commit()
+            logger.info(f"Archived {rows} chat messages from {name} to {path}")
+            return rows
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error archiving chat message partition {name}: {str(e)}")
+            raise e
+
+    async def find_detached_partitions(self) -> List[str]:
+        """Monthly partition tables left detached by an interrupted archive run"""
+        query = text("""
+            SELECT c.relname
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema() AND c.relkind = 'r' AND c.relname LIKE :pattern
+              AND c.relname <> :default_partition AND NOT c.relispartition
+            ORDER BY c.relname
+        """)
+        rows = self.db.execute(query, {"pattern": f"{PARTITION_PREFIX}%", "default_partition": DEFAULT_PARTITION}).fetchall()
+        return [row[0] for row in rows if _is_month_suffix(row[0][len(PARTITION_PREFIX):])]
+
+def _is_month_suffix(suffix: str) -> bool:
+    year, _, month = suffix.partition("_")
+    return year.isdigit() and month.isdigit() and len(year) == 4 and len(month) == 2
@@ -1,13 +1,15 @@
-from typing import Optional
+from typing import Dict, Optional
 from uuid import UUID, uuid4
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from internal.ai.chat.model.session_model import CourseChatSession, GuideChatSession
 from datetime import datetime, timezone, timedelta
+from app.tracing import traced_repository
 
 # GMT+7 timezone
 GMT_PLUS_7 = timezone(timedelta(hours=7))
 
+@traced_repository
 class SessionRepository:
     """Repository for chat session operations using raw queries"""
     
@@ -18,7 +20,7 @@ class SessionRepository:
         """Get existing course session or create a new one using raw query"""
         # Try to get existing session
         query = text("""
-            SELECT id, user_id, course_id, ai_session_id, created_at, updated_at
+            SELECT id, user_id, course_id, ai_session_id, created_at, updated_at, summary, summary_turns, last_message_order
             FROM course_chat_sessions 
             WHERE user_id = :user_id AND course_id = :course_id
         """)
@@ -32,14 +34,17 @@ class SessionRepository:
                 course_id=result[2] if isinstance(result[2], UUID) else UUID(result[2]),
                 ai_session_id=result[3],
                 created_at=result[4],
-                updated_at=result[5]
+                updated_at=result[5],
+                summary=result[6],
+                summary_turns=result[7],
+                last_message_order=result[8]
             )
         
         # Create new session
         insert_query = text("""
             INSERT INTO course_chat_sessions (id, user_id, course_id, ai_session_id, created_at, updated_at)
             VALUES (:id, :user_id, :course_id, :ai_session_id, :created_at, :updated_at)
-            RETURNING id, user_id, course_id, ai_session_id, created_at, updated_at
+            RETURNING id, user_id, course_id, ai_session_id, created_at, updated_at, summary, summary_turns, last_message_order
         """)
         
         session_id = uuid4()
@@ -62,14 +67,17 @@ class SessionRepository:
             course_id=result[2] if isinstance(result[2], UUID) else UUID(result[2]),
             ai_session_id=result[3],
             created_at=result[4],
-            updated_at=result[5]
+            updated_at=result[5],
+            summary=result[6],
+            summary_turns=result[7],
+            last_message_order=result[8]
         )
 
     async def get_or_create_guide_session(self, user_id: UUID, guide_id: UUID, ai_session_id: str) -> GuideChatSession:
         """Get existing guide session or create a new one using raw query"""
         # Try to get existing session
         query = text("""
-            SELECT id, user_id, guide_id, ai_session_id, created_at, updated_at
+            SELECT id, user_id, guide_id, ai_session_id, created_at, updated_at, summary, summary_turns, last_message_order
             FROM guide_chat_sessions 
             WHERE user_id = :user_id AND guide_id = :guide_id
         """)
@@ -83,14 +91,17 @@ class SessionRepository:
                 guide_id=result[2] if isinstance(result[2], UUID) else UUID(result[2]),
                 ai_session_id=result[3],
                 created_at=result[4],
-                updated_at=result[5]
+                updated_at=result[5],
+                summary=result[6],
+                summary_turns=result[7],
+                last_message_order=result[8]
             )
         
         # Create new session
         insert_query = text("""
             INSERT INTO guide_chat_sessions (id, user_id, guide_id, ai_session_id, created_at, updated_at)
             VALUES (:id, :user_id, :guide_id, :ai_session_id, :created_at, :updated_at)
-            RETURNING id, user_id, guide_id, ai_session_id, created_at, updated_at
+            RETURNING id, user_id, guide_id, ai_session_id, created_at, updated_at, summary, summary_turns, last_message_order
         """)
         
         session_id = uuid4()
@@ -113,13 +124,16 @@ class SessionRepository:
             guide_id=result[2] if isinstance(result[2], UUID) else UUID(result[2]),
             ai_session_id=result[3],
             created_at=result[4],
-            updated_at=result[5]
+            updated_at=result[5],
+            summary=result[6],
+            summary_turns=result[7],
+            last_message_order=result[8]
         )
 
     async def get_course_session(self, user_id: UUID, course_id: UUID) -> Optional[CourseChatSession]:
         """Get existing course session using raw query"""
         query = text("""
-            SELECT id, user_id, course_id, ai_session_id, created_at, updated_at
+            SELECT id, user_id, course_id, ai_session_id, created_at, updated_at, summary, summary_turns, last_message_order
             FROM course_chat_sessions 
             WHERE user_id = :user_id AND course_id = :course_id
         """)
@@ -133,14 +147,17 @@ class SessionRepository:
                 course_id=result[2] if isinstance(result[2], UUID) else UUID(result[2]),
                 ai_session_id=result[3],
                 created_at=result[4],
-                updated_at=result[5]
+                updated_at=result[5],
+                summary=result[6],
+                summary_turns=result[7],
+                last_message_order=result[8]
             )
         return None
 
     async def get_guide_session(self, user_id: UUID, guide_id: UUID) -> Optional[GuideChatSession]:
         """Get existing guide session using raw query"""
         query = text("""
-            SELECT id, user_id, guide_id, ai_session_id, created_at, updated_at
+            SELECT id, user_id, guide_id, ai_session_id, created_at, updated_at, summary, summary_turns, last_message_order
             FROM guide_chat_sessions 
             WHERE user_id = :user_id AND guide_id = :guide_id
         """)
@@ -154,10 +171,67 @@ class SessionRepository:
                 guide_id=result[2] if isinstance(result[2], UUID) else UUID(result[2]),
                 ai_session_id=result[3],
                 created_at=result[4],
-                updated_at=result[5]
+                updated_at=result[5],
+                summary=result[6],
+                summary_turns=result[7],
+                last_message_order=result[8]
             )
         return None
 
+    async def touch_sessions(self, course_touches: Dict[UUID, datetime], guide_touches: Dict[UUID, datetime]) -> None:
+        """Set updated_at of many sessions at once, never moving it backwards"""
+        for table, touches in (("course_chat_sessions", course_touches), ("guide_chat_sessions", guide_touches)):
+            if not touches:
+                continue
+            query = text(f"""
+                UPDATE {table} s
+                SET updated_at = t.touched_at
+                FROM unnest(CAST(:ids AS uuid[]), CAST(:touched_at AS timestamptz[])) AS t(id, touched_at)
+                WHERE s.id = t.id AND (s.updated_at IS NULL OR s.updated_at < t.touched_at)
+            """)
+            self.db.execute(query, {
+                "ids": [str(session_id) for session_id in touches],
+                "touched_at": list(touches.values())
+            })
+        self.db.commit()
+
+    async def save_summary(
+        self,
+        session_id: UUID,
+        is_course: bool,
+        summary: str,
+        summary_turns: int,
+        previous_turns: int,
+        ai_session_id: str
+    ) -> bool:
+        """Store a rolling summary and the agent session that continues from it
+
+        Only applies when the stored summary still covers `previous_turns`, so
+        of two workers summarizing the same session one wins. Returns whether
+        the summary was stored.
+        """
+        table = "course_chat_sessions" if is_course else "guide_chat_sessions"
+        query = text(f"""
+            UPDATE {table}
+            SET summary = :summary, summary_turns = :summary_turns, ai_session_id = :ai_session_id, summary_updated_at = :now
+            WHERE id = :session_id AND summary_turns = :previous_turns
+        """)
+        
+        try:
+            result = self.db.execute(query, {
+                "session_id": str(session_id),
+                "summary": summary,
+                "summary_turns": summary_turns,
+                "previous_turns": previous_turns,
+                "ai_session_id": ai_session_id,
+                "now": datetime.now(GMT_PLUS_7)
+            })
+            self.db.commit()
+            return result.rowcount == 1
+        except Exception:
+            self.db.rollback()
+            raise
+
     async def update_session_timestamp(self, session_id: UUID, is_course: bool = True) -> None:
         """Update session timestamp using raw query"""
         if is_course:
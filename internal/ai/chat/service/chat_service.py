@@ -1,12 +1,17 @@
 import httpx
+import json
 import logging
 import uuid
-from typing import Optional
+from typing import AsyncIterator, Optional
 from uuid import UUID
 from sqlalchemy.orm import Session
-from internal.ai.chat.model.chat_dto import CourseChatRequest, CourseChatResponse, GuideChatRequest, GuideChatResponse
+from internal.ai.chat.model.chat_dto import CourseChatRequest, CourseChatResponse, GuideChatRequest, GuideChatResponse, ChatConversation, ChatExchange, CHAT_KIND_COURSE, CHAT_KIND_GUIDE
 from internal.ai.chat.repository.session_repository import SessionRepository
 from internal.ai.chat.repository.message_repository import MessageRepository
+from internal.ai.chat.service.conversation_memory import ConversationWindow, conversation_memory, summarizer, fallback_summarizer, pair_turns
+from internal.ai.chat.service.message_buffer import message_buffer
+from internal.ai.chat.service.session_cache import session_cache, session_touches
+from internal.ai.chat.service.session_pool import session_pool
 from internal.course.service.course_service import CourseService
 from internal.course.repository.course_repository_db import DatabaseCourseRepository
 from internal.guide.service.guide_service import GuideService
@@ -15,7 +20,10 @@ from internal.oauth.service.oauth_service import OAuthService
 from internal.oauth.repository.oauth_repository_db import DatabaseOAuthRepository
 from internal.user.service.user_service import UserService
 from internal.user.repository.user_repository_db import DatabaseUserRepository
+from internal.ai.agent.agent_client import agent_client, AGENT_CHAT
+from internal.ai.agent.resilience import AgentUnavailableError
 from app.config import settings
+from app.database.connection import SessionLocal
 from datetime import datetime, timezone, timedelta
 
 # GMT+7 timezone
@@ -23,6 +31,19 @@ GMT_PLUS_7 = timezone(timedelta(hours=7))
 
 logger = logging.getLogger(__name__)
 
+SSE_CONTENT_TYPE = "text/event-stream"
+
+class AgentReplyError(Exception):
+    """Raised when the agent gave no answer; the message is the reply to show the user instead
+
+    `partial` is set when the agent failed after part of the answer was
+    already streamed.
+    """
+
+    def __init__(self, message: str, partial: bool = False):
+        super().__init__(message)
+        self.partial = partial
+
 class ChatService:
     """Service for AI chat operations with permanent sessions"""
     
@@ -42,61 +63,16 @@ class ChatService:
         user_repository = DatabaseUserRepository(db)
         user_service = UserService(user_repository)
         self.guide_service = GuideService(oauth_service, guide_repository, user_service)
-        
-        self.ai_base_url = "https://agent.taraai.tech"
 
     async def chat_about_course(self, course_id: str, chat_request: CourseChatRequest, user_id: UUID) -> CourseChatResponse:
         """Chat with AI about a specific course using permanent session"""
         try:
-            # Get course details
-            course = await self.course_service.get_course_by_id(UUID(course_id), user_id)
-            if not course:
-                raise ValueError(f"Course not found: {course_id}")
-
-            # Get or create permanent session
-            session = await self.session_repository.get_course_session(user_id, UUID(course_id))
-            
-            if not session:
-                # Create new AI session
-                ai_session_id = str(uuid.uuid4())
-                
-                await self._create_new_ai_session(str(user_id), ai_session_id)
-                
-                session = await self.session_repository.get_or_create_course_session(
-                    user_id, UUID(course_id), ai_session_id
-                )
-                logger.info(f"Created new permanent course chat session: {session.id}")
-            else:
-                # Update session timestamp
-                await self.session_repository.update_session_timestamp(session.id, is_course=True)
-                logger.info(f"Using existing permanent course chat session: {session.id}")
-
-            # Save user message
-            user_message_order = await self.message_repository.get_next_message_order(session.id, is_course=True)
-            await self.message_repository.save_course_message(
-                session.id, chat_request.message, True, user_message_order
-            )
-
-            # Prepare course context
-            course_context = self._prepare_course_context(course)
-            
-            # Send message to AI service
-            ai_response = await self._send_message_to_ai(
-                session.ai_session_id, 
-                chat_request.message, 
-                course_context,
-                str(user_id)
-            )
-            
-            # Save AI response
-            ai_message_order = await self.message_repository.get_next_message_order(session.id, is_course=True)
-            await self.message_repository.save_course_message(
-                session.id, ai_response, False, ai_message_order
-            )
+            conversation = await self.resolve_course_conversation(UUID(course_id), user_id)
+            ai_response = await self.reply(conversation, chat_request.message, user_id)
             
             return CourseChatResponse(
                 response=ai_response,
-                session_id=str(session.id),
+                session_id=str(conversation.session_id),
                 timestamp=datetime.now(GMT_PLUS_7)
             )
             
@@ -113,55 +89,12 @@ class ChatService:
             except (ValueError, AttributeError) as e:
                 raise ValueError(f"Invalid guide ID format: {guide_id}")
             
-            # Get guide details
-            guide = await self.guide_service.get_guide_by_id(guide_uuid, user_id)
-            if not guide:
-                raise ValueError(f"Guide not found: {guide_id}")
-
-            # Get or create permanent session
-            session = await self.session_repository.get_guide_session(user_id, guide_uuid)
-            
-            if not session:
-                # Create new AI session
-                ai_session_id = str(uuid.uuid4())
-
-                await self._create_new_ai_session(str(user_id), ai_session_id)
-                
-                session = await self.session_repository.get_or_create_guide_session(
-                    user_id, guide_uuid, ai_session_id
-                )
-                logger.info(f"Created new permanent guide chat session: {session.id}")
-            else:
-                # Update session timestamp
-                await self.session_repository.update_session_timestamp(session.id, is_course=False)
-                logger.info(f"Using existing permanent guide chat session: {session.id}")
-
-            # Save user message
-            user_message_order = await self.message_repository.get_next_message_order(session.id, is_course=False)
-            await self.message_repository.save_guide_message(
-                session.id, chat_request.message, True, user_message_order
-            )
-
-            # Prepare guide context
-            guide_context = self._prepare_guide_context(guide)
-            
-            # Send message to AI service
-            ai_response = await self._send_message_to_ai(
-                session.ai_session_id, 
-                chat_request.message, 
-                guide_context,
-                str(user_id)
-            )
-            
-            # Save AI response
-            ai_message_order = await self.message_repository.get_next_message_order(session.id, is_course=False)
-            await self.message_repository.save_guide_message(
-                session.id, ai_response, False, ai_message_order
-            )
+            conversation = await self.resolve_guide_conversation(guide_uuid, user_id)
+            ai_response = await self.reply(conversation, chat_request.message, user_id)
             
             return GuideChatResponse(
                 response=ai_response,
-                session_id=str(session.id),
+                session_id=str(conversation.session_id),
                 timestamp=datetime.now(GMT_PLUS_7)
             )
             
@@ -169,9 +102,301 @@ class ChatService:
             logger.error(f"Error in guide chat for guide {guide_id}: {str(e)}")
             raise e
 
+    async def resolve_course_conversation(self, course_id: UUID, user_id: UUID) -> ChatConversation:
+        """Load the course, get or create its permanent chat session and build the agent context"""
+        cached = session_cache.get(CHAT_KIND_COURSE, user_id, course_id)
+        if cached is None:
+            # The session row may be missing; create its agent session while the course loads
+            self.warm_sessions(user_id)
+
+        # Get course details
+        course = await self.course_service.get_course_by_id(course_id, user_id)
+        if not course:
+            raise ValueError(f"Course not found: {course_id}")
+
+        # Get or create permanent session; the cache drops a row once a turn shows it changed
+        session = cached
+        if not session:
+            session = await self.session_repository.get_course_session(user_id, course_id)
+        
+        if not session:
+            # Claim the agent session warmed above
+            ai_session_id = await session_pool.claim(str(user_id), self._create_new_ai_session)
+            
+            session = await self.session_repository.get_or_create_course_session(
+                user_id, course_id, ai_session_id
+            )
+            logger.info(f"Created new permanent course chat session: {session.id}")
+        else:
+            # Update session timestamp with the next batched flush
+            session_touches.touch(CHAT_KIND_COURSE, session.id)
+            logger.debug(f"Using existing permanent course chat session: {session.id}")
+        session_cache.put(CHAT_KIND_COURSE, user_id, course_id, session)
+
+        return ChatConversation(
+            kind=CHAT_KIND_COURSE,
+            resource_id=course_id,
+            session_id=session.id,
+            ai_session_id=session.ai_session_id,
+            context=self._prepare_course_context(course),
+            user_id=user_id,
+            started_at=session.created_at,
+            summary=session.summary,
+            summary_turns=session.summary_turns or 0,
+            last_message_order=session.last_message_order or 0
+        )
+
+    async def resolve_guide_conversation(self, guide_id: UUID, user_id: UUID) -> ChatConversation:
+        """Load the guide, get or create its permanent chat session and build the agent context"""
+        cached = session_cache.get(CHAT_KIND_GUIDE, user_id, guide_id)
+        if cached is None:
+            # The session row may be missing; create its agent session while the guide loads
+            self.warm_sessions(user_id)
+
+        # Get guide details
+        guide = await self.guide_service.get_guide_by_id(guide_id, user_id)
+        if not guide:
+            raise ValueError(f"Guide not found: {guide_id}")
+
+        # Get or create permanent session; the cache drops a row once a turn shows it changed
+        session = cached
+        if not session:
+            session = await self.session_repository.get_guide_session(user_id, guide_id)
+        
+        if not session:
+            # Claim the agent session warmed above
+            ai_session_id = await session_pool.claim(str(user_id), self._create_new_ai_session)
+            
+            session = await self.session_repository.get_or_create_guide_session(
+                user_id, guide_id, ai_session_id
+            )
+            logger.info(f"Created new permanent guide chat session: {session.id}")
+        else:
+            # Update session timestamp with the next batched flush
+            session_touches.touch(CHAT_KIND_GUIDE, session.id)
+            logger.debug(f"Using existing permanent guide chat session: {session.id}")
+        session_cache.put(CHAT_KIND_GUIDE, user_id, guide_id, session)
+
+        return ChatConversation(
+            kind=CHAT_KIND_GUIDE,
+            resource_id=guide_id,
+            session_id=session.id,
+            ai_session_id=session.ai_session_id,
+            context=self._prepare_guide_context(guide),
+            user_id=user_id,
+            started_at=session.created_at,
+            summary=session.summary,
+            summary_turns=session.summary_turns or 0,
+            last_message_order=session.last_message_order or 0
+        )
+
+    def warm_sessions(self, user_id: UUID) -> None:
+        """Pre-create agent sessions for a user who is about to chat"""
+        session_pool.warm(str(user_id), self._create_new_ai_session)
+
+    async def reply(self, conversation: ChatConversation, user_message: str, user_id: UUID) -> str:
+        """Ask the agent and record the exchange; shared by course and guide chat"""
+        window = await self._window(conversation)
+        try:
+            ai_response = await self._send_message_to_ai(
+                window.ai_session_id, 
+                user_message, 
+                self._agent_context(conversation, window),
+                str(user_id)
+            )
+        except AgentReplyError as e:
+            # Shown to the user, but not stored as the agent's answer
+            return str(e)
+        await self.save_exchange(conversation, user_message, ai_response)
+        return ai_response
+
+    async def save_exchange(self, conversation: ChatConversation, user_message: str, ai_response: str) -> None:
+        """Queue a question and its answer for the next batched insert
+
+        When the exchange is written right away, the session row comes back
+        with it. Other workers summarize and answer turns of the same session,
+        so a row that no longer matches this worker's copy drops the cached
+        row and window; the next turn reloads them.
+        """
+        version = await message_buffer.add(ChatExchange(
+            kind=conversation.kind,
+            session_id=conversation.session_id,
+            user_message_id=uuid.uuid4(),
+            ai_message_id=uuid.uuid4(),
+            user_content=user_message,
+            ai_content=ai_response,
+            created_at=datetime.now(GMT_PLUS_7)
+        ))
+        if version is not None and (version.ai_session_id, version.summary_turns) != (conversation.ai_session_id, conversation.summary_turns):
+            await self._reload_session(conversation)
+            return
+        window = conversation_memory.get(conversation.session_id)
+        if window is None:
+            return
+        window.record(user_message, ai_response)
+        if version is not None and version.last_message_order // 2 != window.turns:
+            # Turns answered by another worker are missing from this window
+            conversation_memory.invalidate(conversation.session_id)
+            return
+        if window.unsummarized >= settings.CHAT_SUMMARY_EVERY_TURNS and not window.summarizing and conversation.user_id:
+            window.summarizing = True
+            conversation_memory.run_in_background(self._summarize(conversation, window))
+
+    async def _reload_session(self, conversation: ChatConversation) -> None:
+        """Pick up a summary another worker stored for this conversation"""
+        conversation_memory.invalidate(conversation.session_id)
+        session_cache.invalidate(conversation.kind, conversation.user_id, conversation.resource_id)
+        if conversation.user_id is None:
+            return
+        if conversation.is_course:
+            session = await self.session_repository.get_course_session(conversation.user_id, conversation.resource_id)
+        else:
+            session = await self.session_repository.get_guide_session(conversation.user_id, conversation.resource_id)
+        if session is None:
+            return
+        # Conversations pinned to a WebSocket keep using these
+        conversation.ai_session_id, conversation.summary = session.ai_session_id, session.summary
+        conversation.summary_turns = session.summary_turns or 0
+        conversation.last_message_order = session.last_message_order or 0
+        session_cache.put(conversation.kind, conversation.user_id, conversation.resource_id, session)
+        logger.info(f"Chat session {conversation.session_id} was summarized by another worker; reloaded it")
+
+    async def _window(self, conversation: ChatConversation) -> ConversationWindow:
+        """Summary and latest turns of a conversation, loaded once per worker"""
+        window = conversation_memory.get(conversation.session_id)
+        if window is not None:
+            return window
+
+        recent_turns = settings.CHAT_RECENT_TURNS
+        since = conversation.started_at or datetime(1970, 1, 1, tzinfo=timezone.utc)
+        after_order = conversation.summary_turns * 2
+        latest = await self.message_repository.get_session_messages(
+            conversation.session_id, conversation.is_course, since, limit=recent_turns * 4, after_order=after_order
+        )
+        carried = []
+        if conversation.summary:
+            # The turns right after the summary went into the current agent session as text
+            carried = pair_turns(await self.message_repository.get_session_messages(
+                conversation.session_id, conversation.is_course, since, after_order=after_order, up_to_order=after_order + recent_turns * 2
+            ))
+        window = ConversationWindow(
+            conversation.ai_session_id,
+            summary=conversation.summary,
+            summary_turns=conversation.summary_turns,
+            # Archived messages still count, so numbering and summaries carry on after them
+            turns=latest[-1].message_order // 2 if latest else max(conversation.summary_turns, conversation.last_message_order // 2),
+            carried=carried,
+            recent=pair_turns(latest),
+            keep=recent_turns * 2
+        )
+        return conversation_memory.put(conversation.session_id, window)
+
+    def _agent_context(self, conversation: ChatConversation, window: ConversationWindow) -> str:
+        memory = window.agent_context()
+        return f"{conversation.context}\n{memory}" if memory else conversation.context
+
+    async def _summarize(self, conversation: ChatConversation, window: ConversationWindow) -> None:
+        """Fold all but the latest turns into the session summary and move to a new agent session"""
+        try:
+            previous_turns = window.summary_turns
+            fold_until = window.turns - settings.CHAT_RECENT_TURNS
+            if fold_until <= previous_turns:
+                return
+            # The turns to fold may still be in the write buffer
+            await message_buffer.flush()
+            db = SessionLocal()
+            try:
+                messages = await MessageRepository(db).get_session_messages(
+                    conversation.session_id,
+                    conversation.is_course,
+                    conversation.started_at or datetime(1970, 1, 1, tzinfo=timezone.utc),
+                    after_order=previous_turns * 2,
+                    up_to_order=fold_until * 2
+                )
+                turns = pair_turns(messages)
+                try:
+                    summary = await summarizer.summarize(window.summary, turns, window.ai_session_id, str(conversation.user_id))
+                except Exception as e:
+                    logger.warning(f"Agent summary failed for chat session {conversation.session_id}, using the local summary: {e!r}")
+                    summary = await fallback_summarizer.summarize(window.summary, turns, window.ai_session_id, str(conversation.user_id))
+
+                ai_session_id = await session_pool.claim(str(conversation.user_id), self._create_new_ai_session)
+                stored = await SessionRepository(db).save_summary(
+                    conversation.session_id, conversation.is_course, summary, fold_until, previous_turns, ai_session_id
+                )
+            finally:
+                db.close()
+
+            if stored:
+                window.rotate(summary, fold_until, ai_session_id)
+                # Conversations pinned to a WebSocket reload from these if the window is evicted
+                conversation.ai_session_id, conversation.summary, conversation.summary_turns = ai_session_id, summary, fold_until
+                logger.info(f"Summarized {fold_until - previous_turns} turn(s) of chat session {conversation.session_id}")
+            else:
+                # Another worker summarized first; reload its summary on the next turn
+                conversation_memory.invalidate(conversation.session_id)
+            # The cached session row holds the old agent session and summary
+            session_cache.invalidate(conversation.kind, conversation.user_id, conversation.resource_id)
+        except Exception as e:
+            logger.error(f"Failed to summarize chat session {conversation.session_id}: {str(e)}")
+        finally:
+            window.summarizing = False
+
+    async def stream_reply(self, conversation: ChatConversation, user_message: str, user_id: UUID) -> AsyncIterator[str]:
+        """Stream the agent's answer in text chunks from /run_sse, falling back to /run
+
+        Failures raise AgentUnavailableError (rejected before the call) or
+        AgentReplyError, with `partial` set when chunks were already
+        yielded; the chunks so far are not an answer to store.
+        """
+        window = await self._window(conversation)
+        context = self._agent_context(conversation, window)
+        payload = {**self._run_payload(window.ai_session_id, user_message, context, str(user_id)), "streaming": True}
+        streamed = False
+        try:
+            # Not retried: the agent would record the question twice
+            async with agent_client.stream(AGENT_CHAT, "/run_sse", payload, timeout=settings.AI_CHAT_TIMEOUT, headers={"Accept": SSE_CONTENT_TYPE}, operation="stream_message") as response:
+                content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+                if content_type != SSE_CONTENT_TYPE:
+                    # The agent answered with the /run event list
+                    await response.aread()
+                    yield self._extract_reply(response.json())
+                    return
+                
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    event = json.loads(line[len("data:"):].strip())
+                    if event.get("error"):
+                        raise RuntimeError(f"AI service failed while answering: {event['error']}")
+                    text = self._event_text(event)
+                    if not text:
+                        continue
+                    if event.get("partial"):
+                        streamed = True
+                        yield text
+                    elif not streamed:
+                        # Agents without token streaming send the whole answer as one final event
+                        streamed = True
+                        yield text
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (404, 405) and not streamed:
+                logger.info("Agent has no /run_sse endpoint, falling back to /run")
+                yield await self._send_message_to_ai(window.ai_session_id, user_message, context, str(user_id))
+                return
+            logger.error(f"AI message stream failed: {e.response.status_code}: {e.response.text}")
+            raise AgentReplyError(self._agent_error_reply(e), partial=streamed) from e
+        except AgentUnavailableError:
+            # Rejected before anything was sent; the caller answers 503
+            logger.warning("AI message stream rejected by resilience policy")
+            raise
+        except Exception as e:
+            logger.error(f"AI message stream failed: {e!r}")
+            raise AgentReplyError(self._agent_error_reply(e), partial=streamed) from e
+
     async def _create_new_ai_session(self, user_id: str, session_id: str) -> str:
         """Create a new AI session"""
-        url = f"{self.ai_base_url}/apps/follow_up_agent/users/{user_id}/sessions/{session_id}"
+        path = f"/apps/follow_up_agent/users/{user_id}/sessions/{session_id}"
         
         payload = {
             "parts": []
@@ -183,28 +408,30 @@ class ChatService:
         
         # Log the request
         logger.info(f"Creating new AI session for user {user_id}")
-        logger.info(f"Sending request to {url}")
-        logger.info(f"Request payload: {payload}")
+        logger.debug("Sending request to %s", path)
+        logger.debug("Request payload: %s", payload)
         
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Log the response
-                logger.info(f"Response status: {response.status_code}")
-                logger.info(f"Response data: {data}")
-                
-                session_id = data.get("session_id")
-                
-                if not session_id:
-                    raise ValueError("No session ID returned from AI service")
-                
-                logger.info(f"Created new AI session: {session_id}")
-                return session_id
+            # The session ID is chosen by us, so creating it is safe to retry
+            response = await agent_client.post(AGENT_CHAT, path, payload, timeout=settings.AI_CHAT_TIMEOUT, idempotent=True, headers=headers, operation="create_session")
+            
+            data = response.json()
+            
+            # Log the response
+            logger.debug("Response status: %s", response.status_code)
+            logger.debug("Response data: %s", data)
+            
+            session_id = data.get("session_id")
+            
+            if not session_id:
+                raise ValueError("No session ID returned from AI service")
+            
+            logger.info(f"Created new AI session: {session_id}")
+            return session_id
                 
+        except AgentUnavailableError:
+            logger.warning("AI session creation rejected by resilience policy")
+            raise
         except httpx.TimeoutException:
             logger.error("AI session creation timed out")
             raise RuntimeError("Failed to create AI session: timeout")
@@ -215,14 +442,12 @@ class ChatService:
             logger.error(f"Unexpected error creating AI session: {str(e)}")
             raise RuntimeError(f"Failed to create AI session: {str(e)}")
 
-    async def _send_message_to_ai(self, session_id: str, user_message: str, context: str, user_id: str) -> str:
-        """Send message to AI service"""
-        url = f"{self.ai_base_url}/run"
-        
+    def _run_payload(self, session_id: str, user_message: str, context: str, user_id: str) -> dict:
+        """Agent run request for a question with its context"""
         # Build contextual message
         contextual_message = f"Context: {context}. Question: {user_message}"
         
-        payload = {
+        return {
             "app_name": "follow_up_agent",
             "user_id": user_id,
             "session_id": session_id,
@@ -235,50 +460,79 @@ class ChatService:
                 ]
             }
         }
+
+    @staticmethod
+    def _event_text(event: dict) -> Optional[str]:
+        """Text of a model event from the agent"""
+        content = event.get("content") or {}
+        if content.get("role") != "model":
+            return None
+        texts = [part.get("text") for part in content.get("parts", []) if part.get("text")]
+        return "".join(texts) or None
+
+    def _extract_reply(self, data) -> str:
+        # Response format: [{"content": {"role": "model", "parts": [{"text": "..."}]}}]
+        if isinstance(data, list) and len(data) > 0:
+            content = data[0].get("content", {})
+            if content.get("role") == "model":
+                parts = content.get("parts", [])
+                if len(parts) > 0 and parts[0].get("text"):
+                    return parts[0].get("text")
+        return "I'm sorry, I couldn't process your request."
+
+    @staticmethod
+    def _agent_error_reply(error: Exception) -> str:
+        """Reply shown to the user when the agent could not answer"""
+        if isinstance(error, AgentUnavailableError):
+            return "I'm sorry, the AI assistant is temporarily unavailable. Please try again in a moment."
+        if isinstance(error, httpx.TimeoutException):
+            return "I'm sorry, the request timed out. Please try again."
+        if isinstance(error, httpx.HTTPStatusError):
+            return "I'm sorry, there was an error processing your request. Please try again."
+        return "I'm sorry, I encountered an unexpected error. Please try again."
+
+    async def _send_message_to_ai(self, session_id: str, user_message: str, context: str, user_id: str) -> str:
+        """Send message to AI service
+
+        Raises AgentUnavailableError when the call was rejected without
+        being attempted, and AgentReplyError when it failed.
+        """
+        path = "/run"
+        
+        payload = self._run_payload(session_id, user_message, context, user_id)
         
         headers = {
             "Content-Type": "application/json"
         }
         
         # Log the request
-        logger.info(f"Sending request to {url}")
-        logger.info(f"Request payload: {payload}")
+        logger.debug("Sending request to %s", path)
+        logger.debug("Request payload: %s", payload)
         
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Log the response
-                logger.info(f"Response status: {response.status_code}")
-                logger.info(f"Response data: {data}")
-                # Extract AI response from the response format
-                # Response format: [{"content": {"role": "model", "parts": [{"text": "..."}]}}]
-                ai_response = None
-                
-                if isinstance(data, list) and len(data) > 0:
-                    content = data[0].get("content", {})
-                    if content.get("role") == "model":
-                        parts = content.get("parts", [])
-                        if len(parts) > 0:
-                            ai_response = parts[0].get("text")
-                
-                if not ai_response:
-                    return "I'm sorry, I couldn't process your request."
-                
-                return ai_response
+            # Not retried: the agent would record the question twice
+            response = await agent_client.post(AGENT_CHAT, path, payload, timeout=settings.AI_CHAT_TIMEOUT, headers=headers, operation="send_message")
+            
+            data = response.json()
+            
+            # Log the response
+            logger.debug("Response status: %s", response.status_code)
+            logger.debug("Response data: %s", data)
+            
+            return self._extract_reply(data)
                 
-        except httpx.TimeoutException:
+        except AgentUnavailableError:
+            logger.warning("AI message request rejected by resilience policy")
+            raise
+        except httpx.TimeoutException as e:
             logger.error("AI message request timed out")
-            return "I'm sorry, the request timed out. Please try again."
+            raise AgentReplyError(self._agent_error_reply(e)) from e
         except httpx.HTTPStatusError as e:
             logger.error(f"AI message request failed: {e.response.status_code}: {e.response.text}")
-            return "I'm sorry, there was an error processing your request. Please try again."
+            raise AgentReplyError(self._agent_error_reply(e)) from e
         except Exception as e:
             logger.error(f"Unexpected error sending message to AI: {str(e)}")
-            return "I'm sorry, I encountered an unexpected error. Please try again."
+            raise AgentReplyError(self._agent_error_reply(e)) from e
 
     def _prepare_course_context(self, course) -> str:
         """Prepare course context for AI"""
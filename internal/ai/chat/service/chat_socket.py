@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from uuid import UUID
+from app.lifecycle import ServerLifecycle, lifecycle
+from internal.ai.chat.model.chat_dto import ChatConversation, ChatSocketFrame, CHAT_KIND_COURSE, CHAT_KIND_GUIDE
+from internal.ai.chat.service.chat_service import ChatService, AgentReplyError, GMT_PLUS_7
+from internal.ai.chat.service.session_cache import session_touches
+from internal.ai.agent.resilience import AgentUnavailableError
+from internal.ai.agent.admission import admission, RateLimitExceededError
+from internal.ai.agent.agent_client import AGENT_CHAT
+
+logger = logging.getLogger(__name__)
+
+ConversationKey = Tuple[str, UUID]
+
+class ChatSocketSession:
+    """Course and guide conversations multiplexed over one authenticated WebSocket
+
+    The first message of a conversation resolves it (course/guide load,
+    session lookup, agent context) and pins the result for the life of the
+    socket, so later turns cost one agent call and a buffered message
+    write. Turns of one conversation run in order; different conversations
+    run concurrently. Every DB access uses a short-lived session from
+    `service_scope`, so an idle socket holds no pooled connection.
+
+    Each running turn counts as a request in flight in `state`, so graceful
+    shutdown waits for it like for an HTTP request. uvicorn closes sockets
+    when it stops; turns running then still finish and store their answer,
+    without sending frames.
+    """
+
+    def __init__(
+        self,
+        user_id: UUID,
+        send_json: Callable[[Dict[str, Any]], Awaitable[None]],
+        service_scope: Callable[[], AbstractContextManager],
+        token_expires_at: Optional[float] = None,
+        max_conversations: int = 20,
+        max_message_chars: int = 8000,
+        state: ServerLifecycle = lifecycle
+    ):
+        self.user_id = user_id
+        self.token_expires_at = token_expires_at
+        self.max_conversations = max_conversations
+        self.max_message_chars = max_message_chars
+        self.conversations: Dict[ConversationKey, ChatConversation] = {}
+        self._send_json = send_json
+        self._service_scope = service_scope
+        self._send_lock = asyncio.Lock()
+        self._turn_locks: Dict[ConversationKey, asyncio.Lock] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._state = state
+        self._closed = False
+
+    @property
+    def token_expired(self) -> bool:
+        return self.token_expires_at is not None and time.time() >= self.token_expires_at
+
+    async def send(self, frame: Dict[str, Any]) -> None:
+        if self._closed:
+            return
+        # Turns stream concurrently; frames must not interleave on the socket
+        async with self._send_lock:
+            await self._send_json(frame)
+
+    def warm_sessions(self) -> None:
+        """Pre-create agent sessions so the first conversation opened on this socket costs one agent call"""
+        with self._service_scope() as service:
+            service.warm_sessions(self.user_id)
+
+    async def handle(self, frame: ChatSocketFrame) -> None:
+        """Dispatch one client frame; message turns run as background tasks"""
+        if frame.type == "ping":
+            await self.send({"type": "pong"})
+        elif frame.type == "message":
+            task = asyncio.create_task(self._turn(frame))
+            self._tasks.add(task)
+            self._state.request_started()
+            task.add_done_callback(self._turn_finished)
+        else:
+            await self.send({"type": "error", "id": frame.id, "status": 400, "detail": f"Unsupported frame type: {frame.type}"})
+
+    async def drain(self) -> None:
+        """Wait for running turns to finish"""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def close(self) -> None:
+        """The socket closed: cancel running turns, unless the worker is shutting down"""
+        self._closed = True
+        if not self._state.draining:
+            # The client went away
+            for task in list(self._tasks):
+                task.cancel()
+        await self.drain()
+
+    def _turn_finished(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        self._state.request_finished()
+
+    def _key(self, frame: ChatSocketFrame) -> ConversationKey:
+        if (frame.course_id is None) == (frame.guide_id is None):
+            raise ValueError("Exactly one of course_id and guide_id is required")
+        if not frame.message or not frame.message.strip():
+            raise ValueError("message is required")
+        if len(frame.message) > self.max_message_chars:
+            raise ValueError(f"message is longer than {self.max_message_chars} characters")
+        if frame.course_id is not None:
+            return CHAT_KIND_COURSE, frame.course_id
+        return CHAT_KIND_GUIDE, frame.guide_id
+
+    async def _conversation(self, service: ChatService, key: ConversationKey) -> ChatConversation:
+        conversation = self.conversations.get(key)
+        if conversation is not None:
+            # Resolving touched the session; later turns on the socket must too
+            session_touches.touch(conversation.kind, conversation.session_id)
+            return conversation
+        if len(self.conversations) >= self.max_conversations:
+            raise ValueError(f"At most {self.max_conversations} conversations can be open on one connection")
+        kind, resource_id = key
+        if kind == CHAT_KIND_COURSE:
+            conversation = await service.resolve_course_conversation(resource_id, self.user_id)
+        else:
+            conversation = await service.resolve_guide_conversation(resource_id, self.user_id)
+        self.conversations[key] = conversation
+        return conversation
+
+    async def _turn(self, frame: ChatSocketFrame) -> None:
+        try:
+            key = self._key(frame)
+            if self.token_expired:
+                await self.send({"type": "error", "id": frame.id, "status": 401, "detail": "Token expired"})
+                return
+            await admission.check(AGENT_CHAT, self.user_id)
+            lock = self._turn_locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                with self._service_scope() as service:
+                    conversation = await self._conversation(service, key)
+                    await self.send({"type": "start", "id": frame.id, "session_id": str(conversation.session_id)})
+
+                    chunks = []
+                    async for chunk in service.stream_reply(conversation, frame.message, self.user_id):
+                        chunks.append(chunk)
+                        await self.send({"type": "chunk", "id": frame.id, "text": chunk})
+                    response = "".join(chunks)
+
+                    await service.save_exchange(conversation, frame.message, response)
+                    await self.send({
+                        "type": "done",
+                        "id": frame.id,
+                        "session_id": str(conversation.session_id),
+                        "response": response,
+                        "timestamp": datetime.now(GMT_PLUS_7).isoformat()
+                    })
+        except asyncio.CancelledError:
+            raise
+        except RateLimitExceededError as e:
+            await self._send_error(frame, 429, str(e), retry_after=e.retry_after_header)
+        except AgentUnavailableError as e:
+            await self._send_error(frame, 503, str(e), retry_after=e.retry_after_header)
+        except AgentReplyError as e:
+            # No complete answer, so there is no exchange to store; chunks already sent are to be discarded
+            await self._send_error(frame, 502, str(e), partial=e.partial)
+        except ValueError as e:
+            await self._send_error(frame, 400, str(e))
+        except Exception as e:
+            logger.error(f"Error in chat socket turn for user {self.user_id}: {str(e)}")
+            await self._send_error(frame, 500, f"Failed to process chat message: {str(e)}")
+
+    async def _send_error(self, frame: ChatSocketFrame, status_code: int, detail: str, retry_after: Optional[str] = None, partial: bool = False) -> None:
+        error = {"type": "error", "id": frame.id, "status": status_code, "detail": detail}
+        if retry_after is not None:
+            error["retry_after"] = retry_after
+        if partial:
+            error["partial"] = True
+        try:
+            await self.send(error)
+        except Exception:
+            # The socket is already gone
+            pass
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from typing import List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+from app.config import settings
+from internal.ai.agent.agent_client import agent_client, AGENT_CHAT
+from internal.ai.chat.model.message_model import ChatMessage
+
+# (user message, assistant reply)
+Turn = Tuple[str, str]
+
+def pair_turns(messages: List[ChatMessage]) -> List[Turn]:
+    """Question/answer pairs of messages ordered by message_order"""
+    turns = []
+    for question, answer in zip(messages, messages[1:]):
+        if question.is_user and not answer.is_user and answer.message_order == question.message_order + 1:
+            turns.append((question.content, answer.content))
+    return turns
+
+class ConversationWindow:
+    """What a permanent conversation sends the agent besides the course/guide context
+
+    Turns up to `summary_turns` are folded into `summary`. At each summary
+    the conversation moves to a fresh agent session, so the agent only
+    stores the turns since; the turns that were too recent to summarize
+    are `carried` into the new session verbatim. A turn therefore costs
+    the context, the summary, at most a few carried turns and the agent
+    session's own turns since the last summary, however old the
+    conversation is.
+    """
+
+    def __init__(
+        self,
+        ai_session_id: str,
+        summary: Optional[str] = None,
+        summary_turns: int = 0,
+        turns: int = 0,
+        carried: Sequence[Turn] = (),
+        recent: Sequence[Turn] = (),
+        keep: int = 8
+    ):
+        self.ai_session_id = ai_session_id
+        self.summary = summary
+        self.summary_turns = summary_turns
+        self.turns = turns
+        self.carried = list(carried)
+        self.recent = deque(recent, maxlen=keep)
+        self.summarizing = False
+
+    @property
+    def unsummarized(self) -> int:
+        return self.turns - self.summary_turns
+
+    def record(self, user_message: str, ai_response: str) -> None:
+        self.turns += 1
+        self.recent.append((user_message, ai_response))
+
+    def rotate(self, summary: str, summary_turns: int, ai_session_id: str) -> None:
+        """Continue in a new agent session from `summary`, carrying the turns it does not cover"""
+        self.summary = summary
+        self.summary_turns = summary_turns
+        self.ai_session_id = ai_session_id
+        self.carried = list(self.recent)[-self.unsummarized:] if self.unsummarized > 0 else []
+
+    def agent_context(self) -> str:
+        parts = []
+        if self.summary:
+            parts.append(f"Summary of the earlier conversation: {self.summary}")
+        if self.carried:
+            parts.append("Latest turns before this session:\n" + format_turns(self.carried))
+        return "\n".join(parts)
+
+def format_turns(turns: List[Turn]) -> str:
+    return "\n".join(f"User: {question}\nAssistant: {answer}" for question, answer in turns)
+
+class ConversationMemory:
+    """LRU of conversation windows by chat session id, plus their background summaries"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._windows: "OrderedDict[UUID, ConversationWindow]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def get(self, session_id: UUID) -> Optional[ConversationWindow]:
+        with self._lock:
+            window = self._windows.get(session_id)
+            if window is not None:
+                self._windows.move_to_end(session_id)
+            return window
+
+    def put(self, session_id: UUID, window: ConversationWindow) -> ConversationWindow:
+        with self._lock:
+            # A concurrent turn may have loaded it first; keep one window per session
+            window = self._windows.setdefault(session_id, window)
+            self._windows.move_to_end(session_id)
+            while len(self._windows) > self.max_size:
+                self._windows.popitem(last=False)
+            return window
+
+    def invalidate(self, session_id: UUID) -> None:
+        with self._lock:
+            self._windows.pop(session_id, None)
+
+    def run_in_background(self, coroutine) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        # Keep a reference until it finishes
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+class LocalSummarizer:
+    """Extractive summary without the agent: the start of every question and answer
+
+    Used by tests and with CHAT_SUMMARIZER=local, and as the fallback when
+    the agent cannot summarize. The newest lines are kept when the summary
+    outgrows `max_chars`.
+    """
+
+    def __init__(self, max_chars: int, snippet_chars: int = 160):
+        self.max_chars = max_chars
+        self.snippet_chars = snippet_chars
+
+    def _snippet(self, content: str) -> str:
+        content = " ".join(content.split())
+        return content if len(content) <= self.snippet_chars else content[:self.snippet_chars].rstrip() + "..."
+
+    async def summarize(self, previous: Optional[str], turns: List[Turn], ai_session_id: str, user_id: str) -> str:
+        lines = previous.splitlines() if previous else []
+        lines += [f"Asked: {self._snippet(question)} Answered: {self._snippet(answer)}" for question, answer in turns]
+        while lines and len("\n".join(lines)) > self.max_chars:
+            lines.pop(0)
+        return "\n".join(lines)
+
+class AgentSummarizer:
+    """Asks the agent, in the session about to be replaced, to summarize the turns"""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+
+    async def summarize(self, previous: Optional[str], turns: List[Turn], ai_session_id: str, user_id: str) -> str:
+        prompt = (
+            f"Summarize this tutoring conversation in at most {self.max_chars} characters. Keep what the learner "
+            "said about themselves, the questions they asked and the key points of the answers. Reply with the summary only.\n"
+        )
+        if previous:
+            prompt += f"Summary so far: {previous}\n"
+        prompt += f"Conversation:\n{format_turns(turns)}"
+        payload = {
+            "app_name": "follow_up_agent",
+            "user_id": user_id,
+            "session_id": ai_session_id,
+            "new_message": {"role": "user", "parts": [{"text": prompt}]}
+        }
+        response = await agent_client.post(AGENT_CHAT, "/run", payload, timeout=settings.AI_CHAT_TIMEOUT, operation="summarize")
+        texts = [
+            part.get("text")
+            for event in response.json() if (event.get("content") or {}).get("role") == "model"
+            for part in event["content"].get("parts", []) if part.get("text")
+        ]
+        summary = "".join(texts).strip()
+        if not summary:
+            raise ValueError("AI service returned an empty summary")
+        return summary[:self.max_chars]
+
+def create_summarizer(kind: str):
+    if kind == "local":
+        return LocalSummarizer(settings.CHAT_SUMMARY_MAX_CHARS)
+    if kind == "agent":
+        return AgentSummarizer(settings.CHAT_SUMMARY_MAX_CHARS)
+    raise ValueError(f"Unknown CHAT_SUMMARIZER: {kind}")
+
+conversation_memory = ConversationMemory(settings.CHAT_MEMORY_CACHE_SIZE)
+summarizer = create_summarizer(settings.CHAT_SUMMARIZER)
+fallback_summarizer = LocalSummarizer(settings.CHAT_SUMMARY_MAX_CHARS)
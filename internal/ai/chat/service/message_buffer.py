@@ -0,0 +1,236 @@
+import asyncio
+import glob
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, TextIO, Tuple
+from uuid import UUID
+from pydantic import ValidationError
+from app.config import settings
+from app.database.connection import SessionLocal
+from app.lifecycle import lifecycle
+from internal.ai.chat.model.chat_dto import ChatExchange, ChatSessionVersion
+from internal.ai.chat.repository.message_repository import MessageRepository
+
+logger = logging.getLogger(__name__)
+
+WAL_PREFIX = "chat-messages-"
+WAL_SUFFIX = ".wal"
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class ChatMessageBuffer:
+    """Write-behind buffer for chat messages
+
+    A finished turn is appended here instead of being inserted: the
+    exchange goes to this worker's write-ahead log (when `wal_dir` is set)
+    and to memory, and a background task writes everything buffered every
+    `interval` seconds with one insert and one commit. A batch of
+    `max_batch` exchanges is written at once, and the rest at shutdown.
+
+    The log holds every exchange not yet committed, so if the worker dies
+    the next worker to start replays it (`recover`). Replays are harmless
+    because message ids are fixed before the exchange is logged. Nothing
+    replays a log unless a worker starts later with the same `wal_dir`:
+    uvicorn's supervisor does not replace dead workers and a container's
+    local disk dies with it. Hence the default `interval` of 0, which
+    writes every turn before answering; a turn whose write fails raises
+    from `add`, so it is answered as failed rather than kept in memory.
+    """
+
+    def __init__(self, interval: float, max_batch: int, wal_dir: str = "", fsync: bool = False, session_factory=SessionLocal):
+        self.interval = interval
+        self.max_batch = max_batch
+        self.wal_dir = wal_dir
+        self.fsync = fsync
+        self.session_factory = session_factory
+        self._pending: List[ChatExchange] = []
+        # Not yet committed, including batches being written right now
+        self._unwritten: Dict[UUID, ChatExchange] = {}
+        self._lock = threading.Lock()
+        self._wal: Optional[TextIO] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._unwritten)
+
+    @property
+    def wal_path(self) -> str:
+        return os.path.join(self.wal_dir, f"{WAL_PREFIX}{os.getpid()}{WAL_SUFFIX}")
+
+    async def add(self, exchange: ChatExchange) -> Optional[ChatSessionVersion]:
+        """Buffer an exchange; returns its session row as updated when the exchange was written right away"""
+        with self._lock:
+            self._log([exchange])
+            self._pending.append(exchange)
+            self._unwritten[exchange.user_message_id] = exchange
+            full = len(self._pending) >= self.max_batch
+        if self.interval <= 0:
+            try:
+                _, versions = await self._write_pending()
+            except Exception:
+                # No flusher runs to retry it; the caller reports the turn as failed
+                self._discard(exchange)
+                raise
+            return versions.get(exchange.session_id)
+        if full:
+            try:
+                _, versions = await self._write_pending()
+                return versions.get(exchange.session_id)
+            except Exception as e:
+                # Still buffered; the periodic flush retries
+                logger.error(f"Failed to write chat messages, {self.pending} exchange(s) buffered: {str(e)}")
+        self._ensure_flusher()
+        return None
+
+    def _discard(self, exchange: ChatExchange) -> None:
+        with self._lock:
+            self._pending = [pending for pending in self._pending if pending.user_message_id != exchange.user_message_id]
+            self._unwritten.pop(exchange.user_message_id, None)
+            if self._wal is not None:
+                self._rewrite_log()
+
+    def _ensure_flusher(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write chat messages, {self.pending} exchange(s) buffered: {str(e)}")
+
+    async def flush(self) -> int:
+        """Write buffered exchanges; returns the number written"""
+        written, _ = await self._write_pending()
+        return written
+
+    async def _write_pending(self) -> Tuple[int, Dict[UUID, ChatSessionVersion]]:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0, {}
+
+        db = self.session_factory()
+        try:
+            versions = await MessageRepository(db).save_exchanges(batch)
+        except Exception:
+            with self._lock:
+                # Back in front of newer turns so message order is kept
+                self._pending = batch + self._pending
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            for exchange in batch:
+                self._unwritten.pop(exchange.user_message_id, None)
+            if self._wal is not None:
+                self._rewrite_log()
+        return len(batch), versions or {}
+
+    async def stop(self) -> None:
+        """Cancel the periodic flush and write what is buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        with self._lock:
+            if self._wal is not None and not self._unwritten:
+                # Clean shutdown: nothing for another worker to replay
+                self._wal.close()
+                self._wal = None
+                os.remove(self.wal_path)
+
+    async def recover(self) -> int:
+        """Replay the logs of workers that died before writing their messages"""
+        if not self.wal_dir:
+            return 0
+        recovered = 0
+        for path in glob.glob(os.path.join(self.wal_dir, f"{WAL_PREFIX}*{WAL_SUFFIX}")):
+            pid = os.path.basename(path)[len(WAL_PREFIX):-len(WAL_SUFFIX)]
+            if not pid.isdigit() or int(pid) == os.getpid() or _pid_alive(int(pid)):
+                continue
+            claimed = f"{path}.{os.getpid()}.recovering"
+            try:
+                # Atomic, so only one worker replays each log
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue
+            exchanges = self._read_log(claimed)
+            with self._lock:
+                exchanges = [exchange for exchange in exchanges if exchange.user_message_id not in self._unwritten]
+                self._log(exchanges)
+                self._pending = exchanges + self._pending
+                self._unwritten.update((exchange.user_message_id, exchange) for exchange in exchanges)
+            os.remove(claimed)
+            recovered += len(exchanges)
+            logger.info(f"Recovered {len(exchanges)} chat exchange(s) from {path}")
+        if recovered:
+            await self.flush()
+        return recovered
+
+    @staticmethod
+    def _read_log(path: str) -> List[ChatExchange]:
+        exchanges = []
+        with open(path, encoding="utf-8") as log:
+            for line in log:
+                try:
+                    exchanges.append(ChatExchange.model_validate_json(line))
+                except ValidationError:
+                    # A line torn by the crash was never acknowledged
+                    logger.warning(f"Skipping unreadable chat log line in {path}")
+        return exchanges
+
+    def _log(self, exchanges: List[ChatExchange]) -> None:
+        if not self.wal_dir or not exchanges:
+            return
+        if self._wal is None:
+            os.makedirs(self.wal_dir, exist_ok=True)
+            if os.path.exists(self.wal_path):
+                # Left by an earlier worker with the same pid; replay it as ours
+                earlier = [exchange for exchange in self._read_log(self.wal_path) if exchange.user_message_id not in self._unwritten]
+                self._pending = earlier + self._pending
+                self._unwritten.update((exchange.user_message_id, exchange) for exchange in earlier)
+                self._rewrite_log()
+            else:
+                self._wal = open(self.wal_path, "a", encoding="utf-8")
+        self._write(self._wal, exchanges)
+
+    def _write(self, log: TextIO, exchanges: List[ChatExchange]) -> None:
+        log.write("".join(exchange.model_dump_json() + "\n" for exchange in exchanges))
+        log.flush()
+        if self.fsync:
+            os.fsync(log.fileno())
+
+    def _rewrite_log(self) -> None:
+        """Replace the log with the exchanges not yet committed"""
+        if self._wal is not None:
+            self._wal.close()
+        temporary = f"{self.wal_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as log:
+            self._write(log, list(self._unwritten.values()))
+        os.replace(temporary, self.wal_path)
+        self._wal = open(self.wal_path, "a", encoding="utf-8")
+
+message_buffer = ChatMessageBuffer(
+    settings.CHAT_MESSAGE_FLUSH_INTERVAL_SECONDS,
+    settings.CHAT_MESSAGE_FLUSH_BATCH,
+    wal_dir=settings.CHAT_MESSAGE_WAL_DIR,
+    fsync=settings.CHAT_MESSAGE_WAL_FSYNC
+)
+lifecycle.add_shutdown_hook(message_buffer.stop)
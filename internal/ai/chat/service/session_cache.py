@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+from app.config import settings
+from app.database.connection import SessionLocal
+from app.lifecycle import lifecycle
+from internal.ai.chat.model.chat_dto import CHAT_KIND_COURSE
+from internal.ai.chat.repository.session_repository import SessionRepository, GMT_PLUS_7
+
+logger = logging.getLogger(__name__)
+
+class ChatSessionCache:
+    """LRU cache of permanent chat sessions keyed by (kind, user_id, course_id|guide_id)
+
+    Rows change after creation: every turn moves last_message_order and a
+    summary, written by any worker, replaces ai_session_id, summary and
+    summary_turns. A cached row is therefore only a starting point. Each
+    written turn returns the row as updated (`ChatService.save_exchange`),
+    and a worker whose copy no longer matches drops it here.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, UUID, UUID], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, user_id: UUID, resource_id: UUID) -> Optional[Any]:
+        key = (kind, user_id, resource_id)
+        with self._lock:
+            session = self._entries.get(key)
+            if session is not None:
+                self._entries.move_to_end(key)
+            return session
+
+    def put(self, kind: str, user_id: UUID, resource_id: UUID, session: Any) -> None:
+        if self.max_size <= 0:
+            return
+        key = (kind, user_id, resource_id)
+        with self._lock:
+            self._entries[key] = session
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, kind: str, user_id: UUID, resource_id: UUID) -> None:
+        with self._lock:
+            self._entries.pop((kind, user_id, resource_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class SessionTouchBuffer:
+    """Deferred updated_at touches for chat sessions
+
+    Chat turns record the time a session was used here instead of writing
+    it. A background task flushes the latest time per session every
+    `interval` seconds with one UPDATE per session table, and once more at
+    shutdown.
+    """
+
+    def __init__(self, interval: float, session_factory=SessionLocal):
+        self.interval = interval
+        self.session_factory = session_factory
+        self._pending: Dict[Tuple[str, UUID], datetime] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def touch(self, kind: str, session_id: UUID, touched_at: Optional[datetime] = None) -> None:
+        with self._lock:
+            self._pending[(kind, session_id)] = touched_at or datetime.now(GMT_PLUS_7)
+        self._ensure_flusher()
+
+    def _ensure_flusher(self) -> None:
+        if self.interval <= 0:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush chat session touches: {str(e)}")
+
+    async def flush(self) -> int:
+        """Write pending touches; returns the number of sessions updated"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        course_touches = {session_id: at for (kind, session_id), at in pending.items() if kind == CHAT_KIND_COURSE}
+        guide_touches = {session_id: at for (kind, session_id), at in pending.items() if kind != CHAT_KIND_COURSE}
+        db = self.session_factory()
+        try:
+            await SessionRepository(db).touch_sessions(course_touches, guide_touches)
+        except Exception:
+            # Keep the touches for the next flush unless newer ones arrived meanwhile
+            with self._lock:
+                for key, at in pending.items():
+                    self._pending.setdefault(key, at)
+            raise
+        finally:
+            db.close()
+        return len(pending)
+
+    async def stop(self) -> None:
+        """Cancel the periodic flush and write what is pending"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+session_cache = ChatSessionCache(settings.CHAT_SESSION_CACHE_SIZE)
+session_touches = SessionTouchBuffer(settings.CHAT_SESSION_TOUCH_INTERVAL_SECONDS)
+lifecycle.add_shutdown_hook(session_touches.stop)
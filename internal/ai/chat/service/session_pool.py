@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+from app.config import settings
+from app.lifecycle import lifecycle
+
+logger = logging.getLogger(__name__)
+
+# (user_id, session_id) -> the created session id; ChatService._create_new_ai_session
+CreateSession = Callable[[str, str], Awaitable[str]]
+
+class AgentSessionPool:
+    """Agent sessions created ahead of use, per user
+
+    Agent sessions belong to a user (the user id is part of their path), so
+    a pool is kept per user. A new chat session claims a ready agent session
+    instead of creating one before its first message, and the pool is topped
+    up in the background when a claim used one of its sessions.
+
+    The pool is warmed when a user opens the chat WebSocket and when a chat
+    turn starts without a cached session row, before the course or guide
+    loads; a claim made while that warm-up is running waits for it instead
+    of creating a second session. Only a claim with nothing ready or on the
+    way creates its session inline, and it does not top up the pool. Ready
+    sessions older than `ttl` are not handed out, and only the `max_users`
+    most recent users keep a pool.
+    """
+
+    def __init__(self, size: int, max_users: int, ttl: float):
+        self.size = size
+        self.max_users = max_users
+        self.ttl = ttl
+        self._ready: "OrderedDict[str, Deque[Tuple[str, float]]]" = OrderedDict()
+        self._filling: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def ready(self, user_id: str) -> int:
+        """Sessions of the user that can still be handed out"""
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for _, created in self._ready.get(user_id, ()) if now - created < self.ttl)
+
+    def _take(self, user_id: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            sessions = self._ready.get(user_id)
+            while sessions:
+                session_id, created = sessions.popleft()
+                if now - created < self.ttl:
+                    return session_id
+            return None
+
+    async def claim(self, user_id: str, create_session: CreateSession) -> str:
+        """A ready agent session of the user, or a new one when the pool is empty"""
+        session_id = self._take(user_id)
+        if session_id is None:
+            with self._lock:
+                filling = self._filling.get(user_id)
+            if filling is not None and not filling.done():
+                # Being created right now; cheaper than creating another one
+                await asyncio.shield(filling)
+                session_id = self._take(user_id)
+        if session_id is not None:
+            logger.debug(f"Claimed pooled AI session {session_id} for user {user_id}")
+            # Replace the one just used
+            self.warm(user_id, create_session)
+            return session_id
+        session_id = str(uuid.uuid4())
+        await create_session(user_id, session_id)
+        return session_id
+
+    def warm(self, user_id: str, create_session: CreateSession) -> None:
+        """Top the user's pool up to `size` in the background"""
+        if self.size <= 0 or self.max_users <= 0 or self.ready(user_id) >= self.size:
+            return
+        with self._lock:
+            task = self._filling.get(user_id)
+            if task is not None and not task.done():
+                return
+            task = asyncio.get_running_loop().create_task(self._fill(user_id, create_session))
+            self._filling[user_id] = task
+            self._tasks.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        with self._lock:
+            for user_id, filling in list(self._filling.items()):
+                if filling is task:
+                    del self._filling[user_id]
+
+    async def _fill(self, user_id: str, create_session: CreateSession) -> None:
+        # Concurrently, so a claim waiting for the fill waits for one agent call
+        await asyncio.gather(*(self._create(user_id, create_session) for _ in range(self.size - self.ready(user_id))))
+
+    async def _create(self, user_id: str, create_session: CreateSession) -> None:
+        session_id = str(uuid.uuid4())
+        try:
+            await create_session(user_id, session_id)
+        except Exception as e:
+            # The next claim falls back to creating its session inline
+            logger.warning(f"Failed to pre-create AI session for user {user_id}: {str(e)}")
+            return
+        with self._lock:
+            self._ready.setdefault(user_id, deque()).append((session_id, time.monotonic()))
+            self._ready.move_to_end(user_id)
+            while len(self._ready) > self.max_users:
+                self._ready.popitem(last=False)
+
+    async def stop(self) -> None:
+        """Cancel pending top-ups; ready sessions are simply never used"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        with self._lock:
+            self._ready.clear()
+
+session_pool = AgentSessionPool(
+    settings.CHAT_SESSION_POOL_SIZE,
+    settings.CHAT_SESSION_POOL_MAX_USERS,
+    settings.CHAT_SESSION_POOL_TTL_SECONDS
+)
+lifecycle.add_shutdown_hook(session_pool.stop)
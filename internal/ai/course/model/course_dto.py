@@ -2,6 +2,11 @@ from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 
+# Course generation statuses stored in courses.generation_status
+GENERATION_STATUS_GENERATING = "generating"
+GENERATION_STATUS_COMPLETED = "completed"
+GENERATION_STATUS_FAILED = "failed"
+
 @dataclass
 class AiCourseGenerateRequest:
     """Request model for AI course generation"""
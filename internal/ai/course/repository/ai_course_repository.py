@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from uuid import UUID
-from internal.ai.course.model.course_dto import AiCourseGenerateRequest, AiCourseGenerateResponse, ExternalAiCourseGenerateResponse
+from internal.ai.course.model.course_dto import AiCourseGenerateRequest, AiCourseGenerateResponse, ExternalAiCourseGenerateResponse, Module
 
 class AiCourseRepository(ABC):
     """Abstract repository for AI course operations"""
@@ -10,3 +10,17 @@ class AiCourseRepository(ABC):
         """Save a generated course to the database"""
         pass
 
+    @abstractmethod
+    async def create_course_header(self, user_id: UUID, course_header: ExternalAiCourseGenerateResponse) -> UUID:
+        """Save the course record of a streamed generation, before any module arrives"""
+        pass
+
+    @abstractmethod
+    async def append_module(self, course_id: UUID, module: Module) -> None:
+        """Save one streamed module with its lessons and quiz"""
+        pass
+
+    @abstractmethod
+    async def update_generation_status(self, course_id: UUID, generation_status: str) -> None:
+        """Update the generation status of a course"""
+        pass
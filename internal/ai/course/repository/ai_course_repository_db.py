@@ -5,10 +5,12 @@ from uuid import UUID, uuid4
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from internal.ai.course.repository.ai_course_repository import AiCourseRepository
-from internal.ai.course.model.course_dto import AiCourseGenerateResponse, ExternalAiCourseGenerateResponse, CourseListResponse, CourseListItem
+from internal.ai.course.model.course_dto import AiCourseGenerateResponse, ExternalAiCourseGenerateResponse, CourseListResponse, CourseListItem, Module, GENERATION_STATUS_GENERATING, GENERATION_STATUS_COMPLETED
+from app.tracing import traced_repository
 
 logger = logging.getLogger(__name__)
 
+@traced_repository
 class DatabaseAiCourseRepository(AiCourseRepository):
     """Database repository for AI course operations using raw SQL queries"""
 
@@ -40,11 +42,78 @@ class DatabaseAiCourseRepository(AiCourseRepository):
             self.db.rollback()
             raise e
 
-    def _insert_course(self, course_id: UUID, user_id: UUID, external_response: ExternalAiCourseGenerateResponse) -> None:
+    async def create_course_header(self, user_id: UUID, course_header: ExternalAiCourseGenerateResponse) -> UUID:
+        """Save the course record of a streamed generation, before any module arrives"""
+        try:
+            course_id = uuid4()
+            
+            # Insert course marked as generating so readers can show it as partial
+            self._insert_course(course_id, user_id, course_header, GENERATION_STATUS_GENERATING)
+            
+            # Commit right away so the course is visible while modules are still streaming
+            self.db.commit()
+            
+            return course_id
+            
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    async def append_module(self, course_id: UUID, module: Module) -> None:
+        """Save one streamed module with its lessons and quiz"""
+        try:
+            module_id = uuid4()
+            
+            self._insert_module(module_id, course_id, module)
+            self._insert_lessons(module_id, module.lessons)
+            if module.quiz:
+                self._insert_quiz(module_id, module.quiz)
+            
+            # Touch the course so readers see that its content changed
+            self._touch_course(course_id)
+            
+            # Commit per module so a late failure keeps everything received so far
+            self.db.commit()
+            
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    async def update_generation_status(self, course_id: UUID, generation_status: str) -> None:
+        """Update the generation status of a course"""
+        try:
+            status_query = text("""
+                UPDATE courses
+                SET generation_status = :generation_status,
+                    updated_at = NOW()
+                WHERE id = :id
+            """)
+            
+            self.db.execute(status_query, {
+                "id": course_id,
+                "generation_status": generation_status
+            })
+            self.db.commit()
+            
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    def _touch_course(self, course_id: UUID) -> None:
+        """Bump the course updated_at timestamp"""
+        touch_query = text("""
+            UPDATE courses
+            SET updated_at = NOW()
+            WHERE id = :id
+        """)
+        
+        self.db.execute(touch_query, {"id": course_id})
+
+    def _insert_course(self, course_id: UUID, user_id: UUID, external_response: ExternalAiCourseGenerateResponse, generation_status: str = GENERATION_STATUS_COMPLETED) -> None:
         """Insert course record"""
         course_query = text("""
-            INSERT INTO courses (id, user_id, title, description, estimated_duration, difficulty, learning_objectives, source_from, progress, is_completed, created_at, updated_at, skill)
-            VALUES (:id, :user_id, :title, :description, :estimated_duration, :difficulty, :learning_objectives, :source_from, :progress, :is_completed, NOW(), NOW(), :skill)
+            INSERT INTO courses (id, user_id, title, description, estimated_duration, difficulty, learning_objectives, source_from, progress, is_completed, generation_status, created_at, updated_at, skill)
+            VALUES (:id, :user_id, :title, :description, :estimated_duration, :difficulty, :learning_objectives, :source_from, :progress, :is_completed, :generation_status, NOW(), NOW(), :skill)
         """)
         
         self.db.execute(course_query, {
@@ -58,6 +127,7 @@ class DatabaseAiCourseRepository(AiCourseRepository):
             "source_from": external_response.source_from,
             "progress": 0.0,
             "is_completed": False,
+            "generation_status": generation_status,
             "skill": external_response.skills
         })
 
@@ -1,6 +1,7 @@
 import httpx
+import json
 import logging
-from typing import Optional
+from typing import Optional, Callable, Awaitable, Dict, Any
 from uuid import UUID, uuid4
 from internal.ai.course.model.course_dto import (
     AiCourseGenerateRequest, 
@@ -9,15 +10,21 @@ from internal.ai.course.model.course_dto import (
     Module,
     Lesson,
     QuizQuestion,
-    CourseListResponse
+    CourseListResponse,
+    GENERATION_STATUS_COMPLETED,
+    GENERATION_STATUS_FAILED
 )
 from internal.oauth.service.oauth_service import OAuthService
 from internal.ai.course.repository.ai_course_repository import AiCourseRepository
+from internal.ai.agent.agent_client import agent_client, AGENT_GENERATION
+from internal.ai.agent.resilience import AgentUnavailableError
 from app.config import settings
 from internal.user.service.user_service import UserService
 
 logger = logging.getLogger(__name__)
 
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+
 class AiCourseService:
     """Service for AI course operations"""
 
@@ -47,6 +54,9 @@ class AiCourseService:
             # Update course_data with the user CV
             course_data.cv = user.cv
 
+            if settings.AI_COURSE_STREAMING:
+                return await self._generate_course_streaming(course_data, user_id)
+
             # Call external API
             external_response = await self._call_external_api(course_data, user_id)
             logger.info(f"External API course created: {external_response.title}")
@@ -62,9 +72,60 @@ class AiCourseService:
             # Re-raise the exception to propagate the error
             raise e
 
-    async def _call_external_api(self, course_data: AiCourseGenerateRequest, user_id: UUID) -> ExternalAiCourseGenerateResponse:
-        """Call external AI API to generate course content"""
-        url = f"{settings.AI_API_BASE_URL}/course/generate"
+    async def _generate_course_streaming(self, course_data: AiCourseGenerateRequest, user_id: UUID) -> AiCourseGenerateResponse:
+        """Generate a course, persisting the header and each module as soon as the agent sends them"""
+        course_id: Optional[UUID] = None
+
+        async def on_header(course_header: ExternalAiCourseGenerateResponse) -> None:
+            nonlocal course_id
+            course_id = await self.course_repository.create_course_header(user_id, course_header)
+            logger.info(f"Streamed course header saved with ID: {course_id}")
+
+        async def on_module(module: Module) -> None:
+            if course_id is None:
+                raise ValueError("AI service sent a module before the course header")
+            await self.course_repository.append_module(course_id, module)
+            logger.info(f"Streamed module {module.index} saved for course {course_id}")
+
+        try:
+            external_response = await self._call_external_api(course_data, user_id, on_header=on_header, on_module=on_module)
+        except Exception:
+            if course_id is not None:
+                # Keep the modules received so far and let readers know the course is incomplete
+                try:
+                    await self.course_repository.update_generation_status(course_id, GENERATION_STATUS_FAILED)
+                except Exception as status_error:
+                    # Report the generation error, not the failed status update
+                    logger.error(f"Failed to mark course {course_id} as failed: {str(status_error)}")
+            raise
+
+        if course_id is None:
+            raise ValueError("AI service response did not contain a course")
+
+        await self.course_repository.update_generation_status(course_id, GENERATION_STATUS_COMPLETED)
+        logger.info(f"Course {course_id} generation completed with {len(external_response.modules)} modules")
+
+        return AiCourseGenerateResponse(
+            course_id=course_id,
+            external_response=external_response
+        )
+
+    async def _call_external_api(
+        self,
+        course_data: AiCourseGenerateRequest,
+        user_id: UUID,
+        on_header: Optional[Callable[[ExternalAiCourseGenerateResponse], Awaitable[None]]] = None,
+        on_module: Optional[Callable[[Module], Awaitable[None]]] = None
+    ) -> ExternalAiCourseGenerateResponse:
+        """Call external AI API to generate course content
+
+        When callbacks are given the response is consumed incrementally: NDJSON lines
+        (a "course" header followed by one "module" per line) are handed over as soon as
+        they are parsed. A plain JSON response is still accepted and replayed through
+        the same callbacks.
+        """
+        path = "/course/generate"
+        streaming = on_header is not None or on_module is not None
         
         payload = {
             "token_github": course_data.token_github,
@@ -79,16 +140,24 @@ class AiCourseService:
             "Content-Type": "application/json"
         }
         
-        logger.info(f"Calling external AI API at {url} with timeout {settings.AI_API_TIMEOUT}s")
-        logger.info(f"Request payload: {payload}")
+        if streaming:
+            payload["stream"] = True
+            headers["Accept"] = "application/x-ndjson, application/json"
+        
+        logger.info(f"Calling external AI API at {settings.AI_API_BASE_URL}{path} with timeout {settings.AI_API_TIMEOUT}s")
+        logger.debug("Request payload: %s", payload)
+        
+        if streaming:
+            return await self._stream_external_api(path, payload, headers, on_header, on_module)
         
         try:
-            async with httpx.AsyncClient(timeout=settings.AI_API_TIMEOUT) as client:
-                response = await client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                
-                data = response.json()
-                logger.info(f"External AI API responded successfully with {len(data.get('modules', []))} modules")
+            response = await agent_client.post(AGENT_GENERATION, path, payload, timeout=settings.AI_API_TIMEOUT, headers=headers, operation="generate_course")
+            
+            data = response.json()
+            logger.info(f"External AI API responded successfully with {len(data.get('modules', []))} modules")
+        except AgentUnavailableError:
+            logger.warning("External AI API call rejected by resilience policy")
+            raise
         except httpx.TimeoutException:
             logger.error(f"External AI API request timed out after {settings.AI_API_TIMEOUT}s")
             raise TimeoutError(f"AI service request timed out after {settings.AI_API_TIMEOUT} seconds. Please try again.")
@@ -99,36 +168,103 @@ class AiCourseService:
             logger.error(f"Unexpected error calling external AI API: {str(e)}")
             raise RuntimeError(f"Failed to connect to AI service: {str(e)}")
         
-        # Parse modules and lessons
-        modules = []
-        for module_data in data.get("modules", []):
-            lessons = []
-            for lesson_data in module_data.get("lessons", []):
-                lesson = Lesson(
-                    title=lesson_data["title"],
-                    content=lesson_data["content"],
-                    index=lesson_data["index"]
-                )
-                lessons.append(lesson)
+        return self._parse_course(data)
+
+    async def _stream_external_api(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        headers: Dict[str, str],
+        on_header: Optional[Callable[[ExternalAiCourseGenerateResponse], Awaitable[None]]],
+        on_module: Optional[Callable[[Module], Awaitable[None]]]
+    ) -> ExternalAiCourseGenerateResponse:
+        """Stream the course generation response; callback errors propagate unchanged"""
+        try:
+            async with agent_client.stream(AGENT_GENERATION, path, payload, timeout=settings.AI_API_TIMEOUT, headers=headers, operation="generate_course") as response:
+                external_response = await self._consume_stream(response, on_header, on_module)
+                logger.info(f"External AI API streamed {len(external_response.modules)} modules")
+                return external_response
+        except httpx.TimeoutException:
+            logger.error(f"External AI API stream timed out after {settings.AI_API_TIMEOUT}s")
+            raise TimeoutError(f"AI service request timed out after {settings.AI_API_TIMEOUT} seconds. Please try again.")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"External AI API returned HTTP {e.response.status_code}: {e.response.text}")
+            raise ConnectionError(f"AI service returned error {e.response.status_code}: {e.response.text}")
+        except httpx.HTTPError as e:
+            logger.error(f"Unexpected error streaming from external AI API: {str(e)}")
+            raise RuntimeError(f"Failed to connect to AI service: {str(e)}")
+
+    async def _consume_stream(
+        self,
+        response: httpx.Response,
+        on_header: Optional[Callable[[ExternalAiCourseGenerateResponse], Awaitable[None]]],
+        on_module: Optional[Callable[[Module], Awaitable[None]]]
+    ) -> ExternalAiCourseGenerateResponse:
+        """Parse a streamed course response, invoking the callbacks as each part arrives"""
+        content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        
+        if content_type not in NDJSON_CONTENT_TYPES:
+            # The agent answered with a single JSON document: replay it through the callbacks
+            await response.aread()
+            course = self._parse_course(response.json())
+            if on_header:
+                await on_header(self._course_header(course))
+            for module in course.modules:
+                if on_module:
+                    await on_module(module)
+            return course
+        
+        course: Optional[ExternalAiCourseGenerateResponse] = None
+        async for line in response.aiter_lines():
+            line = line.strip()
+            if not line:
+                continue
             
-            # Parse quiz data if present
-            quiz_questions = []
-            if "quiz" in module_data and module_data["quiz"]:
-                for quiz_data in module_data["quiz"]:
-                    quiz_question = QuizQuestion(
-                        question=quiz_data["question"],
-                        choices=quiz_data["choices"],
-                        answer=quiz_data["answer"]
-                    )
-                    quiz_questions.append(quiz_question)
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                raise ValueError(f"AI service sent a malformed stream line: {line[:200]}")
             
-            module = Module(
-                title=module_data["title"],
-                lessons=lessons,
-                index=module_data["index"],
-                quiz=quiz_questions if quiz_questions else None
-            )
-            modules.append(module)
+            event_type = event.get("type")
+            if event_type == "course":
+                course = self._parse_course({**event, "modules": []})
+                if on_header:
+                    await on_header(self._course_header(course))
+            elif event_type == "module":
+                if course is None:
+                    raise ValueError("AI service sent a module before the course header")
+                module = self._parse_module(event)
+                course.modules.append(module)
+                if on_module:
+                    await on_module(module)
+            elif event_type == "error":
+                raise RuntimeError(f"AI service failed during generation: {event.get('message', 'unknown error')}")
+            elif event_type == "done":
+                break
+            else:
+                logger.debug(f"Ignoring unknown stream event type: {event_type}")
+        
+        if course is None:
+            raise ValueError("AI service stream ended without a course header")
+        
+        return course
+
+    def _course_header(self, course: ExternalAiCourseGenerateResponse) -> ExternalAiCourseGenerateResponse:
+        """Copy of a course without its modules, used as the streamed header"""
+        return ExternalAiCourseGenerateResponse(
+            learning_objectives=course.learning_objectives,
+            description=course.description,
+            estimated_duration=course.estimated_duration,
+            modules=[],
+            title=course.title,
+            source_from=course.source_from,
+            difficulty=course.difficulty,
+            skills=course.skills
+        )
+
+    def _parse_course(self, data: Dict[str, Any]) -> ExternalAiCourseGenerateResponse:
+        """Parse the course payload returned by the external API"""
+        modules = [self._parse_module(module_data) for module_data in data.get("modules", [])]
         
         return ExternalAiCourseGenerateResponse(
             learning_objectives=data["learning_objectives"],
@@ -141,6 +277,35 @@ class AiCourseService:
             skills=data.get("skills")
         )
 
+    def _parse_module(self, module_data: Dict[str, Any]) -> Module:
+        """Parse one module with its lessons and quiz"""
+        lessons = []
+        for lesson_data in module_data.get("lessons", []):
+            lesson = Lesson(
+                title=lesson_data["title"],
+                content=lesson_data["content"],
+                index=lesson_data["index"]
+            )
+            lessons.append(lesson)
+        
+        # Parse quiz data if present
+        quiz_questions = []
+        if "quiz" in module_data and module_data["quiz"]:
+            for quiz_data in module_data["quiz"]:
+                quiz_question = QuizQuestion(
+                    question=quiz_data["question"],
+                    choices=quiz_data["choices"],
+                    answer=quiz_data["answer"]
+                )
+                quiz_questions.append(quiz_question)
+        
+        return Module(
+            title=module_data["title"],
+            lessons=lessons,
+            index=module_data["index"],
+            quiz=quiz_questions if quiz_questions else None
+        )
+
     async def _validate_and_refresh_drive_token(self, user_id: UUID) -> Optional[str]:
         """Validate and refresh Google Drive token if needed"""
         try:
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from typing import Optional
 from uuid import UUID
 from app.database.connection import get_db
 from internal.ai.guide.model.guide_dto import AiGuideGenerateRequest, AiGuideGenerateResponse, GuideListResponse, GuideDetailResponse
@@ -11,6 +12,10 @@ from internal.oauth.repository.oauth_repository_db import DatabaseOAuthRepositor
 from internal.auth.middleware import get_current_user_id
 from internal.user.service.user_service import UserService
 from internal.user.repository.user_repository_db import DatabaseUserRepository
+from internal.idempotency.service.idempotency_service import IdempotencyService, IdempotencyConflictError, IdempotencyKeyReusedError
+from internal.idempotency.repository.idempotency_repository_db import DatabaseIdempotencyRepository
+from internal.ai.agent.resilience import AgentUnavailableError
+from internal.ai.agent.admission import admission, RateLimitExceededError, rate_limit_exceeded
 
 router = APIRouter(prefix="/ai/guide", tags=["ai-guide"])
 security = HTTPBearer()
@@ -34,16 +39,54 @@ def get_ai_guide_service(
     guide_repository = DatabaseAiGuideRepository(db)
     return AiGuideService(oauth_service, guide_repository, user_service)
 
+def get_idempotency_service(db: Session = Depends(get_db)) -> IdempotencyService:
+    """Dependency to get idempotency service"""
+    idempotency_repository = DatabaseIdempotencyRepository(db)
+    return IdempotencyService(idempotency_repository)
+
 @router.post("/generate", response_model=AiGuideGenerateResponse)
 async def generate_guide(
     guide_data: AiGuideGenerateRequest,
     ai_guide_service: AiGuideService = Depends(get_ai_guide_service),
-    current_user_id: str = Depends(get_current_user_id)
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
+    current_user_id: str = Depends(get_current_user_id),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Generate a guide using AI"""
     try:
         user_id = UUID(current_user_id)
-        return await ai_guide_service.generate_guide(guide_data, user_id)
+
+        async def generate():
+            # Replayed keys skip admission; only real generations spend a token and a queue turn
+            async with admission.generation(user_id):
+                return await ai_guide_service.generate_guide(guide_data, user_id)
+
+        return await idempotency_service.execute(
+            idempotency_key,
+            user_id,
+            "POST /ai/guide/generate",
+            guide_data,
+            generate,
+            resource_id_getter=lambda response: response.guide_id
+        )
+    except RateLimitExceededError as e:
+        raise rate_limit_exceeded(e)
+    except AgentUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": e.retry_after_header}
+        )
+    except IdempotencyConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
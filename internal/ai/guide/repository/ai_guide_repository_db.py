@@ -5,9 +5,11 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from internal.ai.guide.repository.ai_guide_repository import AiGuideRepository
 from internal.ai.guide.model.guide_dto import AiGuideGenerateResponse, ExternalAiGuideGenerateResponse, GuideListResponse, GuideListItem, GuideDetailResponse
+from app.tracing import traced_repository
 
 logger = logging.getLogger(__name__)
 
+@traced_repository
 class DatabaseAiGuideRepository(AiGuideRepository):
     """Database repository for AI guide operations using raw SQL queries"""
 
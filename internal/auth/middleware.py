@@ -7,6 +7,7 @@ from app.config import settings
 from internal.user.service.user_service import UserService
 from internal.user.repository.user_repository_db import DatabaseUserRepository
 from app.database.connection import SessionLocal
+from app.tracing import start_span
 
 security = HTTPBearer(auto_error=False)
 
@@ -33,6 +34,36 @@ class JWTMiddleware:
         user_repository = DatabaseUserRepository(db)
         return UserService(user_repository)
     
+    def authenticate(self, request: Request) -> Optional[JSONResponse]:
+        """Validate the bearer token; returns an error response or None on success"""
+        # Get authorization header
+        auth_header = request.headers.get("Authorization")
+        
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Missing or invalid authorization header"},
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        
+        # Extract token
+        token = auth_header.split(" ")[1]
+        
+        # Verify token
+        payload = self.verify_token(token)
+        
+        if not payload:
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Invalid or expired token"},
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        
+        # Add user_id to request state for use in endpoints
+        request.state.user_id = payload.get("user_id")
+        request.state.user_payload = payload
+        return None
+    
     async def __call__(self, request: Request, call_next):
         """Middleware function to handle JWT authentication"""
         
@@ -51,6 +82,9 @@ class JWTMiddleware:
             "/api/v1/oauth/drive/callback",  # Google Drive OAuth callback doesn't need auth
             "/",
             "/health",
+            "/live",
+            "/ready",
+            "/metrics",
             "/docs",
             "/redoc",
             "/openapi.json",
@@ -62,37 +96,22 @@ class JWTMiddleware:
             response = await call_next(request)
             return response
         
+        # Profiling endpoints check their own admin token
+        if request.url.path.startswith("/debug/profile"):
+            response = await call_next(request)
+            return response
+        
         # Check if current path should be skipped
         if request.url.path in skip_paths:
             response = await call_next(request)
             return response
         
-        # Get authorization header
-        auth_header = request.headers.get("Authorization")
-        
-        if not auth_header or not auth_header.startswith("Bearer "):
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Missing or invalid authorization header"},
-                headers={"WWW-Authenticate": "Bearer"}
-            )
-        
-        # Extract token
-        token = auth_header.split(" ")[1]
-        
-        # Verify token
-        payload = self.verify_token(token)
-        
-        if not payload:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Invalid or expired token"},
-                headers={"WWW-Authenticate": "Bearer"}
-            )
-        
-        # Add user_id to request state for use in endpoints
-        request.state.user_id = payload.get("user_id")
-        request.state.user_payload = payload
+        # Authenticate inside its own span so token checks show up in traces
+        with start_span("JWTMiddleware", {"http.route": request.url.path}) as span:
+            error_response = self.authenticate(request)
+            span.set_attribute("auth.authenticated", error_response is None)
+        if error_response is not None:
+            return error_response
         
         # Continue to the next middleware/endpoint
         response = await call_next(request)
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy.orm import Session
+from typing import Optional
 from uuid import UUID
 from app.database.connection import get_db
-from internal.course.model.course_dto import CourseListResponse, CourseDetail, LessonCompletionRequest, LessonCompletionResponse, QuizCompletionRequest, QuizCompletionResponse
+from app.responses import FastJSONResponse
+from app.http_cache import make_etag, etag_matches, cache_headers, not_modified
+from internal.course.model.course_dto import CourseListResponse, CourseDetail, LessonCompletionRequest, LessonCompletionResponse, QuizCompletionRequest, QuizCompletionResponse, CourseProgressUpdateRequest, CourseProgressUpdateResponse, QuizSubmissionRequest, QuizSubmissionResponse
 from internal.course.service.course_service import CourseService
 from internal.course.repository.course_repository_db import DatabaseCourseRepository
 from internal.auth.middleware import get_current_user_id
+from internal.idempotency.service.idempotency_service import IdempotencyService, IdempotencyConflictError, IdempotencyKeyReusedError
+from internal.idempotency.repository.idempotency_repository_db import DatabaseIdempotencyRepository
 
 router = APIRouter(prefix="/course", tags=["course"])
 
@@ -14,6 +19,11 @@ def get_course_service(db: Session = Depends(get_db)) -> CourseService:
     course_repository = DatabaseCourseRepository(db)
     return CourseService(course_repository)
 
+def get_idempotency_service(db: Session = Depends(get_db)) -> IdempotencyService:
+    """Dependency to get idempotency service"""
+    idempotency_repository = DatabaseIdempotencyRepository(db)
+    return IdempotencyService(idempotency_repository)
+
 @router.get("", response_model=CourseListResponse)
 async def get_courses(
     course_service: CourseService = Depends(get_course_service),
@@ -37,12 +47,26 @@ async def get_courses(
 @router.get("/{course_id}", response_model=CourseDetail)
 async def get_course_by_id(
     course_id: UUID,
+    if_none_match: Optional[str] = Header(default=None),
     course_service: CourseService = Depends(get_course_service),
     current_user_id: str = Depends(get_current_user_id)
 ):
     """Get a specific course by ID for the current user"""
     try:
         user_id = UUID(current_user_id)
+        version = await course_service.get_course_version(course_id, user_id)
+        
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Course not found"
+            )
+        
+        # Unchanged since the client's copy: skip loading and serializing the course
+        etag = make_etag("course", course_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, "course_detail")
+        
         course = await course_service.get_course_by_id(course_id, user_id)
         
         if not course:
@@ -51,7 +75,8 @@ async def get_course_by_id(
                 detail="Course not found"
             )
         
-        return course
+        # Serialized straight from the dataclasses, skipping response_model validation
+        return FastJSONResponse(course, headers=cache_headers(etag, "course_detail"))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -70,12 +95,31 @@ async def update_lesson_completion(
     lesson_id: UUID,
     request: LessonCompletionRequest,
     course_service: CourseService = Depends(get_course_service),
-    current_user_id: str = Depends(get_current_user_id)
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
+    current_user_id: str = Depends(get_current_user_id),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Mark a lesson as completed or incomplete"""
     try:
         user_id = UUID(current_user_id)
-        return await course_service.update_lesson_completion(lesson_id, user_id, request.is_completed)
+        return await idempotency_service.execute(
+            idempotency_key,
+            user_id,
+            "PATCH /course/lesson/complete",
+            {"lesson_id": lesson_id, "is_completed": request.is_completed},
+            lambda: course_service.update_lesson_completion(lesson_id, user_id, request.is_completed),
+            resource_id_getter=lambda response: response.lesson_id
+        )
+    except IdempotencyConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -94,12 +138,31 @@ async def update_quiz_completion(
     quiz_id: UUID,
     request: QuizCompletionRequest,
     course_service: CourseService = Depends(get_course_service),
-    current_user_id: str = Depends(get_current_user_id)
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
+    current_user_id: str = Depends(get_current_user_id),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Mark a quiz as completed or incomplete"""
     try:
         user_id = UUID(current_user_id)
-        return await course_service.update_quiz_completion(quiz_id, user_id, request.is_completed)
+        return await idempotency_service.execute(
+            idempotency_key,
+            user_id,
+            "PATCH /course/quiz/complete",
+            {"quiz_id": quiz_id, "is_completed": request.is_completed},
+            lambda: course_service.update_quiz_completion(quiz_id, user_id, request.is_completed),
+            resource_id_getter=lambda response: response.quiz_id
+        )
+    except IdempotencyConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -112,3 +175,99 @@ async def update_quiz_completion(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update quiz completion: {str(e)}"
         )
+
+@router.patch("/{course_id}/progress", response_model=CourseProgressUpdateResponse)
+async def update_course_progress(
+    course_id: UUID,
+    request: CourseProgressUpdateRequest,
+    course_service: CourseService = Depends(get_course_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
+    current_user_id: str = Depends(get_current_user_id),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Apply several lesson and quiz completion changes in one transaction"""
+    try:
+        user_id = UUID(current_user_id)
+        return await idempotency_service.execute(
+            idempotency_key,
+            user_id,
+            "PATCH /course/progress",
+            {"course_id": course_id, "lessons": request.lessons, "quizzes": request.quizzes},
+            lambda: course_service.update_course_progress_batch(course_id, user_id, request),
+            resource_id_getter=lambda response: response.course_id
+        )
+    except IdempotencyConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update course progress: {str(e)}"
+        )
+
+@router.post("/module/{module_id}/quiz/submit", response_model=QuizSubmissionResponse)
+async def submit_quiz_answers(
+    module_id: UUID,
+    request: QuizSubmissionRequest,
+    course_service: CourseService = Depends(get_course_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
+    current_user_id: str = Depends(get_current_user_id),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Grade quiz answers of a module on the server and update course progress"""
+    try:
+        user_id = UUID(current_user_id)
+        
+        async def submit():
+            response = await course_service.submit_quiz_answers(module_id, user_id, request)
+            if response is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Module not found"
+                )
+            return response
+        
+        return await idempotency_service.execute(
+            idempotency_key,
+            user_id,
+            "POST /course/module/quiz/submit",
+            {"module_id": module_id, "answers": request.answers},
+            submit,
+            resource_id_getter=lambda response: response.module_id
+        )
+    except IdempotencyConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to submit quiz answers: {str(e)}"
+        )
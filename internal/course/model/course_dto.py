@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 
@@ -50,6 +50,7 @@ class CourseListItem:
     is_completed: bool
     created_at: str
     updated_at: str
+    generation_status: str = "completed"  # generating, completed, failed
 
 @dataclass
 class CourseDetail:
@@ -66,6 +67,7 @@ class CourseDetail:
     created_at: str
     updated_at: str
     modules: List[ModuleDetail]
+    generation_status: str = "completed"  # generating, completed, failed
 
 @dataclass
 class CourseListResponse:
@@ -98,3 +100,62 @@ class QuizCompletionResponse:
     message: str
     quiz_id: UUID
     is_completed: bool
+
+@dataclass
+class CompletionChange:
+    """Completion change for one lesson or quiz"""
+    id: UUID
+    is_completed: bool = True
+
+@dataclass
+class CourseProgressUpdateRequest:
+    """Request model for applying several lesson and quiz completion changes at once"""
+    lessons: List[CompletionChange] = field(default_factory=list)
+    quizzes: List[CompletionChange] = field(default_factory=list)
+
+@dataclass
+class CourseProgressUpdateResponse:
+    """Response model for a batch progress update"""
+    success: bool
+    message: str
+    course_id: UUID
+    progress: float
+    is_completed: bool
+    updated_lessons: int
+    updated_quizzes: int
+
+@dataclass
+class QuizAnswer:
+    """Answer submitted for one quiz"""
+    quiz_id: UUID
+    answer: str
+
+@dataclass
+class QuizSubmissionRequest:
+    """Request model for submitting the quiz answers of a module"""
+    answers: List[QuizAnswer]
+
+@dataclass
+class QuizGradeResult:
+    """Grading result for one quiz"""
+    quiz_id: UUID
+    is_correct: bool
+    correct_answer: str
+
+@dataclass
+class ModuleAnswerIndex:
+    """Correct answers of a module's quizzes, keyed by quiz ID"""
+    module_id: UUID
+    course_id: UUID
+    user_id: UUID
+    answers: Dict[UUID, str]
+
+@dataclass
+class QuizSubmissionResponse:
+    """Response model for graded quiz answers"""
+    success: bool
+    message: str
+    module_id: UUID
+    results: List[QuizGradeResult]
+    correct_count: int
+    progress: float
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from uuid import UUID
-from typing import List, Optional
-from internal.course.model.course_dto import CourseListResponse, CourseDetail, LessonCompletionResponse, QuizCompletionResponse
+from typing import List, Optional, Tuple
+from internal.course.model.course_dto import CourseListResponse, CourseDetail, LessonCompletionResponse, QuizCompletionResponse, CompletionChange, CourseProgressUpdateResponse, ModuleAnswerIndex
 
 class CourseRepository(ABC):
     """Abstract repository for course operations"""
@@ -16,6 +16,11 @@ class CourseRepository(ABC):
         """Get a course by ID for a specific user"""
         pass
 
+    @abstractmethod
+    async def get_course_version(self, course_id: UUID, user_id: UUID) -> Optional[str]:
+        """Get a version string that changes whenever the course detail changes"""
+        pass
+
     @abstractmethod
     async def update_lesson_completion(self, lesson_id: UUID, user_id: UUID, is_completed: bool) -> LessonCompletionResponse:
         """Update lesson completion status"""
@@ -26,6 +31,23 @@ class CourseRepository(ABC):
         """Update quiz completion status"""
         pass
 
+    @abstractmethod
+    async def update_course_progress_batch(
+        self, course_id: UUID, user_id: UUID, lessons: List[CompletionChange], quizzes: List[CompletionChange]
+    ) -> CourseProgressUpdateResponse:
+        """Apply lesson and quiz completion changes in one transaction and recompute progress once"""
+        pass
+
+    @abstractmethod
+    async def get_module_answer_index(self, module_id: UUID, user_id: UUID) -> Optional[ModuleAnswerIndex]:
+        """Get the correct answers of a module's quizzes, None when the module is not the user's"""
+        pass
+
+    @abstractmethod
+    async def save_quiz_results(self, course_id: UUID, user_id: UUID, results: List[Tuple[UUID, bool]]) -> float:
+        """Mark graded quizzes completed with is_correct, recompute progress and commit; returns the progress"""
+        pass
+
     @abstractmethod
     async def calculate_course_progress(self, course_id: UUID, user_id: UUID) -> float:
         """Calculate course progress based on completed lessons, modules, and quizzes"""
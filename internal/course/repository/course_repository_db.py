@@ -1,13 +1,23 @@
 import logging
-from typing import Optional, List
+from typing import Any, Optional, List, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from internal.course.repository.course_repository import CourseRepository
-from internal.course.model.course_dto import CourseListResponse, CourseListItem, CourseDetail, ModuleDetail, LessonDetail, QuizDetail, LessonCompletionResponse, QuizCompletionResponse
+from internal.course.model.course_dto import CourseListResponse, CourseListItem, CourseDetail, ModuleDetail, LessonDetail, QuizDetail, LessonCompletionResponse, QuizCompletionResponse, CompletionChange, CourseProgressUpdateResponse, ModuleAnswerIndex
+from app.tracing import traced_repository
 
 logger = logging.getLogger(__name__)
 
+def _strip_answers(questions: Any) -> Any:
+    """Quiz questions as sent to clients: answers stay on the server for grading"""
+    if isinstance(questions, dict):
+        return {key: value for key, value in questions.items() if key != "answer"}
+    if isinstance(questions, list):
+        return [_strip_answers(question) for question in questions]
+    return questions
+
+@traced_repository
 class DatabaseCourseRepository(CourseRepository):
     """Database repository for course operations using raw SQL queries"""
 
@@ -31,7 +41,7 @@ class DatabaseCourseRepository(CourseRepository):
             courses_query = text("""
                 SELECT id, title, description, estimated_duration, difficulty, 
                        learning_objectives, source_from, progress, is_completed, 
-                       skill, created_at, updated_at
+                       skill, generation_status, created_at, updated_at
                 FROM courses 
                 WHERE user_id = :user_id 
                 ORDER BY created_at DESC
@@ -60,7 +70,8 @@ class DatabaseCourseRepository(CourseRepository):
                     progress=row.progress,
                     is_completed=row.is_completed,
                     created_at=row.created_at.isoformat() if row.created_at else "",
-                    updated_at=row.updated_at.isoformat() if row.updated_at else ""
+                    updated_at=row.updated_at.isoformat() if row.updated_at else "",
+                    generation_status=row.generation_status
                 )
                 courses.append(course_item)
             
@@ -88,6 +99,7 @@ class DatabaseCourseRepository(CourseRepository):
                     c.source_from as course_source_from,
                     c.progress as course_progress,
                     c.is_completed as course_is_completed,
+                    c.generation_status as course_generation_status,
                     c.created_at as course_created_at,
                     c.updated_at as course_updated_at,
                     m.id as module_id,
@@ -137,7 +149,8 @@ class DatabaseCourseRepository(CourseRepository):
                 is_completed=first_row.course_is_completed,
                 created_at=first_row.course_created_at.isoformat() if first_row.course_created_at else "",
                 updated_at=first_row.course_updated_at.isoformat() if first_row.course_updated_at else "",
-                modules=[]
+                modules=[],
+                generation_status=first_row.course_generation_status
             )
             
             # Group data by modules, lessons, and quizzes
@@ -180,7 +193,7 @@ class DatabaseCourseRepository(CourseRepository):
                 if row.quiz_id and row.quiz_id not in quizzes_dict:
                     quiz_detail = QuizDetail(
                         id=row.quiz_id,
-                        questions=row.quiz_questions if row.quiz_questions else [],
+                        questions=_strip_answers(row.quiz_questions) if row.quiz_questions else [],
                         is_completed=row.quiz_is_completed,
                         is_correct=row.quiz_is_correct,
                         created_at=row.quiz_created_at.isoformat() if row.quiz_created_at else "",
@@ -201,6 +214,33 @@ class DatabaseCourseRepository(CourseRepository):
             logger.error(f"Error getting course {course_id} for user {user_id}: {str(e)}")
             raise e
 
+    async def get_course_version(self, course_id: UUID, user_id: UUID) -> Optional[str]:
+        """Get the latest updated_at across the course and its modules, lessons and quizzes"""
+        try:
+            query = text("""
+                SELECT
+                    c.updated_at,
+                    c.progress,
+                    c.generation_status,
+                    (SELECT COUNT(*) FROM modules m WHERE m.course_id = c.id) as module_count,
+                    (SELECT MAX(m.updated_at) FROM modules m WHERE m.course_id = c.id) as modules_updated_at,
+                    (SELECT MAX(l.updated_at) FROM lessons l JOIN modules m ON l.module_id = m.id WHERE m.course_id = c.id) as lessons_updated_at,
+                    (SELECT MAX(q.updated_at) FROM quizzes q JOIN modules m ON q.module_id = m.id WHERE m.course_id = c.id) as quizzes_updated_at
+                FROM courses c
+                WHERE c.id = :course_id AND c.user_id = :user_id
+            """)
+            
+            row = self.db.execute(query, {"course_id": str(course_id), "user_id": str(user_id)}).fetchone()
+            
+            if not row:
+                return None
+            
+            return "|".join(str(value) for value in row)
+            
+        except Exception as e:
+            logger.error(f"Error getting version of course {course_id} for user {user_id}: {str(e)}")
+            raise e
+
     async def update_lesson_completion(self, lesson_id: UUID, user_id: UUID, is_completed: bool) -> LessonCompletionResponse:
         """Update lesson completion status for a specific lesson"""
         try:
@@ -337,6 +377,145 @@ class DatabaseCourseRepository(CourseRepository):
             self.db.rollback()
             raise e
 
+    async def update_course_progress_batch(
+        self, course_id: UUID, user_id: UUID, lessons: List[CompletionChange], quizzes: List[CompletionChange]
+    ) -> CourseProgressUpdateResponse:
+        """Apply lesson and quiz completion changes in one transaction and recompute progress once"""
+        try:
+            verify_query = text("""
+                SELECT id FROM courses WHERE id = :course_id AND user_id = :user_id
+            """)
+            
+            if not self.db.execute(verify_query, {"course_id": str(course_id), "user_id": str(user_id)}).fetchone():
+                return CourseProgressUpdateResponse(
+                    success=False,
+                    message="Course not found or access denied",
+                    course_id=course_id,
+                    progress=0.0,
+                    is_completed=False,
+                    updated_lessons=0,
+                    updated_quizzes=0
+                )
+            
+            # One UPDATE per table; rows outside this course are not touched
+            updated_lessons = self._apply_completion_changes("lessons", course_id, lessons)
+            updated_quizzes = self._apply_completion_changes("quizzes", course_id, quizzes)
+            
+            await self.check_and_update_module_completion(course_id, user_id)
+            calculated_progress = await self.calculate_course_progress(course_id, user_id)
+            
+            # Commits the lesson, quiz, module and course updates together
+            if not await self.update_course_progress(course_id, user_id, calculated_progress):
+                raise RuntimeError(f"Failed to update progress of course {course_id}")
+            
+            logger.info(f"Applied {updated_lessons} lesson and {updated_quizzes} quiz changes to course {course_id} "
+                       f"for user {user_id}. Course progress updated to {calculated_progress:.2f}%")
+            
+            return CourseProgressUpdateResponse(
+                success=True,
+                message=f"Course progress: {calculated_progress:.1f}%",
+                course_id=course_id,
+                progress=calculated_progress,
+                is_completed=calculated_progress >= 100.0,
+                updated_lessons=updated_lessons,
+                updated_quizzes=updated_quizzes
+            )
+            
+        except Exception as e:
+            logger.error(f"Error updating progress of course {course_id} for user {user_id}: {str(e)}")
+            self.db.rollback()
+            raise e
+
+    def _apply_completion_changes(self, table: str, course_id: UUID, changes: List[CompletionChange]) -> int:
+        """Set is_completed for lessons or quizzes of a course; every ID must belong to the course"""
+        if not changes:
+            return 0
+        
+        # The last change for an ID wins
+        latest = {str(change.id): change.is_completed for change in changes}
+        
+        update_query = text(f"""
+            UPDATE {table} t
+            SET is_completed = c.is_completed,
+                updated_at = NOW()
+            FROM unnest(CAST(:ids AS uuid[]), CAST(:flags AS boolean[])) AS c(id, is_completed), modules m
+            WHERE t.id = c.id AND t.module_id = m.id AND m.course_id = :course_id
+            RETURNING t.id
+        """)
+        
+        result = self.db.execute(update_query, {
+            "ids": list(latest.keys()),
+            "flags": list(latest.values()),
+            "course_id": str(course_id)
+        })
+        updated = {str(row.id) for row in result}
+        
+        missing = [item_id for item_id in latest if item_id not in updated]
+        if missing:
+            raise ValueError(f"{table.capitalize()} not found in course {course_id}: {', '.join(missing)}")
+        
+        return len(updated)
+
+    async def get_module_answer_index(self, module_id: UUID, user_id: UUID) -> Optional[ModuleAnswerIndex]:
+        """Get the correct answers of a module's quizzes"""
+        try:
+            query = text("""
+                SELECT m.course_id, q.id as quiz_id, q.questions
+                FROM modules m
+                JOIN courses c ON m.course_id = c.id
+                LEFT JOIN quizzes q ON q.module_id = m.id
+                WHERE m.id = :module_id AND c.user_id = :user_id
+            """)
+            
+            rows = self.db.execute(query, {"module_id": str(module_id), "user_id": str(user_id)}).fetchall()
+            
+            if not rows:
+                return None
+            
+            answers = {}
+            for row in rows:
+                # Each quiz row holds one question object; older rows without an answer cannot be graded
+                if row.quiz_id and isinstance(row.questions, dict) and row.questions.get("answer") is not None:
+                    answers[row.quiz_id] = str(row.questions["answer"])
+            
+            return ModuleAnswerIndex(module_id=module_id, course_id=rows[0].course_id, user_id=user_id, answers=answers)
+            
+        except Exception as e:
+            logger.error(f"Error getting answer index of module {module_id} for user {user_id}: {str(e)}")
+            raise e
+
+    async def save_quiz_results(self, course_id: UUID, user_id: UUID, results: List[Tuple[UUID, bool]]) -> float:
+        """Mark graded quizzes completed with is_correct, recompute progress and commit"""
+        try:
+            update_query = text("""
+                UPDATE quizzes q
+                SET is_completed = true,
+                    is_correct = r.is_correct,
+                    updated_at = NOW()
+                FROM unnest(CAST(:ids AS uuid[]), CAST(:correct AS boolean[])) AS r(id, is_correct), modules m
+                WHERE q.id = r.id AND q.module_id = m.id AND m.course_id = :course_id
+            """)
+            
+            self.db.execute(update_query, {
+                "ids": [str(quiz_id) for quiz_id, _ in results],
+                "correct": [is_correct for _, is_correct in results],
+                "course_id": str(course_id)
+            })
+            
+            await self.check_and_update_module_completion(course_id, user_id)
+            calculated_progress = await self.calculate_course_progress(course_id, user_id)
+            
+            # Commits the quiz results together with the module and course updates
+            if not await self.update_course_progress(course_id, user_id, calculated_progress):
+                raise RuntimeError(f"Failed to update progress of course {course_id}")
+            
+            return calculated_progress
+            
+        except Exception as e:
+            logger.error(f"Error saving quiz results for course {course_id}, user {user_id}: {str(e)}")
+            self.db.rollback()
+            raise e
+
     async def calculate_course_progress(self, course_id: UUID, user_id: UUID) -> float:
         """Calculate course progress based on completed lessons, modules, and quizzes"""
         try:
@@ -476,6 +655,7 @@ class DatabaseCourseRepository(CourseRepository):
             logger.info(f"Checking module completion for course {course_id}")
             
             # Process each module
+            changed = {}
             for row in modules_data:
                 module_id = row.module_id
                 currently_completed = row.module_completed
@@ -493,18 +673,7 @@ class DatabaseCourseRepository(CourseRepository):
                 
                 # Update module completion status if needed
                 if should_be_completed != currently_completed:
-                    update_module_query = text("""
-                        UPDATE modules 
-                        SET is_completed = :is_completed, 
-                            updated_at = NOW()
-                        WHERE id = :module_id
-                    """)
-                    
-                    self.db.execute(update_module_query, {
-                        "module_id": str(module_id),
-                        "is_completed": should_be_completed
-                    })
-                    
+                    changed[str(module_id)] = should_be_completed
                     status_text = "completed" if should_be_completed else "incomplete"
                     logger.info(f"Module {module_id} marked as {status_text}: "
                                f"Lessons({completed_lessons}/{total_lessons}), "
@@ -512,6 +681,21 @@ class DatabaseCourseRepository(CourseRepository):
                 else:
                     logger.debug(f"Module {module_id} completion status unchanged: {currently_completed}")
             
+            if changed:
+                # One statement however many modules flipped
+                update_module_query = text("""
+                    UPDATE modules m
+                    SET is_completed = c.is_completed, 
+                        updated_at = NOW()
+                    FROM unnest(CAST(:ids AS uuid[]), CAST(:flags AS boolean[])) AS c(id, is_completed)
+                    WHERE m.id = c.id
+                """)
+                
+                self.db.execute(update_module_query, {
+                    "ids": list(changed.keys()),
+                    "flags": list(changed.values())
+                })
+            
         except Exception as e:
             logger.error(f"Error checking module completion for course {course_id}: {str(e)}")
             # Don't raise exception here - this shouldn't break the main lesson completion flow
@@ -1,11 +1,55 @@
 import logging
+import threading
+from collections import OrderedDict
 from uuid import UUID
 from typing import Optional
-from internal.course.model.course_dto import CourseListResponse, CourseDetail, LessonCompletionResponse, QuizCompletionResponse
+from app.config import settings
+from internal.course.model.course_dto import CourseListResponse, CourseDetail, LessonCompletionResponse, QuizCompletionResponse, CourseProgressUpdateRequest, CourseProgressUpdateResponse, ModuleAnswerIndex, QuizSubmissionRequest, QuizSubmissionResponse, QuizGradeResult
 from internal.course.repository.course_repository import CourseRepository
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on lesson + quiz changes accepted by one batch progress update
+MAX_PROGRESS_CHANGES = 500
+
+class AnswerIndexCache:
+    """LRU cache of per-module answer indexes
+
+    Generated quizzes never change, so an index stays valid for the life of
+    the process. Entries remember their owner and are only served to them.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[UUID, ModuleAnswerIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, module_id: UUID, user_id: UUID) -> Optional[ModuleAnswerIndex]:
+        with self._lock:
+            index = self._entries.get(module_id)
+            if index is None or index.user_id != user_id:
+                return None
+            self._entries.move_to_end(module_id)
+            return index
+
+    def put(self, index: ModuleAnswerIndex) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[index.module_id] = index
+            self._entries.move_to_end(index.module_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+answer_index_cache = AnswerIndexCache(settings.QUIZ_ANSWER_CACHE_SIZE)
+
+def _normalize_answer(answer: str) -> str:
+    return str(answer).strip().casefold()
+
 class CourseService:
     """Service for course operations"""
 
@@ -30,6 +74,14 @@ class CourseService:
             logger.error(f"Error getting course {course_id} for user {user_id}: {str(e)}")
             raise e
 
+    async def get_course_version(self, course_id: UUID, user_id: UUID) -> Optional[str]:
+        """Get the course version used for its ETag, None when the course does not exist"""
+        try:
+            return await self.course_repository.get_course_version(course_id, user_id)
+        except Exception as e:
+            logger.error(f"Error getting version of course {course_id} for user {user_id}: {str(e)}")
+            raise e
+
     async def update_lesson_completion(self, lesson_id: UUID, user_id: UUID, is_completed: bool) -> LessonCompletionResponse:
         """Update lesson completion status"""
         try:
@@ -48,6 +100,70 @@ class CourseService:
             logger.error(f"Error updating quiz {quiz_id} completion for user {user_id}: {str(e)}")
             raise e
 
+    async def update_course_progress_batch(self, course_id: UUID, user_id: UUID, request: CourseProgressUpdateRequest) -> CourseProgressUpdateResponse:
+        """Apply several lesson and quiz completion changes with a single progress recomputation"""
+        try:
+            if not request.lessons and not request.quizzes:
+                raise ValueError("At least one lesson or quiz change is required")
+            if len(request.lessons) + len(request.quizzes) > MAX_PROGRESS_CHANGES:
+                raise ValueError(f"At most {MAX_PROGRESS_CHANGES} changes can be applied at once")
+            logger.info(f"Applying {len(request.lessons)} lesson and {len(request.quizzes)} quiz changes to course {course_id} for user {user_id}")
+            return await self.course_repository.update_course_progress_batch(course_id, user_id, request.lessons, request.quizzes)
+        except Exception as e:
+            logger.error(f"Error updating progress of course {course_id} for user {user_id}: {str(e)}")
+            raise e
+
+    async def get_module_answer_index(self, module_id: UUID, user_id: UUID) -> Optional[ModuleAnswerIndex]:
+        """Get a module's answer index, from the cache when possible"""
+        index = answer_index_cache.get(module_id, user_id)
+        if index is None:
+            index = await self.course_repository.get_module_answer_index(module_id, user_id)
+            if index is not None:
+                answer_index_cache.put(index)
+        return index
+
+    async def submit_quiz_answers(self, module_id: UUID, user_id: UUID, request: QuizSubmissionRequest) -> Optional[QuizSubmissionResponse]:
+        """Grade submitted quiz answers of a module and record the results"""
+        try:
+            if not request.answers:
+                raise ValueError("At least one answer is required")
+            quiz_ids = [answer.quiz_id for answer in request.answers]
+            if len(set(quiz_ids)) != len(quiz_ids):
+                raise ValueError("Each quiz can only be answered once per submission")
+            
+            index = await self.get_module_answer_index(module_id, user_id)
+            if index is None:
+                return None
+            
+            results = []
+            for answer in request.answers:
+                correct_answer = index.answers.get(answer.quiz_id)
+                if correct_answer is None:
+                    raise ValueError(f"Quiz {answer.quiz_id} does not belong to module {module_id}")
+                results.append(QuizGradeResult(
+                    quiz_id=answer.quiz_id,
+                    is_correct=_normalize_answer(answer.answer) == _normalize_answer(correct_answer),
+                    correct_answer=correct_answer
+                ))
+            
+            logger.info(f"Grading {len(results)} quiz answers of module {module_id} for user {user_id}")
+            progress = await self.course_repository.save_quiz_results(
+                index.course_id, user_id, [(result.quiz_id, result.is_correct) for result in results]
+            )
+            correct_count = sum(1 for result in results if result.is_correct)
+            
+            return QuizSubmissionResponse(
+                success=True,
+                message=f"{correct_count} of {len(results)} answers correct",
+                module_id=module_id,
+                results=results,
+                correct_count=correct_count,
+                progress=progress
+            )
+        except Exception as e:
+            logger.error(f"Error grading quiz answers of module {module_id} for user {user_id}: {str(e)}")
+            raise e
+
     async def calculate_course_progress(self, course_id: UUID, user_id: UUID) -> float:
         """Calculate course progress for a user"""
         try:
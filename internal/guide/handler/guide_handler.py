@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from typing import Optional
 from uuid import UUID
 from app.database.connection import get_db
+from app.responses import FastJSONResponse
+from app.http_cache import make_etag, etag_matches, cache_headers, not_modified
 from internal.guide.model.guide_dto import GuideListResponse, GuideDetailResponse
 from internal.guide.service.guide_service import GuideService
 from internal.guide.repository.guide_repository_db import DatabaseGuideRepository
@@ -36,13 +39,21 @@ def get_guide_service(
 
 @router.get("/", response_model=GuideListResponse)
 async def get_guides(
+    if_none_match: Optional[str] = Header(default=None),
     guide_service: GuideService = Depends(get_guide_service),
     current_user_id: str = Depends(get_current_user_id)
 ):
     """Get all guides for the current user"""
     try:
         user_id = UUID(current_user_id)
-        return await guide_service.get_guides(user_id)
+        version = await guide_service.get_guides_version(user_id)
+        etag = make_etag("guides", user_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, "guide_list")
+        
+        guides = await guide_service.get_guides(user_id)
+        # Serialized straight from the dataclasses, skipping response_model validation
+        return FastJSONResponse(guides, headers=cache_headers(etag, "guide_list"))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -57,6 +68,7 @@ async def get_guides(
 @router.get("/{guide_id}", response_model=GuideDetailResponse)
 async def get_guide_detail(
     guide_id: str,
+    if_none_match: Optional[str] = Header(default=None),
     guide_service: GuideService = Depends(get_guide_service),
     current_user_id: str = Depends(get_current_user_id)
 ):
@@ -64,7 +76,16 @@ async def get_guide_detail(
     try:
         guide_uuid = UUID(guide_id)
         user_id = UUID(current_user_id)
-        return await guide_service.get_guide_by_id(guide_uuid, user_id)
+        version = await guide_service.get_guide_version(guide_uuid, user_id)
+        if version is None:
+            raise ValueError(f"Guide not found with ID: {guide_uuid}")
+        
+        etag = make_etag("guide", guide_uuid, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, "guide_detail")
+        
+        guide = await guide_service.get_guide_by_id(guide_uuid, user_id)
+        return FastJSONResponse(guide, headers=cache_headers(etag, "guide_detail"))
     except ValueError as e:
         if "Guide not found" in str(e):
             raise HTTPException(
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 from uuid import UUID
 from internal.guide.model.guide_dto import AiGuideGenerateRequest, AiGuideGenerateResponse, ExternalAiGuideGenerateResponse, GuideListResponse, GuideDetailResponse
 
@@ -19,3 +20,13 @@ class GuideRepository(ABC):
     async def get_guide_by_id(self, guide_id: UUID, user_id: UUID) -> GuideDetailResponse:
         """Get a specific guide by ID for a user"""
         pass
+
+    @abstractmethod
+    async def get_guides_version(self, user_id: UUID) -> str:
+        """Get a version string that changes whenever the user's guide list changes"""
+        pass
+
+    @abstractmethod
+    async def get_guide_version(self, guide_id: UUID, user_id: UUID) -> Optional[str]:
+        """Get a version string for a guide, None when it does not exist"""
+        pass
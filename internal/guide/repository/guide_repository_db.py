@@ -5,9 +5,11 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from internal.guide.repository.guide_repository import GuideRepository
 from internal.guide.model.guide_dto import AiGuideGenerateResponse, ExternalAiGuideGenerateResponse, GuideListResponse, GuideListItem, GuideDetailResponse
+from app.tracing import traced_repository
 
 logger = logging.getLogger(__name__)
 
+@traced_repository
 class DatabaseGuideRepository(GuideRepository):
     """Database repository for guide operations using raw SQL queries"""
 
@@ -118,3 +120,35 @@ class DatabaseGuideRepository(GuideRepository):
         except Exception as e:
             logger.error(f"Error getting guide {guide_id} for user {user_id}: {str(e)}")
             raise e
+
+    async def get_guides_version(self, user_id: UUID) -> str:
+        """Get the guide count and latest updated_at for a user"""
+        try:
+            query = text("""
+                SELECT COUNT(*) as guide_count, MAX(updated_at) as updated_at
+                FROM guides
+                WHERE user_id = :user_id
+            """)
+            
+            row = self.db.execute(query, {"user_id": str(user_id)}).fetchone()
+            return f"{row.guide_count}|{row.updated_at}"
+            
+        except Exception as e:
+            logger.error(f"Error getting guides version for user {user_id}: {str(e)}")
+            raise e
+
+    async def get_guide_version(self, guide_id: UUID, user_id: UUID) -> Optional[str]:
+        """Get the updated_at of a guide for a user"""
+        try:
+            query = text("""
+                SELECT updated_at
+                FROM guides
+                WHERE id = :guide_id AND user_id = :user_id
+            """)
+            
+            row = self.db.execute(query, {"guide_id": str(guide_id), "user_id": str(user_id)}).fetchone()
+            return str(row.updated_at) if row else None
+            
+        except Exception as e:
+            logger.error(f"Error getting version of guide {guide_id} for user {user_id}: {str(e)}")
+            raise e
@@ -11,6 +11,8 @@ from internal.guide.model.guide_dto import (
 )
 from internal.oauth.service.oauth_service import OAuthService
 from internal.guide.repository.guide_repository import GuideRepository
+from internal.ai.agent.agent_client import agent_client, AGENT_GENERATION
+from internal.ai.agent.resilience import AgentUnavailableError
 from app.config import settings
 from internal.user.service.user_service import UserService
 
@@ -62,7 +64,7 @@ class GuideService:
 
     async def _call_external_api(self, guide_data: AiGuideGenerateRequest, user_id: UUID) -> ExternalAiGuideGenerateResponse:
         """Call external AI API to generate guide content"""
-        url = f"{settings.AI_API_BASE_URL}/guide/generate"
+        path = "/guide/generate"
         
         payload = {
             "token_github": guide_data.token_github,
@@ -77,16 +79,17 @@ class GuideService:
             "Content-Type": "application/json"
         }
         
-        logger.info(f"Calling external AI API at {url} with timeout {settings.AI_API_TIMEOUT}s")
-        logger.info(f"Request payload: {payload}")
+        logger.info(f"Calling external AI API at {settings.AI_API_BASE_URL}{path} with timeout {settings.AI_API_TIMEOUT}s")
+        logger.debug("Request payload: %s", payload)
         
         try:
-            async with httpx.AsyncClient(timeout=settings.AI_API_TIMEOUT) as client:
-                response = await client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                
-                data = response.json()
-                logger.info(f"External AI API responded successfully")
+            response = await agent_client.post(AGENT_GENERATION, path, payload, timeout=settings.AI_API_TIMEOUT, headers=headers, operation="generate_guide")
+            
+            data = response.json()
+            logger.info(f"External AI API responded successfully")
+        except AgentUnavailableError:
+            logger.warning("External AI API call rejected by resilience policy")
+            raise
         except httpx.TimeoutException:
             logger.error(f"External AI API request timed out after {settings.AI_API_TIMEOUT}s")
             raise TimeoutError(f"AI service request timed out after {settings.AI_API_TIMEOUT} seconds. Please try again.")
@@ -130,6 +133,22 @@ class GuideService:
             logger.error(f"Error getting guides for user {user_id}: {str(e)}")
             raise e
 
+    async def get_guides_version(self, user_id: UUID) -> str:
+        """Get the guide list version used for its ETag"""
+        try:
+            return await self.guide_repository.get_guides_version(user_id)
+        except Exception as e:
+            logger.error(f"Error getting guides version for user {user_id}: {str(e)}")
+            raise e
+
+    async def get_guide_version(self, guide_id: UUID, user_id: UUID) -> Optional[str]:
+        """Get the guide version used for its ETag, None when the guide does not exist"""
+        try:
+            return await self.guide_repository.get_guide_version(guide_id, user_id)
+        except Exception as e:
+            logger.error(f"Error getting version of guide {guide_id} for user {user_id}: {str(e)}")
+            raise e
+
     async def get_guide_by_id(self, guide_id: UUID, user_id: UUID) -> GuideDetailResponse:
         """Get a specific guide by ID for a user"""
         try:
@@ -3,8 +3,10 @@ from sqlalchemy import text
 from typing import Dict, Any
 from internal.hr.company.repository.company_repository import CompanyRepository
 from internal.hr.company.model.company_dto import CompanyStatisticResponse
+from app.tracing import traced_repository
 
 
+@traced_repository
 class DatabaseCompanyRepository(CompanyRepository):
     """Database implementation of company statistics repository"""
     
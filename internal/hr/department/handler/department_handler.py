@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
+from typing import Optional
 from app.database.connection import get_db
+from app.responses import FastJSONResponse
 from internal.hr.department.service.department_service import DepartmentService
 from internal.hr.department.repository.department_repository_db import DatabaseDepartmentRepository
-from internal.hr.department.model.department_dto import DepartmentOverviewResponse, DepartmentDetailResponse, DepartmentListResponse, DepartmentEmployeeListResponse
+from internal.hr.department.model.department_dto import DepartmentOverviewResponse, DepartmentDetailResponse, DepartmentListResponse, DepartmentEmployeeListResponse, EMPLOYEE_SORT_FIELDS, EMPLOYEE_SORT_NAME
 
 router = APIRouter(prefix="/hr/department", tags=["hr-department"])
 
@@ -69,16 +71,27 @@ async def get_department_detail(
 @router.get("/{department_id}/list", response_model=DepartmentEmployeeListResponse)
 async def get_department_employees(
     department_id: str,
+    limit: int = Query(50, ge=1, le=200, description="Employees per page"),
+    offset: int = Query(0, ge=0, description="Employees to skip"),
+    sort: str = Query(EMPLOYEE_SORT_NAME, description=f"Sort by {', '.join(EMPLOYEE_SORT_FIELDS)}"),
+    order: str = Query("asc", description="asc or desc"),
+    search: Optional[str] = Query(None, max_length=100, description="Match employee name or email"),
     department_service: DepartmentService = Depends(get_department_service)
 ):
-    """Get list of employees for a specific department"""
+    """Get a page of employees for a specific department"""
     
     try:
-        employees = await department_service.get_department_employees(department_id)
+        employees = await department_service.get_department_employees(department_id, limit, offset, sort, order, search)
         if not employees:
             # Return empty list instead of error
-            return DepartmentEmployeeListResponse(employees=[], total_count=0)
-        return employees
+            return DepartmentEmployeeListResponse(employees=[], total_count=0, limit=limit, offset=offset)
+        # Already validated when the service built it; dump once without re-validating
+        return FastJSONResponse(employees)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
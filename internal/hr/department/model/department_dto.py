@@ -1,6 +1,11 @@
 from pydantic import BaseModel
 from typing import List
 
+# Sort keys accepted by the department employee listing
+EMPLOYEE_SORT_NAME = "name"
+EMPLOYEE_SORT_COMPLETION_RATE = "completion_rate"
+EMPLOYEE_SORT_COMPLETED_COURSES = "completed_courses"
+EMPLOYEE_SORT_FIELDS = (EMPLOYEE_SORT_NAME, EMPLOYEE_SORT_COMPLETION_RATE, EMPLOYEE_SORT_COMPLETED_COURSES)
 
 class DepartmentOverviewItem(BaseModel):
     """Individual department overview item"""
@@ -60,4 +65,6 @@ class DepartmentEmployeeListResponse(BaseModel):
     """Response model for department employee list"""
     
     employees: List[DepartmentEmployeeItem]
-    total_count: int
+    total_count: int  # Employees matching the search, across all pages
+    limit: int = 0
+    offset: int = 0
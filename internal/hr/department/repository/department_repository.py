@@ -22,6 +22,14 @@ class DepartmentRepository(ABC):
         pass
     
     @abstractmethod
-    async def get_department_employees(self, department_id: str) -> Optional[DepartmentEmployeeListResponse]:
-        """Get list of employees for a specific department"""
+    async def get_department_employees(
+        self,
+        department_id: str,
+        limit: int = 50,
+        offset: int = 0,
+        sort: str = "name",
+        descending: bool = False,
+        search: Optional[str] = None
+    ) -> Optional[DepartmentEmployeeListResponse]:
+        """Get a page of employees for a specific department, sorted and optionally filtered by name or email"""
         pass
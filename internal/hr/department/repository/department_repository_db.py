@@ -2,9 +2,18 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List, Optional
 from internal.hr.department.repository.department_repository import DepartmentRepository
-from internal.hr.department.model.department_dto import DepartmentOverviewItem, DepartmentDetailResponse, DepartmentListResponse, DepartmentListItem, DepartmentEmployeeListResponse, DepartmentEmployeeItem
+from internal.hr.department.model.department_dto import DepartmentOverviewItem, DepartmentDetailResponse, DepartmentListResponse, DepartmentListItem, DepartmentEmployeeListResponse, DepartmentEmployeeItem, EMPLOYEE_SORT_NAME, EMPLOYEE_SORT_COMPLETION_RATE, EMPLOYEE_SORT_COMPLETED_COURSES
+from app.tracing import traced_repository
 
+# ORDER BY expression of each employee sort key
+EMPLOYEE_SORT_COLUMNS = {
+    EMPLOYEE_SORT_NAME: "u.name",
+    EMPLOYEE_SORT_COMPLETION_RATE: "COALESCE(s.completion_rate, 0)",
+    EMPLOYEE_SORT_COMPLETED_COURSES: "COALESCE(s.completed_courses, 0)",
+}
 
+
+@traced_repository
 class DatabaseDepartmentRepository(DepartmentRepository):
     """Database implementation of department statistics repository"""
     
@@ -108,35 +117,69 @@ class DatabaseDepartmentRepository(DepartmentRepository):
         
         return DepartmentListResponse(departments=departments)
     
-    async def get_department_employees(self, department_id: str) -> Optional[DepartmentEmployeeListResponse]:
-        """Get list of employees for a specific department"""
+    async def get_department_employees(
+        self,
+        department_id: str,
+        limit: int = 50,
+        offset: int = 0,
+        sort: str = EMPLOYEE_SORT_NAME,
+        descending: bool = False,
+        search: Optional[str] = None
+    ) -> Optional[DepartmentEmployeeListResponse]:
+        """Get a page of employees for a specific department
+
+        Course aggregates come from user_course_stats, which a trigger on
+        courses keeps current, so a page costs no grouped join over courses.
+        A search of three or more characters is served by the trigram
+        indexes on name and email.
+        """
+        direction = "DESC" if descending else "ASC"
+        # Ties break by name, then id, so pages never overlap
+        order_by = [f"{EMPLOYEE_SORT_COLUMNS[sort]} {direction}", f"u.name {direction}", f"u.id {direction}"]
+        if sort == EMPLOYEE_SORT_NAME:
+            order_by.pop(1)
+        params = {
+            "department_id": department_id,
+            "search": f"%{_escape_like(search)}%" if search else None,
+            "limit": limit,
+            "offset": offset
+        }
+        employee_filter = """
+            u.department_id = :department_id
+            AND (CAST(:search AS text) IS NULL OR u.name ILIKE :search OR u.email ILIKE :search)
+        """
+        
+        # Query to get the number of matching employees
+        count_query = text(f"""
+            SELECT COUNT(*) as total
+            FROM users u
+            WHERE {employee_filter}
+        """)
         
-        # Query to get employees for a specific department
-        department_employees_query = text("""
+        total_count = self.db.execute(count_query, params).scalar() or 0
+        if total_count == 0:
+            return None
+        
+        # Query to get one page of employees; the sort column comes from a fixed set
+        department_employees_query = text(f"""
             SELECT 
                 u.id,
                 u.name,
                 u.email,
                 COALESCE(p.name, 'No Position') as position,
                 u.status,
-                COALESCE(
-                    ROUND(AVG(CASE WHEN c.progress IS NOT NULL THEN c.progress END)::numeric, 2), 
-                    0
-                ) as completion_rate,
-                COUNT(CASE WHEN c.is_completed = true THEN c.id END) as completed_courses,
-                COUNT(c.id) as total_courses
+                COALESCE(s.completion_rate, 0) as completion_rate,
+                COALESCE(s.completed_courses, 0) as completed_courses,
+                COALESCE(s.total_courses, 0) as total_courses
             FROM users u
             LEFT JOIN positions p ON u.position_id = p.id
-            LEFT JOIN courses c ON u.id = c.user_id
-            WHERE u.department_id = :department_id
-            GROUP BY u.id, u.name, u.email, p.name, u.status
-            ORDER BY u.name
+            LEFT JOIN user_course_stats s ON s.user_id = u.id
+            WHERE {employee_filter}
+            ORDER BY {', '.join(order_by)}
+            LIMIT :limit OFFSET :offset
         """)
         
-        result = self.db.execute(department_employees_query, {"department_id": department_id}).fetchall()
-        
-        if not result:
-            return None
+        result = self.db.execute(department_employees_query, params).fetchall()
         
         employees = []
         for row in result:
@@ -153,5 +196,11 @@ class DatabaseDepartmentRepository(DepartmentRepository):
         
         return DepartmentEmployeeListResponse(
             employees=employees,
-            total_count=len(employees)
+            total_count=total_count,
+            limit=limit,
+            offset=offset
         )
+
+def _escape_like(value: str) -> str:
+    """Match `value` literally inside an ILIKE pattern"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -1,5 +1,5 @@
 from internal.hr.department.repository.department_repository import DepartmentRepository
-from internal.hr.department.model.department_dto import DepartmentOverviewItem, DepartmentOverviewResponse, DepartmentDetailResponse, DepartmentListResponse, DepartmentEmployeeListResponse
+from internal.hr.department.model.department_dto import DepartmentOverviewItem, DepartmentOverviewResponse, DepartmentDetailResponse, DepartmentListResponse, DepartmentEmployeeListResponse, EMPLOYEE_SORT_FIELDS, EMPLOYEE_SORT_NAME
 from typing import List, Optional
 
 
@@ -22,6 +22,21 @@ class DepartmentService:
         """Get list of all departments"""
         return await self.repository.get_department_list()
     
-    async def get_department_employees(self, department_id: str) -> Optional[DepartmentEmployeeListResponse]:
-        """Get list of employees for a specific department"""
-        return await self.repository.get_department_employees(department_id)
+    async def get_department_employees(
+        self,
+        department_id: str,
+        limit: int = 50,
+        offset: int = 0,
+        sort: str = EMPLOYEE_SORT_NAME,
+        order: str = "asc",
+        search: Optional[str] = None
+    ) -> Optional[DepartmentEmployeeListResponse]:
+        """Get a page of employees for a specific department"""
+        if sort not in EMPLOYEE_SORT_FIELDS:
+            raise ValueError(f"sort must be one of: {', '.join(EMPLOYEE_SORT_FIELDS)}")
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be asc or desc")
+        search = search.strip() if search else None
+        return await self.repository.get_department_employees(
+            department_id, limit, offset, sort, order == "desc", search or None
+        )
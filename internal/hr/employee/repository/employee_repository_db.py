@@ -4,8 +4,10 @@ from typing import Optional
 from uuid import UUID
 from internal.hr.employee.repository.employee_repository import EmployeeRepository
 from internal.hr.employee.model.employee_dto import EmployeeDetailResponse
+from app.tracing import traced_repository
 
 
+@traced_repository
 class DatabaseEmployeeRepository(EmployeeRepository):
     """Database implementation of employee repository"""
     
@@ -0,0 +1 @@
+# Idempotency module for safely retrying mutating requests
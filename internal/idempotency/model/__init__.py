@@ -0,0 +1 @@
+# Idempotency models and DTOs
@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+from typing import Optional, Any
+from datetime import datetime
+from uuid import UUID
+
+IDEMPOTENCY_STATUS_IN_PROGRESS = "in_progress"
+IDEMPOTENCY_STATUS_COMPLETED = "completed"
+
+@dataclass
+class IdempotencyRecord:
+    """Stored outcome of a request sent with an Idempotency-Key header"""
+    id: UUID
+    user_id: UUID
+    idempotency_key: str
+    endpoint: str
+    request_hash: str
+    status: str
+    resource_id: Optional[UUID]
+    response_body: Optional[Any]
+    created_at: datetime
+    updated_at: datetime
+
+    @property
+    def is_completed(self) -> bool:
+        return self.status == IDEMPOTENCY_STATUS_COMPLETED
@@ -0,0 +1 @@
+# Idempotency repository layer
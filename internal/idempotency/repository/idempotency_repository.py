@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+from uuid import UUID
+from typing import Optional, Any
+from internal.idempotency.model.idempotency_dto import IdempotencyRecord
+
+class IdempotencyRepository(ABC):
+    """Abstract repository for idempotency key operations"""
+
+    @abstractmethod
+    async def get_record(self, user_id: UUID, endpoint: str, idempotency_key: str) -> Optional[IdempotencyRecord]:
+        """Get the stored record for a user, endpoint and key"""
+        pass
+
+    @abstractmethod
+    async def reserve(self, user_id: UUID, endpoint: str, idempotency_key: str, request_hash: str) -> Optional[UUID]:
+        """Reserve a key before running the request; returns None if another request holds it"""
+        pass
+
+    @abstractmethod
+    async def complete(self, record_id: UUID, resource_id: Optional[UUID], response_body: Any) -> None:
+        """Store the response produced for a reserved key"""
+        pass
+
+    @abstractmethod
+    async def delete(self, record_id: UUID) -> None:
+        """Delete a record so the key can be used again"""
+        pass
@@ -0,0 +1,120 @@
+import json
+import logging
+from typing import Optional, Any
+from uuid import UUID, uuid4
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from internal.idempotency.repository.idempotency_repository import IdempotencyRepository
+from internal.idempotency.model.idempotency_dto import IdempotencyRecord, IDEMPOTENCY_STATUS_IN_PROGRESS, IDEMPOTENCY_STATUS_COMPLETED
+from app.tracing import traced_repository
+
+logger = logging.getLogger(__name__)
+
+@traced_repository
+class DatabaseIdempotencyRepository(IdempotencyRepository):
+    """Database repository for idempotency keys using raw SQL queries"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def get_record(self, user_id: UUID, endpoint: str, idempotency_key: str) -> Optional[IdempotencyRecord]:
+        """Get the stored record for a user, endpoint and key"""
+        query = text("""
+            SELECT id, user_id, idempotency_key, endpoint, request_hash, status,
+                   resource_id, response_body, created_at, updated_at
+            FROM idempotency_keys
+            WHERE user_id = :user_id AND endpoint = :endpoint AND idempotency_key = :idempotency_key
+        """)
+        
+        row = self.db.execute(query, {
+            "user_id": str(user_id),
+            "endpoint": endpoint,
+            "idempotency_key": idempotency_key
+        }).fetchone()
+        
+        if not row:
+            return None
+        
+        return IdempotencyRecord(
+            id=row.id,
+            user_id=row.user_id,
+            idempotency_key=row.idempotency_key,
+            endpoint=row.endpoint,
+            request_hash=row.request_hash,
+            status=row.status,
+            resource_id=row.resource_id,
+            response_body=row.response_body,
+            created_at=row.created_at,
+            updated_at=row.updated_at
+        )
+
+    async def reserve(self, user_id: UUID, endpoint: str, idempotency_key: str, request_hash: str) -> Optional[UUID]:
+        """Reserve a key before running the request; returns None if another request holds it"""
+        try:
+            # The unique constraint makes concurrent reservations of the same key race-free
+            insert_query = text("""
+                INSERT INTO idempotency_keys (id, user_id, idempotency_key, endpoint, request_hash, status, created_at, updated_at)
+                VALUES (:id, :user_id, :idempotency_key, :endpoint, :request_hash, :status, NOW(), NOW())
+                ON CONFLICT ON CONSTRAINT uq_idempotency_user_endpoint_key DO NOTHING
+                RETURNING id
+            """)
+            
+            row = self.db.execute(insert_query, {
+                "id": str(uuid4()),
+                "user_id": str(user_id),
+                "idempotency_key": idempotency_key,
+                "endpoint": endpoint,
+                "request_hash": request_hash,
+                "status": IDEMPOTENCY_STATUS_IN_PROGRESS
+            }).fetchone()
+            
+            # Commit right away so retries arriving during a long request can see the reservation
+            self.db.commit()
+            
+            return row.id if row else None
+            
+        except Exception as e:
+            logger.error(f"Error reserving idempotency key for user {user_id} on {endpoint}: {str(e)}")
+            self.db.rollback()
+            raise e
+
+    async def complete(self, record_id: UUID, resource_id: Optional[UUID], response_body: Any) -> None:
+        """Store the response produced for a reserved key"""
+        try:
+            update_query = text("""
+                UPDATE idempotency_keys
+                SET status = :status,
+                    resource_id = :resource_id,
+                    response_body = :response_body,
+                    updated_at = NOW()
+                WHERE id = :id
+            """)
+            
+            self.db.execute(update_query, {
+                "id": str(record_id),
+                "status": IDEMPOTENCY_STATUS_COMPLETED,
+                "resource_id": str(resource_id) if resource_id else None,
+                "response_body": json.dumps(response_body)
+            })
+            self.db.commit()
+            
+        except Exception as e:
+            logger.error(f"Error completing idempotency record {record_id}: {str(e)}")
+            self.db.rollback()
+            raise e
+
+    async def delete(self, record_id: UUID) -> None:
+        """Delete a record so the key can be used again"""
+        try:
+            delete_query = text("""
+                DELETE FROM idempotency_keys
+                WHERE id = :id
+            """)
+            
+            self.db.execute(delete_query, {"id": str(record_id)})
+            self.db.commit()
+            
+        except Exception as e:
+            logger.error(f"Error deleting idempotency record {record_id}: {str(e)}")
+            self.db.rollback()
+            raise e
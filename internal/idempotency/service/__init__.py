@@ -0,0 +1 @@
+# Idempotency service layer
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Any, Awaitable, Callable, Optional
+from uuid import UUID
+from fastapi.encoders import jsonable_encoder
+from internal.idempotency.model.idempotency_dto import IdempotencyRecord
+from internal.idempotency.repository.idempotency_repository import IdempotencyRepository
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+class IdempotencyConflictError(Exception):
+    """Raised when a request with the same key is still being processed"""
+    pass
+
+class IdempotencyKeyReusedError(Exception):
+    """Raised when a key is reused with a different request payload"""
+    pass
+
+class IdempotencyService:
+    """Service that replays stored results for requests retried with the same Idempotency-Key"""
+
+    def __init__(self, idempotency_repository: IdempotencyRepository):
+        self.idempotency_repository = idempotency_repository
+
+    async def execute(
+        self,
+        idempotency_key: Optional[str],
+        user_id: UUID,
+        endpoint: str,
+        request_payload: Any,
+        operation: Callable[[], Awaitable[Any]],
+        resource_id_getter: Optional[Callable[[Any], Optional[UUID]]] = None
+    ) -> Any:
+        """Run the operation once per key; retries get the stored response body back"""
+        if not idempotency_key:
+            return await operation()
+
+        idempotency_key = idempotency_key.strip()
+        if not idempotency_key or len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+            raise ValueError(f"Idempotency-Key must be between 1 and {MAX_IDEMPOTENCY_KEY_LENGTH} characters")
+
+        request_hash = self._hash_payload(request_payload)
+
+        record = await self.idempotency_repository.get_record(user_id, endpoint, idempotency_key)
+        if record and self._is_expired(record):
+            logger.info(f"Discarding expired idempotency key {idempotency_key} for user {user_id} on {endpoint}")
+            await self.idempotency_repository.delete(record.id)
+            record = None
+
+        if record:
+            if record.request_hash != request_hash:
+                raise IdempotencyKeyReusedError("Idempotency-Key was already used with a different request payload")
+
+            if record.is_completed:
+                logger.info(f"Replaying stored response for idempotency key {idempotency_key} on {endpoint}")
+                return record.response_body
+
+            if not self._is_stale(record):
+                raise IdempotencyConflictError("A request with this Idempotency-Key is still being processed")
+
+            # The original request died without completing or releasing the key, so take it over
+            logger.warning(f"Taking over stale idempotency key {idempotency_key} for user {user_id} on {endpoint}")
+            await self.idempotency_repository.delete(record.id)
+
+        record_id = await self.idempotency_repository.reserve(user_id, endpoint, idempotency_key, request_hash)
+        if not record_id:
+            # Lost the race against a concurrent request carrying the same key
+            raise IdempotencyConflictError("A request with this Idempotency-Key is still being processed")
+
+        try:
+            result = await operation()
+        except Exception:
+            # Release the key so the client can retry a failed request
+            await self.idempotency_repository.delete(record_id)
+            raise
+
+        resource_id = resource_id_getter(result) if resource_id_getter else None
+        try:
+            await self.idempotency_repository.complete(record_id, resource_id, jsonable_encoder(result))
+        except Exception as e:
+            # The operation itself succeeded; a retry will simply be rejected until the key goes stale
+            logger.error(f"Failed to store response for idempotency key {idempotency_key} on {endpoint}: {str(e)}")
+
+        return result
+
+    def _hash_payload(self, request_payload: Any) -> str:
+        """Hash the canonical JSON form of the request payload"""
+        canonical = json.dumps(jsonable_encoder(request_payload), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _is_expired(self, record: IdempotencyRecord) -> bool:
+        """Check whether a record is older than the configured key lifetime"""
+        return self._age(record.created_at) > timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+
+    def _is_stale(self, record: IdempotencyRecord) -> bool:
+        """Check whether an in-progress record has outlived any request that could still own it"""
+        return self._age(record.updated_at) > timedelta(seconds=settings.IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS)
+
+    def _age(self, timestamp: Optional[datetime]) -> timedelta:
+        if not timestamp:
+            return timedelta(0)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - timestamp
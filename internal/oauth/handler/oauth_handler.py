@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, List
@@ -16,6 +17,8 @@ from internal.user.service.user_service import UserService
 from internal.user.repository.user_repository_db import DatabaseUserRepository
 from internal.auth.middleware import get_current_user_id, get_current_user_payload
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/oauth", tags=["oauth"])
 security = HTTPBearer()
 
@@ -256,19 +259,12 @@ async def save_google_drive_token(
         # Get user ID from JWT token
         user_id = UUID(user_id)
         
-        # Log the incoming request
-        print(f"📥 Frontend save-token request:")
-        print(f"   User ID: {user_id}")
-        print(f"   Request body: {request}")
+        logger.debug("Frontend save-token request for user %s", user_id)
         
         # Extract access token from request
         access_token = request.get("access_token")
         refresh_token = request.get("refresh_token")
         
-        print(f"🔑 Extracted tokens:")
-        print(f"   Access token: {access_token[:20]}..." if access_token else "   Access token: None")
-        print(f"   Refresh token: {refresh_token[:20]}..." if refresh_token else "   Refresh token: None")
-        
         if not access_token:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
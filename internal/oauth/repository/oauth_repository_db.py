@@ -5,8 +5,10 @@ from sqlalchemy import and_, or_
 from app.database.models import OAuthTokenModel
 from internal.oauth.model.oauth_entity import OAuthTokenEntity
 from internal.oauth.repository.oauth_repository import OAuthRepository
+from app.tracing import traced_repository
 
 
+@traced_repository
 class DatabaseOAuthRepository(OAuthRepository):
     """Database implementation of OAuth repository"""
 
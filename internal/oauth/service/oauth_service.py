@@ -1,5 +1,6 @@
 import httpx
 import asyncio
+import logging
 import uuid
 from typing import Optional, Dict, Any, List
 from uuid import UUID
@@ -13,6 +14,9 @@ from internal.oauth.model.oauth_dto import (
 from internal.oauth.model.oauth_entity import OAuthTokenEntity
 from internal.oauth.repository.oauth_repository import OAuthRepository
 from app.config import settings
+from app.tracing_http import TracingTransport
+
+logger = logging.getLogger(__name__)
 
 
 class OAuthService:
@@ -34,7 +38,7 @@ class OAuthService:
         code: str
     ) -> GitHubOAuthResponse:
         """Exchange GitHub authorization code for access token"""
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(transport=TracingTransport(inject_context=False)) as client:
             # Exchange code for token
             token_response = await client.post(
                 "https://github.com/login/oauth/access_token",
@@ -124,7 +128,7 @@ class OAuthService:
         code: str
     ) -> GoogleDriveOAuthResponse:
         """Exchange Google Drive authorization code for access token"""
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(transport=TracingTransport(inject_context=False)) as client:
             # Exchange code for token
             token_response = await client.post(
                 "https://oauth2.googleapis.com/token",
@@ -143,16 +147,12 @@ class OAuthService:
             
             token_data = token_response.json()
             
-            # Log the raw token response from Google
-            print(f"🔍 Google OAuth Token Response: {token_data}")
-            
             if "error" in token_data:
                 raise ValueError(f"Google OAuth error: {token_data['error']}")
             
             # Extract and log expiration details
             expires_in = token_data.get("expires_in", 3600)
-            print(f"⏰ Google Token expires_in: {expires_in} seconds")
-            print(f"📅 Calculated expiration: {datetime.now(timezone.utc) + timedelta(seconds=expires_in)}")
+            logger.debug("Google OAuth token received, expires_in=%s seconds", expires_in)
             
             return GoogleDriveOAuthResponse(
                 access_token=token_data["access_token"],
@@ -171,15 +171,11 @@ class OAuthService:
         # Calculate expiration
         expires_at = datetime.now(timezone.utc) + timedelta(seconds=google_response.expires_in)
         
-        # Log token details before saving
-        print(f"💾 Saving Google Drive Token:")
-        print(f"   User ID: {user_id}")
-        print(f"   Provider: drive")
-        print(f"   Expires in: {google_response.expires_in} seconds")
-        print(f"   Expires at: {expires_at}")
-        print(f"   Has refresh token: {bool(google_response.refresh_token)}")
-        print(f"   Token type: {google_response.token_type}")
-        print(f"   Scope: {google_response.scope}")
+        # Log token details before saving (never the tokens themselves)
+        logger.debug(
+            "Saving Google Drive token for user %s: expires_at=%s, has_refresh_token=%s, scope=%s",
+            user_id, expires_at, bool(google_response.refresh_token), google_response.scope
+        )
         
         # Create new token
         token_entity = OAuthTokenEntity(
@@ -194,7 +190,7 @@ class OAuthService:
         )
         
         saved_token = await self.oauth_repository.create_token(token_entity)
-        print(f"✅ Token saved successfully with ID: {saved_token.id}")
+        logger.info(f"Google Drive token saved with ID: {saved_token.id}")
         
         return saved_token
 
@@ -206,7 +202,7 @@ class OAuthService:
 
     async def refresh_google_drive_token(self, refresh_token: str) -> GoogleDriveOAuthResponse:
         """Refresh Google Drive access token using refresh token"""
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(transport=TracingTransport(inject_context=False)) as client:
             # Use refresh token to get new access token
             token_response = await client.post(
                 "https://oauth2.googleapis.com/token",
@@ -224,15 +220,12 @@ class OAuthService:
             
             token_data = token_response.json()
             
-            # Log the refresh response
-            print(f"🔄 Google Token Refresh Response: {token_data}")
-            
             if "error" in token_data:
                 raise ValueError(f"Google refresh error: {token_data['error']}")
             
             # Extract and log expiration details
             expires_in = token_data.get("expires_in", 3600)
-            print(f"⏰ New Token expires_in: {expires_in} seconds ({expires_in/3600:.1f} hours)")
+            logger.debug("Google Drive token refreshed, expires_in=%s seconds", expires_in)
             
             return GoogleDriveOAuthResponse(
                 access_token=token_data["access_token"],
@@ -247,7 +240,7 @@ class OAuthService:
         token_entity = await self.get_user_google_drive_token(user_id)
         
         if not token_entity:
-            print(f"❌ No Google Drive token found for user {user_id}")
+            logger.info(f"No Google Drive token found for user {user_id}")
             return None
         
         # Check if token is expired or expires soon (within 5 minutes)
@@ -255,15 +248,14 @@ class OAuthService:
         expires_at = token_entity.expires_at
         
         if expires_at and expires_at > now + timedelta(minutes=5):
-            print(f"✅ Token is still valid until {expires_at}")
             return token_entity.access_token
         
         # Token is expired or expires soon, refresh it
         if not token_entity.refresh_token:
-            print(f"❌ No refresh token available for user {user_id}")
+            logger.warning(f"No Google Drive refresh token available for user {user_id}")
             return None
         
-        print(f"🔄 Token expired or expires soon, refreshing...")
+        logger.info(f"Google Drive token for user {user_id} expired or expires soon, refreshing")
         
         try:
             # Refresh the token
@@ -279,10 +271,10 @@ class OAuthService:
             # Save updated token
             updated_token = await self.oauth_repository.update_token(token_entity)
             
-            print(f"✅ Token refreshed successfully, new expiration: {new_expires_at}")
+            logger.info(f"Google Drive token refreshed for user {user_id}, new expiration: {new_expires_at}")
             return updated_token.access_token
             
         except Exception as e:
-            print(f"❌ Failed to refresh token: {str(e)}")
+            logger.error(f"Failed to refresh Google Drive token for user {user_id}: {str(e)}")
             return None
 
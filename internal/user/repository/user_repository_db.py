@@ -4,8 +4,10 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 from internal.user.model.user_entity import User
 from internal.user.repository.user_repository import UserRepository
+from app.tracing import traced_repository
 
 
+@traced_repository
 class DatabaseUserRepository(UserRepository):
     """Database implementation of User repository using raw SQL"""
     
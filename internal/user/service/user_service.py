@@ -1,7 +1,7 @@
 from typing import Optional
 from uuid import UUID
 from datetime import datetime, timezone
-from jose import jwt
+import jwt
 from internal.user.model.user_entity import User
 from internal.user.model.user_dto import UserCreateRequest, UserLoginRequest, UserLoginResponse, UserResponse, UserCreateResponse, UserSummaryResponse
 from internal.user.repository.user_repository import UserRepository
@@ -1,9 +1,8 @@
 #!/usr/bin/env python3
 """
-Entry point for running the application
+Development entry point (auto-reload); production uses `python -m app.server`
 """
 import uvicorn
-from app.main import app
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Chat message partition maintenance
+
+chat_messages is range partitioned by created_at month. Run this monthly
+(cron, Cloud Scheduler): it creates the partitions for the coming months,
+so new messages never land in the default partition, and archives every
+partition older than the retention window. An archived partition is
+detached, written to <archive-dir>/<partition>.csv.gz, checked against the
+table and dropped. A partition an interrupted run left detached is
+archived on the next run. Sessions keep their last_message_order, so
+messages written after an archive continue the numbering.
+
+Usage:
+    python scripts/archive_chat_messages.py
+    python scripts/archive_chat_messages.py --dry-run
+    python scripts/archive_chat_messages.py --retention-months 6 --archive-dir /mnt/chat-archive
+    python scripts/archive_chat_messages.py --list
+
+Restore a month with
+    gunzip -c chat_messages_2025_01.csv.gz | psql -c "COPY chat_messages FROM STDIN WITH (FORMAT csv, HEADER)"
+after creating its partition again.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.config import settings
+from app.database.connection import SessionLocal
+from internal.ai.chat.repository.partition_repository import ChatPartition, ChatPartitionRepository, add_months, month_start
+
+def cold_partitions(partitions: List[ChatPartition], now: datetime, retention_months: int) -> List[ChatPartition]:
+    """Partitions that end before the first month of the retention window"""
+    cutoff = add_months(month_start(now), -retention_months)
+    return [partition for partition in partitions if add_months(partition.month, 1) <= cutoff]
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "kB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+async def run(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        repository = ChatPartitionRepository(db)
+        partitions = await repository.list_partitions()
+        if args.list:
+            print(f"{'partition':<28}{'rows':>14}{'size':>12}")
+            for partition in partitions:
+                print(f"{partition.name:<28}{partition.rows:>14,}{_format_bytes(partition.total_bytes):>12}")
+            return 0
+
+        now = datetime.now(timezone.utc)
+        cold = cold_partitions(partitions, now, args.retention_months)
+        detached = await repository.find_detached_partitions()
+        if args.dry_run:
+            print(f"Would make sure partitions exist through {add_months(month_start(now), args.premake_months):%Y-%m}")
+            for name in detached:
+                print(f"Would finish archiving detached partition {name}")
+            for partition in cold:
+                print(f"Would archive {partition.name} (~{partition.rows:,} rows, {_format_bytes(partition.total_bytes)})")
+            return 0
+
+        created = await repository.ensure_partitions(month_start(now), args.premake_months + 1)
+        print(f"✅ Created {len(created)} partition(s){': ' + ', '.join(created) if created else ''}")
+
+        os.makedirs(args.archive_dir, exist_ok=True)
+        archived = 0
+        for name, attached in [(name, False) for name in detached] + [(partition.name, True) for partition in cold]:
+            path = os.path.join(args.archive_dir, f"{name}.csv.gz")
+            rows = await repository.archive_partition(name, path, attached=attached)
+            archived += rows
+            print(f"📦 Archived {name}: {rows:,} rows -> {path}")
+        print(f"✅ Archived {archived:,} messages from {len(detached) + len(cold)} partition(s)")
+        return 0
+    finally:
+        db.close()
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Create upcoming chat_messages partitions and archive cold ones")
+    parser.add_argument("--retention-months", type=int, default=settings.CHAT_MESSAGE_RETENTION_MONTHS, help="Months of messages kept in the database")
+    parser.add_argument("--premake-months", type=int, default=settings.CHAT_PARTITION_PREMAKE_MONTHS, help="Partitions created ahead of the current month")
+    parser.add_argument("--archive-dir", default=settings.CHAT_ARCHIVE_DIR, help="Where archived partitions are written")
+    parser.add_argument("--dry-run", action="store_true", help="Only print what would be done")
+    parser.add_argument("--list", action="store_true", help="Only list the partitions")
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Chat history read benchmark
+
+Grows chat_messages in steps (default 4 x 2.5M messages spread over 24
+monthly partitions) and after each step times a history read of one probe
+session, with and without the partition bound. The bounded read only
+touches the partitions since the session started, so its latency should
+stay flat as the table grows; the unbounded read probes every partition.
+
+Needs a disposable PostgreSQL database migrated to head and seeded with
+scripts/seed_data.py (messages are attached to existing course sessions):
+
+    BENCHMARK_DATABASE_URL=postgresql://... python scripts/benchmark_chat_history.py
+    python scripts/benchmark_chat_history.py --database-url postgresql://... --messages 20000000 --steps 8
+    python scripts/benchmark_chat_history.py --json chat_history.json --max-growth 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from internal.ai.chat.repository.message_repository import MessageRepository
+from internal.ai.chat.repository.partition_repository import ChatPartitionRepository, add_months, month_start
+
+# Far enough back that no partition is pruned
+UNBOUNDED = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def create_probe_session(db: Session, started_at: datetime, messages: int) -> uuid.UUID:
+    """A course session started a month ago with `messages` messages since"""
+    course = db.execute(text("""
+        SELECT c.id, c.user_id FROM courses c
+        WHERE NOT EXISTS (SELECT 1 FROM course_chat_sessions s WHERE s.user_id = c.user_id AND s.course_id = c.id)
+        LIMIT 1
+    """)).fetchone()
+    if course is None:
+        raise RuntimeError("No course without a chat session; seed the database with scripts/seed_data.py first")
+    session_id = uuid.uuid4()
+    db.execute(text("""
+        INSERT INTO course_chat_sessions (id, user_id, course_id, ai_session_id, created_at, updated_at)
+        VALUES (:id, :user_id, :course_id, :ai_session_id, :started_at, :started_at)
+    """), {"id": str(session_id), "user_id": str(course[1]), "course_id": str(course[0]), "ai_session_id": f"bench-{session_id}", "started_at": started_at})
+    db.execute(text("""
+        INSERT INTO chat_messages (id, course_session_id, content, is_user, message_order, created_at)
+        SELECT gen_random_uuid(), :session_id, repeat('probe message ', 20), g % 2 = 1, g, :started_at + g * interval '1 minute'
+        FROM generate_series(1, :messages) g
+    """), {"session_id": str(session_id), "started_at": started_at, "messages": messages})
+    db.commit()
+    return session_id
+
+def grow(db: Session, messages: int, sessions: int, start: datetime, end: datetime) -> None:
+    """Add `messages` messages to existing course sessions, spread uniformly between start and end"""
+    per_session = max(1, messages // sessions)
+    db.execute(text("""
+        INSERT INTO chat_messages (id, course_session_id, content, is_user, message_order, created_at)
+        SELECT gen_random_uuid(), s.id, repeat('history filler ', 20), g % 2 = 1, 1000000 + g,
+               :start + random() * (:end - :start)
+        FROM (SELECT id FROM course_chat_sessions ORDER BY id LIMIT :sessions) s,
+             generate_series(1, :per_session) g
+    """), {"start": start, "end": end, "sessions": sessions, "per_session": per_session})
+    db.commit()
+    db.execute(text("ANALYZE chat_messages"))
+    db.commit()
+
+def time_reads(repository: MessageRepository, session_id: uuid.UUID, since: datetime, limit: int, reads: int) -> Dict[str, float]:
+    async def read_all() -> List[float]:
+        samples = []
+        for _ in range(reads):
+            started = time.perf_counter()
+            await repository.get_session_messages(session_id, True, since, limit=limit)
+            samples.append((time.perf_counter() - started) * 1000)
+        return samples
+
+    samples = sorted(asyncio.run(read_all()))
+    return {"median_ms": statistics.median(samples), "p95_ms": samples[int(len(samples) * 0.95) - 1]}
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark chat history reads as chat_messages grows")
+    parser.add_argument("--database-url", default=os.environ.get("BENCHMARK_DATABASE_URL"), help="Disposable database (default: BENCHMARK_DATABASE_URL)")
+    parser.add_argument("--messages", type=int, default=10_000_000, help="Messages added in total")
+    parser.add_argument("--steps", type=int, default=4, help="Growth steps; reads are timed after each")
+    parser.add_argument("--months", type=int, default=24, help="Months the added messages are spread over")
+    parser.add_argument("--sessions", type=int, default=20_000, help="Existing course sessions the messages go to")
+    parser.add_argument("--limit", type=int, default=50, help="Messages per history read")
+    parser.add_argument("--reads", type=int, default=200, help="Timed reads per measurement")
+    parser.add_argument("--json", help="Write the measurements to this JSON file")
+    parser.add_argument("--max-growth", type=float, help="Fail when the bounded median grows by more than this percent")
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error("--database-url or BENCHMARK_DATABASE_URL is required")
+
+    engine = create_engine(args.database_url)
+    db = Session(bind=engine)
+    try:
+        now = datetime.now(timezone.utc)
+        first_month = add_months(month_start(now), -args.months)
+        asyncio.run(ChatPartitionRepository(db).ensure_partitions(first_month, args.months + 1))
+        started_at = now - timedelta(days=30)
+        probe = create_probe_session(db, started_at, args.limit * 4)
+        repository = MessageRepository(db)
+
+        results = []
+        print(f"{'messages':>14}{'bounded p50':>14}{'bounded p95':>14}{'unbounded p50':>16}{'unbounded p95':>16}")
+        for step in range(args.steps + 1):
+            if step:
+                grow(db, args.messages // args.steps, args.sessions, first_month, now)
+            total = db.execute(text("SELECT COUNT(*) FROM chat_messages")).scalar()
+            bounded = time_reads(repository, probe, started_at, args.limit, args.reads)
+            unbounded = time_reads(repository, probe, UNBOUNDED, args.limit, args.reads)
+            results.append({"messages": total, "bounded": bounded, "unbounded": unbounded})
+            print(f"{total:>14,}{bounded['median_ms']:>14.2f}{bounded['p95_ms']:>14.2f}"
+                  f"{unbounded['median_ms']:>16.2f}{unbounded['p95_ms']:>16.2f}")
+    finally:
+        db.close()
+        engine.dispose()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+    if args.max_growth is not None:
+        first, last = results[0]["bounded"]["median_ms"], results[-1]["bounded"]["median_ms"]
+        growth = (last - first) / first * 100 if first else 0.0
+        print(f"\nBounded read median {first:.2f} ms -> {last:.2f} ms ({growth:+.1f}%)")
+        if growth > args.max_growth:
+            print(f"FAIL: history reads slowed down by more than {args.max_growth:.0f}% as the table grew")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark
+
+Imports app.main in fresh interpreters with `python -X importtime` and
+reports the median total plus the slowest modules (cumulative and self
+time) and top-level packages. Results can be written as JSON and compared
+with a stored baseline so startup time is tracked as a regression metric.
+
+Usage:
+    python scripts/benchmark_import_time.py
+    python scripts/benchmark_import_time.py --fast-startup --runs 9 --top 25
+    python scripts/benchmark_import_time.py --fast-startup --json import_time.json
+    python scripts/benchmark_import_time.py --fast-startup --baseline import_time.json --tolerance 15
+    python scripts/benchmark_import_time.py --budget-ms 1500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+# module -> (self microseconds, cumulative microseconds)
+ImportTimes = Dict[str, Tuple[int, int]]
+
+def parse_importtime(output: str) -> ImportTimes:
+    """Parse `-X importtime` stderr into per-module timings"""
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        times[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return times
+
+def measure(module: str, fast_startup: bool) -> ImportTimes:
+    """Import `module` once in a fresh interpreter"""
+    env = {**os.environ, "FAST_STARTUP": "true" if fast_startup else "false", "PYTHONPATH": str(project_root)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+def summarize(runs: List[ImportTimes], module: str, top: int) -> dict:
+    """Median timings across runs, in milliseconds"""
+    modules = set().union(*runs)
+    self_ms = {name: statistics.median(run.get(name, (0, 0))[0] for run in runs) / 1000 for name in modules}
+    cumulative_ms = {name: statistics.median(run.get(name, (0, 0))[1] for run in runs) / 1000 for name in modules}
+
+    packages = defaultdict(float)
+    for name, value in self_ms.items():
+        packages[name.split(".")[0]] += value
+
+    def slowest(values: Dict[str, float]) -> List[List]:
+        return [[name, round(value, 2)] for name, value in sorted(values.items(), key=lambda item: -item[1])[:top]]
+
+    return {
+        "module": module,
+        "runs": len(runs),
+        "total_ms": round(cumulative_ms.get(module, 0.0), 2),
+        "module_count": len(modules),
+        "cumulative_ms": slowest(cumulative_ms),
+        "self_ms": slowest(self_ms),
+        "packages_ms": slowest(packages),
+    }
+
+def print_report(summary: dict) -> None:
+    print(f"import {summary['module']}: median {summary['total_ms']:,.1f} ms over {summary['runs']} runs, {summary['module_count']} modules")
+    for title, key in (("Slowest modules (cumulative)", "cumulative_ms"), ("Slowest modules (self)", "self_ms"), ("Packages (self)", "packages_ms")):
+        print(f"\n{title}:")
+        for name, value in summary[key]:
+            print(f"  {value:10,.1f} ms  {name}")
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark application import time")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure; the median is reported")
+    parser.add_argument("--top", type=int, default=15, help="Modules to list per table")
+    parser.add_argument("--fast-startup", action="store_true", help="Measure with FAST_STARTUP=true (lazy routers)")
+    parser.add_argument("--json", help="Write the summary to this JSON file")
+    parser.add_argument("--baseline", help="Fail when the total exceeds this stored summary by more than --tolerance")
+    parser.add_argument("--tolerance", type=float, default=20.0, help="Allowed regression against the baseline, in percent")
+    parser.add_argument("--budget-ms", type=float, help="Fail when the median total exceeds this many milliseconds")
+    args = parser.parse_args(argv)
+
+    # One warm-up import so bytecode compilation is not measured
+    measure(args.module, args.fast_startup)
+    summary = summarize([measure(args.module, args.fast_startup) for _ in range(args.runs)], args.module, args.top)
+    summary["fast_startup"] = args.fast_startup
+    print_report(summary)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2))
+
+    failed = False
+    if args.budget_ms is not None and summary["total_ms"] > args.budget_ms:
+        print(f"\nFAIL: {summary['total_ms']:,.1f} ms exceeds the {args.budget_ms:,.1f} ms budget")
+        failed = True
+    if args.baseline:
+        baseline_ms = json.loads(Path(args.baseline).read_text())["total_ms"]
+        change = (summary["total_ms"] - baseline_ms) / baseline_ms * 100 if baseline_ms else 0.0
+        print(f"\nBaseline {baseline_ms:,.1f} ms, change {change:+.1f}%")
+        if change > args.tolerance:
+            print(f"FAIL: import time regressed by more than {args.tolerance:.0f}%")
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Response serialization benchmark
+
+Compares FastAPI's default response_model path with returning a
+FastJSONResponse directly, for a course detail payload (50 modules by
+default) built the way CourseService builds it.
+
+Usage:
+    python scripts/benchmark_serialization.py
+    python scripts/benchmark_serialization.py --modules 50 --lessons-per-module 6 --iterations 200
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, List
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.responses import FastJSONResponse, HAS_ORJSON
+from internal.course.model.course_dto import CourseDetail, ModuleDetail, LessonDetail, QuizDetail
+
+TIMESTAMP = "2025-01-27T10:00:00+00:00"
+
+def build_course_detail(modules: int = 50, lessons_per_module: int = 5, quizzes_per_module: int = 1, lesson_chars: int = 2000) -> CourseDetail:
+    """A deterministic CourseDetail of the requested size"""
+    content = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * (lesson_chars // 56 + 1))[:lesson_chars]
+    module_details = []
+    for m in range(modules):
+        lessons = [
+            LessonDetail(
+                id=uuid.UUID(int=m * 1000 + l + 1), title=f"Lesson {m + 1}.{l + 1}", content=content, index=l,
+                is_completed=l % 2 == 0, created_at=TIMESTAMP, updated_at=TIMESTAMP
+            )
+            for l in range(lessons_per_module)
+        ]
+        quizzes = [
+            QuizDetail(
+                id=uuid.UUID(int=10_000_000 + m * 1000 + q),
+                questions=[
+                    {"question": f"Question {i + 1}?", "options": ["A", "B", "C", "D"], "answer": "A"}
+                    for i in range(5)
+                ],
+                is_completed=False, is_correct=False, created_at=TIMESTAMP, updated_at=TIMESTAMP
+            )
+            for q in range(quizzes_per_module)
+        ]
+        module_details.append(ModuleDetail(
+            id=uuid.UUID(int=20_000_000 + m), title=f"Module {m + 1}", order_index=m, is_completed=False,
+            created_at=TIMESTAMP, updated_at=TIMESTAMP, lessons=lessons, quizzes=quizzes
+        ))
+
+    return CourseDetail(
+        id=uuid.UUID(int=1), title="Benchmark course", description="Serialization benchmark payload",
+        estimated_duration=600, difficulty="intermediate", learning_objectives=["Objective"] * 5,
+        source_from=["github"], progress=50.0, is_completed=False, created_at=TIMESTAMP, updated_at=TIMESTAMP,
+        modules=module_details
+    )
+
+def render_default(course: CourseDetail) -> bytes:
+    """What FastAPI does for `return course` on a route with response_model=CourseDetail"""
+    field = create_response_field(name="response", type_=CourseDetail, mode="serialization")
+    content = asyncio.run(serialize_response(field=field, response_content=course))
+    return JSONResponse(content).body
+
+def render_direct(course: CourseDetail) -> bytes:
+    return FastJSONResponse(course).body
+
+def _time(operation: Callable[[], bytes], iterations: int) -> List[float]:
+    operation()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark course detail response serialization")
+    parser.add_argument("--modules", type=int, default=50)
+    parser.add_argument("--lessons-per-module", type=int, default=5)
+    parser.add_argument("--lesson-chars", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    course = build_course_detail(args.modules, args.lessons_per_module, lesson_chars=args.lesson_chars)
+    size_kb = len(render_direct(course)) / 1024
+    print(f"Payload: {args.modules} modules, {args.lessons_per_module} lessons each, {size_kb:,.0f} KiB (orjson: {HAS_ORJSON})")
+
+    # Reuse one event loop so loop setup is not part of the timing
+    field = create_response_field(name="response", type_=CourseDetail, mode="serialization")
+
+    async def default_path():
+        content = await serialize_response(field=field, response_content=course)
+        return JSONResponse(content).body
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = {
+            "response_model (default)": _time(lambda: loop.run_until_complete(default_path()), args.iterations),
+            "FastJSONResponse (direct)": _time(lambda: render_direct(course), args.iterations),
+        }
+    finally:
+        loop.close()
+
+    baseline = statistics.median(results["response_model (default)"])
+    for name, samples in results.items():
+        median = statistics.median(samples)
+        p95 = sorted(samples)[max(0, int(len(samples) * 0.95) - 1)]
+        print(f"  {name:<28} median {median:8.3f} ms   p95 {p95:8.3f} ms   {baseline / median:5.1f}x")
+
+if __name__ == "__main__":
+    main()
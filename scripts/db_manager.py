@@ -4,7 +4,6 @@ Database Management Script for Tara LMS
 Provides easy commands to manage the database
 """
 
-import sqlite3
 import sys
 import os
 from pathlib import Path
@@ -13,6 +12,8 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
 from app.database.connection import engine
 from app.database.models import Base
 
@@ -33,93 +34,64 @@ def show_tables():
     print("📊 Database Tables:")
     print("-" * 40)
     
-    # Connect to SQLite database
-    db_path = project_root / "tara.db"
-    if not db_path.exists():
-        print("❌ Database file not found!")
-        return
-    
-    conn = sqlite3.connect(str(db_path))
-    cursor = conn.cursor()
-    
-    # Get all tables
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cursor.fetchall()
+    tables = inspect(engine).get_table_names()
     
     for table in tables:
-        print(f"📋 {table[0]}")
+        print(f"📋 {table}")
     
-    conn.close()
     print(f"\nTotal tables: {len(tables)}")
 
 def show_schema(table_name=None):
     """Show schema for a specific table or all tables"""
-    db_path = project_root / "tara.db"
-    if not db_path.exists():
-        print("❌ Database file not found!")
-        return
-    
-    conn = sqlite3.connect(str(db_path))
-    cursor = conn.cursor()
+    inspector = inspect(engine)
+    table_names = inspector.get_table_names()
     
     if table_name:
-        print(f"📋 Schema for table '{table_name}':")
-        print("-" * 50)
-        cursor.execute(f"PRAGMA table_info({table_name});")
-        columns = cursor.fetchall()
-        
-        if not columns:
+        if table_name not in table_names:
             print(f"❌ Table '{table_name}' not found!")
             return
-        
-        for col in columns:
-            print(f"  {col[1]} {col[2]} {'NOT NULL' if col[3] else 'NULL'} {'PRIMARY KEY' if col[5] else ''}")
+        print(f"📋 Schema for table '{table_name}':")
+        print("-" * 50)
+        tables = [table_name]
     else:
         print("📋 Database Schema:")
         print("-" * 50)
-        cursor.execute("SELECT sql FROM sqlite_master WHERE type='table';")
-        schemas = cursor.fetchall()
-        
-        for schema in schemas:
-            print(schema[0])
-            print()
+        tables = table_names
     
-    conn.close()
+    for name in tables:
+        if not table_name:
+            print(f"{name}:")
+        primary_keys = set(inspector.get_pk_constraint(name).get("constrained_columns", []))
+        for col in inspector.get_columns(name):
+            print(f"  {col['name']} {col['type']} {'NULL' if col['nullable'] else 'NOT NULL'} {'PRIMARY KEY' if col['name'] in primary_keys else ''}")
+        for index in inspector.get_indexes(name):
+            print(f"  INDEX {index['name']} ({', '.join(index['column_names'])}){' UNIQUE' if index['unique'] else ''}")
+        print()
 
 def run_query(query):
     """Run a custom SQL query"""
-    db_path = project_root / "tara.db"
-    if not db_path.exists():
-        print("❌ Database file not found!")
-        return
-    
-    conn = sqlite3.connect(str(db_path))
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute(query)
-        results = cursor.fetchall()
-        
-        if results:
-            # Get column names
-            columns = [description[0] for description in cursor.description]
-            print("📊 Query Results:")
-            print("-" * 50)
-            
-            # Print column headers
-            print(" | ".join(columns))
-            print("-" * 50)
+        with engine.begin() as conn:
+            result = conn.execute(text(query))
             
-            # Print results
-            for row in results:
-                print(" | ".join(str(cell) for cell in row))
-        else:
-            print("✅ Query executed successfully (no results)")
+            if result.returns_rows:
+                results = result.fetchall()
+                columns = list(result.keys())
+                print("📊 Query Results:")
+                print("-" * 50)
+                
+                # Print column headers
+                print(" | ".join(columns))
+                print("-" * 50)
+                
+                # Print results
+                for row in results:
+                    print(" | ".join(str(cell) for cell in row))
+            else:
+                print("✅ Query executed successfully (no results)")
             
-    except sqlite3.Error as e:
+    except SQLAlchemyError as e:
         print(f"❌ Query error: {e}")
-    finally:
-        conn.close()
 
 def main():
     """Main function"""
@@ -136,6 +108,7 @@ Commands:
     tables          Show all tables
     schema [table]  Show schema (all tables or specific table)
     query <sql>     Run custom SQL query
+    seed [options]  Generate a synthetic dataset (see scripts/seed_data.py --help)
 
 Examples:
     python scripts/db_manager.py create
@@ -162,6 +135,9 @@ Examples:
             return
         query = " ".join(sys.argv[2:])
         run_query(query)
+    elif command == "seed":
+        from scripts.seed_data import main as seed_main
+        seed_main(sys.argv[2:])
     else:
         print(f"❌ Unknown command: {command}")
 
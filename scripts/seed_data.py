@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for performance testing
+
+Populates departments, positions, locations, users with manager hierarchies,
+courses with modules/lessons/quizzes, guides, OAuth tokens and chat
+sessions/messages. Rows are streamed into PostgreSQL with COPY, and the same
+seed always produces the same dataset.
+
+Usage:
+    python scripts/seed_data.py --scale 1k
+    python scripts/seed_data.py --scale 100k --seed 7 --truncate
+    python scripts/seed_data.py --courses 250000 --modules-per-course 6
+    python scripts/seed_data.py --report
+
+Seeded users log in as loadtest-<n>@example.com with the password
+"loadtest-password", matching tests/load/load_test.py.
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, fields, replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.database.connection import engine
+from internal.ai.chat.repository.partition_repository import month_start, partition_ddl
+
+SEED_EMAIL_PREFIX = "loadtest"
+SEED_PASSWORD = "loadtest-password"
+
+# Tables in foreign key order; buffers are always flushed in this order
+TABLE_COLUMNS = {
+    "departments": ("id", "name", "description", "created_at"),
+    "positions": ("id", "name", "created_at"),
+    "locations": ("id", "city", "country", "created_at"),
+    "users": ("id", "department_id", "position_id", "manager_id", "location_id", "name", "image", "email", "password", "status", "cv", "country", "created_at"),
+    "courses": ("id", "user_id", "title", "description", "skill", "estimated_duration", "difficulty", "learning_objectives", "source_from", "progress", "is_completed", "generation_status", "created_at", "updated_at"),
+    "modules": ("id", "course_id", "title", "order_index", "is_completed", "created_at", "updated_at"),
+    "lessons": ("id", "module_id", "title", "content", "index", "is_completed", "created_at", "updated_at"),
+    "quizzes": ("id", "module_id", "questions", "is_completed", "is_correct", "created_at", "updated_at"),
+    "guides": ("id", "user_id", "title", "description", "content", "source_from", "created_at", "updated_at"),
+    "user_oauth_tokens": ("id", "user_id", "provider", "access_token", "refresh_token", "token_type", "expires_at", "created_at"),
+    "course_chat_sessions": ("id", "user_id", "course_id", "ai_session_id", "created_at", "updated_at", "last_message_order"),
+    "guide_chat_sessions": ("id", "user_id", "guide_id", "ai_session_id", "created_at", "updated_at", "last_message_order"),
+    "chat_messages": ("id", "course_session_id", "guide_session_id", "content", "is_user", "message_order", "created_at"),
+}
+
+@dataclass
+class ScaleConfig:
+    """Dataset shape; every count is a total except the per-parent ratios"""
+
+    courses: int
+    users: int
+    departments: int
+    positions: int = 20
+    locations: int = 30
+    modules_per_course: int = 5
+    lessons_per_module: int = 4
+    quiz_questions: int = 5
+    guides: int = 0
+    chat_session_ratio: float = 0.3  # Share of courses and guides with a chat session
+    messages_per_session: int = 10
+    oauth_token_ratio: float = 0.5  # Share of users with GitHub and Drive tokens
+    lesson_chars: int = 1200
+    manager_span: int = 8  # Direct reports per manager
+
+SCALE_PRESETS = {
+    "1k": ScaleConfig(courses=1_000, users=200, departments=5, guides=500),
+    "10k": ScaleConfig(courses=10_000, users=2_000, departments=20, guides=5_000),
+    "100k": ScaleConfig(courses=100_000, users=20_000, departments=60, guides=50_000),
+    "1m": ScaleConfig(courses=1_000_000, users=200_000, departments=200, guides=500_000, lesson_chars=600),
+}
+
+DEPARTMENT_NAMES = ["Engineering", "Data", "Product", "Design", "Marketing", "Sales", "Finance", "People", "Operations", "Support", "Legal", "Security"]
+POSITION_NAMES = ["Intern", "Junior Engineer", "Engineer", "Senior Engineer", "Staff Engineer", "Principal Engineer", "Engineering Manager",
+                  "Analyst", "Senior Analyst", "Designer", "Product Manager", "Director", "VP", "Specialist", "Coordinator", "Consultant",
+                  "Team Lead", "Architect", "Scientist", "Administrator"]
+CITIES = [("Jakarta", "Indonesia"), ("Bandung", "Indonesia"), ("Surabaya", "Indonesia"), ("Singapore", "Singapore"), ("Kuala Lumpur", "Malaysia"),
+          ("Bangkok", "Thailand"), ("Manila", "Philippines"), ("Ho Chi Minh City", "Vietnam"), ("Sydney", "Australia"), ("Tokyo", "Japan")]
+SKILLS = ["python", "sql", "fastapi", "docker", "kubernetes", "react", "typescript", "go", "aws", "gcp", "terraform", "pandas", "spark", "ml", "security"]
+TOPICS = ["Distributed Systems", "Data Modeling", "API Design", "Cloud Cost Control", "Observability", "Testing Strategy", "Frontend Performance",
+          "Machine Learning Basics", "Incident Response", "Query Optimization", "Event Streaming", "Secure Coding"]
+DIFFICULTIES = ["Beginner", "Intermediate", "Advanced"]
+WORDS = ("the system design pattern service request query index cache latency throughput module lesson example practice "
+         "deploy monitor scale data model schema review trade-off failure retry budget metric trace log").split()
+
+class SeedGenerator:
+    """Deterministic row generator streaming into COPY buffers"""
+
+    def __init__(self, config: ScaleConfig, seed: int, batch_rows: int, connection):
+        self.config = config
+        self.rng = random.Random(seed)
+        self.batch_rows = batch_rows
+        self.connection = connection
+        self.base_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.password_hash = hashlib.sha256(SEED_PASSWORD.encode()).hexdigest()
+        self.buffers: Dict[str, io.StringIO] = {table: io.StringIO() for table in TABLE_COLUMNS}
+        self.writers = {table: csv.writer(buffer) for table, buffer in self.buffers.items()}
+        self.pending_rows = 0
+        self.row_counts: Dict[str, int] = {table: 0 for table in TABLE_COLUMNS}
+        # chat_messages is partitioned by month; partitions are created before the rows are copied
+        self.message_months = set()
+        self.created_months = set()
+        # Pre-rendered filler text keeps generation cheap at large scale
+        self.filler = " ".join(self.rng.choice(WORDS) for _ in range(2000))
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def timestamp(self, start: datetime, max_days: float = 365) -> datetime:
+        return start + timedelta(seconds=self.rng.uniform(0, max_days * 86400))
+
+    def text(self, chars: int) -> str:
+        start = self.rng.randrange(0, max(1, len(self.filler) - chars))
+        return self.filler[start:start + chars].strip() or "content"
+
+    def add(self, table: str, row: Sequence) -> None:
+        self.writers[table].writerow([_copy_value(value) for value in row])
+        self.row_counts[table] += 1
+        self.pending_rows += 1
+        if self.pending_rows >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """COPY every buffered table in foreign key order and commit"""
+        cursor = self.connection.cursor()
+        try:
+            for month in sorted(self.message_months - self.created_months):
+                cursor.execute(partition_ddl(month))
+                self.created_months.add(month)
+            for table, columns in TABLE_COLUMNS.items():
+                buffer = self.buffers[table]
+                if not buffer.tell():
+                    continue
+                buffer.seek(0)
+                quoted = ", ".join(f'"{column}"' for column in columns)
+                cursor.copy_expert(f"COPY {table} ({quoted}) FROM STDIN WITH (FORMAT csv)", buffer)
+                buffer.seek(0)
+                buffer.truncate()
+            self.connection.commit()
+        finally:
+            cursor.close()
+        self.pending_rows = 0
+
+    def generate(self) -> Dict[str, int]:
+        config = self.config
+        department_ids = [self._department(i) for i in range(config.departments)]
+        position_ids = [self._position(i) for i in range(config.positions)]
+        location_ids = [self._location(i) for i in range(config.locations)]
+        users = self._users(department_ids, position_ids, location_ids)
+
+        # Spread courses and guides over users with a skew: a few heavy learners, a long tail of light ones
+        course_owners = self._skewed_owners(users, config.courses)
+        guide_owners = self._skewed_owners(users, config.guides)
+
+        for user_id, created_at in course_owners:
+            course_id = self._course(user_id, created_at)
+            if self.rng.random() < config.chat_session_ratio:
+                self._chat_session("course_chat_sessions", "course_session_id", user_id, course_id, created_at)
+
+        for user_id, created_at in guide_owners:
+            guide_id = self._guide(user_id, created_at)
+            if self.rng.random() < config.chat_session_ratio:
+                self._chat_session("guide_chat_sessions", "guide_session_id", user_id, guide_id, created_at)
+
+        self.flush()
+        return dict(self.row_counts)
+
+    def _department(self, index: int) -> str:
+        department_id = self.uuid()
+        name = DEPARTMENT_NAMES[index % len(DEPARTMENT_NAMES)]
+        if index >= len(DEPARTMENT_NAMES):
+            name = f"{name} {index // len(DEPARTMENT_NAMES) + 1}"
+        self.add("departments", (department_id, name, f"{name} department", self.base_time))
+        return department_id
+
+    def _position(self, index: int) -> str:
+        position_id = self.uuid()
+        name = POSITION_NAMES[index % len(POSITION_NAMES)]
+        if index >= len(POSITION_NAMES):
+            name = f"{name} {index // len(POSITION_NAMES) + 1}"
+        self.add("positions", (position_id, name, self.base_time))
+        return position_id
+
+    def _location(self, index: int) -> str:
+        location_id = self.uuid()
+        city, country = CITIES[index % len(CITIES)]
+        self.add("locations", (location_id, city, country, self.base_time))
+        return location_id
+
+    def _users(self, department_ids: List[str], position_ids: List[str], location_ids: List[str]) -> List[tuple]:
+        """Create users department by department, managers before their reports"""
+        config = self.config
+        users = []
+        per_department = max(1, config.users // len(department_ids))
+        index = 0
+        for department_number, department_id in enumerate(department_ids):
+            count = per_department if department_number < len(department_ids) - 1 else config.users - index
+            managers: List[str] = []
+            for position_in_department in range(count):
+                # Breadth-first tree: member k reports to member (k - 1) // span
+                manager_id = managers[(position_in_department - 1) // config.manager_span] if position_in_department else None
+                user_id = self.uuid()
+                created_at = self.timestamp(self.base_time, 180)
+                city_index = self.rng.randrange(len(location_ids))
+                self.add("users", (
+                    user_id, department_id, self.rng.choice(position_ids), manager_id, location_ids[city_index],
+                    f"Load Test {index}", None, f"{SEED_EMAIL_PREFIX}-{index}@example.com", self.password_hash, True,
+                    self.text(400), CITIES[city_index % len(CITIES)][1], created_at
+                ))
+                managers.append(user_id)
+                users.append((user_id, created_at))
+                if self.rng.random() < config.oauth_token_ratio:
+                    self._oauth_tokens(user_id, created_at)
+                index += 1
+        return users
+
+    def _oauth_tokens(self, user_id: str, created_at: datetime) -> None:
+        self.add("user_oauth_tokens", (self.uuid(), user_id, "github", f"gho_{self.uuid().replace('-', '')}", None, "bearer", None, created_at))
+        self.add("user_oauth_tokens", (
+            self.uuid(), user_id, "google_drive", f"ya29.{self.uuid().replace('-', '')}", f"1//{self.uuid().replace('-', '')}",
+            "Bearer", created_at + timedelta(hours=1), created_at
+        ))
+
+    def _skewed_owners(self, users: List[tuple], total: int) -> List[tuple]:
+        if not users or total <= 0:
+            return []
+        weights = [1.0 / (rank + 1) ** 0.8 for rank in range(len(users))]
+        owners = self.rng.choices(users, weights=weights, k=total)
+        return [(user_id, self.timestamp(created_at, 200)) for user_id, created_at in owners]
+
+    def _course(self, user_id: str, created_at: datetime) -> str:
+        config = self.config
+        course_id = self.uuid()
+        topic = self.rng.choice(TOPICS)
+        updated_at = self.timestamp(created_at, 30)
+        # Some learners have not started, some finished, most are in between
+        completion = self.rng.choice([0.0, 0.0, 1.0]) if self.rng.random() < 0.4 else self.rng.random()
+
+        rows = []
+        total_items = completed_items = 0
+        for module_index in range(1, config.modules_per_course + 1):
+            module_id = self.uuid()
+            lessons_done = [self.rng.random() < completion for _ in range(config.lessons_per_module)]
+            quiz_done = self.rng.random() < completion
+            module_done = all(lessons_done) and quiz_done
+            total_items += 1 + config.lessons_per_module + 1
+            completed_items += int(module_done) + sum(lessons_done) + int(quiz_done)
+            rows.append(("modules", (module_id, course_id, f"{topic} module {module_index}", module_index, module_done, created_at, updated_at)))
+            for lesson_index, done in enumerate(lessons_done, start=1):
+                rows.append(("lessons", (
+                    self.uuid(), module_id, f"{topic} lesson {module_index}.{lesson_index}", self.text(config.lesson_chars),
+                    lesson_index, done, created_at, updated_at
+                )))
+            questions = [
+                {
+                    "question": f"{topic} question {module_index}.{q}?",
+                    "choices": {"a": "Option A", "b": "Option B", "c": "Option C", "d": "Option D"},
+                    "answer": self.rng.choice("abcd")
+                }
+                for q in range(1, config.quiz_questions + 1)
+            ]
+            rows.append(("quizzes", (self.uuid(), module_id, json.dumps(questions), quiz_done, quiz_done and self.rng.random() < 0.7, created_at, updated_at)))
+
+        progress = round(completed_items / total_items * 100, 2) if total_items else 0.0
+        self.add("courses", (
+            course_id, user_id, f"{topic} for {self.rng.choice(DIFFICULTIES).lower()} learners", self.text(300),
+            self.rng.sample(SKILLS, 3), config.modules_per_course * config.lessons_per_module, self.rng.choice(DIFFICULTIES),
+            [f"Understand {self.rng.choice(WORDS)} {self.rng.choice(WORDS)}" for _ in range(3)], ["https://example.com/source"],
+            progress, progress >= 100, "completed", created_at, updated_at
+        ))
+        for table, row in rows:
+            self.add(table, row)
+        return course_id
+
+    def _guide(self, user_id: str, created_at: datetime) -> str:
+        guide_id = self.uuid()
+        topic = self.rng.choice(TOPICS)
+        self.add("guides", (
+            guide_id, user_id, f"{topic} guide", self.text(300), self.text(self.config.lesson_chars * 3),
+            ["https://example.com/source"], created_at, self.timestamp(created_at, 30)
+        ))
+        return guide_id
+
+    def _chat_session(self, table: str, message_column: str, user_id: str, parent_id: str, created_at: datetime) -> None:
+        session_id = self.uuid()
+        started_at = self.timestamp(created_at, 30)
+        message_count = self.rng.randint(1, self.config.messages_per_session * 2) // 2 * 2
+        messages = []
+        message_time = started_at
+        for order in range(1, message_count + 1):
+            message_time = message_time + timedelta(seconds=self.rng.randint(5, 600))
+            is_user = order % 2 == 1
+            content = self.text(self.rng.randint(40, 200) if is_user else self.rng.randint(200, 1200))
+            course_session_id = session_id if message_column == "course_session_id" else None
+            guide_session_id = session_id if message_column == "guide_session_id" else None
+            messages.append((self.uuid(), course_session_id, guide_session_id, content, is_user, order, message_time))
+            self.message_months.add(month_start(message_time))
+
+        self.add(table, (session_id, user_id, parent_id, self.uuid(), started_at, message_time, message_count))
+        for row in messages:
+            self.add("chat_messages", row)
+
+def _copy_value(value):
+    """Render a Python value for COPY ... WITH (FORMAT csv); None becomes NULL"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return "{" + ",".join('"' + str(item).replace("\\", "\\\\").replace('"', '\\"') + '"' for item in value) + "}"
+    return value
+
+def truncate_tables(connection) -> None:
+    """Remove existing data from every seeded table"""
+    cursor = connection.cursor()
+    try:
+        tables = ", ".join(reversed(list(TABLE_COLUMNS)))
+        cursor.execute(f"TRUNCATE {tables} CASCADE")
+        connection.commit()
+    finally:
+        cursor.close()
+
+def size_report(connection, tables: Optional[Sequence[str]] = None) -> List[dict]:
+    """Row estimates and on-disk sizes per table, after ANALYZE"""
+    tables = list(tables or TABLE_COLUMNS)
+    cursor = connection.cursor()
+    try:
+        for table in tables:
+            cursor.execute(f"ANALYZE {table}")
+        cursor.execute("""
+            SELECT c.relname AS table_name,
+                   c.reltuples::bigint AS row_estimate,
+                   pg_relation_size(c.oid) AS table_bytes,
+                   pg_indexes_size(c.oid) AS index_bytes,
+                   pg_total_relation_size(c.oid) AS total_bytes
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema() AND c.relname = ANY(%s)
+            ORDER BY pg_total_relation_size(c.oid) DESC
+        """, (tables,))
+        columns = [description[0] for description in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        connection.commit()
+        return rows
+    finally:
+        cursor.close()
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "kB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+def print_size_report(rows: List[dict]) -> None:
+    print("📊 Size report:")
+    print("-" * 78)
+    print(f"{'table':<24}{'rows':>14}{'table':>12}{'indexes':>12}{'total':>12}")
+    for row in rows:
+        print(f"{row['table_name']:<24}{row['row_estimate']:>14,}{_format_bytes(row['table_bytes']):>12}"
+              f"{_format_bytes(row['index_bytes']):>12}{_format_bytes(row['total_bytes']):>12}")
+    total = sum(row["total_bytes"] for row in rows)
+    print("-" * 78)
+    print(f"{'total':<24}{'':>14}{'':>12}{'':>12}{_format_bytes(total):>12}")
+
+def build_config(args: argparse.Namespace) -> ScaleConfig:
+    """Start from the preset and apply any explicit overrides"""
+    config = SCALE_PRESETS[args.scale]
+    overrides = {
+        f.name: getattr(args, f.name)
+        for f in fields(ScaleConfig)
+        if getattr(args, f.name, None) is not None
+    }
+    if "courses" in overrides:
+        # Keep the preset's ratios for whatever was not given explicitly
+        for name in ("users", "guides"):
+            if name not in overrides:
+                overrides[name] = max(1, overrides["courses"] * getattr(config, name) // config.courses)
+    config = replace(config, **overrides)
+    if config.departments > config.users:
+        config = replace(config, departments=config.users)
+    return config
+
+def _parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset for performance testing")
+    parser.add_argument("--scale", choices=list(SCALE_PRESETS), default="1k", help="Preset dataset size (by course count)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-rows", type=int, default=50_000, help="Rows buffered before each COPY round and commit")
+    parser.add_argument("--truncate", action="store_true", help="Empty the seeded tables first")
+    parser.add_argument("--report", action="store_true", help="Only print the size report")
+    for f in fields(ScaleConfig):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", dest=f.name, type=type(getattr(SCALE_PRESETS['1k'], f.name)), default=None)
+    return parser.parse_args(argv)
+
+def main(argv: List[str] = None) -> None:
+    args = _parse_args(argv)
+    connection = engine.raw_connection()
+    try:
+        if args.report:
+            print_size_report(size_report(connection))
+            return
+
+        config = build_config(args)
+        print(f"🌱 Seeding scale={args.scale} seed={args.seed}: {config}")
+        if args.truncate:
+            print("Truncating seeded tables...")
+            truncate_tables(connection)
+
+        started = time.perf_counter()
+        counts = SeedGenerator(config, args.seed, args.batch_rows, connection).generate()
+        elapsed = time.perf_counter() - started
+        total_rows = sum(counts.values())
+        for table, count in counts.items():
+            print(f"  {table:<24}{count:>14,}")
+        print(f"✅ Loaded {total_rows:,} rows in {elapsed:.1f}s ({total_rows / elapsed:,.0f} rows/s)")
+        print_size_report(size_report(connection))
+    finally:
+        connection.close()
+
+if __name__ == "__main__":
+    main()
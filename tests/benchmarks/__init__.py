@@ -0,0 +1 @@
+# Repository benchmarks; skipped unless BENCHMARK_DATABASE_URL is set
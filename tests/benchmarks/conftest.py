@@ -0,0 +1,189 @@
+"""
+Repository benchmark fixtures
+
+The suite only runs when BENCHMARK_DATABASE_URL points at a disposable
+PostgreSQL database: it is migrated to head, truncated and seeded once per
+session. Other settings:
+
+    BENCHMARK_SCALE                   seed_data preset (default 1k)
+    BENCHMARK_SEED                    dataset seed (default 42)
+    BENCHMARK_ITERATIONS              timed calls per method (default 20)
+    BENCHMARK_REGRESSION_THRESHOLD    allowed slowdown vs. baseline (default 0.25)
+    BENCHMARK_BASELINE_PATH           baseline JSON (default tests/benchmarks/baseline.json)
+    BENCHMARK_RESULTS_PATH            results JSON (default tests/benchmarks/results/latest.json)
+    BENCHMARK_UPDATE_BASELINE=1       write this run's results as the new baseline
+    BENCHMARK_REQUIRE_BASELINE=1      fail benchmarks that have no baseline entry (for CI)
+
+Without a baseline entry a benchmark is only measured: the regression gate
+is inactive for it, and the session ends with a warning listing them.
+"""
+import os
+import platform
+import subprocess
+import warnings
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from tests.benchmarks.recorder import run_benchmark, find_regressions, load_results, save_results
+
+BENCHMARK_DIR = Path(__file__).parent
+PROJECT_ROOT = BENCHMARK_DIR.parent.parent
+
+_results = {}
+_missing_baseline = []
+
+def _setting(name: str, default: str) -> str:
+    return os.environ.get(name, default)
+
+@pytest.fixture(scope="session")
+def bench_engine():
+    database_url = os.environ.get("BENCHMARK_DATABASE_URL")
+    if not database_url:
+        pytest.skip("BENCHMARK_DATABASE_URL is not set")
+
+    env = os.environ.copy()
+    env["DATABASE_URL"] = database_url
+    subprocess.run(["alembic", "upgrade", "head"], cwd=PROJECT_ROOT, env=env, check=True)
+
+    engine = create_engine(database_url, pool_pre_ping=True)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="session")
+def bench_dataset(bench_engine):
+    """Seed the benchmark database and pick representative rows"""
+    from scripts.seed_data import SeedGenerator, SCALE_PRESETS, truncate_tables
+
+    connection = bench_engine.raw_connection()
+    try:
+        truncate_tables(connection)
+        config = SCALE_PRESETS[_setting("BENCHMARK_SCALE", "1k")]
+        SeedGenerator(config, int(_setting("BENCHMARK_SEED", "42")), 50_000, connection).generate()
+    finally:
+        connection.close()
+
+    with bench_engine.connect() as conn:
+        # The busiest learner exercises the worst case of every per-user query
+        user_id = conn.execute(text("""
+            SELECT user_id FROM courses GROUP BY user_id ORDER BY COUNT(*) DESC, user_id LIMIT 1
+        """)).scalar()
+        course_id = conn.execute(text("""
+            SELECT id FROM courses WHERE user_id = :user_id ORDER BY created_at, id LIMIT 1
+        """), {"user_id": user_id}).scalar()
+        lesson_id = conn.execute(text("""
+            SELECT l.id FROM lessons l JOIN modules m ON l.module_id = m.id
+            WHERE m.course_id = :course_id ORDER BY m.order_index, l.index LIMIT 1
+        """), {"course_id": course_id}).scalar()
+        department_id = conn.execute(text("""
+            SELECT department_id FROM users GROUP BY department_id ORDER BY COUNT(*) DESC, department_id LIMIT 1
+        """)).scalar()
+        course_session_id = conn.execute(text("""
+            SELECT session_id FROM (
+                SELECT course_session_id AS session_id, COUNT(*) AS messages FROM chat_messages
+                WHERE course_session_id IS NOT NULL GROUP BY course_session_id
+            ) s ORDER BY messages DESC, session_id LIMIT 1
+        """)).scalar()
+
+    return SimpleNamespace(
+        user_id=user_id,
+        course_id=course_id,
+        lesson_id=lesson_id,
+        department_id=department_id,
+        course_session_id=course_session_id
+    )
+
+@pytest.fixture
+def bench_db(bench_engine, bench_dataset):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=bench_engine)()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+@pytest.fixture
+def bench_client(bench_engine, bench_dataset):
+    """The app with every request session bound to the benchmark database
+
+    Yields the test client and the session factory for checking results.
+    """
+    from fastapi.testclient import TestClient
+    from app.database.connection import get_db
+    from app.database.query_stats import install_query_stats
+    from app.main import app
+
+    install_query_stats(bench_engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=bench_engine)
+
+    def get_bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_bench_db
+    try:
+        yield TestClient(app), Session
+    finally:
+        app.dependency_overrides.clear()
+
+@pytest.fixture
+def bench_auth():
+    """Authorization header of a benchmark user"""
+    import jwt
+    from app.config import settings
+
+    def headers(user_id) -> dict:
+        token = jwt.encode({"user_id": str(user_id)}, settings.SECRET_KEY, algorithm="HS256")
+        return {"Authorization": f"Bearer {token}"}
+
+    return headers
+
+@pytest.fixture
+def benchmark(bench_engine):
+    """Measure an async repository call and fail if it regressed against the baseline"""
+    baseline = load_results(Path(_setting("BENCHMARK_BASELINE_PATH", str(BENCHMARK_DIR / "baseline.json"))))
+    threshold = float(_setting("BENCHMARK_REGRESSION_THRESHOLD", "0.25"))
+    iterations = int(_setting("BENCHMARK_ITERATIONS", "20"))
+
+    def measure(name, operation):
+        result = run_benchmark(name, bench_engine, operation, iterations=iterations)
+        _results[name] = result
+        updating = _setting("BENCHMARK_UPDATE_BASELINE", "") == "1"
+        if name not in baseline and not updating:
+            _missing_baseline.append(name)
+            if _setting("BENCHMARK_REQUIRE_BASELINE", "") == "1":
+                pytest.fail(f"{name} has no baseline; record one with BENCHMARK_UPDATE_BASELINE=1")
+            warnings.warn(f"{name} has no baseline, regression gate inactive")
+        problems = find_regressions(result, baseline.get(name), threshold)
+        if problems and not updating:
+            pytest.fail(f"{name} regressed: " + "; ".join(problems))
+        return result
+
+    return measure
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _results:
+        return
+
+    metadata = {
+        "scale": _setting("BENCHMARK_SCALE", "1k"),
+        "seed": int(_setting("BENCHMARK_SEED", "42")),
+        "iterations": int(_setting("BENCHMARK_ITERATIONS", "20")),
+        "python": platform.python_version()
+    }
+    save_results(Path(_setting("BENCHMARK_RESULTS_PATH", str(BENCHMARK_DIR / "results" / "latest.json"))), _results, metadata)
+    if _setting("BENCHMARK_UPDATE_BASELINE", "") == "1":
+        save_results(Path(_setting("BENCHMARK_BASELINE_PATH", str(BENCHMARK_DIR / "baseline.json"))), _results, metadata)
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if _missing_baseline:
+        terminalreporter.section("benchmark baseline", sep="!", red=True, bold=True)
+        terminalreporter.write_line(
+            f"NO BASELINE, GATE INACTIVE for {len(_missing_baseline)} benchmark(s): {', '.join(sorted(_missing_baseline))}",
+            red=True, bold=True
+        )
+        terminalreporter.write_line("Record one with BENCHMARK_UPDATE_BASELINE=1 and commit tests/benchmarks/baseline.json")
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import statistics
+import time
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+@dataclass
+class BenchmarkResult:
+    """Measurements for one benchmarked repository method"""
+
+    name: str
+    iterations: int
+    queries: float  # Statements per call
+    rows: float  # Rows returned or affected per call
+    median_ms: float
+    p95_ms: float
+    min_ms: float
+    samples_ms: List[float] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("samples_ms")
+        return data
+
+class QueryRecorder:
+    """Counts statements and rows issued through an engine while active"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.queries = 0
+        self.rows = 0
+        self.statements: List[str] = []
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.queries += 1
+        self.statements.append(statement)
+        if cursor.rowcount and cursor.rowcount > 0:
+            self.rows += cursor.rowcount
+
+    def reset(self) -> None:
+        self.queries = 0
+        self.rows = 0
+        self.statements = []
+
+    def __enter__(self) -> "QueryRecorder":
+        event.listen(self.engine, "after_cursor_execute", self._after_cursor_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        event.remove(self.engine, "after_cursor_execute", self._after_cursor_execute)
+
+def run_benchmark(
+    name: str,
+    engine: Engine,
+    operation: Callable[[], Awaitable[Any]],
+    iterations: int = 20,
+    warmup: int = 3
+) -> BenchmarkResult:
+    """Time an async repository call and count the SQL it issues"""
+
+    async def measure() -> BenchmarkResult:
+        for _ in range(warmup):
+            await operation()
+
+        samples = []
+        with QueryRecorder(engine) as recorder:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                await operation()
+                samples.append((time.perf_counter() - start) * 1000)
+
+        ordered = sorted(samples)
+        return BenchmarkResult(
+            name=name,
+            iterations=iterations,
+            queries=recorder.queries / iterations,
+            rows=recorder.rows / iterations,
+            median_ms=round(statistics.median(samples), 3),
+            p95_ms=round(ordered[max(0, int(len(ordered) * 0.95) - 1)], 3),
+            min_ms=round(ordered[0], 3),
+            samples_ms=samples
+        )
+
+    return asyncio.run(measure())
+
+def find_regressions(result: BenchmarkResult, baseline: Optional[Dict[str, Any]], threshold: float) -> List[str]:
+    """Compare a result with its baseline entry; query count may never grow"""
+    if not baseline:
+        return []
+
+    problems = []
+    if result.queries > baseline["queries"]:
+        problems.append(f"queries {baseline['queries']} -> {result.queries}")
+    if baseline["rows"] and result.rows > baseline["rows"] * (1 + threshold):
+        problems.append(f"rows {baseline['rows']} -> {result.rows} (>{threshold:.0%})")
+    if baseline["median_ms"] and result.median_ms > baseline["median_ms"] * (1 + threshold):
+        problems.append(f"median {baseline['median_ms']}ms -> {result.median_ms}ms (>{threshold:.0%})")
+    return problems
+
+def load_results(path: Path) -> Dict[str, Dict[str, Any]]:
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f).get("benchmarks", {})
+
+def save_results(path: Path, results: Dict[str, BenchmarkResult], metadata: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"metadata": metadata, "benchmarks": {name: r.to_dict() for name, r in sorted(results.items())}}, f, indent=2)
@@ -0,0 +1,95 @@
+"""
+PATCH /course/{course_id}/progress against the seeded benchmark database
+
+The batch is applied in one transaction, so these need PostgreSQL.
+"""
+import pytest
+from uuid import uuid4
+from sqlalchemy import text
+
+@pytest.fixture
+def progress_case(bench_client, bench_dataset):
+    """Two lessons of the benchmark course and a lesson of another course"""
+    _, Session = bench_client
+    with Session() as db:
+        lesson_ids = [row.id for row in db.execute(text("""
+            SELECT l.id FROM lessons l JOIN modules m ON l.module_id = m.id
+            WHERE m.course_id = :course_id ORDER BY m.order_index, l.index LIMIT 2
+        """), {"course_id": str(bench_dataset.course_id)})]
+        foreign_lesson_id = db.execute(text("""
+            SELECT l.id FROM lessons l JOIN modules m ON l.module_id = m.id
+            WHERE m.course_id <> :course_id LIMIT 1
+        """), {"course_id": str(bench_dataset.course_id)}).scalar()
+        # Known starting point
+        db.execute(text("UPDATE lessons SET is_completed = false WHERE id = ANY(CAST(:ids AS uuid[]))"), {"ids": [str(i) for i in lesson_ids]})
+        db.commit()
+    return lesson_ids, foreign_lesson_id
+
+def _completed(Session, lesson_ids):
+    with Session() as db:
+        rows = db.execute(text("SELECT id, is_completed FROM lessons WHERE id = ANY(CAST(:ids AS uuid[]))"), {"ids": [str(i) for i in lesson_ids]})
+        return {row.id: row.is_completed for row in rows}
+
+def _progress(Session, course_id):
+    with Session() as db:
+        return db.execute(text("SELECT progress FROM courses WHERE id = :id"), {"id": str(course_id)}).scalar()
+
+def test_foreign_lesson_rolls_back_the_whole_batch(bench_client, bench_auth, bench_dataset, progress_case):
+    """An ID from another course fails the request and commits none of the batch"""
+    client, Session = bench_client
+    lesson_ids, foreign_lesson_id = progress_case
+    progress = _progress(Session, bench_dataset.course_id)
+
+    response = client.patch(
+        f"/api/v1/course/{bench_dataset.course_id}/progress",
+        json={"lessons": [{"id": str(lesson_ids[0]), "is_completed": True}, {"id": str(foreign_lesson_id), "is_completed": True}]},
+        headers=bench_auth(bench_dataset.user_id)
+    )
+
+    assert response.status_code == 400
+    assert str(foreign_lesson_id) in response.json()["detail"]
+    assert _completed(Session, lesson_ids[:1]) == {lesson_ids[0]: False}
+    assert _progress(Session, bench_dataset.course_id) == progress
+
+def test_last_change_for_a_lesson_wins(bench_client, bench_auth, bench_dataset, progress_case):
+    """Repeated IDs in one batch count once, with their last value"""
+    client, Session = bench_client
+    lesson_ids, _ = progress_case
+
+    response = client.patch(
+        f"/api/v1/course/{bench_dataset.course_id}/progress",
+        json={"lessons": [
+            {"id": str(lesson_ids[0]), "is_completed": True},
+            {"id": str(lesson_ids[1]), "is_completed": True},
+            {"id": str(lesson_ids[0]), "is_completed": False}
+        ]},
+        headers=bench_auth(bench_dataset.user_id)
+    )
+
+    assert response.status_code == 200
+    assert response.json()["updated_lessons"] == 2
+    assert _completed(Session, lesson_ids) == {lesson_ids[0]: False, lesson_ids[1]: True}
+
+def test_idempotency_key_replays_the_batch_response(bench_client, bench_auth, bench_dataset, progress_case):
+    """A retried batch returns the stored response without applying the changes again"""
+    client, Session = bench_client
+    lesson_ids, _ = progress_case
+    url = f"/api/v1/course/{bench_dataset.course_id}/progress"
+    body = {"lessons": [{"id": str(lesson_ids[0]), "is_completed": True}]}
+    headers = {**bench_auth(bench_dataset.user_id), "Idempotency-Key": str(uuid4())}
+
+    first = client.patch(url, json=body, headers=headers)
+    assert first.status_code == 200
+
+    # Changed by someone else in between; a replay must not overwrite it
+    with Session() as db:
+        db.execute(text("UPDATE lessons SET is_completed = false WHERE id = :id"), {"id": str(lesson_ids[0])})
+        db.commit()
+
+    second = client.patch(url, json=body, headers=headers)
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert _completed(Session, lesson_ids[:1]) == {lesson_ids[0]: False}
+
+    reused = client.patch(url, json={"lessons": [{"id": str(lesson_ids[0]), "is_completed": False}]}, headers=headers)
+    assert reused.status_code == 422
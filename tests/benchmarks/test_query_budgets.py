@@ -0,0 +1,62 @@
+"""
+Query budgets of the hot request paths
+
+These go through the real app (middleware, handlers, services and
+repositories) against the seeded benchmark database, so a change that adds
+a statement per request, or one per lesson or message, fails here.
+"""
+import httpx
+import pytest
+from sqlalchemy import text
+from app.config import settings
+from internal.ai.agent.agent_client import AgentClient
+from internal.ai.chat.service import chat_service as chat_service_module
+from internal.ai.chat.service.conversation_memory import ConversationMemory
+from internal.ai.chat.service.message_buffer import ChatMessageBuffer
+from internal.ai.chat.service.session_cache import ChatSessionCache, SessionTouchBuffer
+from internal.ai.chat.service.session_pool import AgentSessionPool
+from tests.load.fake_agent import FakeAgentConfig, create_fake_agent_app
+
+def test_lesson_completion_query_budget(bench_client, bench_auth, bench_dataset, query_budget):
+    """Completing a lesson costs a fixed number of statements"""
+    client, _ = bench_client
+    url = f"/api/v1/course/lesson/{bench_dataset.lesson_id}/complete"
+    headers = bench_auth(bench_dataset.user_id)
+    # Settle the module's completion state so no module flips below
+    assert client.patch(url, json={"is_completed": True}, headers=headers).status_code == 200
+
+    # verify, lesson update, module check, progress read, progress update
+    with query_budget(5):
+        response = client.patch(url, json={"is_completed": True}, headers=headers)
+    assert response.status_code == 200
+
+def test_chat_turn_query_budget(bench_client, bench_auth, bench_dataset, query_budget, monkeypatch):
+    """A chat turn loads the course and writes the exchange; the session and history are read once"""
+    client, Session = bench_client
+    with Session() as db:
+        user_id, course_id = db.execute(text("""
+            SELECT user_id, course_id FROM course_chat_sessions WHERE id = :id
+        """), {"id": str(bench_dataset.course_session_id)}).one()
+
+    agent = create_fake_agent_app(FakeAgentConfig(latency_ms=0, latency_jitter_ms=0))
+    monkeypatch.setattr(chat_service_module, "agent_client", AgentClient("http://fake-agent", transport=httpx.ASGITransport(app=agent)))
+    monkeypatch.setattr(chat_service_module, "message_buffer", ChatMessageBuffer(interval=0, max_batch=500, session_factory=Session))
+    monkeypatch.setattr(chat_service_module, "session_cache", ChatSessionCache(100))
+    monkeypatch.setattr(chat_service_module, "session_touches", SessionTouchBuffer(3600, session_factory=Session))
+    monkeypatch.setattr(chat_service_module, "conversation_memory", ConversationMemory(100))
+    monkeypatch.setattr(chat_service_module, "session_pool", AgentSessionPool(0, 10, 60))
+    # Summaries run in the background and are not part of a turn
+    monkeypatch.setattr(settings, "CHAT_SUMMARY_EVERY_TURNS", 1_000_000)
+
+    url = f"/api/v1/ai/chat/course/{course_id}"
+    headers = bench_auth(user_id)
+
+    # course, session, latest messages, insert
+    with query_budget(4):
+        response = client.post(url, json={"message": "What is next?"}, headers=headers)
+    assert response.status_code == 200
+
+    # course, insert
+    with query_budget(2):
+        response = client.post(url, json={"message": "And after that?"}, headers=headers)
+    assert response.status_code == 200
@@ -0,0 +1,19 @@
+from tests.benchmarks.recorder import BenchmarkResult, find_regressions
+
+def _result(queries=3, rows=10, median_ms=5.0):
+    return BenchmarkResult(name="x", iterations=5, queries=queries, rows=rows, median_ms=median_ms, p95_ms=median_ms, min_ms=median_ms)
+
+def test_no_baseline_never_fails():
+    """Test that methods without a baseline entry are only recorded"""
+    assert find_regressions(_result(), None, 0.25) == []
+
+def test_slowdown_within_threshold_passes():
+    """Test that noise below the threshold is tolerated"""
+    baseline = {"queries": 3, "rows": 10, "median_ms": 5.0}
+    assert find_regressions(_result(median_ms=6.0), baseline, 0.25) == []
+
+def test_extra_query_or_large_slowdown_fails():
+    """Test that any new statement, or a slowdown past the threshold, is reported"""
+    baseline = {"queries": 3, "rows": 10, "median_ms": 5.0}
+    assert len(find_regressions(_result(queries=4), baseline, 0.25)) == 1
+    assert len(find_regressions(_result(median_ms=7.0, rows=20), baseline, 0.25)) == 2
@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+from sqlalchemy import text
+from internal.course.model.course_dto import CompletionChange
+from internal.course.repository.course_repository_db import DatabaseCourseRepository
+from internal.user.repository.user_repository_db import DatabaseUserRepository
+from internal.hr.company.repository.company_repository_db import DatabaseCompanyRepository
+from internal.hr.department.repository.department_repository_db import DatabaseDepartmentRepository
+from internal.hr.employee.repository.employee_repository_db import DatabaseEmployeeRepository
+from internal.ai.chat.model.chat_dto import ChatExchange, CHAT_KIND_COURSE
+from internal.ai.chat.repository.message_repository import MessageRepository
+
+def test_course_get_course_by_id(benchmark, bench_db, bench_dataset):
+    repository = DatabaseCourseRepository(bench_db)
+    result = benchmark(
+        "course.get_course_by_id",
+        lambda: repository.get_course_by_id(bench_dataset.course_id, bench_dataset.user_id)
+    )
+    assert result.queries > 0
+
+def test_course_get_courses_by_user(benchmark, bench_db, bench_dataset):
+    repository = DatabaseCourseRepository(bench_db)
+    benchmark(
+        "course.get_courses_by_user",
+        lambda: repository.get_courses_by_user(bench_dataset.user_id, limit=10, offset=0)
+    )
+
+def test_course_update_lesson_completion(benchmark, bench_db, bench_dataset):
+    repository = DatabaseCourseRepository(bench_db)
+    state = {"completed": False}
+
+    async def toggle():
+        state["completed"] = not state["completed"]
+        return await repository.update_lesson_completion(bench_dataset.lesson_id, bench_dataset.user_id, state["completed"])
+
+    benchmark("course.update_lesson_completion", toggle)
+
+def test_course_update_progress_batch(benchmark, bench_db, bench_dataset):
+    """All lessons of a course toggled in one call (compare with N x update_lesson_completion)"""
+    repository = DatabaseCourseRepository(bench_db)
+    lesson_ids = [row.id for row in bench_db.execute(text("""
+        SELECT l.id FROM lessons l JOIN modules m ON l.module_id = m.id WHERE m.course_id = :course_id
+    """), {"course_id": str(bench_dataset.course_id)})]
+    state = {"completed": False}
+
+    async def toggle_all():
+        state["completed"] = not state["completed"]
+        changes = [CompletionChange(id=lesson_id, is_completed=state["completed"]) for lesson_id in lesson_ids]
+        return await repository.update_course_progress_batch(bench_dataset.course_id, bench_dataset.user_id, changes, [])
+
+    result = benchmark("course.update_course_progress_batch", toggle_all)
+    # verify, lessons, module check, modules, progress read, progress update; whatever the course size
+    assert result.queries <= 6
+
+def test_user_get_user_summary(benchmark, bench_db, bench_dataset):
+    repository = DatabaseUserRepository(bench_db)
+    benchmark("user.get_user_summary", lambda: repository.get_user_summary(bench_dataset.user_id))
+
+def test_hr_company_statistics(benchmark, bench_db):
+    repository = DatabaseCompanyRepository(bench_db)
+    benchmark("hr.company.get_company_statistics", repository.get_company_statistics)
+
+def test_hr_department_overview(benchmark, bench_db):
+    repository = DatabaseDepartmentRepository(bench_db)
+    benchmark("hr.department.get_department_overview", repository.get_department_overview)
+
+def test_hr_department_detail(benchmark, bench_db, bench_dataset):
+    repository = DatabaseDepartmentRepository(bench_db)
+    benchmark(
+        "hr.department.get_department_detail",
+        lambda: repository.get_department_detail(str(bench_dataset.department_id))
+    )
+
+def test_hr_department_list(benchmark, bench_db):
+    repository = DatabaseDepartmentRepository(bench_db)
+    benchmark("hr.department.get_department_list", repository.get_department_list)
+
+def test_hr_department_employees(benchmark, bench_db, bench_dataset):
+    repository = DatabaseDepartmentRepository(bench_db)
+    benchmark(
+        "hr.department.get_department_employees",
+        lambda: repository.get_department_employees(str(bench_dataset.department_id))
+    )
+
+def test_hr_department_employees_by_completion(benchmark, bench_db, bench_dataset):
+    """A later page of the busiest department, sorted by the precomputed completion rate and searched"""
+    repository = DatabaseDepartmentRepository(bench_db)
+    benchmark(
+        "hr.department.get_department_employees_by_completion",
+        lambda: repository.get_department_employees(
+            str(bench_dataset.department_id), limit=50, offset=200, sort="completion_rate", descending=True, search="a"
+        )
+    )
+
+def test_hr_employee_detail(benchmark, bench_db, bench_dataset):
+    repository = DatabaseEmployeeRepository(bench_db)
+    benchmark("hr.employee.get_employee_detail", lambda: repository.get_employee_detail(bench_dataset.user_id))
+
+def test_chat_message_append(benchmark, bench_db, bench_dataset):
+    repository = MessageRepository(bench_db)
+    session_id = UUID(str(bench_dataset.course_session_id))
+
+    async def append():
+        exchange = ChatExchange(
+            kind=CHAT_KIND_COURSE,
+            session_id=session_id,
+            user_message_id=uuid4(),
+            ai_message_id=uuid4(),
+            user_content="Benchmark question?",
+            ai_content="Benchmark answer.",
+            created_at=datetime.now(timezone.utc)
+        )
+        return await repository.save_exchanges([exchange])
+
+    benchmark("chat.message_append", append)
+
+def test_chat_history_read(benchmark, bench_db, bench_dataset):
+    """Latest messages of the busiest session; the session start prunes older partitions"""
+    repository = MessageRepository(bench_db)
+    session_id = UUID(str(bench_dataset.course_session_id))
+    started_at = bench_db.execute(text("SELECT created_at FROM course_chat_sessions WHERE id = :id"), {"id": str(session_id)}).scalar()
+    result = benchmark(
+        "chat.history_read",
+        lambda: repository.get_session_messages(session_id, True, started_at, limit=50)
+    )
+    assert result.queries == 1
@@ -0,0 +1,80 @@
+"""Fake repositories and services shared by several test modules"""
+from uuid import uuid4
+from internal.ai.course.model.course_dto import AiCourseGenerateResponse
+from internal.ai.course.repository.ai_course_repository import AiCourseRepository
+from internal.course.repository.course_repository import CourseRepository
+
+class VersionedCourseRepository(CourseRepository):
+    """Serves one course and counts full loads"""
+
+    def __init__(self, course):
+        self.course = course
+        self.version = "v1"
+        self.loads = 0
+
+    async def get_course_version(self, course_id, user_id):
+        return self.version if course_id == self.course.id else None
+
+    async def get_course_by_id(self, course_id, user_id):
+        self.loads += 1
+        return self.course
+
+    async def get_courses_by_user(self, user_id, limit=10, offset=0):
+        raise NotImplementedError
+
+    async def update_lesson_completion(self, lesson_id, user_id, is_completed):
+        raise NotImplementedError
+
+    async def update_quiz_completion(self, quiz_id, user_id, is_completed):
+        raise NotImplementedError
+
+    async def update_course_progress_batch(self, course_id, user_id, lessons, quizzes):
+        raise NotImplementedError
+
+    async def get_module_answer_index(self, module_id, user_id):
+        raise NotImplementedError
+
+    async def save_quiz_results(self, course_id, user_id, results):
+        raise NotImplementedError
+
+    async def calculate_course_progress(self, course_id, user_id):
+        raise NotImplementedError
+
+    async def update_course_progress(self, course_id, user_id, progress):
+        raise NotImplementedError
+
+    async def check_and_update_module_completion(self, course_id, user_id):
+        raise NotImplementedError
+
+class InMemoryAiCourseRepository(AiCourseRepository):
+    """In-memory AI course repository recording streamed writes"""
+
+    def __init__(self):
+        self.course_id = None
+        self.modules = []
+        self.statuses = []
+
+    async def save_course(self, user_id, external_response):
+        self.course_id = uuid4()
+        self.modules = list(external_response.modules)
+        return AiCourseGenerateResponse(course_id=self.course_id, external_response=external_response)
+
+    async def create_course_header(self, user_id, course_header):
+        assert course_header.modules == []
+        self.course_id = uuid4()
+        return self.course_id
+
+    async def append_module(self, course_id, module):
+        assert course_id == self.course_id
+        self.modules.append(module)
+
+    async def update_generation_status(self, course_id, generation_status):
+        self.statuses.append(generation_status)
+
+class StubUserService:
+    async def get_user_by_id(self, user_id):
+        return type("User", (), {"cv": "cv"})()
+
+class StubOAuthService:
+    async def get_valid_google_drive_token(self, user_id):
+        return "drive-token"
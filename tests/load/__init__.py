@@ -0,0 +1 @@
+# Load testing tools; run as modules, not collected by pytest
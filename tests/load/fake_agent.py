@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Fake AI agent for local load testing
+
+Implements the agent endpoints the backend calls, with configurable latency,
+payload sizes and error rates:
+
+    python -m tests.load.fake_agent --port 8001 --latency-ms 300 --error-rate 0.02
+
+Then point the backend at it with AI_API_BASE_URL=http://localhost:8001.
+"""
+import argparse
+import asyncio
+import json
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List
+from uuid import uuid4
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+@dataclass
+class FakeAgentConfig:
+    """Behaviour knobs for the fake agent"""
+
+    latency_ms: float = 50.0  # Base latency for chat and session calls
+    latency_jitter_ms: float = 25.0
+    generation_latency_ms: float = 500.0  # Total time to "generate" a course or guide
+    error_rate: float = 0.0  # Fraction of calls answered with error_status
+    error_status: int = 503
+    modules: int = 5
+    lessons_per_module: int = 4
+    quiz_questions_per_module: int = 5
+    lesson_chars: int = 2000
+    reply_chars: int = 400
+    reply_chunks: int = 4  # Partial events per /run_sse answer
+    sse_enabled: bool = True  # Without it /run_sse answers 404, like agents that cannot stream
+    seed: int = 42
+
+def create_fake_agent_app(config: FakeAgentConfig) -> FastAPI:
+    """Build the fake agent application"""
+    app = FastAPI(title="Fake AI agent")
+    rng = random.Random(config.seed)
+    app.state.config = config
+    app.state.calls = {}
+
+    def count(endpoint: str) -> None:
+        app.state.calls[endpoint] = app.state.calls.get(endpoint, 0) + 1
+
+    async def delay(base_ms: float) -> None:
+        jitter = rng.uniform(-config.latency_jitter_ms, config.latency_jitter_ms) if config.latency_jitter_ms else 0.0
+        seconds = max(0.0, base_ms + jitter) / 1000
+        if seconds:
+            await asyncio.sleep(seconds)
+
+    def should_fail() -> bool:
+        return config.error_rate > 0 and rng.random() < config.error_rate
+
+    def error_response() -> JSONResponse:
+        return JSONResponse(status_code=config.error_status, content={"detail": "Injected fake agent failure"})
+
+    def text(chars: int, label: str) -> str:
+        sentence = f"{label} explains the topic step by step with examples. "
+        return (sentence * (chars // len(sentence) + 1))[:chars]
+
+    def course_header(prompt: str) -> Dict[str, Any]:
+        return {
+            "title": f"Course: {prompt[:60]}",
+            "description": text(300, "This course"),
+            "estimated_duration": config.modules * config.lessons_per_module,
+            "learning_objectives": [f"Objective {i}" for i in range(1, 4)],
+            "source_from": ["https://example.com/source"],
+            "difficulty": "Beginner",
+            "skills": ["python", "testing"]
+        }
+
+    def module(index: int) -> Dict[str, Any]:
+        return {
+            "title": f"Module {index}",
+            "index": index,
+            "lessons": [
+                {"title": f"Lesson {index}.{i}", "content": text(config.lesson_chars, f"Lesson {index}.{i}"), "index": i}
+                for i in range(1, config.lessons_per_module + 1)
+            ],
+            "quiz": [
+                {
+                    "question": f"Question {index}.{i}?",
+                    "choices": {"a": "First", "b": "Second", "c": "Third", "d": "Fourth"},
+                    "answer": rng.choice(["a", "b", "c", "d"])
+                }
+                for i in range(1, config.quiz_questions_per_module + 1)
+            ]
+        }
+
+    @app.post("/apps/follow_up_agent/users/{user_id}/sessions/{session_id}")
+    async def create_session(user_id: str, session_id: str):
+        count("session")
+        await delay(config.latency_ms)
+        if should_fail():
+            return error_response()
+        return {"id": session_id, "session_id": session_id, "app_name": "follow_up_agent", "user_id": user_id, "state": {}, "events": []}
+
+    def reply_to(body: Dict[str, Any]) -> str:
+        question = body.get("new_message", {}).get("parts", [{}])[0].get("text", "")
+        return f"Answer to: {question[-80:]} " + text(config.reply_chars, "The answer")
+
+    def model_event(reply: str, partial: bool = False) -> Dict[str, Any]:
+        event = {"content": {"role": "model", "parts": [{"text": reply}]}, "author": "follow_up_agent", "id": str(uuid4())}
+        if partial:
+            event["partial"] = True
+        return event
+
+    @app.post("/run")
+    async def run(request: Request):
+        count("run")
+        body = await request.json()
+        await delay(config.latency_ms)
+        if should_fail():
+            return error_response()
+        return [model_event(reply_to(body))]
+
+    @app.post("/run_sse")
+    async def run_sse(request: Request):
+        count("run_sse")
+        if not config.sse_enabled:
+            return JSONResponse(status_code=404, content={"detail": "Not Found"})
+        body = await request.json()
+        if should_fail():
+            await delay(config.latency_ms)
+            return error_response()
+        reply = reply_to(body)
+
+        async def events():
+            # Token streaming: partial chunks, then the aggregated final event
+            size = len(reply) // max(1, config.reply_chunks) + 1
+            for start in range(0, len(reply), size):
+                await delay(config.latency_ms / max(1, config.reply_chunks))
+                yield f"data: {json.dumps(model_event(reply[start:start + size], partial=True))}\n\n"
+            yield f"data: {json.dumps(model_event(reply))}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/course/generate")
+    async def generate_course(request: Request):
+        count("course")
+        body = await request.json()
+        if should_fail():
+            await delay(config.latency_ms)
+            return error_response()
+
+        header = course_header(body.get("prompt", ""))
+        if "application/x-ndjson" not in request.headers.get("accept", ""):
+            await delay(config.generation_latency_ms)
+            return {**header, "modules": [module(i) for i in range(1, config.modules + 1)]}
+
+        async def events():
+            per_module_ms = config.generation_latency_ms / max(1, config.modules)
+            yield json.dumps({"type": "course", **header}) + "\n"
+            for i in range(1, config.modules + 1):
+                await delay(per_module_ms)
+                yield json.dumps({"type": "module", **module(i)}) + "\n"
+            yield json.dumps({"type": "done"}) + "\n"
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    @app.post("/guide/generate")
+    async def generate_guide(request: Request):
+        count("guide")
+        body = await request.json()
+        await delay(config.generation_latency_ms)
+        if should_fail():
+            return error_response()
+        return {
+            "title": f"Guide: {body.get('prompt', '')[:60]}",
+            "description": text(300, "This guide"),
+            "content": text(config.lesson_chars * config.modules, "The guide"),
+            "source_from": ["https://example.com/source"]
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return {"calls": app.state.calls}
+
+    return app
+
+def _parse_args(argv: List[str] = None) -> argparse.Namespace:
+    defaults = FakeAgentConfig()
+    parser = argparse.ArgumentParser(description="Run the fake AI agent")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--latency-jitter-ms", type=float, default=defaults.latency_jitter_ms)
+    parser.add_argument("--generation-latency-ms", type=float, default=defaults.generation_latency_ms)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--error-status", type=int, default=defaults.error_status)
+    parser.add_argument("--modules", type=int, default=defaults.modules)
+    parser.add_argument("--lessons-per-module", type=int, default=defaults.lessons_per_module)
+    parser.add_argument("--quiz-questions-per-module", type=int, default=defaults.quiz_questions_per_module)
+    parser.add_argument("--lesson-chars", type=int, default=defaults.lesson_chars)
+    parser.add_argument("--reply-chars", type=int, default=defaults.reply_chars)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    return parser.parse_args(argv)
+
+def main(argv: List[str] = None) -> None:
+    import uvicorn
+
+    args = _parse_args(argv)
+    config = FakeAgentConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        generation_latency_ms=args.generation_latency_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        modules=args.modules,
+        lessons_per_module=args.lessons_per_module,
+        quiz_questions_per_module=args.quiz_questions_per_module,
+        lesson_chars=args.lesson_chars,
+        reply_chars=args.reply_chars,
+        seed=args.seed
+    )
+    uvicorn.run(create_fake_agent_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
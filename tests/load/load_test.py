@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for the backend API
+
+Virtual users log in once, then loop over course listing, course detail,
+lesson completion toggles and chat until the run ends. Latency percentiles
+and throughput are reported per endpoint.
+
+    python -m tests.load.fake_agent --port 8001 &
+    AI_API_BASE_URL=http://localhost:8001 uvicorn app.main:app --port 9000 &
+    python -m tests.load.load_test --base-url http://localhost:9000 --users 50 --duration 60 --register
+
+Users are loadtest-<n>@example.com with a shared password; pass --register on
+the first run to create them. Courses must already exist for those users
+(seed them or generate one per user against the fake agent with --generate).
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import httpx
+
+API_PREFIX = "/api/v1"
+
+# Relative weight of each action in a virtual user's loop
+DEFAULT_MIX = {
+    "list_courses": 40,
+    "course_detail": 30,
+    "toggle_lesson": 15,
+    "chat": 15
+}
+
+@dataclass
+class EndpointStats:
+    """Latency samples and status counts for one endpoint"""
+
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    errors: int = 0
+
+    def record(self, seconds: float, status_code: Optional[int]) -> None:
+        self.latencies.append(seconds)
+        if status_code is None:
+            self.errors += 1
+            return
+        self.statuses[status_code] += 1
+        if status_code >= 400:
+            self.errors += 1
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of the samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class LoadTestRecorder:
+    """Collects per-endpoint measurements for a run"""
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send a request and record it under the endpoint label"""
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.endpoints[endpoint].record(time.perf_counter() - start, None)
+            return None
+        self.endpoints[endpoint].record(time.perf_counter() - start, response.status_code)
+        return response
+
+    def finish(self) -> None:
+        self.finished_at = time.perf_counter()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        result = {}
+        for endpoint, stats in sorted(self.endpoints.items()):
+            count = len(stats.latencies)
+            result[endpoint] = {
+                "requests": count,
+                "errors": stats.errors,
+                "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(stats.latencies, 50) * 1000, 2),
+                "p95_ms": round(percentile(stats.latencies, 95) * 1000, 2),
+                "p99_ms": round(percentile(stats.latencies, 99) * 1000, 2),
+                "max_ms": round(max(stats.latencies) * 1000, 2) if count else 0.0,
+                "statuses": dict(stats.statuses)
+            }
+        return result
+
+    def report(self) -> str:
+        lines = [f"{'endpoint':<28}{'reqs':>8}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+        for endpoint, row in self.summary().items():
+            lines.append(
+                f"{endpoint:<28}{row['requests']:>8}{row['errors']:>8}{row['throughput_rps']:>9}"
+                f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+            )
+        return "\n".join(lines)
+
+class VirtualUser:
+    """One simulated learner"""
+
+    def __init__(self, index: int, args: argparse.Namespace, client: httpx.AsyncClient, recorder: LoadTestRecorder, rng: random.Random):
+        self.email = f"{args.email_prefix}-{index}@example.com"
+        self.index = index
+        self.args = args
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.headers: Dict[str, str] = {}
+        self.course_ids: List[str] = []
+        self.lesson_ids: List[str] = []
+
+    async def register(self) -> None:
+        await self.recorder.request(
+            self.client, "register", "POST", f"{API_PREFIX}/users/register",
+            json={"name": f"Load Test {self.index}", "email": self.email, "password": self.args.password}
+        )
+
+    async def login(self) -> bool:
+        response = await self.recorder.request(
+            self.client, "login", "POST", f"{API_PREFIX}/users/login",
+            json={"email": self.email, "password": self.args.password}
+        )
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def generate_course(self) -> None:
+        await self.recorder.request(
+            self.client, "generate_course", "POST", f"{API_PREFIX}/ai/course/generate",
+            headers=self.headers, timeout=self.args.generation_timeout,
+            json={"token_github": "", "token_drive": "", "prompt": f"Load test course {self.index}"}
+        )
+
+    async def list_courses(self) -> None:
+        response = await self.recorder.request(self.client, "list_courses", "GET", f"{API_PREFIX}/course", headers=self.headers)
+        if response is not None and response.status_code == 200:
+            self.course_ids = [course["id"] for course in response.json().get("courses", [])]
+
+    async def course_detail(self) -> None:
+        if not self.course_ids:
+            await self.list_courses()
+            if not self.course_ids:
+                return
+        course_id = self.rng.choice(self.course_ids)
+        response = await self.recorder.request(self.client, "course_detail", "GET", f"{API_PREFIX}/course/{course_id}", headers=self.headers)
+        if response is not None and response.status_code == 200:
+            self.lesson_ids = [
+                lesson["id"]
+                for module in response.json().get("modules", [])
+                for lesson in module.get("lessons", [])
+            ]
+
+    async def toggle_lesson(self) -> None:
+        if not self.lesson_ids:
+            await self.course_detail()
+            if not self.lesson_ids:
+                return
+        lesson_id = self.rng.choice(self.lesson_ids)
+        await self.recorder.request(
+            self.client, "toggle_lesson", "PATCH", f"{API_PREFIX}/course/lesson/{lesson_id}/complete",
+            headers=self.headers, json={"is_completed": self.rng.random() < 0.7}
+        )
+
+    async def chat(self) -> None:
+        if not self.course_ids:
+            await self.list_courses()
+            if not self.course_ids:
+                return
+        course_id = self.rng.choice(self.course_ids)
+        await self.recorder.request(
+            self.client, "chat", "POST", f"{API_PREFIX}/ai/chat/course/{course_id}",
+            headers=self.headers, json={"message": f"Question {self.rng.randint(1, 1000)} about this course?"}
+        )
+
+    async def run(self, deadline: float, mix: Dict[str, int]) -> None:
+        if self.args.register:
+            await self.register()
+        if not await self.login():
+            return
+        if self.args.generate:
+            await self.generate_course()
+
+        actions = list(mix)
+        weights = [mix[action] for action in actions]
+        while time.perf_counter() < deadline:
+            action = self.rng.choices(actions, weights=weights)[0]
+            await getattr(self, action)()
+            if self.args.think_time_ms:
+                await asyncio.sleep(self.rng.uniform(0, self.args.think_time_ms) / 1000)
+
+async def run_load_test(args: argparse.Namespace) -> LoadTestRecorder:
+    """Run all virtual users against the target and return the recorder"""
+    recorder = LoadTestRecorder()
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    mix = {action: weight for action, weight in DEFAULT_MIX.items() if action not in args.skip}
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        deadline = time.perf_counter() + args.ramp_up + args.duration
+        users = []
+        for index in range(args.users):
+            user = VirtualUser(index, args, client, recorder, random.Random(args.seed + index))
+            users.append(asyncio.create_task(user.run(deadline, mix)))
+            if args.ramp_up:
+                await asyncio.sleep(args.ramp_up / args.users)
+        await asyncio.gather(*users)
+
+    recorder.finish()
+    return recorder
+
+def _parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the backend API")
+    parser.add_argument("--base-url", default="http://localhost:9000")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of steady-state load")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds over which users are started")
+    parser.add_argument("--think-time-ms", type=float, default=0.0, help="Max random pause between actions")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--generation-timeout", type=float, default=600.0)
+    parser.add_argument("--email-prefix", default="loadtest")
+    parser.add_argument("--password", default="loadtest-password")
+    parser.add_argument("--register", action="store_true", help="Register the virtual users before logging in")
+    parser.add_argument("--generate", action="store_true", help="Generate one course per user through the agent")
+    parser.add_argument("--skip", nargs="*", default=[], choices=list(DEFAULT_MIX), help="Actions to leave out of the mix")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON summary to this file")
+    return parser.parse_args(argv)
+
+def main(argv: List[str] = None) -> None:
+    args = _parse_args(argv)
+    recorder = asyncio.run(run_load_test(args))
+    print(recorder.report())
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(recorder.summary(), f, indent=2)
+        print(f"Summary written to {args.output}")
+
+if __name__ == "__main__":
+    main()
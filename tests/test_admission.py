@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from uuid import uuid4
+from fastapi import HTTPException
+from internal.ai.agent import admission as admission_module
+from internal.ai.agent.admission import AdmissionController, FairQueue, RateLimitExceededError, TokenBucketLimiter, rate_limited
+from internal.ai.agent.agent_client import AGENT_CHAT, AGENT_GENERATION
+from internal.ai.agent.resilience import BulkheadFullError
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_token_bucket_allows_a_burst_then_refills():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(clock=clock)
+
+    async def take():
+        return await limiter.take("chat:u1", 0.5, 2)
+
+    assert asyncio.run(take()) == 0 and asyncio.run(take()) == 0
+    assert asyncio.run(take()) == pytest.approx(2.0)
+    clock.now += 1.0
+    assert asyncio.run(take()) == pytest.approx(1.0)
+    clock.now += 1.0
+    assert asyncio.run(take()) == 0
+    # Buckets are per key
+    assert asyncio.run(limiter.take("chat:u2", 0.5, 2)) == 0
+
+def test_fair_queue_serves_users_in_turn():
+    """Test that a user queueing many generations cannot starve another user"""
+    queue = FairQueue(AGENT_GENERATION, max_concurrent=1, max_per_user=4, max_wait_seconds=5)
+    served = []
+
+    async def run(user_id, name):
+        await queue.acquire(user_id)
+        served.append(name)
+        await asyncio.sleep(0)
+        queue.release(user_id)
+
+    async def scenario():
+        await queue.acquire("a")
+        tasks = [asyncio.create_task(run("a", "a1")), asyncio.create_task(run("a", "a2")), asyncio.create_task(run("a", "a3"))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(run("b", "b1")))
+        await asyncio.sleep(0)
+        assert queue.queued == 4
+        queue.release("a")
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert served == ["a1", "b1", "a2", "a3"]
+    assert queue.in_flight == 0 and queue.queued == 0
+
+def test_fair_queue_rejects_over_the_user_cap_and_after_waiting():
+    queue = FairQueue(AGENT_GENERATION, max_concurrent=1, max_per_user=1, max_wait_seconds=0.01)
+
+    async def scenario():
+        await queue.acquire("a")
+        with pytest.raises(RateLimitExceededError):
+            await queue.acquire("a")
+        with pytest.raises(BulkheadFullError):
+            await queue.acquire("b")
+        queue.release("a")
+        await queue.acquire("b")
+        queue.release("b")
+
+    asyncio.run(scenario())
+    assert queue.in_flight == 0
+
+def test_exhausted_users_get_429_with_retry_after(monkeypatch):
+    controller = AdmissionController(
+        TokenBucketLimiter(),
+        {AGENT_CHAT: (1 / 60, 1)},
+        FairQueue(AGENT_GENERATION, 1, 1, 0)
+    )
+    monkeypatch.setattr(admission_module, "admission", controller)
+    dependency = rate_limited(AGENT_CHAT)
+    user_id = str(uuid4())
+
+    asyncio.run(dependency(current_user_id=user_id))
+    with pytest.raises(HTTPException) as limited:
+        asyncio.run(dependency(current_user_id=user_id))
+    assert limited.value.status_code == 429
+    assert 59 <= int(limited.value.headers["Retry-After"]) <= 60
+    # Another user still has their token
+    asyncio.run(dependency(current_user_id=str(uuid4())))
@@ -0,0 +1,184 @@
+import asyncio
+import httpx
+import pytest
+from internal.ai.agent.agent_client import AgentClient, AGENT_CHAT, AGENT_GENERATION
+from internal.ai.agent.resilience import Bulkhead, CircuitBreaker, RetryPolicy, BulkheadFullError, CircuitOpenError, CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class FakeAgent:
+    """Stub agent whose failures and latency can be switched at runtime"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail_with = None
+        self.latency = 0.0
+
+    async def __call__(self, request):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_with == "timeout":
+            raise httpx.ReadTimeout("agent too slow", request=request)
+        if self.fail_with:
+            return httpx.Response(self.fail_with, json={"detail": "agent error"})
+        return httpx.Response(200, json={"session_id": "s-1"})
+
+def _client(agent, clock=None, max_concurrent=10, max_wait=0.0, attempts=3):
+    breakers = {
+        name: CircuitBreaker(name, failure_rate_threshold=0.5, minimum_calls=4, window_seconds=60, open_seconds=30, clock=clock or FakeClock())
+        for name in (AGENT_CHAT, AGENT_GENERATION)
+    }
+    bulkheads = {name: Bulkhead(name, max_concurrent, max_wait) for name in (AGENT_CHAT, AGENT_GENERATION)}
+    return AgentClient(
+        "http://agent",
+        transport=httpx.MockTransport(agent),
+        bulkheads=bulkheads,
+        breakers=breakers,
+        retry_policy=RetryPolicy(max_attempts=attempts, base_delay=0, max_delay=0)
+    )
+
+def test_circuit_opens_on_error_spike_and_fails_fast():
+    """Test that the breaker opens after a failure spike and stops calling the agent"""
+    agent = FakeAgent()
+    agent.fail_with = 503
+    client = _client(agent)
+
+    async def scenario():
+        for _ in range(4):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.post(AGENT_CHAT, "/run", {}, timeout=1)
+        calls_before = agent.calls
+        with pytest.raises(CircuitOpenError) as exc_info:
+            await client.post(AGENT_CHAT, "/run", {}, timeout=1)
+        assert agent.calls == calls_before
+        assert exc_info.value.retry_after > 0
+
+    asyncio.run(scenario())
+    assert client.breakers[AGENT_CHAT].state == CIRCUIT_OPEN
+    # The generation breaker is isolated from chat failures
+    assert client.breakers[AGENT_GENERATION].state == CIRCUIT_CLOSED
+
+def test_circuit_half_opens_and_closes_after_recovery():
+    """Test that a successful probe after the open period closes the breaker"""
+    agent = FakeAgent()
+    agent.fail_with = "timeout"
+    clock = FakeClock()
+    client = _client(agent, clock=clock)
+
+    async def scenario():
+        for _ in range(4):
+            with pytest.raises(httpx.TimeoutException):
+                await client.post(AGENT_CHAT, "/run", {}, timeout=1)
+        clock.now += 31
+        agent.fail_with = None
+        response = await client.post(AGENT_CHAT, "/run", {}, timeout=1)
+        assert response.status_code == 200
+
+    asyncio.run(scenario())
+    breaker = client.breakers[AGENT_CHAT]
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.transitions["closed->open"] == 1
+    assert breaker.transitions["open->half_open"] == 1
+    assert breaker.transitions["half_open->closed"] == 1
+
+def test_half_open_admits_a_single_probe():
+    """Test that only one probe goes through while half-open"""
+    clock = FakeClock()
+    breaker = CircuitBreaker("chat", minimum_calls=1, open_seconds=5, clock=clock)
+    breaker.before_call()
+    breaker.record_failure()
+    clock.now += 6
+    probe = breaker.before_call()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure(probe)
+    assert breaker.state == CIRCUIT_OPEN
+
+def test_only_probes_end_the_half_open_state():
+    """Test that a call admitted while closed does not close or reopen the breaker when it finishes half-open"""
+    clock = FakeClock()
+    breaker = CircuitBreaker("chat", minimum_calls=1, open_seconds=5, clock=clock)
+    slow = breaker.before_call()
+    assert slow is None
+    breaker.before_call()
+    breaker.record_failure()
+    clock.now += 6
+    probe = breaker.before_call()
+    assert probe is not None
+
+    # The slow call finishes while the probe is in flight
+    breaker.record_success(slow)
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success(probe)
+    assert breaker.state == CIRCUIT_CLOSED
+
+def test_client_errors_do_not_trip_the_breaker():
+    """Test that 4xx responses count as a healthy agent"""
+    agent = FakeAgent()
+    agent.fail_with = 422
+    client = _client(agent)
+
+    async def scenario():
+        for _ in range(6):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.post(AGENT_CHAT, "/run", {}, timeout=1)
+
+    asyncio.run(scenario())
+    assert client.breakers[AGENT_CHAT].state == CIRCUIT_CLOSED
+
+def test_only_idempotent_calls_are_retried():
+    """Test that retries happen for idempotent calls and never for the rest"""
+    agent = FakeAgent()
+    agent.fail_with = 502
+    client = _client(agent, attempts=3)
+
+    async def scenario():
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.post(AGENT_CHAT, "/sessions/1", {}, timeout=1, idempotent=True)
+        assert agent.calls == 3
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.post(AGENT_GENERATION, "/course/generate", {}, timeout=1)
+        assert agent.calls == 4
+
+    asyncio.run(scenario())
+
+def test_bulkhead_rejects_when_full():
+    """Test that a saturated generation bulkhead rejects instead of queueing forever"""
+    agent = FakeAgent()
+    agent.latency = 0.05
+    client = _client(agent, max_concurrent=2, max_wait=0.0)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(client.post(AGENT_GENERATION, "/course/generate", {}, timeout=1) for _ in range(4)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    rejected = [r for r in results if isinstance(r, BulkheadFullError)]
+    assert len(rejected) == 2
+    assert agent.calls == 2
+    assert client.bulkheads[AGENT_GENERATION].in_flight == 0
+    assert client.bulkheads[AGENT_GENERATION].rejected == 2
+
+def test_bulkhead_queues_within_wait_budget():
+    """Test that queued callers get a slot once one frees up"""
+    agent = FakeAgent()
+    agent.latency = 0.01
+    client = _client(agent, max_concurrent=1, max_wait=1.0)
+
+    async def scenario():
+        return await asyncio.gather(*(client.post(AGENT_CHAT, "/run", {}, timeout=1) for _ in range(3)))
+
+    results = asyncio.run(scenario())
+    assert [r.status_code for r in results] == [200, 200, 200]
+    assert client.bulkheads[AGENT_CHAT].in_flight == 0
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import httpx
+import pytest
+from uuid import uuid4
+from internal.ai.course.model.course_dto import AiCourseGenerateRequest, GENERATION_STATUS_COMPLETED, GENERATION_STATUS_FAILED
+from internal.ai.course.service import course_service as course_service_module
+from internal.ai.course.service.course_service import AiCourseService
+from internal.ai.agent.agent_client import AgentClient
+from tests.fakes import InMemoryAiCourseRepository, StubOAuthService, StubUserService
+
+COURSE_HEADER = {
+    "type": "course",
+    "title": "Streaming 101",
+    "description": "Learn streaming",
+    "estimated_duration": 3,
+    "learning_objectives": ["stream"],
+    "source_from": ["https://example.com"],
+    "difficulty": "Beginner",
+    "skills": ["python"]
+}
+
+def _module(index):
+    return {
+        "type": "module",
+        "title": f"Module {index}",
+        "index": index,
+        "lessons": [{"title": f"Lesson {index}", "content": "Content", "index": 1}],
+        "quiz": [{"question": "Q?", "choices": {"a": "A", "b": "B"}, "answer": "a"}]
+    }
+
+def _use_stub_agent(monkeypatch, handler):
+    """Route the service's agent client to a local stub agent"""
+    monkeypatch.setattr(course_service_module.settings, "AI_COURSE_STREAMING", True)
+    monkeypatch.setattr(course_service_module, "agent_client", AgentClient("http://agent", transport=httpx.MockTransport(handler)))
+
+def _generate(repository):
+    service = AiCourseService(StubOAuthService(), repository, StubUserService())
+    request = AiCourseGenerateRequest(token_github="gh", token_drive="", prompt="Teach me streaming")
+    return asyncio.run(service.generate_course(request, uuid4()))
+
+def test_modules_are_persisted_as_they_stream(monkeypatch):
+    """Test that each module is saved before the agent sends the next one"""
+    repository = InMemoryAiCourseRepository()
+    saved_before_next_line = []
+
+    async def ndjson_stream():
+        yield (json.dumps(COURSE_HEADER) + "\n").encode()
+        for index in range(1, 4):
+            saved_before_next_line.append(len(repository.modules))
+            yield (json.dumps(_module(index)) + "\n").encode()
+        saved_before_next_line.append(len(repository.modules))
+        yield b'{"type": "done"}\n'
+
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, headers={"content-type": "application/x-ndjson"}, content=ndjson_stream())
+
+    _use_stub_agent(monkeypatch, handler)
+    response = _generate(repository)
+
+    assert response.course_id == repository.course_id
+    assert len(response.external_response.modules) == 3
+    assert saved_before_next_line == [0, 1, 2, 3]
+    assert repository.statuses == [GENERATION_STATUS_COMPLETED]
+
+def test_late_failure_keeps_received_modules(monkeypatch):
+    """Test that a failure after some modules marks the course failed without losing them"""
+    repository = InMemoryAiCourseRepository()
+
+    def handler(request):
+        lines = [COURSE_HEADER, _module(1), {"type": "error", "message": "agent crashed"}]
+        body = "".join(json.dumps(line) + "\n" for line in lines)
+        return httpx.Response(200, headers={"content-type": "application/x-ndjson"}, content=body)
+
+    _use_stub_agent(monkeypatch, handler)
+    with pytest.raises(RuntimeError):
+        _generate(repository)
+
+    assert len(repository.modules) == 1
+    assert repository.statuses == [GENERATION_STATUS_FAILED]
+
+def test_failed_status_update_keeps_the_generation_error(monkeypatch):
+    """Test that the agent's error, not the status update's, reaches the caller"""
+    repository = InMemoryAiCourseRepository()
+
+    async def broken_status_update(course_id, generation_status):
+        raise ConnectionError("database went away")
+
+    repository.update_generation_status = broken_status_update
+
+    def handler(request):
+        lines = [COURSE_HEADER, {"type": "error", "message": "agent crashed"}]
+        body = "".join(json.dumps(line) + "\n" for line in lines)
+        return httpx.Response(200, headers={"content-type": "application/x-ndjson"}, content=body)
+
+    _use_stub_agent(monkeypatch, handler)
+    with pytest.raises(RuntimeError, match="agent crashed"):
+        _generate(repository)
+
+def test_plain_json_response_is_replayed_incrementally(monkeypatch):
+    """Test that an agent without streaming support still works in streaming mode"""
+    repository = InMemoryAiCourseRepository()
+
+    def handler(request):
+        course = {key: value for key, value in COURSE_HEADER.items() if key != "type"}
+        course["modules"] = [_module(1), _module(2)]
+        return httpx.Response(200, json=course)
+
+    _use_stub_agent(monkeypatch, handler)
+    response = _generate(repository)
+
+    assert [module.index for module in repository.modules] == [1, 2]
+    assert response.external_response.title == "Streaming 101"
+    assert repository.statuses == [GENERATION_STATUS_COMPLETED]
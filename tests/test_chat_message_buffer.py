@@ -0,0 +1,146 @@
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import pytest
+from datetime import datetime, timezone
+from uuid import uuid4
+from internal.ai.chat.model.chat_dto import ChatExchange, CHAT_KIND_COURSE, CHAT_KIND_GUIDE
+from internal.ai.chat.repository.message_repository import MessageRepository
+from internal.ai.chat.service.message_buffer import ChatMessageBuffer
+
+class FakeDb:
+    def close(self):
+        pass
+
+def _exchange(kind=CHAT_KIND_COURSE, session_id=None, question="q"):
+    return ChatExchange(
+        kind=kind,
+        session_id=session_id or uuid4(),
+        user_message_id=uuid4(),
+        ai_message_id=uuid4(),
+        user_content=question,
+        ai_content=f"answer to {question}",
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc)
+    )
+
+@pytest.fixture
+def written(monkeypatch):
+    """Exchanges passed to save_exchanges; set `fail` to make the insert raise"""
+    state = {"batches": [], "fail": False}
+
+    async def save_exchanges(self, exchanges):
+        if state["fail"]:
+            raise RuntimeError("database unavailable")
+        state["batches"].append(list(exchanges))
+
+    monkeypatch.setattr(MessageRepository, "save_exchanges", save_exchanges)
+    return state
+
+def test_exchanges_are_written_in_one_batch(written, tmp_path):
+    buffer = ChatMessageBuffer(60, max_batch=3, wal_dir=str(tmp_path), session_factory=FakeDb)
+    exchanges = [_exchange(question=str(i)) for i in range(4)]
+
+    async def scenario():
+        for exchange in exchanges:
+            await buffer.add(exchange)
+        assert [len(batch) for batch in written["batches"]] == [3]
+        await buffer.stop()
+
+    asyncio.run(scenario())
+    assert [exchange for batch in written["batches"] for exchange in batch] == exchanges
+    assert buffer.pending == 0
+    assert os.listdir(tmp_path) == []
+
+def test_a_failed_write_through_raises_and_keeps_nothing(written, tmp_path):
+    """Test that without a periodic flush a failed insert fails the turn instead of leaving it in memory"""
+    buffer = ChatMessageBuffer(0, max_batch=100, wal_dir=str(tmp_path), session_factory=FakeDb)
+    failed, later = _exchange(question="failed"), _exchange(question="later")
+
+    async def scenario():
+        written["fail"] = True
+        with pytest.raises(RuntimeError):
+            await buffer.add(failed)
+        assert buffer.pending == 0
+        written["fail"] = False
+        await buffer.add(later)
+        await buffer.stop()
+
+    asyncio.run(scenario())
+    assert written["batches"] == [[later]]
+    assert os.listdir(tmp_path) == []
+
+def test_a_dead_workers_log_is_replayed(written, tmp_path):
+    """Test that exchanges survive a failed write and are replayed from the log after a crash"""
+    crashed = ChatMessageBuffer(60, max_batch=100, wal_dir=str(tmp_path), session_factory=FakeDb)
+    exchanges = [_exchange(question="first"), _exchange(kind=CHAT_KIND_GUIDE, question="second")]
+    written["fail"] = True
+
+    async def crash():
+        for exchange in exchanges:
+            await crashed.add(exchange)
+        with pytest.raises(RuntimeError):
+            await crashed.flush()
+
+    asyncio.run(crash())
+    assert crashed.pending == 2
+    # The worker dies: its log stays behind under a pid that is no longer running
+    os.rename(crashed.wal_path, tmp_path / "chat-messages-999999999.wal")
+    with open(tmp_path / "chat-messages-999999999.wal", "a", encoding="utf-8") as log:
+        log.write('{"kind": "course", "session_')
+
+    written["fail"] = False
+    replacement = ChatMessageBuffer(60, max_batch=100, wal_dir=str(tmp_path), session_factory=FakeDb)
+    assert asyncio.run(replacement.recover()) == 2
+    assert written["batches"] == [exchanges]
+    assert replacement.pending == 0
+    assert asyncio.run(replacement.recover()) == 0
+
+KILLED_WORKER = """
+import asyncio, sys, time
+from internal.ai.chat.model.chat_dto import ChatExchange
+from internal.ai.chat.service.message_buffer import ChatMessageBuffer
+
+async def main():
+    buffer = ChatMessageBuffer(3600, max_batch=100, wal_dir=sys.argv[1])
+    for line in sys.stdin:
+        await buffer.add(ChatExchange.model_validate_json(line))
+    print("logged", flush=True)
+    time.sleep(60)
+
+asyncio.run(main())
+"""
+
+def test_a_killed_workers_log_is_replayed_by_another_process(written, tmp_path):
+    """Test that exchanges accepted by a worker that is killed are written by the next one to start"""
+    exchanges = [_exchange(question="first"), _exchange(kind=CHAT_KIND_GUIDE, question="second")]
+    worker = subprocess.Popen(
+        [sys.executable, "-c", KILLED_WORKER, str(tmp_path)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        worker.stdin.write("".join(exchange.model_dump_json() + "\n" for exchange in exchanges))
+        worker.stdin.close()
+        assert worker.stdout.readline().strip() == "logged"
+    finally:
+        worker.send_signal(signal.SIGKILL)
+        worker.wait()
+    assert os.listdir(tmp_path) == [f"chat-messages-{worker.pid}.wal"]
+
+    replacement = ChatMessageBuffer(60, max_batch=100, wal_dir=str(tmp_path), session_factory=FakeDb)
+    assert asyncio.run(replacement.recover()) == 2
+    assert written["batches"] == [exchanges]
+    assert not os.path.exists(tmp_path / f"chat-messages-{worker.pid}.wal")
+
+def test_messages_are_numbered_per_session_within_a_batch():
+    course_session, guide_session = uuid4(), uuid4()
+    rows = MessageRepository._exchange_rows([
+        _exchange(session_id=course_session),
+        _exchange(kind=CHAT_KIND_GUIDE, session_id=guide_session),
+        _exchange(session_id=course_session),
+    ])
+    assert rows["positions"] == [1, 2, 1, 2, 3, 4]
+    assert rows["is_user"] == [True, False] * 3
+    assert rows["course_session_ids"] == [str(course_session)] * 2 + [None] * 2 + [str(course_session)] * 2
+    assert rows["guide_session_ids"] == [None] * 2 + [str(guide_session)] * 2 + [None] * 2
@@ -0,0 +1,25 @@
+from datetime import datetime, timedelta, timezone
+from internal.ai.chat.repository.partition_repository import ChatPartition, add_months, month_start, partition_ddl, partition_name
+from scripts.archive_chat_messages import cold_partitions
+
+def _partition(year, month):
+    moment = datetime(year, month, 1, tzinfo=timezone.utc)
+    return ChatPartition(name=partition_name(moment), month=moment, rows=0, total_bytes=0)
+
+def test_month_bounds_are_utc():
+    # 06:30 on the 1st in GMT+7 is still the previous month in UTC
+    moment = datetime(2026, 3, 1, 6, 30, tzinfo=timezone(timedelta(hours=7)))
+    assert month_start(moment) == datetime(2026, 2, 1, tzinfo=timezone.utc)
+    assert add_months(datetime(2026, 11, 1, tzinfo=timezone.utc), 3) == datetime(2027, 2, 1, tzinfo=timezone.utc)
+    assert add_months(datetime(2026, 1, 1, tzinfo=timezone.utc), -1) == datetime(2025, 12, 1, tzinfo=timezone.utc)
+    assert partition_ddl(moment) == (
+        "CREATE TABLE IF NOT EXISTS chat_messages_2026_02 PARTITION OF chat_messages "
+        "FOR VALUES FROM ('2026-02-01T00:00:00+00:00') TO ('2026-03-01T00:00:00+00:00')"
+    )
+
+def test_only_partitions_past_the_retention_window_are_cold():
+    partitions = [_partition(2025, 9), _partition(2025, 10), _partition(2025, 11), _partition(2026, 10)]
+    now = datetime(2026, 10, 19, tzinfo=timezone.utc)
+    # 12 months kept: October 2025 to September 2026 plus the current month
+    assert [partition.name for partition in cold_partitions(partitions, now, 12)] == ["chat_messages_2025_09"]
+    assert cold_partitions(partitions, now, 24) == []
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+from internal.ai.chat.model.chat_dto import CHAT_KIND_COURSE, CHAT_KIND_GUIDE
+from internal.ai.chat.repository.session_repository import SessionRepository
+from internal.ai.chat.service import chat_service as chat_service_module
+from internal.ai.chat.service.chat_service import ChatService
+from internal.ai.chat.service.session_cache import ChatSessionCache, SessionTouchBuffer
+
+class CountingSessionRepository:
+    """Serves one existing course session and counts lookups"""
+
+    def __init__(self, session):
+        self.session = session
+        self.lookups = 0
+
+    async def get_course_session(self, user_id, course_id):
+        self.lookups += 1
+        return self.session
+
+    async def update_session_timestamp(self, session_id, is_course=True):
+        raise AssertionError("updated_at must be touched through the buffer")
+
+class FakeDb:
+    def close(self):
+        pass
+
+def test_cached_course_session_skips_the_lookup(monkeypatch):
+    """Test that a resolved session is served from the cache and its touch is deferred"""
+    cache, touches = ChatSessionCache(10), SessionTouchBuffer(0)
+    monkeypatch.setattr(chat_service_module, "session_cache", cache)
+    monkeypatch.setattr(chat_service_module, "session_touches", touches)
+    session = SimpleNamespace(id=uuid4(), ai_session_id="ai-1", created_at=None, summary=None, summary_turns=0, last_message_order=0)
+    service = ChatService(None)
+    service.session_repository = CountingSessionRepository(session)
+
+    async def get_course_by_id(course_id, user_id):
+        return SimpleNamespace(title="Streams", description="", modules=[])
+
+    monkeypatch.setattr(service.course_service, "get_course_by_id", get_course_by_id)
+    monkeypatch.setattr(service, "_prepare_course_context", lambda course: "context")
+    user_id, course_id = uuid4(), uuid4()
+
+    first = asyncio.run(service.resolve_course_conversation(course_id, user_id))
+    second = asyncio.run(service.resolve_course_conversation(course_id, user_id))
+
+    assert first == second
+    assert second.ai_session_id == "ai-1"
+    assert service.session_repository.lookups == 1
+    assert touches.pending == 1
+
+def test_cache_evicts_the_least_recently_used_session():
+    cache = ChatSessionCache(2)
+    user_id, a, b, c = uuid4(), uuid4(), uuid4(), uuid4()
+    cache.put(CHAT_KIND_COURSE, user_id, a, "a")
+    cache.put(CHAT_KIND_GUIDE, user_id, b, "b")
+    assert cache.get(CHAT_KIND_COURSE, user_id, a) == "a"
+    cache.put(CHAT_KIND_COURSE, user_id, c, "c")
+    assert cache.get(CHAT_KIND_GUIDE, user_id, b) is None
+    cache.invalidate(CHAT_KIND_COURSE, user_id, a)
+    assert cache.get(CHAT_KIND_COURSE, user_id, a) is None
+    assert cache.get(CHAT_KIND_COURSE, user_id, c) == "c"
+
+def test_touches_are_flushed_once_per_session(monkeypatch):
+    """Test that repeated touches collapse to the latest time and survive a failed flush"""
+    flushed = []
+    failing = [True]
+
+    async def touch_sessions(self, course_touches, guide_touches):
+        if failing[0]:
+            raise RuntimeError("database unavailable")
+        flushed.append((course_touches, guide_touches))
+
+    monkeypatch.setattr(SessionRepository, "touch_sessions", touch_sessions)
+    touches = SessionTouchBuffer(0, session_factory=FakeDb)
+    course_session, guide_session = uuid4(), uuid4()
+    start = datetime(2026, 1, 1)
+    touches.touch(CHAT_KIND_COURSE, course_session, start)
+    touches.touch(CHAT_KIND_COURSE, course_session, start + timedelta(seconds=5))
+    touches.touch(CHAT_KIND_GUIDE, guide_session, start)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(touches.flush())
+    assert touches.pending == 2
+
+    failing[0] = False
+    assert asyncio.run(touches.stop()) is None
+    assert flushed == [({course_session: start + timedelta(seconds=5)}, {guide_session: start})]
+    assert touches.pending == 0
+    assert asyncio.run(touches.flush()) == 0
@@ -0,0 +1,77 @@
+import asyncio
+from internal.ai.chat.service.session_pool import AgentSessionPool
+
+def test_claims_use_pre_created_sessions_and_top_the_pool_up():
+    """Test that a warm pool answers a claim without creating a session inline"""
+    pool = AgentSessionPool(size=2, max_users=10, ttl=60)
+    created = []
+
+    async def create_session(user_id, session_id):
+        await asyncio.sleep(0)
+        created.append((user_id, session_id))
+        return session_id
+
+    async def scenario():
+        pool.warm("u1", create_session)
+        pool.warm("u1", create_session)
+        await asyncio.gather(*pool._tasks)
+        assert pool.ready("u1") == 2 and len(created) == 2
+
+        claimed = await pool.claim("u1", create_session)
+        assert claimed == created[0][1]
+        assert len(created) == 2
+        await asyncio.gather(*pool._tasks)
+        assert pool.ready("u1") == 2 and len(created) == 3
+
+        # Another user's pool is empty, so the first claim creates its session inline, and only that one
+        other = await pool.claim("u2", create_session)
+        assert created[3] == ("u2", other)
+        await asyncio.gather(*pool._tasks)
+        assert len(created) == 4 and pool.ready("u2") == 0
+        await pool.stop()
+
+    asyncio.run(scenario())
+
+def test_expired_and_failed_sessions_fall_back_to_inline_creation():
+    pool = AgentSessionPool(size=1, max_users=10, ttl=0)
+    attempts = []
+
+    async def create_session(user_id, session_id):
+        attempts.append(session_id)
+        if len(attempts) == 1:
+            raise RuntimeError("agent down")
+        return session_id
+
+    async def scenario():
+        pool.warm("u1", create_session)
+        await asyncio.gather(*pool._tasks)
+        assert pool.ready("u1") == 0
+        pool.warm("u1", create_session)
+        await asyncio.gather(*pool._tasks)
+        # ttl=0: the pooled session is too old to hand out
+        claimed = await pool.claim("u1", create_session)
+        assert claimed == attempts[-1] and claimed != attempts[1]
+        await pool.stop()
+
+    asyncio.run(scenario())
+
+def test_a_claim_during_warm_up_waits_for_it():
+    """Test that a claim right after warming takes the session being created instead of creating another"""
+    pool = AgentSessionPool(size=1, max_users=10, ttl=60)
+    created = []
+
+    async def create_session(user_id, session_id):
+        await asyncio.sleep(0.01)
+        created.append(session_id)
+        return session_id
+
+    async def scenario():
+        pool.warm("u1", create_session)
+        claimed = await pool.claim("u1", create_session)
+        assert created == [claimed]
+        # The claimed session is replaced in the background
+        await asyncio.gather(*pool._tasks)
+        assert pool.ready("u1") == 1 and len(created) == 2
+        await pool.stop()
+
+    asyncio.run(scenario())
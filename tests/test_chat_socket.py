@@ -0,0 +1,258 @@
+import asyncio
+import httpx
+import jwt
+import pytest
+from contextlib import contextmanager
+from uuid import uuid4
+from starlette.websockets import WebSocketDisconnect
+from app.config import settings
+from app.lifecycle import ServerLifecycle
+from app.main import app
+from internal.ai.agent.agent_client import AgentClient
+from internal.ai.agent.resilience import AgentUnavailableError
+from internal.ai.chat.handler.chat_handler import get_chat_service_scope
+from internal.ai.chat.model.chat_dto import ChatConversation, ChatSocketFrame, CHAT_KIND_COURSE, CHAT_KIND_GUIDE
+from internal.ai.chat.service import chat_service as chat_service_module
+from internal.ai.chat.service.chat_service import ChatService, AgentReplyError
+from internal.ai.chat.service import chat_socket as chat_socket_module
+from internal.ai.chat.service.chat_socket import ChatSocketSession
+from internal.ai.chat.service.conversation_memory import ConversationMemory, ConversationWindow
+from tests.load.fake_agent import FakeAgentConfig, create_fake_agent_app
+
+class FakeChatService:
+    """Resolves conversations without a database and streams a canned answer"""
+
+    def __init__(self, calls, error=None):
+        self.calls = calls
+        self.error = error
+
+    async def resolve_course_conversation(self, course_id, user_id):
+        self.calls["resolve"].append(course_id)
+        return ChatConversation(kind=CHAT_KIND_COURSE, resource_id=course_id, session_id=uuid4(), ai_session_id="ai", context="course")
+
+    async def resolve_guide_conversation(self, guide_id, user_id):
+        self.calls["resolve"].append(guide_id)
+        return ChatConversation(kind=CHAT_KIND_GUIDE, resource_id=guide_id, session_id=uuid4(), ai_session_id="ai", context="guide")
+
+    def warm_sessions(self, user_id):
+        self.calls["warmed"].append(user_id)
+
+    async def stream_reply(self, conversation, user_message, user_id):
+        if self.error is not None:
+            if getattr(self.error, "partial", False):
+                yield "Hello "
+            raise self.error
+        for chunk in ("Hello ", "there"):
+            await asyncio.sleep(0)
+            yield chunk
+
+    async def save_exchange(self, conversation, user_message, ai_response):
+        self.calls["saved"].append((conversation.kind, user_message, ai_response))
+
+class RecordingTouches:
+    """Records session touches instead of buffering them"""
+
+    def __init__(self):
+        self.kinds = []
+
+    def touch(self, kind, session_id, touched_at=None):
+        self.kinds.append(kind)
+
+@pytest.fixture
+def fake_scope():
+    calls = {"resolve": [], "saved": [], "warmed": []}
+
+    @contextmanager
+    def scope():
+        yield FakeChatService(calls)
+
+    return scope, calls
+
+def _conversation():
+    return ChatConversation(kind=CHAT_KIND_COURSE, resource_id=uuid4(), session_id=uuid4(), ai_session_id="s1", context="Course Title: Streams")
+
+@pytest.mark.parametrize("sse_enabled", [True, False])
+def test_replies_stream_from_run_sse_or_fall_back_to_run(monkeypatch, sse_enabled):
+    """Test that /run_sse chunks add up to the /run answer, and the fallback when it is missing"""
+    fake_agent = create_fake_agent_app(FakeAgentConfig(latency_ms=0, latency_jitter_ms=0, reply_chunks=4, sse_enabled=sse_enabled))
+    monkeypatch.setattr(chat_service_module, "agent_client", AgentClient("http://fake-agent", transport=httpx.ASGITransport(app=fake_agent)))
+    memory = ConversationMemory(10)
+    monkeypatch.setattr(chat_service_module, "conversation_memory", memory)
+    service = ChatService(None)
+    conversation = _conversation()
+    memory.put(conversation.session_id, ConversationWindow("s1"))
+
+    async def collect():
+        return [chunk async for chunk in service.stream_reply(conversation, "What is a stream?", uuid4())]
+
+    chunks = asyncio.run(collect())
+    expected = asyncio.run(service._send_message_to_ai("s1", "What is a stream?", "Course Title: Streams", "u1"))
+
+    assert "".join(chunks) == expected
+    assert len(chunks) == (4 if sse_enabled else 1)
+
+class UnavailableAgent:
+    """Agent client whose circuit is open"""
+
+    def stream(self, *args, **kwargs):
+        raise AgentUnavailableError("AI agent is temporarily unavailable", retry_after=5)
+
+    async def post(self, *args, **kwargs):
+        raise AgentUnavailableError("AI agent is temporarily unavailable", retry_after=5)
+
+def test_rejected_agent_call_raises_instead_of_apologising(monkeypatch):
+    """Test that an agent rejected before answering is not turned into a reply or stored"""
+    monkeypatch.setattr(chat_service_module, "agent_client", UnavailableAgent())
+    memory = ConversationMemory(10)
+    monkeypatch.setattr(chat_service_module, "conversation_memory", memory)
+    saved = []
+    monkeypatch.setattr(ChatService, "save_exchange", lambda self, *args: saved.append(args))
+    service = ChatService(None)
+    conversation = _conversation()
+    memory.put(conversation.session_id, ConversationWindow("s1"))
+
+    async def collect():
+        return [chunk async for chunk in service.stream_reply(conversation, "What is a stream?", uuid4())]
+
+    with pytest.raises(AgentUnavailableError):
+        asyncio.run(collect())
+    with pytest.raises(AgentUnavailableError):
+        asyncio.run(service.reply(conversation, "What is a stream?", uuid4()))
+    assert saved == []
+
+def test_agent_failing_mid_answer_raises_after_the_partial_chunks(monkeypatch):
+    """Test that an error event after the first chunk raises instead of ending the answer early"""
+    events = 'data: {"partial": true, "content": {"role": "model", "parts": [{"text": "Streams are"}]}}\n\ndata: {"error": "model overloaded"}\n\n'
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events))
+    monkeypatch.setattr(chat_service_module, "agent_client", AgentClient("http://fake-agent", transport=transport))
+    memory = ConversationMemory(10)
+    monkeypatch.setattr(chat_service_module, "conversation_memory", memory)
+    service = ChatService(None)
+    conversation = _conversation()
+    memory.put(conversation.session_id, ConversationWindow("s1"))
+    chunks = []
+
+    async def collect():
+        async for chunk in service.stream_reply(conversation, "What is a stream?", uuid4()):
+            chunks.append(chunk)
+
+    with pytest.raises(AgentReplyError) as error:
+        asyncio.run(collect())
+    assert error.value.partial
+    assert chunks == ["Streams are"]
+
+@pytest.mark.parametrize("error, status", [
+    (AgentUnavailableError("AI agent is temporarily unavailable", retry_after=5), 503),
+    (AgentReplyError("I'm sorry, the request timed out. Please try again."), 502),
+    (AgentReplyError("I'm sorry, I encountered an unexpected error. Please try again.", partial=True), 502)
+])
+def test_failed_agent_turn_sends_an_error_and_stores_nothing(error, status):
+    """Test that a turn without an agent answer ends in an error frame and saves no exchange"""
+    calls = {"resolve": [], "saved": [], "warmed": []}
+
+    @contextmanager
+    def scope():
+        yield FakeChatService(calls, error=error)
+
+    sent = []
+
+    async def send(frame):
+        sent.append(frame)
+
+    session = ChatSocketSession(uuid4(), send, scope)
+
+    async def scenario():
+        await session.handle(ChatSocketFrame(type="message", id="1", course_id=uuid4(), message="hi"))
+        await session.drain()
+
+    asyncio.run(scenario())
+
+    partial = getattr(error, "partial", False)
+    assert [frame["type"] for frame in sent] == ["start"] + ["chunk"] * partial + ["error"]
+    assert sent[-1]["status"] == status
+    assert sent[-1]["detail"] == str(error)
+    # Tells the client to discard the chunks it already showed
+    assert sent[-1].get("partial", False) == partial
+    assert calls["saved"] == []
+
+def test_conversations_are_pinned_and_multiplexed(fake_scope, monkeypatch):
+    """Test that each conversation is resolved once and turns stream back by id"""
+    scope, calls = fake_scope
+    touches = RecordingTouches()
+    monkeypatch.setattr(chat_socket_module, "session_touches", touches)
+    sent = []
+
+    async def send(frame):
+        sent.append(frame)
+
+    course_id, guide_id = uuid4(), uuid4()
+    session = ChatSocketSession(uuid4(), send, scope)
+
+    async def scenario():
+        await session.handle(ChatSocketFrame(type="message", id="1", course_id=course_id, message="first"))
+        await session.handle(ChatSocketFrame(type="message", id="2", guide_id=guide_id, message="guide"))
+        await session.handle(ChatSocketFrame(type="message", id="3", course_id=course_id, message="second"))
+        await session.handle(ChatSocketFrame(type="message", id="4", message="no target"))
+        await session.drain()
+
+    asyncio.run(scenario())
+
+    assert calls["resolve"] == [course_id, guide_id]
+    # Turns on a pinned conversation still keep its session active
+    assert touches.kinds == ["course"]
+    assert sorted(calls["saved"]) == [("course", "first", "Hello there"), ("course", "second", "Hello there"), ("guide", "guide", "Hello there")]
+    done = {frame["id"]: frame["response"] for frame in sent if frame["type"] == "done"}
+    assert done == {"1": "Hello there", "2": "Hello there", "3": "Hello there"}
+    assert [frame["status"] for frame in sent if frame["type"] == "error"] == [400]
+    # Turns of one conversation are answered in order
+    course_done = [frame["id"] for frame in sent if frame["type"] == "done" and frame["id"] in ("1", "3")]
+    assert course_done == ["1", "3"]
+
+def test_turns_count_as_in_flight_and_finish_when_the_server_closes_the_socket(fake_scope):
+    """Test that graceful shutdown waits for a running turn, which still stores its answer"""
+    scope, calls = fake_scope
+    state = ServerLifecycle()
+    sent = []
+
+    async def send(frame):
+        sent.append(frame)
+
+    session = ChatSocketSession(uuid4(), send, scope, state=state)
+
+    async def scenario():
+        await session.handle(ChatSocketFrame(type="message", id="1", course_id=uuid4(), message="hi"))
+        assert state.in_flight == 1
+        state.begin_draining()
+        # uvicorn closes the socket when it stops
+        await session.close()
+        assert await state.wait_for_idle(1)
+
+    asyncio.run(scenario())
+
+    assert state.in_flight == 0
+    assert calls["saved"] == [("course", "hi", "Hello there")]
+    assert sent == []
+
+def test_socket_authenticates_once_with_the_first_frame(client, fake_scope):
+    scope, calls = fake_scope
+    app.dependency_overrides[get_chat_service_scope] = lambda: scope
+    user_id = uuid4()
+    token = jwt.encode({"user_id": str(user_id)}, settings.SECRET_KEY, algorithm="HS256")
+    course_id = uuid4()
+    try:
+        with client.websocket_connect("/api/v1/ai/chat/ws") as websocket:
+            websocket.send_json({"type": "auth", "token": token})
+            assert websocket.receive_json() == {"type": "ready", "user_id": str(user_id)}
+            websocket.send_json({"type": "message", "id": "a", "course_id": str(course_id), "message": "hi"})
+            frames = [websocket.receive_json() for _ in range(4)]
+        assert [frame["type"] for frame in frames] == ["start", "chunk", "chunk", "done"]
+        assert calls["saved"] == [("course", "hi", "Hello there")]
+        assert calls["warmed"] == [user_id]
+
+        with client.websocket_connect("/api/v1/ai/chat/ws") as websocket:
+            websocket.send_json({"type": "auth", "token": "not-a-token"})
+            with pytest.raises(WebSocketDisconnect) as closed:
+                websocket.receive_json()
+        assert closed.value.code == 1008
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,210 @@
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+from internal.ai.chat.model.chat_dto import ChatConversation, ChatSessionVersion, CHAT_KIND_COURSE
+from internal.ai.chat.model.message_model import ChatMessage
+from internal.ai.chat.repository.message_repository import MessageRepository
+from internal.ai.chat.repository.session_repository import SessionRepository
+from internal.ai.chat.service import chat_service as chat_service_module
+from internal.ai.chat.service.chat_service import ChatService
+from internal.ai.chat.service.conversation_memory import ConversationMemory, LocalSummarizer, pair_turns
+from internal.ai.chat.service.session_pool import AgentSessionPool
+from app.config import settings
+
+class FakeDb:
+    def close(self):
+        pass
+
+class StoredMessages:
+    """Stands in for the message buffer and the chat_messages table"""
+
+    def __init__(self, last_message_order=0):
+        self.messages = []
+        # Kept on the session row, so it survives archived messages
+        self.last_message_order = last_message_order
+        # The session row as every worker sees it; when set, writes return its version
+        self.session = None
+
+    async def add(self, exchange):
+        order = self.last_message_order
+        self.messages.append(ChatMessage(content=exchange.user_content, is_user=True, message_order=order + 1))
+        self.messages.append(ChatMessage(content=exchange.ai_content, is_user=False, message_order=order + 2))
+        self.last_message_order += 2
+        if self.session is None:
+            return None
+        self.session.last_message_order = self.last_message_order
+        return ChatSessionVersion(
+            session_id=exchange.session_id,
+            ai_session_id=self.session.ai_session_id,
+            summary_turns=self.session.summary_turns,
+            last_message_order=self.last_message_order
+        )
+
+    async def flush(self):
+        return 0
+
+    async def read(self, session_id, is_course, since, limit=None, after_order=None, up_to_order=None):
+        selected = [
+            message for message in self.messages
+            if (after_order is None or message.message_order > after_order) and (up_to_order is None or message.message_order <= up_to_order)
+        ]
+        return selected[-limit:] if limit else selected
+
+def test_local_summary_keeps_the_newest_turns():
+    summarizer = LocalSummarizer(max_chars=120, snippet_chars=20)
+    summary = asyncio.run(summarizer.summarize("Asked: old Answered: old", [("q" * 50, "a"), ("last question", "last answer")], "s", "u"))
+    assert len(summary) <= 120
+    assert summary.endswith("Asked: last question Answered: last answer")
+    assert "qqqqqqqqqqqqqqqqqqqq..." in summary
+
+def test_pairs_skip_unanswered_questions():
+    messages = [
+        ChatMessage(content="q1", is_user=True, message_order=1),
+        ChatMessage(content="q2", is_user=True, message_order=3),
+        ChatMessage(content="a2", is_user=False, message_order=4),
+    ]
+    assert pair_turns(messages) == [("q2", "a2")]
+
+@pytest.fixture
+def chat(monkeypatch):
+    """ChatService over an in-memory message store, recording agent calls and stored summaries"""
+    state = SimpleNamespace(store=StoredMessages(), summaries=[], sent=[])
+    monkeypatch.setattr(chat_service_module, "conversation_memory", ConversationMemory(10))
+    monkeypatch.setattr(chat_service_module, "summarizer", LocalSummarizer(500))
+    monkeypatch.setattr(chat_service_module, "message_buffer", state.store)
+    monkeypatch.setattr(chat_service_module, "SessionLocal", FakeDb)
+    monkeypatch.setattr(chat_service_module, "session_pool", AgentSessionPool(0, 10, 60))
+
+    async def get_session_messages(self, *args, **kwargs):
+        return await state.store.read(*args, **kwargs)
+
+    monkeypatch.setattr(MessageRepository, "get_session_messages", get_session_messages)
+
+    async def save_summary(self, session_id, is_course, summary, summary_turns, previous_turns, ai_session_id):
+        state.summaries.append((summary_turns, previous_turns, ai_session_id))
+        return True
+
+    monkeypatch.setattr(SessionRepository, "save_summary", save_summary)
+    state.service = ChatService(None)
+
+    async def send(session_id, user_message, context, user_id):
+        state.sent.append((session_id, context))
+        return f"answer {len(state.sent)}"
+
+    async def create_session(user_id, session_id):
+        return session_id
+
+    monkeypatch.setattr(state.service, "_send_message_to_ai", send)
+    monkeypatch.setattr(state.service, "_create_new_ai_session", create_session)
+    return state
+
+def test_old_turns_are_summarized_into_a_new_agent_session(chat, monkeypatch):
+    """Test that after N turns all but the last K are summarized and later turns carry summary + K turns"""
+    monkeypatch.setattr(settings, "CHAT_SUMMARY_EVERY_TURNS", 3)
+    monkeypatch.setattr(settings, "CHAT_RECENT_TURNS", 1)
+    service, sent, stored_summaries = chat.service, chat.sent, chat.summaries
+    conversation = ChatConversation(
+        kind=CHAT_KIND_COURSE, resource_id=uuid4(), session_id=uuid4(), ai_session_id="first", context="Course Title: Streams",
+        user_id=uuid4(), started_at=datetime(2026, 1, 1, tzinfo=timezone.utc)
+    )
+
+    async def scenario():
+        for i in range(1, 4):
+            await service.reply(conversation, f"question {i}", conversation.user_id)
+        await asyncio.gather(*chat_service_module.conversation_memory._tasks)
+        await service.reply(conversation, "question 4", conversation.user_id)
+
+    asyncio.run(scenario())
+
+    assert [session_id for session_id, _ in sent[:3]] == ["first"] * 3
+    assert sent[0][1] == "Course Title: Streams"
+    ((summary_turns, previous_turns, new_session),) = stored_summaries
+    assert (summary_turns, previous_turns) == (2, 0)
+    assert new_session != "first" and sent[3][0] == new_session
+    context = sent[3][1]
+    assert "Asked: question 1 Answered: answer 1" in context
+    assert "Asked: question 2 Answered: answer 2" in context
+    assert "User: question 3\nAssistant: answer 3" in context
+    assert (conversation.ai_session_id, conversation.summary_turns) == (new_session, 2)
+
+def test_turns_after_archiving_continue_the_numbering(chat):
+    """Test that a session whose messages were all archived keeps numbering, so new turns stay in its window"""
+    # 60 turns, the first 50 summarized, then every message archived
+    chat.store.last_message_order = 120
+    conversation = ChatConversation(
+        kind=CHAT_KIND_COURSE, resource_id=uuid4(), session_id=uuid4(), ai_session_id="agent", context="Course Title: Streams",
+        user_id=uuid4(), started_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        summary="Asked: streams Answered: yes", summary_turns=50, last_message_order=120
+    )
+
+    async def scenario():
+        await chat.service.reply(conversation, "question 1", conversation.user_id)
+        # Another worker, or an evicted window, reloads the conversation from the table
+        chat_service_module.conversation_memory.invalidate(conversation.session_id)
+        await chat.service.reply(conversation, "question 2", conversation.user_id)
+
+    asyncio.run(scenario())
+
+    assert [message.message_order for message in chat.store.messages] == [121, 122, 123, 124]
+    window = chat_service_module.conversation_memory.get(conversation.session_id)
+    # The reloaded window found the turn after the summary
+    assert list(window.recent) == [("question 1", "answer 1"), ("question 2", "answer 2")]
+    assert window.turns == 62
+    assert chat.summaries == []
+
+@pytest.fixture
+def shared_session(chat, monkeypatch):
+    """A conversation whose session row other workers also write"""
+    conversation = ChatConversation(
+        kind=CHAT_KIND_COURSE, resource_id=uuid4(), session_id=uuid4(), ai_session_id="first", context="Course Title: Streams",
+        user_id=uuid4(), started_at=datetime(2026, 1, 1, tzinfo=timezone.utc)
+    )
+    chat.store.session = SimpleNamespace(
+        id=conversation.session_id, ai_session_id="first", summary=None, summary_turns=0, last_message_order=0,
+        created_at=conversation.started_at
+    )
+
+    async def get_course_session(self, user_id, course_id):
+        return chat.store.session
+
+    monkeypatch.setattr(SessionRepository, "get_course_session", get_course_session)
+    return conversation
+
+def test_a_summary_by_another_worker_is_picked_up(chat, shared_session):
+    """Test that a worker notices another worker's summary when writing a turn and continues from it"""
+    conversation = shared_session
+
+    async def scenario():
+        await chat.service.reply(conversation, "question 1", conversation.user_id)
+        # Another worker folds turn 1 into a summary and moves to a new agent session
+        chat.store.session.ai_session_id = "second"
+        chat.store.session.summary = "Asked: question 1 Answered: answer 1"
+        chat.store.session.summary_turns = 1
+        await chat.service.reply(conversation, "question 2", conversation.user_id)
+        await chat.service.reply(conversation, "question 3", conversation.user_id)
+
+    asyncio.run(scenario())
+
+    assert [session_id for session_id, _ in chat.sent] == ["first", "first", "second"]
+    assert "Asked: question 1 Answered: answer 1" in chat.sent[2][1]
+    assert (conversation.ai_session_id, conversation.summary_turns) == ("second", 1)
+
+def test_turns_answered_by_another_worker_reload_the_window(chat, shared_session):
+    """Test that a window missing turns another worker wrote is rebuilt from the table"""
+    conversation = shared_session
+
+    async def scenario():
+        await chat.service.reply(conversation, "question 1", conversation.user_id)
+        # The same session answered on another worker
+        await chat.store.add(SimpleNamespace(session_id=conversation.session_id, user_content="elsewhere", ai_content="answer elsewhere"))
+        await chat.service.reply(conversation, "question 2", conversation.user_id)
+        assert chat_service_module.conversation_memory.get(conversation.session_id) is None
+        await chat.service.reply(conversation, "question 3", conversation.user_id)
+
+    asyncio.run(scenario())
+
+    window = chat_service_module.conversation_memory.get(conversation.session_id)
+    assert window.turns == 4
+    assert ("elsewhere", "answer elsewhere") in list(window.recent)
@@ -0,0 +1,34 @@
+import jwt
+import pytest
+from uuid import uuid4
+from app.config import settings
+from app.main import app
+from internal.course.handler.course_handler import get_course_service, get_idempotency_service
+from internal.course.service.course_service import CourseService, MAX_PROGRESS_CHANGES
+from internal.idempotency.service.idempotency_service import IdempotencyService
+
+@pytest.fixture
+def progress_client(client):
+    """Client whose course progress requests fail if they reach a repository"""
+    app.dependency_overrides[get_course_service] = lambda: CourseService(None)
+    app.dependency_overrides[get_idempotency_service] = lambda: IdempotencyService(None)
+    token = jwt.encode({"user_id": str(uuid4())}, settings.SECRET_KEY, algorithm="HS256")
+    client.headers["Authorization"] = f"Bearer {token}"
+    try:
+        yield client
+    finally:
+        app.dependency_overrides.clear()
+
+def test_empty_progress_batch_is_rejected(progress_client):
+    """Test that a batch without lesson or quiz changes answers 400"""
+    response = progress_client.patch(f"/api/v1/course/{uuid4()}/progress", json={"lessons": [], "quizzes": []})
+    assert response.status_code == 400
+    assert "At least one" in response.json()["detail"]
+
+def test_oversized_progress_batch_is_rejected(progress_client):
+    """Test that more than MAX_PROGRESS_CHANGES changes answer 400"""
+    lessons = [{"id": str(uuid4()), "is_completed": True} for _ in range(MAX_PROGRESS_CHANGES)]
+    quizzes = [{"id": str(uuid4()), "is_completed": True}]
+    response = progress_client.patch(f"/api/v1/course/{uuid4()}/progress", json={"lessons": lessons, "quizzes": quizzes})
+    assert response.status_code == 400
+    assert f"At most {MAX_PROGRESS_CHANGES}" in response.json()["detail"]
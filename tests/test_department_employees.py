@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from uuid import uuid4
+from internal.hr.department.repository.department_repository_db import DatabaseDepartmentRepository
+from internal.hr.department.service.department_service import DepartmentService
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalar(self):
+        return self.rows
+
+    def fetchall(self):
+        return self.rows
+
+class FakeDb:
+    """Answers the count query, then the page query, recording both"""
+
+    def __init__(self, total, rows):
+        self.results = [total, rows]
+        self.queries = []
+
+    def execute(self, query, params):
+        self.queries.append((str(query), params))
+        return FakeResult(self.results.pop(0))
+
+def _row(name, completion_rate):
+    return SimpleNamespace(
+        id=uuid4(), name=name, email=f"{name}@example.com", position="Engineer", status=True,
+        completion_rate=completion_rate, completed_courses=1, total_courses=2
+    )
+
+def test_page_is_sorted_from_stats_and_search_is_literal():
+    db = FakeDb(120, [_row("ana", 90.5), _row("bo", 40)])
+    service = DepartmentService(DatabaseDepartmentRepository(db))
+
+    page = asyncio.run(service.get_department_employees("d1", 2, 50, "completion_rate", "desc", " 50%_off "))
+
+    assert (page.total_count, page.limit, page.offset) == (120, 2, 50)
+    assert [employee.completion_rate for employee in page.employees] == [90.5, 40.0]
+    page_sql, params = db.queries[1]
+    assert "user_course_stats" in page_sql and "GROUP BY" not in page_sql
+    assert "ORDER BY COALESCE(s.completion_rate, 0) DESC, u.name DESC, u.id DESC" in page_sql
+    assert params["search"] == "%50\\%\\_off%"
+    assert (params["limit"], params["offset"]) == (2, 50)
+
+def test_empty_departments_skip_the_page_query():
+    db = FakeDb(0, [])
+    page = asyncio.run(DatabaseDepartmentRepository(db).get_department_employees("d1"))
+    assert page is None and len(db.queries) == 1
+    assert db.queries[0][1]["search"] is None
+
+def test_unknown_sort_keys_are_rejected():
+    service = DepartmentService(DatabaseDepartmentRepository(FakeDb(0, [])))
+    with pytest.raises(ValueError):
+        asyncio.run(service.get_department_employees("d1", sort="email"))
+    with pytest.raises(ValueError):
+        asyncio.run(service.get_department_employees("d1", order="sideways"))
@@ -0,0 +1,54 @@
+import asyncio
+import httpx
+from uuid import uuid4
+from internal.ai.agent.agent_client import AgentClient, AGENT_CHAT
+from internal.ai.course.service import course_service as course_service_module
+from internal.ai.course.service.course_service import AiCourseService
+from internal.ai.course.model.course_dto import AiCourseGenerateRequest
+from tests.load.fake_agent import FakeAgentConfig, create_fake_agent_app
+from tests.load.load_test import percentile
+from tests.fakes import InMemoryAiCourseRepository, StubOAuthService, StubUserService
+
+def _agent_client(config: FakeAgentConfig) -> AgentClient:
+    app = create_fake_agent_app(config)
+    return AgentClient("http://fake-agent", transport=httpx.ASGITransport(app=app))
+
+def test_fake_agent_streams_courses_the_service_can_parse(monkeypatch):
+    """Test that the fake agent's NDJSON course stream is accepted by the course service"""
+    config = FakeAgentConfig(latency_ms=0, latency_jitter_ms=0, generation_latency_ms=0, modules=3, lessons_per_module=2)
+    monkeypatch.setattr(course_service_module, "agent_client", _agent_client(config))
+    monkeypatch.setattr(course_service_module.settings, "AI_COURSE_STREAMING", True)
+    repository = InMemoryAiCourseRepository()
+    service = AiCourseService(StubOAuthService(), repository, StubUserService())
+    request = AiCourseGenerateRequest(token_github="gh", token_drive="", prompt="Load testing")
+
+    response = asyncio.run(service.generate_course(request, uuid4()))
+
+    assert [module.index for module in repository.modules] == [1, 2, 3]
+    assert len(response.external_response.modules[0].lessons) == 2
+
+def test_fake_agent_chat_endpoints_and_error_injection():
+    """Test the session and run endpoints, and that error_rate=1 always fails"""
+    healthy = _agent_client(FakeAgentConfig(latency_ms=0, latency_jitter_ms=0))
+    failing = _agent_client(FakeAgentConfig(latency_ms=0, latency_jitter_ms=0, error_rate=1.0, error_status=502))
+
+    async def scenario():
+        session = await healthy.post(AGENT_CHAT, "/apps/follow_up_agent/users/u1/sessions/s1", {"parts": []}, timeout=5)
+        run = await healthy.post(AGENT_CHAT, "/run", {"new_message": {"role": "user", "parts": [{"text": "hi"}]}}, timeout=5)
+        try:
+            await failing.post(AGENT_CHAT, "/run", {}, timeout=5)
+        except httpx.HTTPStatusError as e:
+            return session.json(), run.json(), e.response.status_code
+        return session.json(), run.json(), None
+
+    session, run, failed_status = asyncio.run(scenario())
+    assert session["session_id"] == "s1"
+    assert run[0]["content"]["role"] == "model"
+    assert failed_status == 502
+
+def test_percentile_uses_nearest_rank():
+    """Test the load test percentile helper"""
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([], 95) == 0.0
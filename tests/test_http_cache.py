@@ -0,0 +1,109 @@
+import json
+import jwt
+import pytest
+from uuid import uuid4
+from fastapi import FastAPI, Header
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.http_cache import etag_matches, make_etag, not_modified
+from app.main import app
+from app.middleware.compression import CompressionMiddleware
+from app.responses import FastJSONResponse
+from internal.course.handler.course_handler import get_course_service
+from internal.course.service.course_service import CourseService
+from scripts.benchmark_serialization import build_course_detail
+from tests.fakes import VersionedCourseRepository
+
+@pytest.fixture
+def compressed_client():
+    compressed_app = FastAPI()
+    compressed_app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @compressed_app.get("/large")
+    async def large():
+        return FastJSONResponse({"content": "markdown " * 200}, headers={"ETag": '"v1"'})
+
+    @compressed_app.get("/cached")
+    async def cached(if_none_match: str = Header(default=None)):
+        if etag_matches(if_none_match, '"v1"'):
+            return not_modified('"v1"', "course_detail")
+        return FastJSONResponse({"content": "markdown " * 200}, headers={"ETag": '"v1"'})
+
+    @compressed_app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @compressed_app.get("/stream")
+    async def stream():
+        async def lines():
+            for i in range(3):
+                yield json.dumps({"line": i, "padding": "x" * 400}) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return TestClient(compressed_app)
+
+def test_etag_matching():
+    etag = make_etag("course", "1", "2025-01-27")
+    assert etag == make_etag("course", "1", "2025-01-27")
+    assert etag != make_etag("course", "1", "2025-01-28")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag[:-1]}-gzip"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+def test_large_responses_are_gzipped(compressed_client):
+    response = compressed_client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < 1800
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == '"v1-gzip"'
+    assert response.json()["content"].startswith("markdown")
+
+def test_small_streamed_and_unaccepted_responses_are_not_compressed(compressed_client):
+    assert "content-encoding" not in compressed_client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in compressed_client.get("/large", headers={"Accept-Encoding": "gzip;q=0, identity"}).headers
+    stream = compressed_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in stream.headers
+    assert len(stream.text.splitlines()) == 3
+
+def test_304_carries_the_etag_of_the_held_representation(compressed_client):
+    """Test that a 304 revalidating a gzipped copy repeats that copy's ETag"""
+    first = compressed_client.get("/cached", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["etag"] == '"v1-gzip"'
+
+    second = compressed_client.get("/cached", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.headers["etag"] == first.headers["etag"]
+    assert "Accept-Encoding" in second.headers["vary"]
+
+    # An uncompressed copy keeps its own validator
+    identity = compressed_client.get("/cached", headers={"Accept-Encoding": "gzip", "If-None-Match": '"v1"'})
+    assert identity.status_code == 304
+    assert identity.headers["etag"] == '"v1"'
+
+def test_unchanged_course_returns_304_without_loading(client):
+    """Test the conditional GET flow on the course detail endpoint"""
+    repository = VersionedCourseRepository(build_course_detail(modules=2, lessons_per_module=2, lesson_chars=50))
+    app.dependency_overrides[get_course_service] = lambda: CourseService(repository)
+    token = jwt.encode({"user_id": str(uuid4())}, settings.SECRET_KEY, algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+    url = f"/api/v1/course/{repository.course.id}"
+    try:
+        first = client.get(url, headers=headers)
+        assert first.status_code == 200
+        assert first.headers["cache-control"] == "private, no-cache"
+        etag = first.headers["etag"]
+
+        second = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert second.status_code == 304
+        assert repository.loads == 1
+
+        repository.version = "v2"
+        third = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert third.status_code == 200
+        assert third.headers["etag"] != etag
+        assert repository.loads == 2
+    finally:
+        app.dependency_overrides.clear()
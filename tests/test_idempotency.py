@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from datetime import datetime, timezone, timedelta
+from uuid import uuid4
+from internal.idempotency.model.idempotency_dto import IdempotencyRecord, IDEMPOTENCY_STATUS_IN_PROGRESS, IDEMPOTENCY_STATUS_COMPLETED
+from internal.idempotency.repository.idempotency_repository import IdempotencyRepository
+from internal.idempotency.service.idempotency_service import IdempotencyService, IdempotencyConflictError, IdempotencyKeyReusedError
+from internal.course.model.course_dto import LessonCompletionResponse
+
+class InMemoryIdempotencyRepository(IdempotencyRepository):
+    """In-memory idempotency repository for tests"""
+
+    def __init__(self):
+        self.records = {}
+
+    async def get_record(self, user_id, endpoint, idempotency_key):
+        return self.records.get((user_id, endpoint, idempotency_key))
+
+    async def reserve(self, user_id, endpoint, idempotency_key, request_hash):
+        if (user_id, endpoint, idempotency_key) in self.records:
+            return None
+        now = datetime.now(timezone.utc)
+        record = IdempotencyRecord(
+            id=uuid4(), user_id=user_id, idempotency_key=idempotency_key, endpoint=endpoint,
+            request_hash=request_hash, status=IDEMPOTENCY_STATUS_IN_PROGRESS, resource_id=None,
+            response_body=None, created_at=now, updated_at=now
+        )
+        self.records[(user_id, endpoint, idempotency_key)] = record
+        return record.id
+
+    async def complete(self, record_id, resource_id, response_body):
+        for record in self.records.values():
+            if record.id == record_id:
+                record.status = IDEMPOTENCY_STATUS_COMPLETED
+                record.resource_id = resource_id
+                record.response_body = response_body
+
+    async def delete(self, record_id):
+        self.records = {k: v for k, v in self.records.items() if v.id != record_id}
+
+def _completion_operation(calls, lesson_id):
+    async def operation():
+        calls.append(lesson_id)
+        return LessonCompletionResponse(success=True, message="done", lesson_id=lesson_id, is_completed=True)
+    return operation
+
+def test_retry_replays_stored_response():
+    """Test that a retried request returns the stored body without running again"""
+    service = IdempotencyService(InMemoryIdempotencyRepository())
+    user_id, lesson_id, calls = uuid4(), uuid4(), []
+    payload = {"lesson_id": lesson_id, "is_completed": True}
+
+    first = asyncio.run(service.execute("key-1", user_id, "lesson", payload, _completion_operation(calls, lesson_id), lambda r: r.lesson_id))
+    second = asyncio.run(service.execute("key-1", user_id, "lesson", payload, _completion_operation(calls, lesson_id), lambda r: r.lesson_id))
+
+    assert len(calls) == 1
+    assert first.lesson_id == lesson_id
+    assert second == {"success": True, "message": "done", "lesson_id": str(lesson_id), "is_completed": True}
+
+def test_missing_key_always_runs_operation():
+    """Test that requests without a key are not deduplicated"""
+    service = IdempotencyService(InMemoryIdempotencyRepository())
+    user_id, lesson_id, calls = uuid4(), uuid4(), []
+
+    for _ in range(2):
+        asyncio.run(service.execute(None, user_id, "lesson", {}, _completion_operation(calls, lesson_id)))
+
+    assert len(calls) == 2
+
+def test_key_reused_with_different_payload_is_rejected():
+    """Test that reusing a key for another request fails"""
+    service = IdempotencyService(InMemoryIdempotencyRepository())
+    user_id, calls = uuid4(), []
+
+    asyncio.run(service.execute("key-1", user_id, "lesson", {"is_completed": True}, _completion_operation(calls, uuid4())))
+    with pytest.raises(IdempotencyKeyReusedError):
+        asyncio.run(service.execute("key-1", user_id, "lesson", {"is_completed": False}, _completion_operation(calls, uuid4())))
+
+def test_in_progress_key_conflicts_until_stale():
+    """Test that a concurrent retry conflicts while the original request is running"""
+    repository = InMemoryIdempotencyRepository()
+    service = IdempotencyService(repository)
+    user_id, calls = uuid4(), []
+    asyncio.run(repository.reserve(user_id, "lesson", "key-1", service._hash_payload({})))
+
+    with pytest.raises(IdempotencyConflictError):
+        asyncio.run(service.execute("key-1", user_id, "lesson", {}, _completion_operation(calls, uuid4())))
+
+    record = asyncio.run(repository.get_record(user_id, "lesson", "key-1"))
+    record.updated_at -= timedelta(days=1)
+    asyncio.run(service.execute("key-1", user_id, "lesson", {}, _completion_operation(calls, uuid4())))
+    assert len(calls) == 1
+
+def test_failed_operation_releases_key():
+    """Test that a failed request can be retried with the same key"""
+    repository = InMemoryIdempotencyRepository()
+    service = IdempotencyService(repository)
+    user_id = uuid4()
+
+    async def failing_operation():
+        raise TimeoutError("agent timed out")
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(service.execute("key-1", user_id, "course", {}, failing_operation))
+
+    assert repository.records == {}
@@ -0,0 +1,65 @@
+import asyncio
+import httpx
+import pytest
+from app.metrics import MetricsRegistry, AGENT_REQUESTS
+from internal.ai.agent.agent_client import AgentClient, AGENT_CHAT
+
+def test_histogram_renders_cumulative_buckets():
+    """Test the exposition format of a labelled histogram"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5.0, route="/a")
+
+    output = registry.render()
+
+    assert "# TYPE latency_seconds histogram" in output
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in output
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in output
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in output
+    assert 'latency_seconds_count{route="/a"} 3' in output
+
+def test_wrong_labels_are_rejected():
+    registry = MetricsRegistry()
+    counter = registry.counter("calls_total", "Calls", ("outcome",))
+    with pytest.raises(ValueError):
+        counter.inc(route="/a")
+
+def test_metrics_endpoint_uses_route_templates(client):
+    """Test that /metrics is public and labels requests by route template"""
+    client.get("/health")
+    client.get("/api/v1/course/00000000-0000-0000-0000-000000000001")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in response.text
+    assert 'route="/api/v1/course/{course_id}"' in response.text
+    assert "00000000-0000-0000-0000-000000000001" not in response.text
+    assert "db_pool_size" in response.text
+    assert 'ai_agent_circuit_state{endpoint_class="chat",state="closed"} 1' in response.text
+
+def test_agent_calls_are_counted_by_outcome():
+    """Test success, HTTP error and timeout outcomes for an operation"""
+    def handler(request):
+        if request.url.path == "/timeout":
+            raise httpx.ReadTimeout("slow", request=request)
+        if request.url.path == "/error":
+            return httpx.Response(500)
+        return httpx.Response(200, json={})
+
+    client = AgentClient("http://agent", transport=httpx.MockTransport(handler))
+    before = {outcome: AGENT_REQUESTS.value(operation="metrics_test", outcome=outcome) for outcome in ("success", "http_error", "timeout")}
+
+    async def scenario():
+        await client.post(AGENT_CHAT, "/ok", {}, timeout=1, operation="metrics_test")
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.post(AGENT_CHAT, "/error", {}, timeout=1, operation="metrics_test")
+        with pytest.raises(httpx.TimeoutException):
+            await client.post(AGENT_CHAT, "/timeout", {}, timeout=1, operation="metrics_test")
+
+    asyncio.run(scenario())
+    for outcome in ("success", "http_error", "timeout"):
+        assert AGENT_REQUESTS.value(operation="metrics_test", outcome=outcome) == before[outcome] + 1
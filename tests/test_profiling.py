@@ -0,0 +1,63 @@
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.middleware.profiling import ProfilingMiddleware
+from app.profiling import SamplingProfiler, router as profiling_router
+
+ADMIN = {"X-Admin-Token": "profiling-token"}
+
+@pytest.fixture
+def profiled_client(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_ADMIN_TOKEN", "profiling-token")
+    app = FastAPI()
+    app.middleware("http")(ProfilingMiddleware())
+    app.include_router(profiling_router)
+
+    @app.get("/work/{n}")
+    async def work(n: int):
+        return {"total": sum(i * i for i in range(n))}
+
+    return TestClient(app)
+
+def busy_loop(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+def test_sampling_profiler_produces_folded_stacks():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    busy_loop(0.2)
+    profiler.stop()
+
+    lines = profiler.folded().splitlines()
+    assert profiler.samples > 0
+    busy = [line for line in lines if "busy_loop (test_profiling.py:" in line]
+    assert busy
+    stack, count = busy[0].rsplit(" ", 1)
+    assert stack.startswith("MainThread;")
+    assert int(count) >= 1
+
+def test_profiling_endpoints_require_admin_token(profiled_client):
+    assert profiled_client.get("/debug/profile/routes").status_code == 403
+    assert profiled_client.get("/debug/profile/routes", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert profiled_client.get("/debug/profile/routes", headers=ADMIN).status_code == 200
+
+def test_route_cpu_and_single_request_profile(profiled_client):
+    """Test per-route accounting by template and a report for a profiled request"""
+    profiled_client.get("/work/1000")
+    response = profiled_client.get("/work/2000", headers={**ADMIN, "X-Profile-Request": "1"})
+    assert "X-Profile-Id" in response.headers
+    # The header alone, without the token, does not profile
+    assert "X-Profile-Id" not in profiled_client.get("/work/10", headers={"X-Profile-Request": "1"}).headers
+
+    routes = profiled_client.get("/debug/profile/routes", headers=ADMIN).json()["routes"]
+    work = next(row for row in routes if row["route"] == "/work/{n}")
+    assert work["requests"] >= 3
+
+    report = profiled_client.get(f"/debug/profile/requests/{response.headers['X-Profile-Id']}", headers=ADMIN)
+    assert report.status_code == 200
+    assert report.text.startswith("GET /work/2000")
+    assert "function calls" in report.text
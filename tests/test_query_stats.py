@@ -0,0 +1,59 @@
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from app.database.query_stats import install_query_stats
+from app.middleware.query_stats import QueryStatsMiddleware
+
+@pytest.fixture
+def instrumented_app():
+    """Small app over an in-memory SQLite engine carrying the query counters"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    install_query_stats(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE lessons (id INTEGER PRIMARY KEY, title TEXT)"))
+        conn.execute(text("INSERT INTO lessons (id, title) VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+
+    app = FastAPI()
+    app.middleware("http")(QueryStatsMiddleware(n_plus_one_threshold=3))
+
+    @app.get("/batched")
+    def batched():
+        with engine.connect() as conn:
+            return {"titles": [row.title for row in conn.execute(text("SELECT title FROM lessons"))]}
+
+    @app.get("/n-plus-one")
+    def n_plus_one():
+        with engine.connect() as conn:
+            ids = [row.id for row in conn.execute(text("SELECT id FROM lessons"))]
+            titles = [conn.execute(text("SELECT title FROM lessons WHERE id = :id"), {"id": i}).scalar() for i in ids]
+        return {"titles": titles}
+
+    return TestClient(app)
+
+def test_server_timing_reports_queries(instrumented_app):
+    """Test that the response carries the per-request DB statement count"""
+    response = instrumented_app.get("/batched")
+    assert response.status_code == 200
+    server_timing = response.headers["Server-Timing"]
+    assert server_timing.startswith("db;dur=")
+    assert '"1 queries' in server_timing
+    assert "app;dur=" in server_timing
+
+def test_repeated_statement_is_flagged_as_n_plus_one(instrumented_app, caplog):
+    """Test that a statement run once per row is logged as a possible N+1"""
+    with caplog.at_level(logging.INFO, logger="app.middleware.query_stats"):
+        response = instrumented_app.get("/n-plus-one")
+    assert '"4 queries' in response.headers["Server-Timing"]
+    assert any("Possible N+1 query: executed 3 times" in record.message for record in caplog.records)
+    assert any(getattr(record, "db_queries", None) == 4 for record in caplog.records)
+
+def test_query_budget_fixture(instrumented_app, query_budget):
+    """Test that the budget passes within the limit and fails when exceeded"""
+    with query_budget(1):
+        instrumented_app.get("/batched")
+    with pytest.raises(AssertionError, match="Query budget exceeded: 4 > 2"):
+        with query_budget(2):
+            instrumented_app.get("/n-plus-one")
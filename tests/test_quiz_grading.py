@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from uuid import uuid4
+from internal.course.model.course_dto import ModuleAnswerIndex, QuizAnswer, QuizSubmissionRequest
+from internal.course.repository.course_repository_db import _strip_answers
+from internal.course.service.course_service import CourseService, answer_index_cache
+from scripts.benchmark_serialization import build_course_detail
+from tests.fakes import VersionedCourseRepository
+
+class GradingCourseRepository(VersionedCourseRepository):
+    """Serves one module's answer index and records saved results"""
+
+    def __init__(self, index):
+        super().__init__(build_course_detail(modules=1, lessons_per_module=1, lesson_chars=10))
+        self.index = index
+        self.index_loads = 0
+        self.saved = []
+
+    async def get_module_answer_index(self, module_id, user_id):
+        self.index_loads += 1
+        if module_id != self.index.module_id or user_id != self.index.user_id:
+            return None
+        return self.index
+
+    async def save_quiz_results(self, course_id, user_id, results):
+        self.saved.append((course_id, results))
+        return 50.0
+
+@pytest.fixture(autouse=True)
+def empty_answer_cache():
+    answer_index_cache.clear()
+    yield
+    answer_index_cache.clear()
+
+def test_answers_are_graded_from_a_cached_index():
+    """Test grading against the answer index, which is loaded once per module"""
+    first_quiz, second_quiz = uuid4(), uuid4()
+    index = ModuleAnswerIndex(module_id=uuid4(), course_id=uuid4(), user_id=uuid4(), answers={first_quiz: "b", second_quiz: "c"})
+    repository = GradingCourseRepository(index)
+    service = CourseService(repository)
+    request = QuizSubmissionRequest(answers=[QuizAnswer(quiz_id=first_quiz, answer=" B "), QuizAnswer(quiz_id=second_quiz, answer="a")])
+
+    response = asyncio.run(service.submit_quiz_answers(index.module_id, index.user_id, request))
+    asyncio.run(service.submit_quiz_answers(index.module_id, index.user_id, request))
+
+    assert [result.is_correct for result in response.results] == [True, False]
+    assert response.correct_count == 1
+    assert response.progress == 50.0
+    assert repository.saved[0] == (index.course_id, [(first_quiz, True), (second_quiz, False)])
+    assert repository.index_loads == 1
+
+def test_foreign_modules_and_quizzes_are_rejected():
+    index = ModuleAnswerIndex(module_id=uuid4(), course_id=uuid4(), user_id=uuid4(), answers={uuid4(): "a"})
+    repository = GradingCourseRepository(index)
+    service = CourseService(repository)
+    asyncio.run(service.get_module_answer_index(index.module_id, index.user_id))
+
+    other_user = asyncio.run(service.submit_quiz_answers(index.module_id, uuid4(), QuizSubmissionRequest(answers=[QuizAnswer(quiz_id=uuid4(), answer="a")])))
+    assert other_user is None
+    with pytest.raises(ValueError):
+        asyncio.run(service.submit_quiz_answers(index.module_id, index.user_id, QuizSubmissionRequest(answers=[QuizAnswer(quiz_id=uuid4(), answer="a")])))
+    assert repository.saved == []
+
+def test_answers_are_stripped_from_course_detail():
+    questions = {"question": "2 + 2?", "choices": {"a": "3", "b": "4"}, "answer": "b"}
+    assert _strip_answers(questions) == {"question": "2 + 2?", "choices": {"a": "3", "b": "4"}}
+    assert _strip_answers([questions]) == [{"question": "2 + 2?", "choices": {"a": "3", "b": "4"}}]
@@ -0,0 +1,30 @@
+import json
+import pytest
+from app import responses
+from app.responses import FastJSONResponse
+from internal.hr.department.model.department_dto import DepartmentEmployeeItem, DepartmentEmployeeListResponse
+from scripts.benchmark_serialization import build_course_detail, render_default
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_direct_response_matches_response_model_output(monkeypatch, use_orjson):
+    """Test that the direct path produces the same JSON as the response_model path"""
+    if use_orjson and not responses.HAS_ORJSON:
+        pytest.skip("orjson is not installed")
+    monkeypatch.setattr(responses, "HAS_ORJSON", use_orjson)
+    course = build_course_detail(modules=3, lessons_per_module=2, lesson_chars=50)
+
+    assert json.loads(FastJSONResponse(course).body) == json.loads(render_default(course))
+
+def test_pydantic_models_are_dumped_directly():
+    employees = DepartmentEmployeeListResponse(
+        employees=[DepartmentEmployeeItem(
+            id="1", name="Ana", email="ana@example.com", position="Engineer", status=True,
+            completion_rate=50.0, completed_courses=1, total_courses=2
+        )],
+        total_count=1
+    )
+
+    response = FastJSONResponse(employees)
+
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == employees.model_dump()
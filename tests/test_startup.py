@@ -0,0 +1,103 @@
+import asyncio
+import importlib
+import os
+import time
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app import main
+from app.config import settings
+from app.lifecycle import ServerLifecycle, lifecycle
+from app.middleware.draining import DrainingMiddleware
+from app.server import available_cpus, worker_count
+from scripts.benchmark_import_time import parse_importtime
+
+def api_paths(app):
+    return {route.path for route in app.routes if route.path.startswith(settings.API_V1_STR)}
+
+def test_router_registry_matches_router_prefixes():
+    for prefix, module_path in main.ROUTERS:
+        assert importlib.import_module(module_path).router.prefix == prefix
+
+def test_fast_startup_includes_routers_on_first_request(monkeypatch):
+    """Test that routers are included by the first request under their prefix"""
+    monkeypatch.setattr(settings, "FAST_STARTUP", True)
+    app = main.create_app()
+    client = TestClient(app)
+    assert api_paths(app) == set()
+
+    client.get("/api/v1/hr/company/00000000-0000-0000-0000-000000000000/not-a-route")
+    assert api_paths(app)
+    assert all(path.startswith("/api/v1/hr/company") for path in api_paths(app))
+    assert "/api/v1/course/{course_id}" not in api_paths(app)
+
+    assert "/api/v1/course/{course_id}" in client.get("/openapi.json").json()["paths"]
+    assert api_paths(app) == api_paths(main.app)
+
+def test_readiness_reports_an_unreachable_database(client, monkeypatch):
+    monkeypatch.setattr(settings, "READINESS_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(main, "check_database", lambda: time.sleep(1))
+    response = client.get("/ready")
+    assert response.status_code == 503
+
+    monkeypatch.setattr(main, "check_database", lambda: None)
+    assert client.get("/ready").json() == {"status": "ready"}
+
+def test_importtime_output_is_parsed():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |     jwt.exceptions",
+        "import time:      2500 |       2620 |   jwt",
+    ])
+    assert parse_importtime(output) == {"jwt.exceptions": (120, 120), "jwt": (2500, 2620)}
+
+def test_workers_are_sized_to_the_cgroup_quota(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(16)), raising=False)
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 0)
+    assert available_cpus(tmp_path) == 16
+    assert worker_count(tmp_path) == settings.SERVER_MAX_WORKERS
+
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert available_cpus(tmp_path) == 2
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert available_cpus(tmp_path) == 16
+
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 3)
+    assert worker_count(tmp_path) == 3
+
+def test_streamed_responses_count_as_in_flight_until_sent():
+    """Test that a streamed response counts until its last chunk"""
+    state = ServerLifecycle()
+    streaming_app = FastAPI()
+    streaming_app.add_middleware(DrainingMiddleware, state=state)
+    seen = []
+
+    @streaming_app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                seen.append(state.in_flight)
+                yield f"{i}\n"
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    assert TestClient(streaming_app).get("/stream").text == "0\n1\n2\n"
+    assert seen == [1, 1, 1]
+    assert state.in_flight == 0
+    assert asyncio.run(state.wait_for_idle(0.1))
+
+def test_readiness_fails_while_draining(client, monkeypatch):
+    monkeypatch.setattr(main, "check_database", lambda: None)
+    monkeypatch.setattr(lifecycle, "draining", True)
+    assert client.get("/ready").status_code == 503
+    assert client.get("/live").json() == {"status": "alive", "draining": True}
+
+def test_shutdown_wait_gets_only_the_grace_left(monkeypatch):
+    """Test that time already spent draining is taken off the grace period"""
+    state = ServerLifecycle()
+    assert state.grace_left(8) == 8
+    state.begin_draining()
+    monkeypatch.setattr(state, "draining_since", time.monotonic() - 5)
+    assert 2.9 < state.grace_left(8) <= 3
+    monkeypatch.setattr(state, "draining_since", time.monotonic() - 20)
+    assert state.grace_left(8) == 0
+    assert asyncio.run(state.wait_for_idle(0))
@@ -0,0 +1,96 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from app.middleware.tracing import TracingMiddleware
+from app.tracing import InMemorySpanWriter, configure_tracing, install_sql_tracing, start_span, traced_repository
+from internal.ai.agent.agent_client import AgentClient, AGENT_CHAT
+
+@pytest.fixture
+def spans():
+    """Enable the built-in tracer for one test, collecting spans in memory"""
+    writer = InMemorySpanWriter()
+    configure_tracing(enabled=True, writer=writer)
+    yield writer.spans
+    configure_tracing(enabled=False)
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    install_sql_tracing(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE lessons (id INTEGER PRIMARY KEY, title TEXT)"))
+        conn.execute(text("INSERT INTO lessons (id, title) VALUES (1, 'a')"))
+    return engine
+
+def _by_name(spans):
+    return {span.name: span for span in spans}
+
+def test_repository_and_sql_spans_are_nested(spans, engine):
+    """Test that repository methods and their statements join the current trace"""
+    @traced_repository
+    class LessonRepository:
+        def get_title(self, lesson_id):
+            with engine.connect() as conn:
+                return conn.execute(text("SELECT title FROM lessons WHERE id = :id"), {"id": lesson_id}).scalar()
+
+    with start_span("request") as root:
+        assert LessonRepository().get_title(1) == "a"
+
+    named = _by_name(spans)
+    repository_span = named["LessonRepository.get_title"]
+    sql_span = named["SQL SELECT"]
+    assert repository_span.parent_id == root.span_id
+    assert sql_span.parent_id == repository_span.span_id
+    assert sql_span.attributes["db.statement"].startswith("SELECT title FROM lessons")
+    assert {span.trace_id for span in spans} == {root.trace_id}
+
+def test_agent_calls_propagate_traceparent(spans):
+    """Test that the agent receives a traceparent belonging to the current trace"""
+    received = {}
+
+    def handler(request):
+        received["traceparent"] = request.headers.get("traceparent")
+        return httpx.Response(200, json={})
+
+    client = AgentClient("http://agent", transport=httpx.MockTransport(handler))
+
+    async def scenario():
+        with start_span("request") as root:
+            await client.post(AGENT_CHAT, "/run", {}, timeout=1, operation="tracing_test")
+        return root
+
+    root = asyncio.run(scenario())
+    client_span = _by_name(spans)["HTTP POST /run"]
+    assert client_span.parent_id == root.span_id
+    assert received["traceparent"] == client_span.traceparent
+
+def test_middleware_continues_incoming_trace(spans, engine):
+    """Test that an incoming traceparent is continued and unsampled ones are respected"""
+    app = FastAPI()
+    app.middleware("http")(TracingMiddleware())
+
+    @app.get("/lessons/{lesson_id}")
+    def get_lesson(lesson_id: int):
+        with engine.connect() as conn:
+            return {"title": conn.execute(text("SELECT title FROM lessons WHERE id = :id"), {"id": lesson_id}).scalar()}
+
+    client = TestClient(app)
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    response = client.get("/lessons/1", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+
+    assert response.headers["X-Trace-Id"] == trace_id
+    named = _by_name(spans)
+    server_span = named["GET /lessons/{lesson_id}"]
+    assert server_span.parent_id == "00f067aa0ba902b7"
+    assert server_span.attributes["http.status_code"] == 200
+    assert named["SQL SELECT"].parent_id == server_span.span_id
+
+    spans.clear()
+    response = client.get("/lessons/1", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-00"})
+    assert response.status_code == 200
+    assert "X-Trace-Id" not in response.headers
+    assert spans == []